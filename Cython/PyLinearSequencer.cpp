@@ -18,19 +18,291 @@
 #include "../Sequencing/Alignment.h"
 #include "../Pairwise/LinearSequencer.h"
 #include "../Pairwise/AffineSequencer.h"
+#include "../Pairwise/AllPairsScorer.h"
+#include "../Pairwise/BandedSequencer.h"
+#include "../Pairwise/Cigar.h"
+#include "../Pairwise/EditDistanceSequencer.h"
+#include "../Pairwise/KmerDistanceSequencer.h"
+#include "../Pairwise/MinHashSketcher.h"
+#include "../Pairwise/SeedSearcher.h"
 #include "../Sequencing/Sequence.h"
 #include "../NeighborJoin/NeighborJoin.h"
+#include "../NeighborJoin/NeighborJoinBootstrap.h"
 #include "../MultipleAlignment/Msa.h"
+#include "../Utilities/Wavefront.h"
 
 using Pairwise::MatrixDataType;
 using Pairwise::SubstitutionMatrix;
 using Pairwise::LinearSequencer;
 using Pairwise::AffineSequencer;
 using Pairwise::PairwiseAlignment;
+using Pairwise::AllPairsScorer;
+using Pairwise::BandedSequencer;
+using Pairwise::Cigar;
+using Pairwise::EditDistanceSequencer;
+using Pairwise::KmerDistanceSequencer;
+using Pairwise::MinHashSketch;
+using Pairwise::MinHashSketchFile;
+using Pairwise::MinHashSketcher;
+using Pairwise::SearchHit;
+using Pairwise::SeedIndex;
+using Pairwise::SeedSearcher;
 using Sequencing::Sequence;
 using Sequencing::Alignment;
 using MultipleSequencing::MultipleSequenceAlignment;
 
+/**
+ * This helper function converts a Python list of lists into the vector of vectors used
+ * to construct a SubstitutionMatrix.
+ *
+ * @param input_matrix The Python list of lists containing the substitution matrix.
+ * @param matrix The vector of vectors that the converted matrix is stored in.
+ * The cells may be integers or floats, such as the lists of loadSubstitutionMatrix.
+ *
+ * @return True if the input was a non-empty list of lists of the same length, otherwise
+ * false with a Python exception set.
+ */
+static bool Sequencing_convertSubstitutionMatrix(PyObject* input_matrix, std::vector<std::vector<MatrixDataType> >& matrix)
+{
+	if ( !PyList_Check(input_matrix) || PyList_Size(input_matrix) == 0 || !PyList_Check(PyList_GetItem(input_matrix, 0)) )
+	{
+		PyErr_SetString(PyExc_TypeError, "a substitution matrix must be a non-empty list of lists");
+		return false;
+	}
+
+	int column_list_size = PyList_Size(input_matrix);
+	int row_list_size = PyList_Size(PyList_GetItem(input_matrix, 0));
+
+	matrix = std::vector<std::vector<MatrixDataType> >(column_list_size, std::vector<MatrixDataType>(row_list_size, 0));
+
+	for ( int i = 0; i < column_list_size; i++ )
+	{
+		PyObject* row_list = PyList_GetItem(input_matrix, i);
+		if ( !PyList_Check(row_list) )
+		{
+			PyErr_SetString(PyExc_TypeError, "a substitution matrix must be a non-empty list of lists");
+			return false;
+		}
+		if ( PyList_Size(row_list) != row_list_size )
+		{
+			PyErr_Format(PyExc_ValueError, "every row of a substitution matrix must have %d cells", row_list_size);
+			return false;
+		}
+
+		for ( int j = 0; j < row_list_size; j++ )
+		{
+			PyObject* matrix_cell_contents = PyList_GetItem(row_list, j);
+			if ( PyFloat_Check(matrix_cell_contents) )
+				matrix[i][j] = (MatrixDataType)PyFloat_AsDouble(matrix_cell_contents);
+			else
+				matrix[i][j] = PyLong_AsLong(matrix_cell_contents);
+		}
+	}
+	return !PyErr_Occurred();
+}
+
+/**
+ * The Python object of the Sequencing.SubstitutionMatrix type. It holds a compiled
+ * SubstitutionMatrix, so the lookup table of the matrix is built only once instead of
+ * once per call. The object is immutable, which allows the alignment functions to use
+ * it while the GIL is released.
+ */
+typedef struct
+{
+	PyObject_HEAD
+	SubstitutionMatrix* substitution_matrix;
+} Sequencing_SubstitutionMatrixObject;
+
+static PyTypeObject Sequencing_SubstitutionMatrixType = { PyVarObject_HEAD_INIT(NULL, 0) };
+
+/**
+ * This function creates a SubstitutionMatrix object from a list of lists, such as the
+ * lists returned by loadSubstitutionMatrix.
+ *
+ * @param PyTypeObject* type The type of the new object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Matrix - The list of lists containing the substitution matrix.
+ * @return The new SubstitutionMatrix object.
+ */
+static PyObject* Sequencing_SubstitutionMatrix_new(PyTypeObject* type, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	std::vector<std::vector<MatrixDataType> > matrix;
+	static const char* keywords[] = { "matrix", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "O", (char**)keywords, &input_matrix) )
+		return NULL;
+
+	if ( !Sequencing_convertSubstitutionMatrix(input_matrix, matrix) )
+		return NULL;
+
+	Sequencing_SubstitutionMatrixObject* self = (Sequencing_SubstitutionMatrixObject*)type->tp_alloc(type, 0);
+	if ( self == NULL )
+		return NULL;
+
+	self->substitution_matrix = new SubstitutionMatrix(matrix);
+	return (PyObject*)self;
+}
+
+static void Sequencing_SubstitutionMatrix_dealloc(Sequencing_SubstitutionMatrixObject* self)
+{
+	delete self->substitution_matrix;
+	Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+/**
+ * This function returns the substitution matrix as a list of lists of integers, in the
+ * same layout as the lists returned by loadSubstitutionMatrix.
+ */
+static PyObject* Sequencing_SubstitutionMatrix_toList(Sequencing_SubstitutionMatrixObject* self, PyObject* unused)
+{
+	int column_count = self->substitution_matrix->getColumnCount();
+	int row_count = self->substitution_matrix->getRowCount();
+
+	PyObject* matrix = PyList_New(column_count);
+	for ( int i = 0; i < column_count; i++ )
+	{
+		PyObject* row = PyList_New(row_count);
+		for ( int j = 0; j < row_count; j++ )
+			PyList_SetItem(row, j, PyLong_FromLong(self->substitution_matrix->get(i, j)));
+		PyList_SetItem(matrix, i, row);
+	}
+	return matrix;
+}
+
+/**
+ * This function supports pickling. The matrix is pickled as its list of lists, which is
+ * compiled again when the object is unpickled.
+ */
+static PyObject* Sequencing_SubstitutionMatrix_reduce(Sequencing_SubstitutionMatrixObject* self, PyObject* unused)
+{
+	return Py_BuildValue("O(N)", (PyObject*)Py_TYPE(self), Sequencing_SubstitutionMatrix_toList(self, NULL));
+}
+
+static PyMethodDef Sequencing_SubstitutionMatrix_Methods[] = {
+	{"toList", (PyCFunction)Sequencing_SubstitutionMatrix_toList, METH_NOARGS, "Returns the Substitution Matrix as a list of lists"},
+	{"__reduce__", (PyCFunction)Sequencing_SubstitutionMatrix_reduce, METH_NOARGS, "Pickles the Substitution Matrix"},
+	{NULL, NULL}
+};
+
+/**
+ * This helper function finds the SubstitutionMatrix of the matrix argument of the
+ * alignment functions. A SubstitutionMatrix object is used directly. A list of lists is
+ * still accepted, in which case it is compiled into the provided converted matrix.
+ *
+ * @param input_matrix The SubstitutionMatrix object or list of lists.
+ * @param converted_matrix The matrix that a list of lists is compiled into.
+ * @return The substitution matrix, or NULL if the argument is not a substitution matrix.
+ */
+static const SubstitutionMatrix* Sequencing_getSubstitutionMatrix(PyObject* input_matrix, SubstitutionMatrix& converted_matrix)
+{
+	if ( PyObject_TypeCheck(input_matrix, &Sequencing_SubstitutionMatrixType) )
+		return ((Sequencing_SubstitutionMatrixObject*)input_matrix)->substitution_matrix;
+
+	if ( !PyList_Check(input_matrix) )
+	{
+		PyErr_SetString(PyExc_TypeError, "matrix must be a SubstitutionMatrix or a non-empty list of lists");
+		return NULL;
+	}
+
+	std::vector<std::vector<MatrixDataType> > matrix;
+	if ( !Sequencing_convertSubstitutionMatrix(input_matrix, matrix) )
+		return NULL;
+
+	converted_matrix = SubstitutionMatrix(matrix);
+	return &converted_matrix;
+}
+
+/**
+ * This helper function copies the distances of a buffer into a vector of doubles.
+ *
+ * @param buffer The first distance of the buffer.
+ * @param size The number of distances.
+ * @param matrix Set to the distances.
+ */
+template <class T>
+static void Sequencing_copyDistances(const void* buffer, const size_t size, std::vector<double>& matrix)
+{
+	const T* distances = (const T*)buffer;
+	matrix.resize(size);
+	for ( size_t i = 0; i < size; i++ )
+		matrix[i] = distances[i];
+}
+
+/**
+ * This helper function reads a condensed distance matrix, the upper triangle of the
+ * matrix row after row, from an object that supports the buffer protocol, such as an
+ * array.array, a NumPy array or a memoryview. The buffer is read in place instead of
+ * through a Python object per distance, and the distances are copied only once, into
+ * the working matrix of the NeighborJoin. A ValueError is raised if the buffer is not
+ * a contiguous buffer of native numbers with the size of the triangle.
+ *
+ * @param input The object that holds the distances.
+ * @param count The number of sequences of the matrix.
+ * @param matrix Set to the distances, n*(n+1)/2 of them if the triangle holds the
+ * diagonal, such as the scores of scoreAllPairs, or n*(n-1)/2 if it does not.
+ * @return True if the distances could be read, otherwise false.
+ */
+static bool Sequencing_getCondensedMatrix(PyObject* input, const int count, std::vector<double>& matrix)
+{
+	Py_buffer view;
+	if ( PyObject_GetBuffer(input, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0 )
+		return false;
+
+	const char* format = view.format == NULL ? "B" : view.format;
+	if ( format[0] == '@' || format[0] == '=' )
+		format++;
+
+	size_t size = view.itemsize > 0 ? view.len / view.itemsize : 0;
+	size_t with_diagonal = (size_t)count * (count + 1) / 2;
+	size_t without_diagonal = count > 0 ? (size_t)count * (count - 1) / 2 : 0;
+	bool valid = view.ndim <= 1 && std::string(format).size() == 1 && ( size == with_diagonal || size == without_diagonal );
+
+	if ( valid && format[0] == 'd' && view.itemsize == sizeof(double) )
+		Sequencing_copyDistances<double>(view.buf, size, matrix);
+	else if ( valid && format[0] == 'f' && view.itemsize == sizeof(float) )
+		Sequencing_copyDistances<float>(view.buf, size, matrix);
+	else if ( valid && format[0] == 'i' && view.itemsize == sizeof(int) )
+		Sequencing_copyDistances<int>(view.buf, size, matrix);
+	else if ( valid && format[0] == 'l' && view.itemsize == sizeof(long) )
+		Sequencing_copyDistances<long>(view.buf, size, matrix);
+	else if ( valid && format[0] == 'q' && view.itemsize == sizeof(long long) )
+		Sequencing_copyDistances<long long>(view.buf, size, matrix);
+	else
+		valid = false;
+
+	PyBuffer_Release(&view);
+	if ( !valid )
+	{
+		PyErr_Format(PyExc_ValueError, "the distances must be a condensed upper triangle of %d sequences", count);
+		return false;
+	}
+	return true;
+}
+
+/**
+ * This helper function reads the search keyword argument of constructNewickTree and
+ * bootstrapNewickTree. A ValueError is raised for unknown searches.
+ *
+ * @param search The name of the tree search, "exact" or "rapid".
+ * @param tree_search Set to the NeighborJoin search constant of the requested search.
+ * @return True if the search is known, otherwise false.
+ */
+static bool Sequencing_parseTreeSearch(const char* search, int& tree_search)
+{
+	std::string name = std::string(search);
+	if ( name == "exact" )
+		tree_search = NeighborJoin::EXACT_SEARCH;
+	else if ( name == "rapid" )
+		tree_search = NeighborJoin::RAPID_SEARCH;
+	else
+	{
+		PyErr_Format(PyExc_ValueError, "unknown tree search '%s'", search);
+		return false;
+	}
+	return true;
+}
+
 /**
  * This function constructs the string representation of a Phylogenetic tree in the
  * newick tree format. This tree is constructed from a distance matrix that contains
@@ -57,18 +329,32 @@ using MultipleSequencing::MultipleSequenceAlignment;
  * @param PyObject* args The arguments provided to this function used to create the
  * newick tree. The arguments include the following:
  *     Input Matrix - The distance matrix composed of n*n pariwise comparisons made
- *     between n sequences.
+ *     between n sequences, either as a list of lists or as the condensed upper triangle
+ *     of the matrix in an object that supports the buffer protocol, such as the array
+ *     returned by scoreAllPairs. The triangle is read row after row, with or without
+ *     the diagonal, and is not converted into Python objects.
+ *     Sequence Names - The names of the n sequences.
+ *     Search - Optional keyword argument that selects how the pair of nodes to join
+ *         is found. "exact" (the default) compares every pair of nodes for every join,
+ *         "rapid" skips most of the pairs in the style of RapidNJ and is much faster
+ *         for large matrices. Both searches construct the same tree.
  * @return The newick tree constructed from the distance matrix provided. The newick
  * tree is provided in the form of a string.
  */
-static PyObject* Sequencing_constructNewickTree(PyObject* self, PyObject* args)
+static PyObject* Sequencing_constructNewickTree(PyObject* self, PyObject* args, PyObject* kwargs)
 {
 	PyObject* input_matrix;
 	std::vector<std::vector<double> > matrix;
 	PyObject* sequence_names;
 	std::vector<std::string> sequences;
+	const char* input_search = "exact";
+	static const char* keywords[] = { "matrix", "names", "search", NULL };
 
-	if ( !PyArg_ParseTuple(args, "OO", &input_matrix, &sequence_names) )
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "OO|s", (char**)keywords, &input_matrix, &sequence_names, &input_search) )
+		return NULL;
+
+	int search = NeighborJoin::EXACT_SEARCH;
+	if ( !Sequencing_parseTreeSearch(input_search, search) )
 		return NULL;
 
 	int sequence_names_size = PyList_Size(sequence_names);
@@ -83,6 +369,22 @@ static PyObject* Sequencing_constructNewickTree(PyObject* self, PyObject* args)
 		sequences.push_back(s);
 	}
 
+	NeighborJoin nj = NeighborJoin();
+	std::string newick_tree;
+
+	if ( !PyList_Check(input_matrix) )
+	{
+		std::vector<double> condensed_matrix;
+		if ( !Sequencing_getCondensedMatrix(input_matrix, sequences.size(), condensed_matrix) )
+			return NULL;
+
+		Py_BEGIN_ALLOW_THREADS
+		newick_tree = nj.construct_tree(condensed_matrix, sequences, search);
+		Py_END_ALLOW_THREADS
+
+		return Py_BuildValue("s", newick_tree.c_str());
+	}
+
 	int column_list_size = PyList_Size(input_matrix);
 	int row_list_size = 0;
 
@@ -110,8 +412,10 @@ static PyObject* Sequencing_constructNewickTree(PyObject* self, PyObject* args)
 		}
 	}
 
-	NeighborJoin nj = NeighborJoin();
-	std::string newick_tree = nj.construct_tree(matrix, sequences);
+	Py_BEGIN_ALLOW_THREADS
+	newick_tree = nj.construct_tree(matrix, sequences, search);
+	Py_END_ALLOW_THREADS
+
 	return Py_BuildValue("s", newick_tree.c_str());
 }
 
@@ -161,6 +465,68 @@ static PyObject* Sequencing_loadSubstitutionMatrix(PyObject* self, PyObject* arg
 	return matrix;
 }
 
+/**
+ * The alignment modes of linearSequence and affineSequence.
+ */
+static const int SEQUENCING_FULL_MODE = 0;
+static const int SEQUENCING_LINEAR_SPACE_MODE = 1;
+static const int SEQUENCING_BANDED_MODE = 2;
+static const int SEQUENCING_X_DROP_MODE = 3;
+
+/**
+ * The X-drop used by the x-drop mode when none is provided.
+ */
+static const int SEQUENCING_DEFAULT_X_DROP = 50;
+
+/**
+ * This helper function reads the alignment mode keyword argument of linearSequence and
+ * affineSequence. A ValueError is raised for unknown modes.
+ *
+ * @param mode The name of the alignment mode, "full", "linear-space", "banded" or "x-drop".
+ * @param alignment_mode Set to the constant of the requested mode.
+ * @return True if the mode is known, otherwise false.
+ */
+static bool Sequencing_parseAlignmentMode(const char* mode, int& alignment_mode)
+{
+	std::string name = std::string(mode);
+	if ( name == "full" )
+		alignment_mode = SEQUENCING_FULL_MODE;
+	else if ( name == "linear-space" )
+		alignment_mode = SEQUENCING_LINEAR_SPACE_MODE;
+	else if ( name == "banded" )
+		alignment_mode = SEQUENCING_BANDED_MODE;
+	else if ( name == "x-drop" )
+		alignment_mode = SEQUENCING_X_DROP_MODE;
+	else
+	{
+		PyErr_Format(PyExc_ValueError, "unknown alignment mode '%s'", mode);
+		return false;
+	}
+	return true;
+}
+
+/**
+ * This helper function builds the return value of linearSequence and affineSequence.
+ * Either both aligned sequences with gaps inserted and the score, or with the cigar
+ * keyword argument the compact runs of edit operations of the Cigar class, the start
+ * and end of the alignment in both sequences and the score.
+ *
+ * @param alignment The alignment of the two sequences.
+ * @param sequence1 The first sequence that was aligned.
+ * @param sequence2 The second sequence that was aligned.
+ * @param substitution_matrix The substitution matrix that provides the gap character.
+ * @param cigar If true the compact runs are returned instead of the aligned sequences.
+ * @return The tuple returned to Python.
+ */
+static PyObject* Sequencing_buildAlignment(PairwiseAlignment& alignment, const std::string& sequence1, const std::string& sequence2, const SubstitutionMatrix& substitution_matrix, const bool cigar)
+{
+	if ( !cigar )
+		return Py_BuildValue("ssi", alignment.getSequence(0).c_str(), alignment.getSequence(1).c_str(), alignment.getScore());
+
+	Cigar runs = Cigar(alignment, sequence1, sequence2, substitution_matrix.getGapCharacter());
+	return Py_BuildValue("siiiii", runs.getOperations().c_str(), runs.getStart(0), runs.getEnd(0), runs.getStart(1), runs.getEnd(1), runs.getScore());
+}
+
 /**
  * This function is used to align two sequences based on the linear scoring method. The
  * linear scoring method simply lowers the score of the alignment based on a linear
@@ -184,62 +550,91 @@ static PyObject* Sequencing_loadSubstitutionMatrix(PyObject* self, PyObject* arg
  *	       alignment.
  *     Sequence 1 - The first sequence to align.
  *     Sequence 2 - The second sequence to align.
+ *     Mode - Optional keyword argument that selects how the alignment is computed.
+ *         "full" (the default) keeps the complete sequence matrix in memory, or for local
+ *         alignments only the part between the start and the end of the alignment, while
+ *         "linear-space" uses Hirschberg's divide and conquer algorithm, which only
+ *         needs memory proportional to the length of the sequences. "banded" aligns the
+ *         sequences globally within a band of diagonals and "x-drop" extends an
+ *         alignment from the start of both sequences, see the BandedSequencer. Both
+ *         ignore the global argument.
+ *     Bandwidth - Optional keyword argument of the banded mode, the number of diagonals
+ *         the band reaches past the difference of the lengths. 0 (the default) estimates
+ *         the bandwidth from the lengths of the sequences.
+ *     X Drop - Optional keyword argument of the x-drop mode, how far below the best
+ *         score the extension may drop.
+ *     Verify - Optional keyword argument of the banded and x-drop modes. If true (the
+ *         default) the band is widened while the best path touches its edge, and X is
+ *         widened while it lowers the score.
+ *     Threads - Optional keyword argument of the full and linear-space modes. With a count
+ *         other than 1 (the default) the sequence matrix is computed in square tiles, the
+ *         tiles on each anti-diagonal by a pool of native threads, 0 meaning one thread
+ *         per processor. The alignment is identical to the alignment of one thread.
+ *     Tile Size - Optional keyword argument, the number of rows and columns of a tile.
+ *     Cigar - Optional keyword argument. If true the alignment is returned as the compact
+ *         runs of edit operations of the Cigar class, such as "12M2D30M", instead of the
+ *         aligned sequences, see expandCigar.
  * @return The return value of this function is a composite object that includes both
  * aligned sequences with gaps inserted followed by the score that the alignment achieved.
+ * With the cigar argument it includes the runs of edit operations, the start and the end
+ * of the alignment in the first sequence, the start and the end in the second sequence
+ * and the score.
  */
-static PyObject* Sequencing_linearSequence(PyObject* self, PyObject* args)
+static PyObject* Sequencing_linearSequence(PyObject* self, PyObject* args, PyObject* kwargs)
 {
 	PyObject* input_matrix;
 	int input_global;
 	int input_gap_penalty;
 	const char* input_sequence1;
 	const char* input_sequence2;
-	std::vector<std::vector<MatrixDataType> > matrix;
+	const char* input_mode = "full";
+	int input_bandwidth = BandedSequencer::AUTO_BANDWIDTH;
+	int input_x_drop = SEQUENCING_DEFAULT_X_DROP;
+	int input_verify = 1;
+	int input_threads = 1;
+	int input_tile_size = Utilities::Wavefront::DEFAULT_TILE_SIZE;
+	int input_cigar = 0;
 	std::string sequence1;
 	std::string sequence2;
+	static const char* keywords[] = { "global", "gap_penalty", "matrix", "sequence1", "sequence2", "mode", "bandwidth", "x_drop", "verify", "threads", "tile_size", "cigar", NULL };
 
-	if ( !PyArg_ParseTuple(args, "iiOss", &input_global, &input_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2) )
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiOss|siiiiii", (char**)keywords, &input_global, &input_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2, &input_mode, &input_bandwidth, &input_x_drop, &input_verify, &input_threads, &input_tile_size, &input_cigar) )
 		return NULL;
 
-	if ( !PyList_Check(input_matrix) )
+	int alignment_mode = SEQUENCING_FULL_MODE;
+	if ( !Sequencing_parseAlignmentMode(input_mode, alignment_mode) )
 		return NULL;
 
-	int column_list_size = PyList_Size(input_matrix);
-	int row_list_size = 0;
-
-	if ( column_list_size == 0 )
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL )
 		return NULL;
-	else
-	{
-		PyObject* row_list = PyList_GetItem(input_matrix, 0);
-		row_list_size = PyList_Size(row_list);
-	}
-	
-	matrix = std::vector<std::vector<MatrixDataType> >(column_list_size, std::vector<MatrixDataType>(row_list_size, 0));
-	
-	for ( int i = 0; i < column_list_size; i++ )
-	{
-		PyObject* row_list = PyList_GetItem(input_matrix, i);
-		if ( !PyList_Check(row_list) )
-			return NULL;
-		
-		for ( int j = 0; j < row_list_size; j++ )
-		{
-			PyObject* matrix_cell_contents = PyList_GetItem(row_list, j);
-			int score = PyLong_AsLong(matrix_cell_contents);
-			matrix[i][j] = score;
-		}
-	}
-	
+
 	sequence1 = std::string(input_sequence1);
 	sequence2 = std::string(input_sequence2);
 	bool global = input_global;
 
-	SubstitutionMatrix substitution_matrix = SubstitutionMatrix(matrix);
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
 
 	LinearSequencer ds = LinearSequencer(input_gap_penalty);
-	PairwiseAlignment alignment = ds.sequence(global, substitution_matrix, sequence1, sequence2);
-	return Py_BuildValue("ssi", alignment.getSequence(0).c_str(), alignment.getSequence(1).c_str(), alignment.getScore());
+	BandedSequencer bs = BandedSequencer(input_gap_penalty);
+	if ( input_threads != 1 )
+		ds.setWavefront(input_tile_size, input_threads);
+	bool verify = input_verify;
+	PairwiseAlignment alignment;
+
+	Py_BEGIN_ALLOW_THREADS
+	if ( alignment_mode == SEQUENCING_BANDED_MODE )
+		alignment = bs.sequence(substitution_matrix, sequence1, sequence2, input_bandwidth, verify);
+	else if ( alignment_mode == SEQUENCING_X_DROP_MODE )
+		alignment = bs.extend(substitution_matrix, sequence1, sequence2, input_x_drop, verify);
+	else if ( alignment_mode == SEQUENCING_LINEAR_SPACE_MODE )
+		alignment = ds.sequenceLinearSpace(global, substitution_matrix, sequence1, sequence2);
+	else
+		alignment = ds.sequence(global, substitution_matrix, sequence1, sequence2);
+	Py_END_ALLOW_THREADS
+
+	return Sequencing_buildAlignment(alignment, sequence1, sequence2, substitution_matrix, input_cigar != 0);
 }
 
 /**
@@ -263,10 +658,22 @@ static PyObject* Sequencing_linearSequence(PyObject* self, PyObject* args)
  *	       alignment.
  *     Sequence 1 - The first sequence to align.
  *     Sequence 2 - The second sequence to align.
+ *     Mode - Optional keyword argument that selects how the alignment is computed.
+ *         "full" (the default) keeps a traceback pointer of every cell in memory while
+ *         "linear-space" uses the divide and conquer algorithm of Myers and Miller, which
+ *         only needs memory proportional to the length of the sequences. Local alignments
+ *         are always computed in full. "banded" and "x-drop" work as they do for
+ *         linearSequence.
+ *     Bandwidth, X Drop, Verify - Optional keyword arguments of the banded and x-drop
+ *         modes, see linearSequence.
+ *     Threads, Tile Size - Optional keyword arguments of the full and linear-space modes,
+ *         see linearSequence.
+ *     Cigar - Optional keyword argument, see linearSequence.
  * @return The return value of this function is a composite object that includes both
- * aligned sequences with gaps inserted followed by the score that the alignment achieved.
+ * aligned sequences with gaps inserted followed by the score that the alignment achieved,
+ * or with the cigar argument the runs of edit operations, see linearSequence.
  */
-static PyObject* Sequencing_affineSequence(PyObject* self, PyObject* args)
+static PyObject* Sequencing_affineSequence(PyObject* self, PyObject* args, PyObject* kwargs)
 {
 	PyObject* input_matrix;
 	int input_global;
@@ -274,106 +681,947 @@ static PyObject* Sequencing_affineSequence(PyObject* self, PyObject* args)
 	int input_extend_gap_penalty;
 	const char* input_sequence1;
 	const char* input_sequence2;
-	std::vector<std::vector<MatrixDataType> > matrix;
+	const char* input_mode = "full";
+	int input_bandwidth = BandedSequencer::AUTO_BANDWIDTH;
+	int input_x_drop = SEQUENCING_DEFAULT_X_DROP;
+	int input_verify = 1;
+	int input_threads = 1;
+	int input_tile_size = Utilities::Wavefront::DEFAULT_TILE_SIZE;
+	int input_cigar = 0;
 	std::string sequence1;
 	std::string sequence2;
+	static const char* keywords[] = { "global", "open_gap_penalty", "extend_gap_penalty", "matrix", "sequence1", "sequence2", "mode", "bandwidth", "x_drop", "verify", "threads", "tile_size", "cigar", NULL };
 
-	if ( !PyArg_ParseTuple(args, "iiiOss", &input_global, &input_open_gap_penalty, &input_extend_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2) )
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiiOss|siiiiii", (char**)keywords, &input_global, &input_open_gap_penalty, &input_extend_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2, &input_mode, &input_bandwidth, &input_x_drop, &input_verify, &input_threads, &input_tile_size, &input_cigar) )
 		return NULL;
 
-	if ( !PyList_Check(input_matrix) )
+	int alignment_mode = SEQUENCING_FULL_MODE;
+	if ( !Sequencing_parseAlignmentMode(input_mode, alignment_mode) )
 		return NULL;
 
-	int column_list_size = PyList_Size(input_matrix);
-	int row_list_size = 0;
-
-	if ( column_list_size == 0 )
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL )
 		return NULL;
-	else
-	{
-		PyObject* row_list = PyList_GetItem(input_matrix, 0);
-		row_list_size = PyList_Size(row_list);
-	}
-	
-	matrix = std::vector<std::vector<MatrixDataType> >(column_list_size, std::vector<MatrixDataType>(row_list_size, 0));
-	
-	for ( int i = 0; i < column_list_size; i++ )
-	{
-		PyObject* row_list = PyList_GetItem(input_matrix, i);
-		if ( !PyList_Check(row_list) )
-			return NULL;
-		
-		for ( int j = 0; j < row_list_size; j++ )
-		{
-			PyObject* matrix_cell_contents = PyList_GetItem(row_list, j);
-			int score = PyLong_AsLong(matrix_cell_contents);
-			matrix[i][j] = score;
-		}
-	}
-	
+
 	sequence1 = std::string(input_sequence1);
 	sequence2 = std::string(input_sequence2);
 	bool global = input_global;
 
-	SubstitutionMatrix substitution_matrix = SubstitutionMatrix(matrix);
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
 
 	AffineSequencer as = AffineSequencer(input_open_gap_penalty, input_extend_gap_penalty);
-	PairwiseAlignment alignment = as.sequence(global, substitution_matrix, sequence1, sequence2);
-	return Py_BuildValue("ssi", alignment.getSequence(0).c_str(), alignment.getSequence(1).c_str(), alignment.getScore());
+	BandedSequencer bs = BandedSequencer(input_open_gap_penalty, input_extend_gap_penalty);
+	if ( input_threads != 1 )
+		as.setWavefront(input_tile_size, input_threads);
+	bool verify = input_verify;
+	PairwiseAlignment alignment;
+
+	Py_BEGIN_ALLOW_THREADS
+	if ( alignment_mode == SEQUENCING_BANDED_MODE )
+		alignment = bs.sequence(substitution_matrix, sequence1, sequence2, input_bandwidth, verify);
+	else if ( alignment_mode == SEQUENCING_X_DROP_MODE )
+		alignment = bs.extend(substitution_matrix, sequence1, sequence2, input_x_drop, verify);
+	else if ( alignment_mode == SEQUENCING_LINEAR_SPACE_MODE )
+		alignment = as.sequenceLinearSpace(global, substitution_matrix, sequence1, sequence2);
+	else
+		alignment = as.sequence(global, substitution_matrix, sequence1, sequence2);
+	Py_END_ALLOW_THREADS
+
+	return Sequencing_buildAlignment(alignment, sequence1, sequence2, substitution_matrix, input_cigar != 0);
 }
 
-static PyObject* Sequencing_alignMultipleSequences(PyObject* self, PyObject* args)
+/**
+ * This function expands the runs of edit operations returned by linearSequence and
+ * affineSequence with the cigar argument into the aligned sequences with gaps inserted.
+ * The Results tab keeps only the runs of an alignment and expands them when it shows
+ * the alignment.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function include the following:
+ *     Operations - The runs of edit operations, such as "12M2D30M".
+ *     Sequence 1 - The first sequence that was aligned.
+ *     Sequence 2 - The second sequence that was aligned.
+ *     Start 1 - Optional, the start of the alignment in the first sequence.
+ *     Start 2 - Optional, the start of the alignment in the second sequence.
+ * @return Both aligned sequences with gaps inserted. A ValueError is raised if the runs
+ * are malformed or reach past the end of a sequence.
+ */
+static PyObject* Sequencing_expandCigar(PyObject* self, PyObject* args, PyObject* kwargs)
 {
-	PyObject* input_distance_matrix;
-	PyObject* input_substitution_matrix;
-	PyObject* sequences_list;
-	std::vector<std::vector<double> > distance_matrix;
-	std::vector<std::vector<MatrixDataType> > substitution_matrix;
-	std::vector<Sequence> sequences;
+	const char* input_operations;
+	const char* input_sequence1;
+	const char* input_sequence2;
+	int input_start1 = 0;
+	int input_start2 = 0;
+	static const char* keywords[] = { "operations", "sequence1", "sequence2", "start1", "start2", NULL };
 
-	if ( !PyArg_ParseTuple(args, "OOO", &input_distance_matrix, &input_substitution_matrix, &sequences_list) )
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "sss|ii", (char**)keywords, &input_operations, &input_sequence1, &input_sequence2, &input_start1, &input_start2) )
 		return NULL;
 
-	// Load the sequences
-	sequences = std::vector<Sequence>();
-	int sequence_count = PyList_Size(sequences_list);
-	for ( int i = 0; i < sequence_count; i++ )
+	std::string aligned_sequence1;
+	std::string aligned_sequence2;
+	if ( !Cigar::expand(input_operations, input_start1, input_start2, Sequence(input_sequence1), Sequence(input_sequence2), SubstitutionMatrix().getGapCharacter(), aligned_sequence1, aligned_sequence2) )
 	{
-		PyObject* current_sequence = PyList_GetItem(sequences_list, i);
-		PyObject* ascii = PyUnicode_AsASCIIString(current_sequence);
-		const char* cur_string = PyBytes_AsString(ascii);
-		Sequence newSequence = Sequence(std::string(cur_string));
-		sequences.push_back(newSequence);
+		PyErr_Format(PyExc_ValueError, "invalid operations '%s' for the sequences", input_operations);
+		return NULL;
 	}
 
-	// load the substitution matrix
-	int column_list_size = PyList_Size(input_substitution_matrix);
-	int row_list_size = 0;
+	return Py_BuildValue("ss", aligned_sequence1.c_str(), aligned_sequence2.c_str());
+}
 
-	if ( column_list_size == 0 )
-		return NULL;
+/**
+ * This helper function reads the engine keyword argument of the score only functions.
+ * A ValueError is raised for unknown engines.
+ *
+ * @param engine The name of the scoring engine, "scalar", "striped", "batch" or "banded".
+ * @param score_engine Set to the AllPairsScorer engine constant of the requested engine.
+ * @return True if the engine is known, otherwise false.
+ */
+static bool Sequencing_parseScoreEngine(const char* engine, int& score_engine)
+{
+	std::string name = std::string(engine);
+	if ( name == "scalar" )
+		score_engine = AllPairsScorer::SCALAR_ENGINE;
+	else if ( name == "striped" )
+		score_engine = AllPairsScorer::STRIPED_ENGINE;
+	else if ( name == "batch" )
+		score_engine = AllPairsScorer::BATCH_ENGINE;
+	else if ( name == "banded" )
+		score_engine = AllPairsScorer::BANDED_ENGINE;
 	else
 	{
-		PyObject* row_list = PyList_GetItem(input_substitution_matrix, 0);
-		row_list_size = PyList_Size(row_list);
+		PyErr_Format(PyExc_ValueError, "unknown score engine '%s'", engine);
+		return false;
 	}
-	
-	substitution_matrix = std::vector<std::vector<MatrixDataType> >(column_list_size, std::vector<MatrixDataType>(row_list_size, 0));
-	
-	for ( int i = 0; i < column_list_size; i++ )
-	{
-		PyObject* row_list = PyList_GetItem(input_substitution_matrix, i);
-		if ( !PyList_Check(row_list) )
-			return NULL;
-		
-		for ( int j = 0; j < row_list_size; j++ )
+	return true;
+}
+
+/**
+ * This function computes only the score of the alignment of two sequences based on the
+ * linear scoring method. The score is the same as the score returned by linearSequence,
+ * however the aligned sequences are not constructed. Only two rows of the sequence matrix
+ * are kept in memory, which makes this function suitable for building score matrices.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are the same as the
+ * arguments of linearSequence:
+ *     Global - If true the sequences are scored globally, otherwise locally.
+ *     Gap Penalty - The gap penalty is used to lower the score between mismatching
+ *         charactesr in the provided sequences.
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignment.
+ *     Sequence 1 - The first sequence to score.
+ *     Sequence 2 - The second sequence to score.
+ *     Engine - Optional keyword argument that selects the kernel used for scoring.
+ *         "scalar" (the default) uses the 32 bit kernel of the sequencer, "striped"
+ *         uses the vectorized StripedSequencer and "batch" the BatchSequencer, which
+ *         scores many targets at once. All engines return the same scores. "banded" scores
+ *         global alignments within a verified band, see the BandedSequencer.
+ * @return The score that the alignment of the two sequences achieved.
+ */
+static PyObject* Sequencing_linearScore(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	int input_global;
+	int input_gap_penalty;
+	const char* input_sequence1;
+	const char* input_sequence2;
+	const char* input_engine = "scalar";
+	static const char* keywords[] = { "global", "gap_penalty", "matrix", "sequence1", "sequence2", "engine", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiOss|s", (char**)keywords, &input_global, &input_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2, &input_engine) )
+		return NULL;
+
+	int engine = AllPairsScorer::SCALAR_ENGINE;
+	if ( !Sequencing_parseScoreEngine(input_engine, engine) )
+		return NULL;
+
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL )
+		return NULL;
+
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
+
+	AllPairsScorer scorer = AllPairsScorer(input_global != 0, input_gap_penalty, engine);
+	Sequence sequence1 = Sequence(input_sequence1);
+	std::vector<Sequence> sequence2 = std::vector<Sequence>(1, Sequence(input_sequence2));
+	MatrixDataType score;
+
+	Py_BEGIN_ALLOW_THREADS
+	score = scorer.scoreRow(substitution_matrix, sequence1, sequence2)[0];
+	Py_END_ALLOW_THREADS
+
+	return Py_BuildValue("i", score);
+}
+
+/**
+ * This function computes only the score of the alignment of two sequences based on the
+ * affine scoring method. The score is the same as the score returned by affineSequence,
+ * however the aligned sequences are not constructed. Only two rows of each of the affine
+ * sequence matrices are kept in memory, which makes this function suitable for building
+ * score matrices.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are the same as the
+ * arguments of affineSequence:
+ *     Global - If true the sequences are scored globally, otherwise locally. Local
+ *         affine alignments are always scored with the scalar kernel.
+ *     Open Gap Penalty - The open gap penalty is the cost of opening a gap in the
+ *         aligned sequences.
+ *     Extend Gap Penalty - The extend gap penalty is the cost of extending a gap in the
+ *         aligned sequences.
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignment.
+ *     Sequence 1 - The first sequence to score.
+ *     Sequence 2 - The second sequence to score.
+ *     Engine - Optional keyword argument that selects the kernel used for scoring.
+ *         "scalar" (the default) uses the 32 bit kernel of the sequencer, "striped"
+ *         uses the vectorized StripedSequencer and "batch" the BatchSequencer, which
+ *         scores many targets at once. All engines return the same scores. "banded" scores
+ *         global alignments within a verified band, see the BandedSequencer.
+ * @return The score that the alignment of the two sequences achieved.
+ */
+static PyObject* Sequencing_affineScore(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	int input_global;
+	int input_open_gap_penalty;
+	int input_extend_gap_penalty;
+	const char* input_sequence1;
+	const char* input_sequence2;
+	const char* input_engine = "scalar";
+	static const char* keywords[] = { "global", "open_gap_penalty", "extend_gap_penalty", "matrix", "sequence1", "sequence2", "engine", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiiOss|s", (char**)keywords, &input_global, &input_open_gap_penalty, &input_extend_gap_penalty, &input_matrix, &input_sequence1, &input_sequence2, &input_engine) )
+		return NULL;
+
+	int engine = AllPairsScorer::SCALAR_ENGINE;
+	if ( !Sequencing_parseScoreEngine(input_engine, engine) )
+		return NULL;
+
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL )
+		return NULL;
+
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
+
+	AllPairsScorer scorer = AllPairsScorer(input_global != 0, input_open_gap_penalty, input_extend_gap_penalty, engine);
+	Sequence sequence1 = Sequence(input_sequence1);
+	std::vector<Sequence> sequence2 = std::vector<Sequence>(1, Sequence(input_sequence2));
+	MatrixDataType score;
+
+	Py_BEGIN_ALLOW_THREADS
+	score = scorer.scoreRow(substitution_matrix, sequence1, sequence2)[0];
+	Py_END_ALLOW_THREADS
+
+	return Py_BuildValue("i", score);
+}
+
+/**
+ * This helper function converts a Python list of strings into a vector of sequences.
+ *
+ * @param input_sequences The Python list of sequence strings.
+ * @param sequences The vector that the converted sequences are stored in.
+ * @return True if the input was a list of strings, otherwise false with a Python
+ * exception set.
+ */
+static bool Sequencing_convertSequences(PyObject* input_sequences, std::vector<Sequence>& sequences)
+{
+	if ( !PyList_Check(input_sequences) )
+	{
+		PyErr_SetString(PyExc_TypeError, "sequences must be a list of strings");
+		return false;
+	}
+
+	int sequence_count = PyList_Size(input_sequences);
+	sequences = std::vector<Sequence>();
+
+	for ( int i = 0; i < sequence_count; i++ )
+	{
+		PyObject* ascii = PyUnicode_AsASCIIString(PyList_GetItem(input_sequences, i));
+		if ( ascii == NULL )
+			return false;
+		sequences.push_back(Sequence(std::string(PyBytes_AsString(ascii))));
+		Py_DECREF(ascii);
+	}
+	return true;
+}
+
+/**
+ * This function scores one query sequence against a list of target sequences based on
+ * the linear scoring method. The query is profiled once and every target is encoded
+ * once, so this is faster than calling linearScore for every pair. Each score is the
+ * same as the score returned by linearScore(global, gap, matrix, query, target).
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Global - If true the sequences are scored globally, otherwise locally.
+ *     Gap Penalty - The gap penalty is used to lower the score between mismatching
+ *         charactesr in the provided sequences.
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignments.
+ *     Query - The sequence that is scored as the first sequence of every alignment.
+ *     Targets - The list of sequences that are scored as the second sequence.
+ *     Engine - Optional keyword argument that selects the kernel used for scoring.
+ *         "scalar" (the default) uses the 32 bit kernel of the sequencer, "striped"
+ *         uses the vectorized StripedSequencer and "batch" the BatchSequencer, which
+ *         scores many targets at once. All engines return the same scores. "banded" scores
+ *         global alignments within a verified band, see the BandedSequencer.
+ * @return A list with the score of the query against each target, in order.
+ */
+static PyObject* Sequencing_linearScoreRow(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	PyObject* input_targets;
+	int input_global;
+	int input_gap_penalty;
+	const char* input_query;
+	const char* input_engine = "scalar";
+	std::vector<Sequence> targets;
+	static const char* keywords[] = { "global", "gap_penalty", "matrix", "query", "targets", "engine", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiOsO|s", (char**)keywords, &input_global, &input_gap_penalty, &input_matrix, &input_query, &input_targets, &input_engine) )
+		return NULL;
+
+	int engine = AllPairsScorer::SCALAR_ENGINE;
+	if ( !Sequencing_parseScoreEngine(input_engine, engine) )
+		return NULL;
+
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL || !Sequencing_convertSequences(input_targets, targets) )
+		return NULL;
+
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
+	AllPairsScorer scorer = AllPairsScorer(input_global != 0, input_gap_penalty, engine);
+	Sequence query = Sequence(input_query);
+	std::vector<MatrixDataType> row_scores;
+
+	Py_BEGIN_ALLOW_THREADS
+	row_scores = scorer.scoreRow(substitution_matrix, query, targets);
+	Py_END_ALLOW_THREADS
+
+	PyObject* scores = PyList_New(targets.size());
+	for ( unsigned int i = 0; i < targets.size(); i++ )
+		PyList_SetItem(scores, i, PyLong_FromLong(row_scores[i]));
+	return scores;
+}
+
+/**
+ * This function scores one query sequence against a list of target sequences based on
+ * the affine scoring method. The query is profiled once and every target is encoded
+ * once, so this is faster than calling affineScore for every pair. Each score is the
+ * same as the score returned by affineScore(global, open_gap, extend_gap, matrix, query, target).
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Global - If true the sequences are scored globally, otherwise locally. Local
+ *         affine alignments are always scored with the scalar kernel.
+ *     Open Gap Penalty - The open gap penalty is the cost of opening a gap in the
+ *         aligned sequences.
+ *     Extend Gap Penalty - The extend gap penalty is the cost of extending a gap in the
+ *         aligned sequences.
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignments.
+ *     Query - The sequence that is scored as the first sequence of every alignment.
+ *     Targets - The list of sequences that are scored as the second sequence.
+ *     Engine - Optional keyword argument that selects the kernel used for scoring.
+ *         "scalar" (the default) uses the 32 bit kernel of the sequencer, "striped"
+ *         uses the vectorized StripedSequencer and "batch" the BatchSequencer, which
+ *         scores many targets at once. All engines return the same scores. "banded" scores
+ *         global alignments within a verified band, see the BandedSequencer.
+ * @return A list with the score of the query against each target, in order.
+ */
+static PyObject* Sequencing_affineScoreRow(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	PyObject* input_targets;
+	int input_global;
+	int input_open_gap_penalty;
+	int input_extend_gap_penalty;
+	const char* input_query;
+	const char* input_engine = "scalar";
+	std::vector<Sequence> targets;
+	static const char* keywords[] = { "global", "open_gap_penalty", "extend_gap_penalty", "matrix", "query", "targets", "engine", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "iiiOsO|s", (char**)keywords, &input_global, &input_open_gap_penalty, &input_extend_gap_penalty, &input_matrix, &input_query, &input_targets, &input_engine) )
+		return NULL;
+
+	int engine = AllPairsScorer::SCALAR_ENGINE;
+	if ( !Sequencing_parseScoreEngine(input_engine, engine) )
+		return NULL;
+
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( input_substitution_matrix == NULL || !Sequencing_convertSequences(input_targets, targets) )
+		return NULL;
+
+	const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
+	AllPairsScorer scorer = AllPairsScorer(input_global != 0, input_open_gap_penalty, input_extend_gap_penalty, engine);
+	Sequence query = Sequence(input_query);
+	std::vector<MatrixDataType> row_scores;
+
+	Py_BEGIN_ALLOW_THREADS
+	row_scores = scorer.scoreRow(substitution_matrix, query, targets);
+	Py_END_ALLOW_THREADS
+
+	PyObject* scores = PyList_New(targets.size());
+	for ( unsigned int i = 0; i < targets.size(); i++ )
+		PyList_SetItem(scores, i, PyLong_FromLong(row_scores[i]));
+	return scores;
+}
+
+/**
+ * This function computes the unit-cost edit distance of two sequences, the smallest
+ * number of substitutions, insertions and deletions that turn one sequence into the
+ * other, with the bit-parallel EditDistanceSequencer. Upper and lower case characters
+ * are the same character. No substitution matrix or gap penalty is needed.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Sequence 1 - The first sequence.
+ *     Sequence 2 - The second sequence.
+ * @return The edit distance of the two sequences.
+ */
+static PyObject* Sequencing_editDistance(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	const char* input_sequence1;
+	const char* input_sequence2;
+	static const char* keywords[] = { "sequence1", "sequence2", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "ss", (char**)keywords, &input_sequence1, &input_sequence2) )
+		return NULL;
+
+	Sequence sequence1 = Sequence(input_sequence1);
+	Sequence sequence2 = Sequence(input_sequence2);
+	EditDistanceSequencer es = EditDistanceSequencer();
+	MatrixDataType distance;
+
+	Py_BEGIN_ALLOW_THREADS
+	distance = es.distance(sequence1, sequence2);
+	Py_END_ALLOW_THREADS
+
+	return PyLong_FromLong(distance);
+}
+
+/**
+ * This helper function checks the k-mer length argument of kmerDistance and of the kmer
+ * mode of scoreAllPairs. A ValueError is raised for lengths the profiles cannot hold.
+ *
+ * @param k The length of the k-mers.
+ * @return True if the length is supported, otherwise false.
+ */
+static bool Sequencing_checkKmerLength(const int k)
+{
+	if ( k < 1 || k > KmerDistanceSequencer::MAXIMUM_K )
+	{
+		PyErr_Format(PyExc_ValueError, "k-mer length %d is not between 1 and %d", k, (int)KmerDistanceSequencer::MAXIMUM_K);
+		return false;
+	}
+	return true;
+}
+
+/**
+ * This function computes the alignment-free k-mer distance of two sequences from the
+ * k-mers they share, see the KmerDistanceSequencer. The distance is 0 for sequences with
+ * the same k-mers and 1000 for sequences that share none.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Sequence 1 - The first sequence.
+ *     Sequence 2 - The second sequence.
+ *     K - Optional keyword argument with the length of the k-mers, from 1 to 8. Defaults
+ *         to 4.
+ * @return The k-mer distance of the two sequences.
+ */
+static PyObject* Sequencing_kmerDistance(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	const char* input_sequence1;
+	const char* input_sequence2;
+	int input_k = KmerDistanceSequencer::DEFAULT_K;
+	static const char* keywords[] = { "sequence1", "sequence2", "k", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "ss|i", (char**)keywords, &input_sequence1, &input_sequence2, &input_k) )
+		return NULL;
+
+	if ( !Sequencing_checkKmerLength(input_k) )
+		return NULL;
+
+	Sequence sequence1 = Sequence(input_sequence1);
+	Sequence sequence2 = Sequence(input_sequence2);
+	KmerDistanceSequencer ks = KmerDistanceSequencer(input_k);
+	MatrixDataType distance;
+
+	Py_BEGIN_ALLOW_THREADS
+	distance = ks.distance(sequence1, sequence2);
+	Py_END_ALLOW_THREADS
+
+	return PyLong_FromLong(distance);
+}
+
+/**
+ * This function constructs the neighbor joining tree of the k-mer distances of a list of
+ * sequences, the tree that constructNewickTree builds from the "kmer" scores of
+ * scoreAllPairs, and estimates the support of its branches by bootstrapping. The k-mer
+ * profiles of the sequences are computed once, and every replicate draws the k-mers of
+ * the profiles with replacement, recomputes the distances and joins its own tree. The
+ * replicates are run by a pool of native threads while the GIL is released, and the
+ * tree does not depend on the number of threads.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Sequences - The list of sequences.
+ *     Sequence Names - The names of the sequences.
+ *     Replicates - Optional keyword argument with the number of bootstrap replicates.
+ *         Defaults to 100. With 0 replicates no support is written.
+ *     K - Optional keyword argument with the length of the k-mers, from 1 to 8. Defaults
+ *         to 4.
+ *     Seed - Optional keyword argument with the seed of the random draws. The same seed
+ *         gives the same support. Defaults to 1.
+ *     Threads - Optional keyword argument with the number of threads. The default of 0
+ *         uses one thread per processor.
+ *     Search - Optional keyword argument with the search of the neighbor joining, the
+ *         same as the search of constructNewickTree. Defaults to "exact".
+ *     Distances - Optional keyword argument with the k-mer distances of the sequences
+ *         that were already computed, the condensed buffer returned by scoreAllPairs in
+ *         the "kmer" mode with the same k. The tree is joined from them instead of from
+ *         distances computed again.
+ * @return The newick tree, with the number of replicate trees that contain the clade
+ * of every inner node written after the closing parenthesis of the node, such as
+ * "(A:1,(B:2,C:3)95:0.5);".
+ */
+static PyObject* Sequencing_bootstrapNewickTree(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_sequences;
+	PyObject* input_names;
+	int input_replicates = 100;
+	int input_k = KmerDistanceSequencer::DEFAULT_K;
+	unsigned int input_seed = 1;
+	int input_threads = 0;
+	const char* input_search = "exact";
+	PyObject* input_distances = NULL;
+	std::vector<Sequence> sequences;
+	static const char* keywords[] = { "sequences", "names", "replicates", "k", "seed", "threads", "search", "distances", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "OO|iiIisO", (char**)keywords, &input_sequences, &input_names, &input_replicates, &input_k, &input_seed, &input_threads, &input_search, &input_distances) )
+		return NULL;
+
+	if ( !Sequencing_checkKmerLength(input_k) )
+		return NULL;
+
+	if ( input_replicates < 0 )
+	{
+		PyErr_Format(PyExc_ValueError, "the number of replicates must not be negative");
+		return NULL;
+	}
+
+	int search = NeighborJoin::EXACT_SEARCH;
+	if ( !Sequencing_parseTreeSearch(input_search, search) )
+		return NULL;
+
+	if ( !Sequencing_convertSequences(input_sequences, sequences) )
+		return NULL;
+
+	if ( !PyList_Check(input_names) || PyList_Size(input_names) != (Py_ssize_t)sequences.size() )
+	{
+		PyErr_Format(PyExc_ValueError, "there must be a name for every sequence");
+		return NULL;
+	}
+
+	// The names are the names of the leaves of the tree.
+	std::vector<Sequence> named_sequences;
+	for ( size_t i = 0; i < sequences.size(); i++ )
+	{
+		PyObject* ascii = PyUnicode_AsASCIIString(PyList_GetItem(input_names, i));
+		if ( ascii == NULL )
+			return NULL;
+		named_sequences.push_back(Sequence(std::string(PyBytes_AsString(ascii)), sequences[i].getSequence()));
+		Py_DECREF(ascii);
+	}
+
+	std::vector<double> distances;
+	bool has_distances = input_distances != NULL && input_distances != Py_None;
+	if ( has_distances && !Sequencing_getCondensedMatrix(input_distances, named_sequences.size(), distances) )
+		return NULL;
+
+	NeighborJoinBootstrap bootstrap = NeighborJoinBootstrap(input_k, input_replicates, input_seed);
+	std::string newick_tree;
+
+	Py_BEGIN_ALLOW_THREADS
+	if ( has_distances )
+		newick_tree = bootstrap.construct_tree(named_sequences, distances, search, input_threads).to_newick();
+	else
+		newick_tree = bootstrap.construct_tree(named_sequences, search, input_threads).to_newick();
+	Py_END_ALLOW_THREADS
+
+	return Py_BuildValue("s", newick_tree.c_str());
+}
+
+/**
+ * This helper function copies the condensed upper triangle of scoreAllPairs and
+ * sketchAllPairs into an array.array of type 'i', without a Python object per score.
+ *
+ * @param scores The condensed upper triangle.
+ * @return The array, or NULL if it could not be created.
+ */
+static PyObject* Sequencing_buildScoreArray(const std::vector<MatrixDataType>& scores)
+{
+	PyObject* array_module = PyImport_ImportModule("array");
+	if ( array_module == NULL )
+		return NULL;
+
+	const char* data = scores.empty() ? "" : (const char*)&scores[0];
+	PyObject* bytes = PyBytes_FromStringAndSize(data, scores.size() * sizeof(MatrixDataType));
+	if ( bytes == NULL )
+	{
+		Py_DECREF(array_module);
+		return NULL;
+	}
+
+	PyObject* result = PyObject_CallMethod(array_module, "array", "sO", "i", bytes);
+	Py_DECREF(bytes);
+	Py_DECREF(array_module);
+	return result;
+}
+
+/**
+ * This function scores every pair of a list of sequences. The upper triangle of the score
+ * matrix is computed by a pool of native threads while the GIL is released, so no Python
+ * objects are created for the individual pairs. Each score is the same as the score
+ * returned by linearScore or affineScore for the pair.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignments.
+ *     Sequences - The list of sequences to score.
+ *     Mode - The scoring method: "global" or "local" for the linear scoring method,
+ *         "affine" for the global affine scoring method, "edit" for the unit-cost edit distance
+ *         of editDistance or "kmer" for the k-mer distance of kmerDistance. The edit and
+ *         k-mer distances are distances rather than scores, so they can be passed to
+ *         constructNewickTree as they are.
+ *     Params - A tuple with the gap penalty of the linear scoring method, the open gap
+ *         penalty and the extend gap penalty of the affine scoring method, or the length
+ *         of the k-mers of the k-mer distance. The edit distance has no parameters, so the
+ *         tuple is ignored. Both distances ignore the matrix and the engine.
+ *     Threads - Optional keyword argument with the number of threads. The default of 0
+ *         uses one thread per processor.
+ *     Engine - Optional keyword argument that selects the kernel used for scoring, the
+ *         same as the engine of linearScoreRow. Defaults to "batch".
+ * @return An array.array of type 'i' holding the condensed upper triangle of the score
+ * matrix, including the diagonal: the scores of sequence i against sequences i to n - 1
+ * follow the scores of sequence i - 1.
+ */
+static PyObject* Sequencing_scoreAllPairs(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	PyObject* input_sequences;
+	PyObject* input_params;
+	const char* input_mode;
+	const char* input_engine = "batch";
+	int input_threads = 0;
+	std::vector<Sequence> sequences;
+	static const char* keywords[] = { "matrix", "sequences", "mode", "params", "threads", "engine", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "OOsO|is", (char**)keywords, &input_matrix, &input_sequences, &input_mode, &input_params, &input_threads, &input_engine) )
+		return NULL;
+
+	int engine = AllPairsScorer::SCALAR_ENGINE;
+	if ( !Sequencing_parseScoreEngine(input_engine, engine) )
+		return NULL;
+
+	std::string mode = std::string(input_mode);
+	int gap_penalty = 0;
+	int open_gap_penalty = 0;
+	int extend_gap_penalty = 0;
+	int k = KmerDistanceSequencer::DEFAULT_K;
+	if ( mode == "affine" )
+	{
+		if ( !PyArg_ParseTuple(input_params, "ii", &open_gap_penalty, &extend_gap_penalty) )
+			return NULL;
+	}
+	else if ( mode == "global" || mode == "local" )
+	{
+		if ( !PyArg_ParseTuple(input_params, "i", &gap_penalty) )
+			return NULL;
+	}
+	else if ( mode == "kmer" )
+	{
+		if ( !PyArg_ParseTuple(input_params, "i", &k) || !Sequencing_checkKmerLength(k) )
+			return NULL;
+	}
+	else if ( mode != "edit" )
+	{
+		PyErr_Format(PyExc_ValueError, "unknown scoring mode '%s'", input_mode);
+		return NULL;
+	}
+
+	std::vector<MatrixDataType> scores;
+	if ( mode == "edit" )
+	{
+		if ( !Sequencing_convertSequences(input_sequences, sequences) )
+			return NULL;
+
+		EditDistanceSequencer es = EditDistanceSequencer();
+
+		Py_BEGIN_ALLOW_THREADS
+		scores = es.distances(sequences, input_threads);
+		Py_END_ALLOW_THREADS
+	}
+	else if ( mode == "kmer" )
+	{
+		if ( !Sequencing_convertSequences(input_sequences, sequences) )
+			return NULL;
+
+		KmerDistanceSequencer ks = KmerDistanceSequencer(k);
+
+		Py_BEGIN_ALLOW_THREADS
+		scores = ks.distances(sequences, input_threads);
+		Py_END_ALLOW_THREADS
+	}
+	else
+	{
+		SubstitutionMatrix converted_matrix;
+		const SubstitutionMatrix* input_substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+		if ( input_substitution_matrix == NULL || !Sequencing_convertSequences(input_sequences, sequences) )
+			return NULL;
+
+		const SubstitutionMatrix& substitution_matrix = *input_substitution_matrix;
+		AllPairsScorer scorer = (mode == "affine") ? AllPairsScorer(true, open_gap_penalty, extend_gap_penalty, engine) : AllPairsScorer(mode == "global", gap_penalty, engine);
+
+		Py_BEGIN_ALLOW_THREADS
+		scores = scorer.score(substitution_matrix, sequences, input_threads);
+		Py_END_ALLOW_THREADS
+	}
+
+	return Sequencing_buildScoreArray(scores);
+}
+
+/**
+ * This function estimates the Mash distance of every pair of a list of sequences from their
+ * bottom-k MinHash sketches, see the MinHashSketcher. The sketches are computed and
+ * compared by a pool of native threads while the GIL is released. With a sketch file the
+ * sketches of earlier runs are read from the file, only the sequences that are not in it
+ * are sketched, and the file is written again when sequences were added.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Sequences - The list of sequences to compare.
+ *     Filename - Optional keyword argument with the path of the sketch file. The default
+ *         of "" keeps no sketches. A file of other parameters is replaced.
+ *     K - Optional keyword argument with the length of the k-mers. Defaults to 21.
+ *     Size - Optional keyword argument with the number of hash values of every sketch.
+ *         Defaults to 1000.
+ *     Threads - Optional keyword argument with the number of threads. The default of 0
+ *         uses one thread per processor.
+ * @return An array.array of type 'i' holding the condensed upper triangle of the distances
+ * in the layout of scoreAllPairs, 0 for identical sequences and 1000 for sequences that
+ * share no sketched k-mers. An IOError is raised if the sketch file cannot be written.
+ */
+static PyObject* Sequencing_sketchAllPairs(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_sequences;
+	const char* input_filename = "";
+	int input_k = MinHashSketcher::DEFAULT_K;
+	int input_size = MinHashSketcher::DEFAULT_SKETCH_SIZE;
+	int input_threads = 0;
+	std::vector<Sequence> sequences;
+	static const char* keywords[] = { "sequences", "filename", "k", "size", "threads", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "O|siii", (char**)keywords, &input_sequences, &input_filename, &input_k, &input_size, &input_threads) )
+		return NULL;
+
+	if ( input_k < 1 || input_size < 1 )
+	{
+		PyErr_Format(PyExc_ValueError, "k-mer length %d and sketch size %d must be positive", input_k, input_size);
+		return NULL;
+	}
+
+	if ( !Sequencing_convertSequences(input_sequences, sequences) )
+		return NULL;
+
+	std::string filename = std::string(input_filename);
+	MinHashSketcher sketcher = MinHashSketcher(input_k, input_size);
+	MinHashSketchFile sketch_file = MinHashSketchFile(input_k, input_size);
+	std::vector<MatrixDataType> scores;
+	bool written = true;
+
+	Py_BEGIN_ALLOW_THREADS
+	bool stored = !filename.empty() && sketch_file.read(filename);
+	int stored_count = sketch_file.size();
+	std::vector<MinHashSketch> sketches = sketcher.sketch(sequences, filename.empty() ? NULL : &sketch_file, input_threads);
+	if ( !filename.empty() && (!stored || sketch_file.size() != stored_count) )
+		written = sketch_file.write(filename);
+	scores = sketcher.distances(sketches, input_threads);
+	Py_END_ALLOW_THREADS
+
+	if ( !written )
+	{
+		PyErr_Format(PyExc_IOError, "could not write the sketch file '%s'", input_filename);
+		return NULL;
+	}
+
+	return Sequencing_buildScoreArray(scores);
+}
+
+/**
+ * This function searches a list of subject sequences for local alignments with a query in
+ * the seed-and-extend style of BLAST, see the SeedSearcher, instead of scoring the query
+ * against every subject. The subjects are indexed, and the seeds are found and extended by
+ * a pool of native threads while the GIL is released. With an index file the index of
+ * earlier runs is memory-mapped from the file instead, only subjects appended to the list
+ * since then are indexed, and the file is written again when subjects were indexed.
+ *
+ * @param PyObject* self The Python reference to the calling object.
+ * @param PyObject* args The arguments provided to this function are:
+ *     Matrix - The substitution matrix is required to calculate the score of the
+ *	       alignments.
+ *     Query - The sequence to search for.
+ *     Subjects - The list of sequences to search.
+ *     Mode - The scoring method of the gapped extension: "linear" or "affine".
+ *     Params - A tuple with the gap penalty of the linear scoring method, or the open gap
+ *         penalty and the extend gap penalty of the affine scoring method.
+ *     Filename - Optional keyword argument with the path of the index file. The default of
+ *         "" keeps no index. A file of another seed length or of other subjects is replaced.
+ *     K - Optional keyword argument with the length of the seeds, from 1 to 12. Defaults
+ *         to 11.
+ *     X_drop - Optional keyword argument with the X of the gapped extension. Defaults
+ *         to 50.
+ *     Ungapped_x_drop - Optional keyword argument with the X of the ungapped extension.
+ *         Defaults to 20.
+ *     Minimum_score - Optional keyword argument with the lowest score of an ungapped
+ *         segment that is extended with gaps, and of a hit. Defaults to 0.
+ *     Threads - Optional keyword argument with the number of threads. The default of 0
+ *         uses one thread per processor.
+ * @return A list with the best hit of every subject that has one, the highest score first.
+ * Each hit is a tuple of the index of the subject, the runs of edit operations of the
+ * alignment in the format of the cigar option of linearSequence, the start and end of the
+ * alignment in the query and in the subject, and its score. An IOError is raised if the
+ * index file cannot be written.
+ */
+static PyObject* Sequencing_searchDatabase(PyObject* self, PyObject* args, PyObject* kwargs)
+{
+	PyObject* input_matrix;
+	PyObject* input_subjects;
+	PyObject* input_params;
+	const char* input_query;
+	const char* input_mode;
+	const char* input_filename = "";
+	int input_k = SeedSearcher::DEFAULT_K;
+	int input_x_drop = 50;
+	int input_ungapped_x_drop = SeedSearcher::DEFAULT_UNGAPPED_X_DROP;
+	int input_minimum_score = 0;
+	int input_threads = 0;
+	std::vector<Sequence> subjects;
+	static const char* keywords[] = { "matrix", "query", "subjects", "mode", "params", "filename", "k", "x_drop", "ungapped_x_drop", "minimum_score", "threads", NULL };
+
+	if ( !PyArg_ParseTupleAndKeywords(args, kwargs, "OsOsO|siiiii", (char**)keywords, &input_matrix, &input_query, &input_subjects, &input_mode, &input_params, &input_filename, &input_k, &input_x_drop, &input_ungapped_x_drop, &input_minimum_score, &input_threads) )
+		return NULL;
+
+	std::string mode = std::string(input_mode);
+	int open_gap_penalty = 0;
+	int extend_gap_penalty = 0;
+	if ( mode == "affine" )
+	{
+		if ( !PyArg_ParseTuple(input_params, "ii", &open_gap_penalty, &extend_gap_penalty) )
+			return NULL;
+	}
+	else if ( mode == "linear" )
+	{
+		if ( !PyArg_ParseTuple(input_params, "i", &open_gap_penalty) )
+			return NULL;
+	}
+	else
+	{
+		PyErr_Format(PyExc_ValueError, "unknown search mode '%s'", input_mode);
+		return NULL;
+	}
+
+	int maximum_k = SeedIndex::MAXIMUM_K;
+	if ( input_k < 1 || input_k > maximum_k )
+	{
+		PyErr_Format(PyExc_ValueError, "seed length %d is not between 1 and %d", input_k, maximum_k);
+		return NULL;
+	}
+
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* substitution_matrix = Sequencing_getSubstitutionMatrix(input_matrix, converted_matrix);
+	if ( substitution_matrix == NULL || !Sequencing_convertSequences(input_subjects, subjects) )
+		return NULL;
+
+	std::string filename = std::string(input_filename);
+	Sequence query = Sequence(std::string(input_query));
+	SeedSearcher searcher = (mode == "affine") ? SeedSearcher(open_gap_penalty, extend_gap_penalty) : SeedSearcher(open_gap_penalty);
+	std::vector<SearchHit> hits;
+	bool written = true;
+
+	Py_BEGIN_ALLOW_THREADS
+	SeedIndex index;
+	bool stored = !filename.empty() && index.load(filename) && index.getK() == input_k && index.indexes(subjects);
+	int stored_count = index.getSubjectCount();
+	if ( !stored )
+		index = SeedIndex(subjects, input_k);
+	else if ( stored_count < (int)subjects.size() )
+		index.append(subjects);
+	if ( !filename.empty() && (!stored || stored_count < (int)subjects.size()) )
+		written = index.save(filename);
+	hits = searcher.search(*substitution_matrix, query, subjects, index, input_x_drop, input_ungapped_x_drop, input_minimum_score, input_threads);
+	Py_END_ALLOW_THREADS
+
+	if ( !written )
+	{
+		PyErr_Format(PyExc_IOError, "could not write the index file '%s'", input_filename);
+		return NULL;
+	}
+
+	PyObject* result = PyList_New(hits.size());
+	for ( unsigned int h = 0; h < hits.size(); h++ )
+	{
+		const Cigar& alignment = hits[h].getAlignment();
+		PyObject* hit = Py_BuildValue("isiiiii", hits[h].getSubject(), alignment.getOperations().c_str(), alignment.getStart(0), alignment.getEnd(0), alignment.getStart(1), alignment.getEnd(1), alignment.getScore());
+		if ( hit == NULL )
 		{
-			PyObject* matrix_cell_contents = PyList_GetItem(row_list, j);
-			int score = PyLong_AsLong(matrix_cell_contents);
-			substitution_matrix[i][j] = score;
+			Py_DECREF(result);
+			return NULL;
 		}
+		PyList_SetItem(result, h, hit);
 	}
-	
+
+	return result;
+}
+
+static PyObject* Sequencing_alignMultipleSequences(PyObject* self, PyObject* args)
+{
+	PyObject* input_distance_matrix;
+	PyObject* input_substitution_matrix;
+	PyObject* sequences_list;
+	std::vector<std::vector<double> > distance_matrix;
+	std::vector<Sequence> sequences;
+
+	if ( !PyArg_ParseTuple(args, "OOO", &input_distance_matrix, &input_substitution_matrix, &sequences_list) )
+		return NULL;
+
+	// Load the sequences
+	sequences = std::vector<Sequence>();
+	int sequence_count = PyList_Size(sequences_list);
+	for ( int i = 0; i < sequence_count; i++ )
+	{
+		PyObject* current_sequence = PyList_GetItem(sequences_list, i);
+		PyObject* ascii = PyUnicode_AsASCIIString(current_sequence);
+		const char* cur_string = PyBytes_AsString(ascii);
+		Sequence newSequence = Sequence(std::string(cur_string));
+		sequences.push_back(newSequence);
+	}
+
+	// load the substitution matrix
+	SubstitutionMatrix converted_matrix;
+	const SubstitutionMatrix* substitution_matrix = Sequencing_getSubstitutionMatrix(input_substitution_matrix, converted_matrix);
+	if ( substitution_matrix == NULL )
+		return NULL;
+
 	// load the distance matrix
 	int distance_column_list_size = PyList_Size(input_distance_matrix);
 	int distance_row_list_size = 0;
@@ -403,8 +1651,11 @@ static PyObject* Sequencing_alignMultipleSequences(PyObject* self, PyObject* arg
 	}
 
 	MultipleSequenceAlignment msa = MultipleSequenceAlignment();
-	
-	Alignment alignment = msa.align_sequences(distance_matrix, sequences, substitution_matrix);
+	Alignment alignment;
+
+	Py_BEGIN_ALLOW_THREADS
+	alignment = msa.align_sequences(distance_matrix, sequences, *substitution_matrix);
+	Py_END_ALLOW_THREADS
 
 	PyObject* py_alignment = PyList_New(alignment.size());
 
@@ -421,17 +1672,42 @@ static PyObject* Sequencing_alignMultipleSequences(PyObject* self, PyObject* arg
  * This array defines the functions that will be avaliable in the Python module.
  * The following interfaces for these functions in Python are as follows:
  * 
- *     linearSequence(bool global, int gap, listoflists substitution_matrix, string sequence1, string sequence2)
- *     affineSequence(bool global, int open_gap, int extend_gap, listoflists subsitution_matrix, string sequence1, sequence2)
+ *     linearSequence(bool global, int gap, listoflists substitution_matrix, string sequence1, string sequence2, string mode="full", int bandwidth=0, int x_drop=50, bool verify=True, int threads=1, int tile_size=256, bool cigar=False)
+ *     affineSequence(bool global, int open_gap, int extend_gap, listoflists subsitution_matrix, string sequence1, sequence2, string mode="full", int bandwidth=0, int x_drop=50, bool verify=True, int threads=1, int tile_size=256, bool cigar=False)
+ *     expandCigar(string operations, string sequence1, string sequence2, int start1=0, int start2=0)
+ *     linearScore(bool global, int gap, listoflists substitution_matrix, string sequence1, string sequence2, string engine="scalar")
+ *     affineScore(bool global, int open_gap, int extend_gap, listoflists subsitution_matrix, string sequence1, sequence2, string engine="scalar")
+ *     linearScoreRow(bool global, int gap, listoflists substitution_matrix, string query, list targets, string engine="scalar")
+ *     affineScoreRow(bool global, int open_gap, int extend_gap, listoflists subsitution_matrix, string query, list targets, string engine="scalar")
+ *     scoreAllPairs(listoflists substitution_matrix, list sequences, string mode, tuple params, int threads=0, string engine="batch")
+ *     editDistance(string sequence1, string sequence2)
+ *     kmerDistance(string sequence1, string sequence2, int k=4)
+ *     sketchAllPairs(list sequences, string filename="", int k=21, int size=1000, int threads=0)
+ *     searchDatabase(listoflists substitution_matrix, string query, list subjects, string mode, tuple params, string filename="", int k=11, int x_drop=50, int ungapped_x_drop=20, int minimum_score=0, int threads=0)
  *     loadSubstitutionMatrix(string filename)
- *     constructNewickTree(listoflists distance_matrix)
+ *     constructNewickTree(listoflists or buffer distance_matrix, list names, string search="exact")
+ *     bootstrapNewickTree(list sequences, list names, int replicates=100, int k=4, int seed=1, int threads=0, string search="exact", buffer distances=None)
+ *
+ * Every substitution_matrix argument accepts either a list of lists or a compiled
+ * SubstitutionMatrix(listoflists substitution_matrix) object.
  */
 static PyMethodDef Sequencing_Methods[] = {
-	{"linearSequence", Sequencing_linearSequence, METH_VARARGS, "Linear Sequencing of two Sequences"},
+	{"linearSequence", (PyCFunction)Sequencing_linearSequence, METH_VARARGS | METH_KEYWORDS, "Linear Sequencing of two Sequences"},
 	{"loadSubstitutionMatrix", Sequencing_loadSubstitutionMatrix, METH_VARARGS, "Loads a Substitution Matrix"},
-	{"affineSequence", Sequencing_affineSequence, METH_VARARGS, "Affine Sequencing of two Sequnces"},
-	{"constructNewickTree", Sequencing_constructNewickTree, METH_VARARGS, "Constructs a Newick tree from a distance Matrix"},
+	{"affineSequence", (PyCFunction)Sequencing_affineSequence, METH_VARARGS | METH_KEYWORDS, "Affine Sequencing of two Sequnces"},
+	{"expandCigar", (PyCFunction)Sequencing_expandCigar, METH_VARARGS | METH_KEYWORDS, "Expands the runs of edit operations of an alignment"},
+	{"constructNewickTree", (PyCFunction)Sequencing_constructNewickTree, METH_VARARGS | METH_KEYWORDS, "Constructs a Newick tree from a distance Matrix"},
+	{"bootstrapNewickTree", (PyCFunction)Sequencing_bootstrapNewickTree, METH_VARARGS | METH_KEYWORDS, "Constructs a bootstrapped Newick tree from Sequences"},
 	{"alignMultipleSequences", Sequencing_alignMultipleSequences, METH_VARARGS, "Aligns multiple sequences"},
+	{"linearScore", (PyCFunction)Sequencing_linearScore, METH_VARARGS | METH_KEYWORDS, "Linear Scoring of two Sequences"},
+	{"affineScore", (PyCFunction)Sequencing_affineScore, METH_VARARGS | METH_KEYWORDS, "Affine Scoring of two Sequences"},
+	{"linearScoreRow", (PyCFunction)Sequencing_linearScoreRow, METH_VARARGS | METH_KEYWORDS, "Linear Scoring of a Sequence against many Sequences"},
+	{"affineScoreRow", (PyCFunction)Sequencing_affineScoreRow, METH_VARARGS | METH_KEYWORDS, "Affine Scoring of a Sequence against many Sequences"},
+	{"scoreAllPairs", (PyCFunction)Sequencing_scoreAllPairs, METH_VARARGS | METH_KEYWORDS, "Scoring of every pair of Sequences"},
+	{"editDistance", (PyCFunction)Sequencing_editDistance, METH_VARARGS | METH_KEYWORDS, "Edit Distance of two Sequences"},
+	{"kmerDistance", (PyCFunction)Sequencing_kmerDistance, METH_VARARGS | METH_KEYWORDS, "K-mer Distance of two Sequences"},
+	{"sketchAllPairs", (PyCFunction)Sequencing_sketchAllPairs, METH_VARARGS | METH_KEYWORDS, "MinHash Distance of every pair of Sequences"},
+	{"searchDatabase", (PyCFunction)Sequencing_searchDatabase, METH_VARARGS | METH_KEYWORDS, "Seed and extend search of a Sequence against many Sequences"},
 	{NULL, NULL}
 };
 
@@ -458,7 +1734,23 @@ struct PyModuleDef Sequencing_Definition =
  */
 PyMODINIT_FUNC PyInit_Sequencing()
 {
-	return PyModule_Create(&Sequencing_Definition);
+	Sequencing_SubstitutionMatrixType.tp_name = "Sequencing.SubstitutionMatrix";
+	Sequencing_SubstitutionMatrixType.tp_basicsize = sizeof(Sequencing_SubstitutionMatrixObject);
+	Sequencing_SubstitutionMatrixType.tp_dealloc = (destructor)Sequencing_SubstitutionMatrix_dealloc;
+	Sequencing_SubstitutionMatrixType.tp_flags = Py_TPFLAGS_DEFAULT;
+	Sequencing_SubstitutionMatrixType.tp_doc = "A compiled Substitution Matrix";
+	Sequencing_SubstitutionMatrixType.tp_methods = Sequencing_SubstitutionMatrix_Methods;
+	Sequencing_SubstitutionMatrixType.tp_new = Sequencing_SubstitutionMatrix_new;
+	if ( PyType_Ready(&Sequencing_SubstitutionMatrixType) < 0 )
+		return NULL;
+
+	PyObject* module = PyModule_Create(&Sequencing_Definition);
+	if ( module == NULL )
+		return NULL;
+
+	Py_INCREF(&Sequencing_SubstitutionMatrixType);
+	PyModule_AddObject(module, "SubstitutionMatrix", (PyObject*)&Sequencing_SubstitutionMatrixType);
+	return module;
 }
 
 #endif
\ No newline at end of file
@@ -1,7 +1,7 @@
 from distutils.core import setup, Extension
 
 SequencingModule = Extension('Sequencing',
-    sources = ['PyLinearSequencer.cpp', '../Sequencing/Sequence.cpp', '../Sequencing/Alignment.cpp', '../Pairwise/SubstitutionMatrix.cpp', '../Pairwise/PairwiseAlignment.cpp', '../Pairwise/AffineSequencer.cpp', '../Pairwise/LinearSequencer.cpp', '../Utilities/Scanner.cpp', '../Utilities/FileScanner.cpp', '../Utilities/StringScanner.cpp', '../NeighborJoin/NeighborJoin.cpp', '../NeighborJoin/GeneticTreeNode.cpp', '../MultipleAlignment/Msa.cpp']
+    sources = ['PyLinearSequencer.cpp', '../Sequencing/Sequence.cpp', '../Sequencing/Alignment.cpp', '../Pairwise/SubstitutionMatrix.cpp', '../Pairwise/PairwiseAlignment.cpp', '../Pairwise/EncodedSequence.cpp', '../Pairwise/ScoreProfile.cpp', '../Pairwise/StripedSequencer.cpp', '../Pairwise/BatchSequencer.cpp', '../Pairwise/BandedSequencer.cpp', '../Pairwise/AllPairsScorer.cpp', '../Pairwise/Cigar.cpp', '../Pairwise/EditDistanceSequencer.cpp', '../Pairwise/KmerDistanceSequencer.cpp', '../Pairwise/MinHashSketcher.cpp', '../Pairwise/SeedSearcher.cpp', '../Pairwise/AffineSequencer.cpp', '../Pairwise/LinearSequencer.cpp', '../Utilities/Scanner.cpp', '../Utilities/FileScanner.cpp', '../Utilities/MappedFile.cpp', '../Utilities/StringScanner.cpp', '../NeighborJoin/NeighborJoin.cpp', '../NeighborJoin/GeneticTree.cpp', '../NeighborJoin/NeighborJoinBootstrap.cpp', '../MultipleAlignment/Msa.cpp']
 )
 
 setup(name = "Sequencing",
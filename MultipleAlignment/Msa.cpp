@@ -1,6 +1,7 @@
 #include "msa.h"
 #include "../NeighborJoin/NeighborJoin.h"
-#include "../NeighborJoin/GeneticTreeNode.h"
+#include "../NeighborJoin/GeneticTree.h"
+#include "../Utilities/ArenaBuffer.h"
 #include <iostream>
 
 using namespace std;
@@ -32,35 +33,43 @@ Alignment MultipleSequenceAlignment::align_sequences(	const vector< vector<doubl
 {
 	//construct guide tree
 	NeighborJoin nj;
-	GeneticTreeNode* guideTree = nj.construct_tree(distanceMatrix, sequences);
+	const GeneticTree& guideTree = nj.construct_tree(distanceMatrix, sequences);
 
 	//construct msa from guide tree
-	Alignment finalAlignment = align_sequences_recursive(guideTree);
+	Alignment finalAlignment = align_guide_tree(guideTree);
 
 
 	//return msa
 	return finalAlignment;
 }
 
-/* Traverses the given guide tree recursively aligning sequences to form a single alignment.
- * If a leaf node is found the alignment at that node is returned, otherwise the two children 
- * of the node are aligned.
+/* Aligns the sequences of the given guide tree into a single alignment. The nodes of the tree are visited by index,
+ * which reaches every child before its parent: the alignment of a leaf node is its sequence, and the alignment of
+ * any other node is the alignment of the alignments of its two children. The alignments of the children are
+ * released once their parent is aligned.
  */
-Alignment MultipleSequenceAlignment::align_sequences_recursive(GeneticTreeNode* head)
+Alignment MultipleSequenceAlignment::align_guide_tree(const GeneticTree &guideTree)
 {
-	if (head->num_children() > 2) {
-		//error, unable to align more than two sequences/alignments 
-		std::cerr << "Multiiple sequence alignment failed.  Guide tree contains node with more than two children" << endl;
-	} else if (head->num_children() == 0) {
-		//leaf node, return alignment
-		return head->get_alignment();
-	} else {
-		//align children's sequences/alignments
-		vector<GeneticTreeNode *> children = head->get_children();
-		Alignment a1 = align_sequences_recursive(children[0]);
-		Alignment a2 = align_sequences_recursive(children[1]);
-		return align(a1, a2);
+	if (guideTree.size() == 0) {
+		return Alignment();
 	}
+
+	vector<Alignment> alignments(guideTree.size());
+	for (int node = 0; node < guideTree.size(); ++node) {
+		if (guideTree.num_children(node) == 0) {
+			//leaf node, the alignment of its sequence
+			Sequence sequence = guideTree.get_sequence(node);
+			alignments[node].addSequence(sequence);
+		} else {
+			//align children's sequences/alignments
+			Alignment& a1 = alignments[guideTree.get_child(node, 0)];
+			Alignment& a2 = alignments[guideTree.get_child(node, 1)];
+			alignments[node] = align(a1, a2);
+			a1 = Alignment();
+			a2 = Alignment();
+		}
+	}
+	return alignments[guideTree.get_root()];
 }
 
 Alignment MultipleSequenceAlignment::align(Alignment &a1, Alignment &a2) 
@@ -68,22 +77,23 @@ Alignment MultipleSequenceAlignment::align(Alignment &a1, Alignment &a2)
 	int a1length = a1.getSequence(0).length();
 	int a2length = a2.getSequence(0).length();
 
-	vector< vector<double> > v(a1length, vector<double>(a2length));
+	//the matrix is stored row by row in a buffer reused by every alignment of the thread
+	Utilities::ArenaBuffer<double> v(a1length * a2length, 0);
 
-	v[0][0] = 0;
+	v[0] = 0;
 	for (int i = 1; i < a1length; ++i) {
-		v[i][0] = v[i-1][0] + gapPenalty;
+		v[i*a2length] = v[(i-1)*a2length] + gapPenalty;
 	}
 	for (int j = 1; j < a2length; ++j) {
-		v[0][j] = v[0][j-1] + gapPenalty;
+		v[j] = v[j-1] + gapPenalty;
 	}
 	for (int i = 1; i < a1length; ++i) {
 		for (int j = 1; j < a2length; ++j)
 		{
-			double Match = v[i-1][j-1] + psp(a1, a2, i, j);
-			double Delete = v[i-1][j] + gapPenalty;
-			double Insert = v[i][j-1] + gapPenalty;
-			v[i][j] = max(Match, max(Insert, Delete));
+			double Match = v[(i-1)*a2length + j-1] + psp(a1, a2, i, j);
+			double Delete = v[(i-1)*a2length + j] + gapPenalty;
+			double Insert = v[i*a2length + j-1] + gapPenalty;
+			v[i*a2length + j] = max(Match, max(Insert, Delete));
 		}
 	}
 	//TODO construct alignment
@@ -95,10 +105,10 @@ Alignment MultipleSequenceAlignment::align(Alignment &a1, Alignment &a2)
 
 	while (i > 0 && j > 0)
 	{
-		double Score = v[i][j];
-		double ScoreDiag = v[i - 1][j - 1];
-		double ScoreUp = v[i][j - 1];
-		double ScoreLeft = v[i - 1][j];
+		double Score = v[i*a2length + j];
+		double ScoreDiag = v[(i - 1)*a2length + j - 1];
+		double ScoreUp = v[i*a2length + j - 1];
+		double ScoreLeft = v[(i - 1)*a2length + j];
 		if (Score == ScoreDiag + psp(a1, a2, i, j))
 		{
 			prepend(a1, i, aA); 
@@ -1,6 +1,6 @@
 #include <string>
 #include <vector>
-#include "../NeighborJoin/GeneticTreeNode.h"
+#include "../NeighborJoin/GeneticTree.h"
 #include "../Sequencing/Sequence.h"
 #include "../Sequencing/Alignment.h"
 #include "../Pairwise/SubstitutionMatrix.h"
@@ -31,7 +31,7 @@ namespace MultipleSequencing {
 	private:
 		double psp(Sequencing::Alignment &a1, Sequencing::Alignment &a2, int i, int j);
 		int column_symbol_count( Sequencing::Alignment &a, int index, char symbol);
-		Sequencing::Alignment align_sequences_recursive(GeneticTreeNode* head);
+		Sequencing::Alignment align_guide_tree(const GeneticTree &guideTree);
 		Sequencing::Alignment align(Sequencing::Alignment &a1, Sequencing::Alignment &a2);
 		void prepend(Sequencing::Alignment &original, int index, std::vector<std::string> &a);
 		void prepend(char c, std::vector<std::string> &a);
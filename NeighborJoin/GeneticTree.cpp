@@ -0,0 +1,152 @@
+#include "GeneticTree.h"
+#include <sstream>
+#include <utility>
+
+#include <assert.h>
+
+using namespace std;
+using namespace Sequencing;
+
+GeneticTree::GeneticTree(void) {
+}
+GeneticTree::~GeneticTree(void) {
+}
+
+int GeneticTree::add_leaf(string label) {
+	return add_leaf(Sequence(label, ""));
+}
+/* Adds a node without children for a sequence and returns the index of the node.
+ */
+int GeneticTree::add_leaf(Sequence sequence) {
+	Node leaf;
+	leaf.parent = -1;
+	leaf.children[0] = -1;
+	leaf.children[1] = -1;
+	leaf.length = 0;
+	leaf.support = -1;
+	leaf.sequence = sequences.size();
+	sequences.push_back(sequence);
+	nodes.push_back(leaf);
+	return nodes.size()-1;
+}
+/* Adds a node with the nodes a and b as children, at the given lengths of the branches to them, and returns the
+ * index of the node.
+ */
+int GeneticTree::join(int a, double lengthA, int b, double lengthB) {
+	Node parent;
+	parent.parent = -1;
+	parent.children[0] = a;
+	parent.children[1] = b;
+	parent.length = 0;
+	parent.support = -1;
+	parent.sequence = -1;
+	nodes.push_back(parent);
+
+	int index = nodes.size()-1;
+	nodes[a].parent = index;
+	nodes[a].length = lengthA;
+	nodes[b].parent = index;
+	nodes[b].length = lengthB;
+	return index;
+}
+/* Sets the support of the branch above a node, a negative support for none.
+ */
+void GeneticTree::set_support(int node, int support) {
+	nodes[node].support = support;
+}
+void GeneticTree::clear() {
+	nodes.clear();
+	sequences.clear();
+}
+/* Writes the subtree below a node in the newick format, such as "(A:1,(B:2,C:3)95:0.5);", the support of an inner
+ * node following its closing parenthesis. The tree is walked with a stack of the nodes whose children are being
+ * written instead of recursion, so a deep tree cannot overflow the call stack, and everything is written straight to
+ * the stream instead of being concatenated.
+ */
+void GeneticTree::write_newick(ostream& out, int node) const {
+	//every entry is a node and the number of its children written so far
+	vector< pair<int, int> > stack;
+	stack.push_back(make_pair(node, 0));
+	while (!stack.empty()) {
+		int current = stack.back().first;
+		int written = stack.back().second;
+		if (num_children(current) > 0 && written < 2) {
+			out << (written == 0 ? '(' : ',');
+			stack.back().second++;
+			stack.push_back(make_pair(get_child(current, written), 0));
+			continue;
+		}
+
+		if (num_children(current) > 0) {
+			out << ')';
+			if (nodes[current].support >= 0) {
+				out << nodes[current].support;
+			}
+		} else {
+			out << get_sequence(current).getName();
+		}
+		if (current != node) {
+			out << ':' << nodes[current].length;
+		}
+		stack.pop_back();
+	}
+	out << ';';
+}
+string GeneticTree::to_newick() const {
+	//an empty tree has no root
+	if (nodes.empty()) {
+		return ";";
+	}
+	return to_newick(get_root());
+}
+string GeneticTree::to_newick(int node) const {
+	stringstream out;
+	write_newick(out, node);
+	return out.str();
+}
+
+/***************************************TESTS**************************************/
+
+void GeneticTree::run_tests() {
+	test_join();
+	test_write_newick();
+}
+void GeneticTree::test_join() {
+	GeneticTree tree;
+	int a = tree.add_leaf("A");
+	int b = tree.add_leaf("B");
+	int ab = tree.join(a, 1, b, 2);
+	(void)ab;
+
+	assert(tree.size() == 3 && tree.get_root() == ab);
+	assert(tree.get_parent(a) == ab && tree.get_parent(b) == ab && tree.get_parent(ab) == -1);
+	assert(tree.num_children(a) == 0 && tree.num_children(ab) == 2);
+	assert(tree.get_child(ab, 0) == a && tree.get_child(ab, 1) == b);
+	assert(tree.get_length(a) == 1 && tree.get_length(b) == 2);
+	assert(tree.get_sequence(b).getName() == "B");
+}
+void GeneticTree::test_write_newick() {
+	GeneticTree tree;
+	assert(tree.to_newick() == ";");
+	int a = tree.add_leaf("A");
+	int b = tree.add_leaf("B");
+	int c = tree.add_leaf("C");
+	int bc = tree.join(b, 2, c, 3);
+	tree.join(a, 1, bc, 0.5);
+	assert(tree.to_newick() == "(A:1,(B:2,C:3):0.5);");
+	assert(tree.to_newick(bc) == "(B:2,C:3);");
+	assert(tree.to_newick(a) == "A;");
+	tree.set_support(bc, 95);
+	assert(tree.get_support(bc) == 95 && tree.get_support(a) == -1);
+	assert(tree.to_newick() == "(A:1,(B:2,C:3)95:0.5);");
+
+	//a caterpillar tree far deeper than the call stack allows for recursion
+	GeneticTree deep;
+	int node = deep.add_leaf("A");
+	for (int i = 0; i < 200000; ++i) {
+		node = deep.join(node, 1, deep.add_leaf("B"), 1);
+	}
+	string newick = deep.to_newick();
+	assert(newick.size() == 200000*8 + 2);
+	assert(newick.substr(0, 3) == "(((" && newick.substr(newick.size()-6) == ",B:1);");
+}
\ No newline at end of file
@@ -0,0 +1,62 @@
+#pragma once
+#include <ostream>
+#include <string>
+#include <vector>
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___GENETICTREE___
+#define ___GENETICTREE___
+
+/* A binary tree of sequences kept in one array of nodes instead of a node per allocation. Nodes refer to their
+ * parent and children by index, so the whole tree is freed with the array. A node is always added after its
+ * children, so running through the nodes by index visits every child before its parent, and the last node is the
+ * root of the tree once every node is joined. An inner node may carry the support of its branch, such as the number of
+ * bootstrap replicates that hold the branch, which is written as the label of the node.
+ */
+class GeneticTree
+{
+public:
+	GeneticTree(void);
+	~GeneticTree(void);
+
+	int add_leaf(std::string label);
+	int add_leaf(Sequencing::Sequence sequence);
+	int join(int a, double lengthA, int b, double lengthB);
+	void set_support(int node, int support);
+	void clear();
+
+	int size() const { return nodes.size(); };
+	int get_root() const { return nodes.size()-1; };
+	int get_parent(int node) const { return nodes[node].parent; };
+	int num_children(int node) const { return nodes[node].children[0] < 0 ? 0 : 2; };
+	int get_child(int node, int index) const { return nodes[node].children[index]; };
+	double get_length(int node) const { return nodes[node].length; };
+	int get_support(int node) const { return nodes[node].support; };
+	const Sequencing::Sequence& get_sequence(int node) const { return sequences[nodes[node].sequence]; };
+
+	void write_newick(std::ostream& out, int node) const;
+	std::string to_newick() const;
+	std::string to_newick(int node) const;
+
+	//tests
+	void run_tests();
+
+private:
+	struct Node {
+		int parent;
+		int children[2];
+		double length;
+		int support;
+		int sequence;
+	};
+
+	std::vector<Node> nodes;
+	std::vector<Sequencing::Sequence> sequences;
+
+	//tests
+	void test_join();
+	void test_write_newick();
+};
+
+
+#endif
@@ -1,4 +1,7 @@
 #include "NeighborJoin.h"
+#include <algorithm>
+#include <cmath>
+#include <set>
 #include <sstream>
 #include <iostream>
 
@@ -17,176 +20,349 @@ NeighborJoin::~NeighborJoin(void) {
 
 }
 
-string NeighborJoin::construct_tree(const std::vector< std::vector<double> >& distanceMatrix, const std::vector<std::string>& sequence_names) {
+string NeighborJoin::construct_tree(const std::vector< std::vector<double> >& distanceMatrix, const std::vector<std::string>& sequence_names, int search) {
 	int r = distanceMatrix.size();
 
 	init_genetic_tree_list(r, sequence_names);
 
-	neighbor_join(distanceMatrix, r);
-	
-	join_tree_nodes(0, 1);
+	neighbor_join(distanceMatrix, r, search);
 
-	return genetic_tree_list.front()->to_newick();
+	return genetic_tree.to_newick();
 }
 
-GeneticTreeNode* NeighborJoin::construct_tree(const vector< vector<double> > &distanceMatrix, const vector< Sequence > &sequences) {
+/* Constructs the tree of a condensed distance matrix, which is overwritten, see join_condensed_matrix.
+ */
+string NeighborJoin::construct_tree(vector<double>& condensedMatrix, const vector<string>& sequence_names, int search) {
+	int n = sequence_names.size();
+
+	init_genetic_tree_list(n, sequence_names);
+
+	join_condensed_matrix(condensedMatrix, n, search);
+
+	return genetic_tree.to_newick();
+}
+
+const GeneticTree& NeighborJoin::construct_tree(vector<double>& condensedMatrix, const vector< Sequence > &sequences, int search) {
+	int n = sequences.size();
+
+	init_genetic_tree_list(sequences);
+
+	join_condensed_matrix(condensedMatrix, n, search);
+
+	return genetic_tree;
+}
+
+const GeneticTree& NeighborJoin::construct_tree(const vector< vector<double> > &distanceMatrix, const vector< Sequence > &sequences, int search) {
 	int r = distanceMatrix.size();
 
 	init_genetic_tree_list(sequences);
 
-	neighbor_join(distanceMatrix, r);
+	neighbor_join(distanceMatrix, r, search);
 
-	join_tree_nodes(0, 1);
+	return genetic_tree;
+}
 
-	return genetic_tree_list.front();
+/* Returns the index of the distance between rows i != j in a condensed matrix of n rows, which keeps only the
+ * distances above the diagonal, row after row.
+ */
+static inline size_t neighbor_join_index(size_t n, size_t i, size_t j) {
+	if (i > j) {
+		swap(i, j);
+	}
+	return i*n - i*(i+1)/2 + j - i - 1;
 }
 
+/* Returns the largest float that is not above a distance, so the sorted rows of the rapid search hold lower bounds
+ * of the distances in half of the memory.
+ */
+static inline float neighbor_join_lower_bound(double distance) {
+	float bound = (float)distance;
+	if (bound > distance) {
+		bound = nextafterf(bound, -HUGE_VALF);
+	}
+	return bound;
+}
 
-void NeighborJoin::neighbor_join(const vector< vector<double> >& d, int r) {
-	if (r <= 2) {
-		return;
-	} else {
-		//compute q matrix (while keeping track of minimum q value)
-		vector< vector<double> > q(r, vector<double>(r));
-		double minQ=999999999;
-		int minQA, minQB;
-		for (int i = 0; i < r; ++i) {
-			for (int j = 0; j < r; ++j) {
-				if (i == j) {
-					q[i][j] = 0;
-				} else {
-					q[i][j] = (r-2)*d[i][j] - sum_column(d, i) - sum_row(d, j);
-					if (q[i][j] <= minQ) {
-						minQ = q[i][j];
-						minQA = i;
-						minQB = j;
-					}
-				}
+/* Joins the nodes of a condensed distance matrix of n rows, the upper triangle of the matrix row after row, with or
+ * without the diagonal, which is told apart by the size of the matrix. The matrix becomes the working matrix of the
+ * joins, so it is overwritten instead of being copied.
+ */
+void NeighborJoin::join_condensed_matrix(vector<double>& condensedMatrix, int n, int search) {
+	bool diagonal = n > 0 && condensedMatrix.size() == (size_t)n*(n+1)/2;
+
+	//the sums are added up in the same order as for the full matrix, so both give the same tree
+	vector<double> sums(n, 0);
+	size_t cell = 0;
+	for (int i = 0; i < n; ++i) {
+		if (diagonal) {
+			sums[i] += condensedMatrix[cell++];
+		}
+		for (int j = i+1; j < n; ++j) {
+			sums[i] += condensedMatrix[cell];
+			sums[j] += condensedMatrix[cell];
+			++cell;
+		}
+	}
+
+	//the diagonal is dropped in place, every distance moving towards the front
+	if (diagonal) {
+		size_t kept = 0;
+		cell = 0;
+		for (int i = 0; i < n; ++i) {
+			++cell;
+			for (int j = i+1; j < n; ++j) {
+				condensedMatrix[kept++] = condensedMatrix[cell++];
 			}
 		}
+		condensedMatrix.resize(kept);
+	}
 
-		//construct new distance matrix
-		vector< vector<double> > newD = map_distance_matrix(d, minQA, minQB);
-		
-		//set new values
-		for (int i = 0; i < r-1; ++i) {
-			if (i != minQA && i != minQB) {
-				int iMapper = 0;
-				if (i > minQA || i > minQB) {
-					iMapper = 1;
-				}
-				if (i > minQA && i > minQB) {
-					iMapper = 2;
-				}
-				newD[newD.size()-1][i-iMapper] = 0.5*(d[minQA][i]+d[minQB][i]-d[minQA][minQB]);
-				newD[i-iMapper][newD.size()-1] = newD[newD.size()-1][i-iMapper];
+	neighbor_join(condensedMatrix, sums, n, search);
+}
+/* Copies a full distance matrix of r rows into a condensed working matrix and joins its nodes.
+ */
+void NeighborJoin::neighbor_join(const vector< vector<double> >& d, int r, int search) {
+	int n = r;
+	vector<double> distances(n > 1 ? (size_t)n*(n-1)/2 : 0);
+	vector<double> sums(n, 0);
+	for (int i = 0; i < r; ++i) {
+		for (int j = 0; j < r; ++j) {
+			if (j > i) {
+				distances[neighbor_join_index(n, i, j)] = d[i][j];
 			}
+			sums[i] += d[i][j];
 		}
+	}
+
+	neighbor_join(distances, sums, n, search);
+}
+/* Joins the nodes of a condensed working matrix of n rows, given the sums of its rows, until one is left. The
+ * matrix holds the n*(n-1)/2 distances above the diagonal, of which the leading block of rows and columns belongs to
+ * the nodes that are not joined yet. Every join updates the block in place, so each step takes O(r*r) time for
+ * finding the pair to join and O(r) time for the update, and the whole tree O(r*r*r) time. The sum of every row of
+ * the block is kept up to date instead of being summed again for every value of q.
+ *
+ * The rapid search finds the same pair as the exact search without looking at most of the pairs, see
+ * find_neighbors_rapid. Both searches share the working matrix and its updates, so the sums and the values of q
+ * are the same to the last bit and so are the joins.
+ */
+void NeighborJoin::neighbor_join(vector<double>& distances, vector<double>& sums, int n, int search) {
+	int r = n;
+	if (search == RAPID_SEARCH) {
+		init_rapid_rows(distances, n);
+	}
 
-		//TODO: Record the two nodes that were joined
-		join_tree_nodes(minQA, minQB);
+	for (; r > 2; --r) {
+		int minQA, minQB;
+		if (search == RAPID_SEARCH) {
+			find_neighbors_rapid(distances, sums, n, r, minQA, minQB);
+		} else {
+			find_neighbors(distances, sums, n, r, minQA, minQB);
+		}
+		double dAB = distances[neighbor_join_index(n, minQA, minQB)];
+		double lengthA = 0.5*dAB + (sums[minQA] - sums[minQB])/(2*(r-2));
+		join_distances(distances, sums, n, r, minQA, minQB);
+		if (search == RAPID_SEARCH) {
+			join_rapid_rows(distances, n, r, minQA, minQB);
+		}
+		join_tree_nodes(minQA, minQB, lengthA, dAB - lengthA);
+	}
 
-		//recursively neighbor join the new distance matrix
-		neighbor_join(newD, r-1);
+	//the branch between the last two nodes is split in the middle
+	if (r == 2) {
+		double dAB = distances[neighbor_join_index(n, 0, 1)];
+		join_tree_nodes(0, 1, 0.5*dAB, 0.5*dAB);
 	}
 
+	vector< vector<RapidEntry> >().swap(rapid_rows);
 }
-/* Sums over the second dimension of the given column in the matrix
+/* Finds the pair of rows a < b with the lowest q value, the first pair in row order when several pairs share it.
  */
-double NeighborJoin::sum_column(const vector< vector<double> >& matrix, int column) {
-	if (column >= 0 && column < matrix.size()) {
-		double sum = 0;
-		for (vector< vector<int> >::size_type i = 0; i < matrix[column].size(); ++i) {
-			sum += matrix[column][i];
-		}
-		return sum;
-	} else {
-		return 0;
+void NeighborJoin::find_neighbors(const vector<double>& distances, const vector<double>& sums, int n, int r, int& a, int& b) {
+	double minQ = 0;
+	a = 0;
+	b = 1;
+	for (int i = 0; i < r-1; ++i) {
+		const double* row = &distances[neighbor_join_index(n, i, i+1)];
+		double sumI = sums[i];
+		for (int j = i+1; j < r; ++j) {
+			double q = (r-2)*row[j-i-1] - sumI - sums[j];
+			if (q < minQ || (i == 0 && j == 1)) {
+				minQ = q;
+				a = i;
+				b = j;
+			}
+		}
 	}
 }
-/* Sums over the first dimension of the given row in the matrix
+/* Replaces the distances of row a with the distances to the node that joins a and b, and moves the distances of
+ * the last row into row b, so the block shrinks by one. The row sums are updated for the removed and the new
+ * distances.
  */
-double NeighborJoin::sum_row(const vector< vector<double> >& matrix, int row) {
-	double sum = 0;
-	for (vector<int>::size_type i = 0; i < matrix.size(); ++i) {
-		if (row >= 0 && row < matrix[i].size()) {
-			sum += matrix[i][row];
+void NeighborJoin::join_distances(vector<double>& distances, vector<double>& sums, int n, int r, int a, int b) {
+	double dAB = distances[neighbor_join_index(n, a, b)];
+	double sumU = 0;
+	for (int k = 0; k < r; ++k) {
+		if (k != a && k != b) {
+			double& dA = distances[neighbor_join_index(n, a, k)];
+			double dB = distances[neighbor_join_index(n, b, k)];
+			double dU = 0.5*(dA+dB-dAB);
+			sums[k] += dU - dA - dB;
+			sumU += dU;
+			dA = dU;
 		}
 	}
-	return sum;
+	sums[a] = sumU;
+
+	int last = r-1;
+	if (b != last) {
+		for (int k = 0; k < last; ++k) {
+			if (k != b) {
+				distances[neighbor_join_index(n, b, k)] = distances[neighbor_join_index(n, last, k)];
+			}
+		}
+		sums[b] = sums[last];
+	}
 }
-/*  Constructs a new distance matrix with columns/rows rowA and rowB removed.
+/* Sorts the distances of every node for the rapid search. Every pair of nodes is kept in the row of only one of
+ * them: a sequence keeps the distances to the sequences after it, and a joined node the distances to every node
+ * that is left when it is created. Rows are kept by node rather than by row of the block, since join_distances
+ * moves the nodes between the rows.
  */
-vector< vector<double> > NeighborJoin::map_distance_matrix(const vector< vector<double> >& d, int rowA, int rowB) {
-	vector< vector<double> > newD = d;
-	if (rowA == rowB || rowA < 0 || rowB < 0 || rowA >= d.size() || rowB >= d.size()) {
-		return newD;
+void NeighborJoin::init_rapid_rows(const vector<double>& distances, int n) {
+	rapid_rows = vector< vector<RapidEntry> >(2*n);
+	row_nodes = vector<int>(n);
+	node_rows = vector<int>(2*n, -1);
+	for (int i = 0; i < n; ++i) {
+		row_nodes[i] = i;
+		node_rows[i] = i;
+
+		vector<RapidEntry>& row = rapid_rows[i];
+		row.resize(n-i-1);
+		for (int j = i+1; j < n; ++j) {
+			row[j-i-1].distance = neighbor_join_lower_bound(distances[neighbor_join_index(n, i, j)]);
+			row[j-i-1].node = j;
+		}
+		sort(row.begin(), row.end());
 	}
-	int indexMapper = 0;
-	if (rowA < rowB) { indexMapper = 1; }
-	newD.erase(newD.begin()+rowA);
-	newD.erase(newD.begin()+rowB-indexMapper);
-	
-	for (int i = 0; i < newD.size(); ++i) {
-		newD[i].erase(newD[i].begin()+rowA);
-		newD[i].erase(newD[i].begin()+rowB-indexMapper);
+}
+/* Finds the same pair of rows as find_neighbors in the style of RapidNJ. The distances of every row are scanned
+ * from the lowest up, and since q = (r-2)*d(i,j) - sums[i] - sums[j] is at least (r-2)*d(i,j) - sums[i] - maxSum,
+ * the rest of a row is skipped once that bound is above the lowest q found so far. The bound is loosened by far
+ * more than the rounding of q, so no pair of the lowest q is skipped and ties are broken the way find_neighbors
+ * breaks them. Distances to joined nodes are skipped, and removed from a row when it holds many of them.
+ */
+void NeighborJoin::find_neighbors_rapid(const vector<double>& distances, const vector<double>& sums, int n, int r, int& a, int& b) {
+	double maxSum = sums[0];
+	for (int k = 1; k < r; ++k) {
+		maxSum = max(maxSum, sums[k]);
 	}
-	newD.push_back(vector<double>(newD.size(), 0));
-	for (int i = 0; i < newD.size(); ++i) {
-		newD[i].push_back(0);
+
+	double minQ = HUGE_VAL;
+	a = 0;
+	b = 1;
+	for (int i = 0; i < r; ++i) {
+		vector<RapidEntry>& row = rapid_rows[row_nodes[i]];
+		double sumI = sums[i];
+		int joined = 0;
+		for (size_t e = 0; e < row.size(); ++e) {
+			double scaled = (r-2)*(double)row[e].distance;
+			if (scaled - sumI - maxSum > minQ + 1e-9*(fabs(scaled) + fabs(sumI) + fabs(maxSum))) {
+				break;
+			}
+
+			int j = node_rows[row[e].node];
+			if (j < 0) {
+				++joined;
+				continue;
+			}
+			int lo = min(i, j);
+			int hi = max(i, j);
+			double q = (r-2)*distances[neighbor_join_index(n, lo, hi)] - sums[lo] - sums[hi];
+			if (q < minQ || (q == minQ && (lo < a || (lo == a && hi < b)))) {
+				minQ = q;
+				a = lo;
+				b = hi;
+			}
+		}
+
+		if (joined > 16) {
+			size_t kept = 0;
+			for (size_t e = 0; e < row.size(); ++e) {
+				if (node_rows[row[e].node] >= 0) {
+					row[kept++] = row[e];
+				}
+			}
+			row.resize(kept);
+		}
+	}
+}
+/* Follows a join of rows a and b in the rows of the rapid search: the nodes of a and b are removed with their
+ * rows, the joined node takes row a of the block and the node of the last row moves into row b, the way
+ * join_distances moves them. The joined node is numbered after every earlier node and gets the sorted distances to
+ * every node that is left.
+ */
+void NeighborJoin::join_rapid_rows(const vector<double>& distances, int n, int r, int a, int b) {
+	int joined = 2*n - r;
+	vector<RapidEntry>().swap(rapid_rows[row_nodes[a]]);
+	vector<RapidEntry>().swap(rapid_rows[row_nodes[b]]);
+	node_rows[row_nodes[a]] = -1;
+	node_rows[row_nodes[b]] = -1;
+
+	row_nodes[a] = joined;
+	node_rows[joined] = a;
+	int last = r-1;
+	if (b != last) {
+		row_nodes[b] = row_nodes[last];
+		node_rows[row_nodes[b]] = b;
 	}
 
-	return newD;
+	vector<RapidEntry>& row = rapid_rows[joined];
+	for (int k = 0; k < last; ++k) {
+		if (k != a) {
+			RapidEntry entry;
+			entry.distance = neighbor_join_lower_bound(distances[neighbor_join_index(n, a, k)]);
+			entry.node = row_nodes[k];
+			row.push_back(entry);
+		}
+	}
+	sort(row.begin(), row.end());
 }
 
-/* Creates a new node with nodes at index values provided as children and pushes it back on the list of nodes.
- *
+/* Creates a new node with the nodes at index values a < b as children, at the given lengths of the branches to
+ * them, stores it at index a and moves the last node into index b, the same way join_distances moves the rows of
+ * the distance matrix.
  */
-void NeighborJoin::join_tree_nodes(int a, int b) {
-	//get nodes to join
-	list<GeneticTreeNode*>::iterator aNodeItr, bNodeItr;
-	aNodeItr = genetic_tree_list.begin();
-	bNodeItr = genetic_tree_list.begin();
-	advance(aNodeItr, a);
-	advance(bNodeItr, b);
-	GeneticTreeNode *aNode = *aNodeItr;
-	GeneticTreeNode *bNode = *bNodeItr;
-
+void NeighborJoin::join_tree_nodes(int a, int b, double lengthA, double lengthB) {
 	//create new node
-	GeneticTreeNode *newNode = new GeneticTreeNode("");
-	newNode->add_child(aNode);
-	newNode->add_child(bNode);
-
-	//remove old nodes from list
-	genetic_tree_list.erase(aNodeItr);
-	genetic_tree_list.erase(bNodeItr);
+	int newNode = genetic_tree.join(genetic_tree_list[a], lengthA, genetic_tree_list[b], lengthB);
 
-	//add new node to list
-	genetic_tree_list.push_front(newNode);
+	//replace the joined nodes
+	genetic_tree_list[a] = newNode;
+	genetic_tree_list[b] = genetic_tree_list.back();
+	genetic_tree_list.pop_back();
 }
 void NeighborJoin::init_genetic_tree_list(int r, const std::vector<std::string>& sequence_names) {
+	genetic_tree.clear();
 	genetic_tree_list.clear();
 	for (int i = 0; i < r; ++i) {
-		string s;
-		stringstream out;
-		out << sequence_names[i];
-		s = out.str();
-		genetic_tree_list.push_back(new GeneticTreeNode(s));
+		genetic_tree_list.push_back(genetic_tree.add_leaf(sequence_names[i]));
 	}
 }
 void NeighborJoin::init_genetic_tree_list(const vector<Sequence> &sequences) {
+	genetic_tree.clear();
 	genetic_tree_list.clear();
 	for (int i = 0; i < sequences.size(); ++i) {
-		genetic_tree_list.push_back(new GeneticTreeNode(sequences[i]));
+		genetic_tree_list.push_back(genetic_tree.add_leaf(sequences[i]));
 	}
 }
 
 /***************************************TESTS**************************************/
 
 void NeighborJoin::run_tests() {
-	test_sum_row();
-	test_sum_column();
-	test_map_distance_matrix();
+	test_join_distances();
+	test_rapid_search();
+	test_condensed_matrix();
 	test_init_genetic_tree_list();
 	test_join_tree_nodes();
 	test_neighbor_join();
@@ -201,215 +377,278 @@ void NeighborJoin::print_array(vector< vector<double> > a) {
 
 
 }
-void NeighborJoin::print_tree(list<GeneticTreeNode *> tree) {
-	for (list<GeneticTreeNode *>::iterator it = tree.begin(); it != tree.end(); it++) {
-		cout << (*it)->to_newick() << endl;
+void NeighborJoin::print_tree(const vector<int>& nodes) {
+	for (vector<int>::const_iterator it = nodes.begin(); it != nodes.end(); it++) {
+		cout << genetic_tree.to_newick(*it) << endl;
 	}
 }
-void  NeighborJoin::test_neighbor_join() {
-	vector<double> d0;
-	d0.push_back(0);
-	d0.push_back(5);
-	d0.push_back(4);
-	d0.push_back(7);
-	d0.push_back(6);
-	d0.push_back(8);
-
-	vector<double> d1;
-	d1.push_back(5);
-	d1.push_back(0);
-	d1.push_back(7);
-	d1.push_back(10);
-	d1.push_back(9);
-	d1.push_back(11);
-
-	vector<double> d2;
-	d2.push_back(4);
-	d2.push_back(7);
-	d2.push_back(0);
-	d2.push_back(7);
-	d2.push_back(6);
-	d2.push_back(8);
-
-	vector<double> d3;
-	d3.push_back(7);
-	d3.push_back(10);
-	d3.push_back(7);
-	d3.push_back(0);
-	d3.push_back(5);
-	d3.push_back(9);
-
-	vector<double> d4;
-	d4.push_back(6);
-	d4.push_back(9);
-	d4.push_back(6);
-	d4.push_back(5);
-	d4.push_back(0);
-	d4.push_back(8);
-
-	vector<double> d5;
-	d5.push_back(8);
-	d5.push_back(11);
-	d5.push_back(8);
-	d5.push_back(9);
-	d5.push_back(8);
-	d5.push_back(0);
-
-	vector< vector<double> > d;
-	d.push_back(d0);
-	d.push_back(d1);
-	d.push_back(d2);
-	d.push_back(d3);
-	d.push_back(d4);
-	d.push_back(d5);
-
-	//NeighborJoin nj;
-	//cout << nj.construct_tree(d) << endl;
-
+/* Collects the sorted names below every inner node of a tree as the clusters of the tree. Children come before
+ * their parents in the nodes of the tree, so the names below every child are known when its parent is reached.
+ */
+static set<string> neighbor_join_test_clusters(const GeneticTree& tree) {
+	vector< vector<string> > names(tree.size());
+	set<string> clusters;
+	for (int node = 0; node < tree.size(); ++node) {
+		if (tree.num_children(node) == 0) {
+			names[node].push_back(tree.get_sequence(node).getName());
+			continue;
+		}
+		for (int i = 0; i < tree.num_children(node); ++i) {
+			vector<string>& below = names[tree.get_child(node, i)];
+			names[node].insert(names[node].end(), below.begin(), below.end());
+		}
+		sort(names[node].begin(), names[node].end());
+		string cluster;
+		for (int i = 0; i < names[node].size(); ++i) {
+			cluster += names[node][i] + " ";
+		}
+		clusters.insert(cluster);
+	}
+	return clusters;
 }
-void NeighborJoin::test_sum_row() {
-	vector<double> d0;
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-
-	vector<double> d1;
-	d1.push_back(2);
-	d1.push_back(1);
-	d1.push_back(1);
-	d1.push_back(1);
-
-	vector<double> d2;
-	d2.push_back(3);
-	d2.push_back(5);
-	d2.push_back(6);
-	d2.push_back(7);
-
-	vector<double> d3;
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-
-	vector< vector<double> > d;
-	d.push_back(d0);
-	d.push_back(d1);
-	d.push_back(d2);
-	d.push_back(d3);
-
+#ifndef NDEBUG
+/* Neighbor joins a distance matrix the way the textbook describes it, summing the rows again for every value of
+ * q and building a new matrix for every join, and returns the clusters of the tree.
+ */
+static set<string> neighbor_join_test_reference(vector< vector<double> > d, const vector<string>& names) {
+	vector<string> clusters = names;
+	set<string> result;
+	while (d.size() > 2) {
+		int r = d.size();
+		vector<double> sums(r, 0);
+		for (int i = 0; i < r; ++i) {
+			for (int j = 0; j < r; ++j) {
+				sums[i] += d[i][j];
+			}
+		}
+		int minQA = 0, minQB = 1;
+		for (int i = 0; i < r; ++i) {
+			for (int j = i+1; j < r; ++j) {
+				if ((r-2)*d[i][j] - sums[i] - sums[j] < (r-2)*d[minQA][minQB] - sums[minQA] - sums[minQB]) {
+					minQA = i;
+					minQB = j;
+				}
+			}
+		}
 
-	NeighborJoin nj;
+		stringstream leaves(clusters[minQA] + " " + clusters[minQB]);
+		vector<string> joined;
+		string name;
+		while (leaves >> name) {
+			joined.push_back(name);
+		}
+		sort(joined.begin(), joined.end());
+		string cluster;
+		for (int i = 0; i < joined.size(); ++i) {
+			cluster += joined[i] + " ";
+		}
+		result.insert(cluster);
 
-	assert(nj.sum_row(d, 0) == 10);
-	assert(nj.sum_row(d, 1) == 11);
-	assert(nj.sum_row(d, 2) == 12);
-	assert(nj.sum_row(d, 3) == 13);
+		vector< vector<double> > newD;
+		vector<string> newClusters;
+		vector<int> kept;
+		for (int i = 0; i < r; ++i) {
+			if (i != minQA && i != minQB) {
+				kept.push_back(i);
+			}
+		}
+		for (int x = 0; x < kept.size(); ++x) {
+			vector<double> row;
+			for (int y = 0; y < kept.size(); ++y) {
+				row.push_back(d[kept[x]][kept[y]]);
+			}
+			row.push_back(0.5*(d[minQA][kept[x]]+d[minQB][kept[x]]-d[minQA][minQB]));
+			newD.push_back(row);
+			newClusters.push_back(clusters[kept[x]]);
+		}
+		vector<double> row;
+		for (int x = 0; x < kept.size(); ++x) {
+			row.push_back(newD[x].back());
+		}
+		row.push_back(0);
+		newD.push_back(row);
+		newClusters.push_back(cluster);
+		d = newD;
+		clusters = newClusters;
+	}
 
-	assert(nj.sum_row(d, -1) == 0);
-	assert(nj.sum_row(d, 4) == 0);
+	stringstream leaves(clusters[0] + " " + clusters[1]);
+	vector<string> joined;
+	string name;
+	while (leaves >> name) {
+		joined.push_back(name);
+	}
+	sort(joined.begin(), joined.end());
+	string cluster;
+	for (int i = 0; i < joined.size(); ++i) {
+		cluster += joined[i] + " ";
+	}
+	result.insert(cluster);
+	return result;
 }
+/* Turns the clusters of a tree into the splits of the unrooted tree, the side of every cluster that does not hold
+ * the first sequence. The last joins of neighbor joining always tie, so only the unrooted trees can be compared.
+ */
+static set<string> neighbor_join_test_splits(const set<string>& clusters, const vector<string>& names) {
+	set<string> splits;
+	for (set<string>::const_iterator it = clusters.begin(); it != clusters.end(); ++it) {
+		stringstream leaves(*it);
+		set<string> cluster;
+		string name;
+		while (leaves >> name) {
+			cluster.insert(name);
+		}
+		if (cluster.count(names[0]) > 0) {
+			set<string> complement;
+			for (int i = 0; i < names.size(); ++i) {
+				if (cluster.count(names[i]) == 0) {
+					complement.insert(names[i]);
+				}
+			}
+			cluster = complement;
+		}
+		if (cluster.size() > 1 && cluster.size() + 1 < names.size()) {
+			string split;
+			for (set<string>::iterator leaf = cluster.begin(); leaf != cluster.end(); ++leaf) {
+				split += *leaf + " ";
+			}
+			splits.insert(split);
+		}
+	}
+	return splits;
+}
+#endif
+void  NeighborJoin::test_neighbor_join() {
+	//the tree has the same splits as the tree of the textbook algorithm, for distances without ties
+	srand(1);
+	for (int test = 0; test < 20; ++test) {
+		int r = 2 + rand() % 40;
+		vector< vector<double> > d(r, vector<double>(r, 0));
+		vector<string> names;
+		for (int i = 0; i < r; ++i) {
+			stringstream out;
+			out << "s" << i;
+			names.push_back(out.str());
+			for (int j = 0; j < i; ++j) {
+				d[i][j] = d[j][i] = 1 + rand() / (double)RAND_MAX;
+			}
+		}
 
-void NeighborJoin::test_sum_column() {
-	vector<double> d0;
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-
-	vector<double> d1;
-	d1.push_back(2);
-	d1.push_back(1);
-	d1.push_back(1);
-	d1.push_back(1);
-
-	vector<double> d2;
-	d2.push_back(3);
-	d2.push_back(5);
-	d2.push_back(6);
-	d2.push_back(7);
-
-	vector<double> d3;
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-
-	vector< vector<double> > d;
-	d.push_back(d0);
-	d.push_back(d1);
-	d.push_back(d2);
-	d.push_back(d3);
-
+		NeighborJoin nj;
+		vector<Sequence> sequences;
+		for (int i = 0; i < r; ++i) {
+			sequences.push_back(Sequence(names[i], ""));
+		}
+		set<string> clusters = neighbor_join_test_clusters(nj.construct_tree(d, sequences));
+		assert(neighbor_join_test_splits(clusters, names) == neighbor_join_test_splits(neighbor_join_test_reference(d, names), names));
+		assert(nj.construct_tree(d, names) == nj.construct_tree(d, sequences).to_newick());
+	}
 
+	//the branch lengths of a tree are recovered from its distances, the last branch split in the middle
+	double values[4][4] = { { 0, 3, 9, 10 }, { 3, 0, 10, 11 }, { 9, 10, 0, 7 }, { 10, 11, 7, 0 } };
+	vector< vector<double> > d(4, vector<double>(4));
+	for (int i = 0; i < 4; ++i) {
+		d[i].assign(values[i], values[i] + 4);
+	}
+	const char* letters[] = { "A", "B", "C", "D" };
+	(void)letters;
 	NeighborJoin nj;
-	
-	assert(nj.sum_column(d, 0) == 4);
-	assert(nj.sum_column(d, 1) == 5);
-	assert(nj.sum_column(d, 2) == 21);
-	assert(nj.sum_column(d, 3) == 16);
-
-	assert(nj.sum_column(d, -1) == 0);
-	assert(nj.sum_column(d, 4) == 0);
-
+	assert(nj.construct_tree(d, vector<string>(letters, letters + 4)) == "(((A:1,B:2):5,D:4):1.5,C:1.5);");
 
+	//a tree of a single sequence is the sequence
+	assert(nj.construct_tree(vector< vector<double> >(1, vector<double>(1, 0)), vector<string>(1, "A")) == "A;");
 }
-
-void NeighborJoin::test_map_distance_matrix() {
-	vector<double> d0;
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-	d0.push_back(1);
-
-	vector<double> d1;
-	d1.push_back(2);
-	d1.push_back(2);
-	d1.push_back(2);
-	d1.push_back(2);
-
-	vector<double> d2;
-	d2.push_back(3);
-	d2.push_back(3);
-	d2.push_back(3);
-	d2.push_back(3);
-
-	vector<double> d3;
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-	d3.push_back(4);
-
-	vector< vector<double> > d;
-	d.push_back(d0);
-	d.push_back(d1);
-	d.push_back(d2);
-	d.push_back(d3);
+void NeighborJoin::test_join_distances() {
+	double values[4][4] = { { 0, 5, 9, 9 }, { 5, 0, 10, 10 }, { 9, 10, 0, 8 }, { 9, 10, 8, 0 } };
+	vector<double> distances(6);
+	vector<double> sums(4, 0);
+	for (int i = 0; i < 4; ++i) {
+		for (int j = 0; j < 4; ++j) {
+			if (j > i) {
+				distances[neighbor_join_index(4, i, j)] = values[i][j];
+			}
+			sums[i] += values[i][j];
+		}
+	}
+	assert(distances[neighbor_join_index(4, 2, 3)] == 8 && distances[neighbor_join_index(4, 3, 2)] == 8);
 
 	NeighborJoin nj;
-	
-	vector< vector<double> > newD = nj.map_distance_matrix(d, 1, 2);
-	print_array(d);
-	print_array(newD);
-
-	newD = nj.map_distance_matrix(d, 0, 1);
-	print_array(d);
-	print_array(newD);
-
-	newD = nj.map_distance_matrix(d, 0, 2);
-	print_array(d);
-	print_array(newD);
-
-	newD = nj.map_distance_matrix(d, 0, 3);
-	print_array(d);
-	print_array(newD);
+	int a, b;
+	nj.find_neighbors(distances, sums, 4, 4, a, b);
+	assert(a == 0 && b == 1);
+
+	//the node of rows 0 and 1 is kept in row 0, and the last row moves into row 1
+	nj.join_distances(distances, sums, 4, 4, a, b);
+	assert(distances[neighbor_join_index(4, 0, 1)] == 7);
+	assert(distances[neighbor_join_index(4, 0, 2)] == 7);
+	assert(distances[neighbor_join_index(4, 1, 2)] == 8);
+	assert(sums[0] == 14 && sums[1] == 15 && sums[2] == 15);
+}
+void NeighborJoin::test_rapid_search() {
+	//the rapid search constructs the same tree as the exact search, also for distances with many ties
+	srand(2);
+	for (int test = 0; test < 40; ++test) {
+		int r = 1 + rand() % 120;
+		vector< vector<double> > d(r, vector<double>(r, 0));
+		vector<string> names;
+		for (int i = 0; i < r; ++i) {
+			stringstream out;
+			out << "s" << i;
+			names.push_back(out.str());
+			for (int j = 0; j < i; ++j) {
+				d[i][j] = d[j][i] = test % 2 == 0 ? rand() % 5 : rand() / (double)RAND_MAX - 0.25;
+			}
+		}
 
-	newD = nj.map_distance_matrix(d, 1, 3);
-	print_array(d);
-	print_array(newD);
+		NeighborJoin nj;
+		assert(nj.construct_tree(d, names, RAPID_SEARCH) == nj.construct_tree(d, names, EXACT_SEARCH));
+	}
 
+	//the first pair of the lowest q is joined, as in the exact search
+	NeighborJoin nj;
+	vector< vector<double> > d(4, vector<double>(4, 1));
+	for (int i = 0; i < 4; ++i) {
+		d[i][i] = 0;
+	}
+	vector<double> distances(6, 1);
+	vector<double> sums(4, 3);
+	nj.init_rapid_rows(distances, 4);
+	int a, b;
+	nj.find_neighbors_rapid(distances, sums, 4, 4, a, b);
+	assert(a == 0 && b == 1);
+	assert(nj.construct_tree(d, vector<string>(4, "A"), RAPID_SEARCH) == nj.construct_tree(d, vector<string>(4, "A")));
 }
+void NeighborJoin::test_condensed_matrix() {
+	//a condensed matrix, with or without the diagonal, gives the tree of the full matrix
+	srand(3);
+	for (int test = 0; test < 20; ++test) {
+		int r = 1 + rand() % 60;
+		bool diagonal = test % 2 == 0;
+		vector< vector<double> > d(r, vector<double>(r, 0));
+		vector<string> names;
+		vector<double> condensed;
+		for (int i = 0; i < r; ++i) {
+			stringstream out;
+			out << "s" << i;
+			names.push_back(out.str());
+			for (int j = 0; j < i; ++j) {
+				d[i][j] = d[j][i] = rand() / (double)RAND_MAX;
+			}
+			if (diagonal) {
+				d[i][i] = rand() % 10;
+			}
+		}
+		for (int i = 0; i < r; ++i) {
+			for (int j = diagonal ? i : i+1; j < r; ++j) {
+				condensed.push_back(d[i][j]);
+			}
+		}
 
+		NeighborJoin nj;
+		string newick = nj.construct_tree(d, names);
+		assert(nj.construct_tree(condensed, names, test % 4 < 2 ? EXACT_SEARCH : RAPID_SEARCH) == newick);
+	}
+}
 void NeighborJoin::test_init_genetic_tree_list() {
 	//init_genetic_tree_list(5);
 	print_tree(genetic_tree_list);
@@ -430,7 +669,9 @@ void NeighborJoin::test_join_tree_nodes() {
 
 	init_genetic_tree_list(5, s);
 
-	join_tree_nodes(1, 2);
+	join_tree_nodes(1, 2, 1, 2);
 
-	print_tree(genetic_tree_list);
-}
+	assert(genetic_tree_list.size() == 4);
+	assert(genetic_tree.to_newick(genetic_tree_list[1]) == "(B:1,C:2);");
+	assert(genetic_tree.to_newick(genetic_tree_list[2]) == "E;");
+}
\ No newline at end of file
@@ -1,46 +1,71 @@
 #pragma once
 #include <vector>
-#include <list>
-#include "../NeighborJoin/GeneticTreeNode.h"
+#include "../NeighborJoin/GeneticTree.h"
 #include "../Sequencing/Sequence.h"
 
 #ifndef ___NEIGHBORJOIN___
 #define ___NEIGHBORJOIN___
 
+/* Joins the nodes of a distance matrix into a tree. The exact search compares every pair of nodes for every join,
+ * the rapid search skips most of the pairs in the style of RapidNJ. Both searches join the same pairs in the same
+ * order, so they construct the same tree.
+ */
 class NeighborJoin
 {
 private:
+	//an entry of the sorted rows of the rapid search
+	struct RapidEntry {
+		float distance;
+		int node;
+
+		bool operator < (const RapidEntry& other) const { return distance < other.distance; }
+	};
+
 	//members
-	std::list<GeneticTreeNode*> genetic_tree_list;
+	GeneticTree genetic_tree;
+	std::vector<int> genetic_tree_list;
+	std::vector< std::vector<RapidEntry> > rapid_rows;
+	std::vector<int> row_nodes;
+	std::vector<int> node_rows;
 
 	//methods
-	void neighbor_join( const std::vector< std::vector<double> >&, int);
-	double sum_column(const std::vector< std::vector<double> >&, int);
-	double sum_row(const std::vector< std::vector<double> >&, int);
-	std::vector< std::vector<double> > map_distance_matrix(const std::vector< std::vector<double> >&, int, int);
-	void join_tree_nodes(int, int);
+	void neighbor_join(const std::vector< std::vector<double> >&, int, int search);
+	void neighbor_join(std::vector<double>& distances, std::vector<double>& sums, int n, int search);
+	void join_condensed_matrix(std::vector<double>& condensedMatrix, int n, int search);
+	void find_neighbors(const std::vector<double>& distances, const std::vector<double>& sums, int n, int r, int& a, int& b);
+	void join_distances(std::vector<double>& distances, std::vector<double>& sums, int n, int r, int a, int b);
+	void init_rapid_rows(const std::vector<double>& distances, int n);
+	void find_neighbors_rapid(const std::vector<double>& distances, const std::vector<double>& sums, int n, int r, int& a, int& b);
+	void join_rapid_rows(const std::vector<double>& distances, int n, int r, int a, int b);
+	void join_tree_nodes(int, int, double lengthA, double lengthB);
 	void init_genetic_tree_list(int, const std::vector<std::string>& sequence_names);
 	void init_genetic_tree_list(const std::vector<Sequencing::Sequence> &sequences);
 
 	//tests
-	void test_sum_row();
-	void test_sum_column();
 	void test_neighbor_join();
-	void test_map_distance_matrix();
+	void test_join_distances();
+	void test_rapid_search();
+	void test_condensed_matrix();
 	void test_join_tree_nodes();
 	void test_init_genetic_tree_list();
 
 	void print_array(std::vector< std::vector<double> > a);
-	void print_tree(std::list<GeneticTreeNode *>);
+	void print_tree(const std::vector<int>&);
 
 public:
+	//searches for the pair of nodes to join
+	static const int EXACT_SEARCH = 0;
+	static const int RAPID_SEARCH = 1;
+
 	//constructors
 	NeighborJoin(void);
 	~NeighborJoin(void);
 
 	//public interfaces
-	std::string construct_tree(const std::vector< std::vector<double> >&, const std::vector<std::string>& sequence_names);
-	GeneticTreeNode* construct_tree(const std::vector< std::vector<double> > &distanceMatrix, const std::vector< Sequencing::Sequence > &sequences);
+	std::string construct_tree(const std::vector< std::vector<double> >&, const std::vector<std::string>& sequence_names, int search = EXACT_SEARCH);
+	std::string construct_tree(std::vector<double>& condensedMatrix, const std::vector<std::string>& sequence_names, int search = EXACT_SEARCH);
+	const GeneticTree& construct_tree(const std::vector< std::vector<double> > &distanceMatrix, const std::vector< Sequencing::Sequence > &sequences, int search = EXACT_SEARCH);
+	const GeneticTree& construct_tree(std::vector<double>& condensedMatrix, const std::vector< Sequencing::Sequence > &sequences, int search = EXACT_SEARCH);
 
 	//tests
 	void run_tests();
@@ -0,0 +1,353 @@
+#include "NeighborJoinBootstrap.h"
+#include "NeighborJoin.h"
+#include "../Pairwise/KmerDistanceSequencer.h"
+#include "../Utilities/ThreadPool.h"
+#include <algorithm>
+#include <random>
+
+#include <assert.h>
+
+using namespace std;
+using namespace Sequencing;
+using Pairwise::KmerProfile;
+using Pairwise::KmerDistanceSequencer;
+using Pairwise::MatrixDataType;
+
+/* The task of the ThreadPool that joins the tree of one replicate and marks the branches of the tree of all of the
+ * columns that the replicate tree holds.
+ */
+struct NeighborJoinBootstrapTask {
+	NeighborJoinBootstrap* bootstrap;
+	const vector<NeighborJoinBootstrap::Profile>* profiles;
+	int column_count;
+	const vector<Sequence>* leaves;
+	const vector<uint64_t>* keys;
+	const vector<uint64_t>* reference_splits;
+	int search;
+	vector< vector<char> >* found;
+
+	void operator () (const int replicate) {
+		vector<int> weights;
+		vector<double> distances;
+		bootstrap->resample(replicate, column_count, weights);
+		bootstrap->compute_distances(*profiles, weights, distances);
+
+		NeighborJoin nj;
+		vector<uint64_t> splits;
+		bootstrap->hash_splits(nj.construct_tree(distances, *leaves, search), *keys, splits);
+		sort(splits.begin(), splits.end());
+
+		vector<char>& marks = (*found)[replicate];
+		marks.resize(reference_splits->size());
+		for (int i = 0; i < reference_splits->size(); ++i) {
+			marks[i] = binary_search(splits.begin(), splits.end(), (*reference_splits)[i]);
+		}
+	}
+};
+
+NeighborJoinBootstrap::NeighborJoinBootstrap(int k, int replicates, unsigned int seed) {
+	this->k = k;
+	this->replicates = replicates;
+	this->seed = seed;
+}
+NeighborJoinBootstrap::~NeighborJoinBootstrap(void) {
+}
+
+/* Constructs the neighbor joining tree of the k-mer distances of the sequences, the same tree as that of the
+ * distances of the KmerDistanceSequencer, with the number of replicates that hold every inner branch as the support
+ * of the node below the branch. The branches are compared by the splits of the sequences they make, each hashed to the
+ * sum modulo two of random keys of the sequences on the side without the first sequence, so a replicate tree is
+ * compared in O(n) time and a chance match of two different splits is vanishingly unlikely. The replicates do not
+ * depend on the number of threads.
+ */
+GeneticTree NeighborJoinBootstrap::construct_tree(const vector<Sequence>& sequences, int search, int thread_count) {
+	vector<Profile> profiles;
+	int columnCount = encode_profiles(sequences, profiles);
+	vector<double> distances;
+	compute_distances(profiles, vector<int>(columnCount, 1), distances);
+	return support_tree(sequences, profiles, columnCount, distances, search, thread_count);
+}
+/* Constructs the same tree from the k-mer distances of the sequences that were already computed, such as the scores
+ * of the KmerDistanceSequencer, condensed with or without the diagonal. The distances are overwritten.
+ */
+GeneticTree NeighborJoinBootstrap::construct_tree(const vector<Sequence>& sequences, vector<double>& distances, int search, int thread_count) {
+	vector<Profile> profiles;
+	int columnCount = replicates > 0 ? encode_profiles(sequences, profiles) : 0;
+	return support_tree(sequences, profiles, columnCount, distances, search, thread_count);
+}
+/* Joins the tree of the distances of all of the columns and sets the support of its inner nodes from the replicates.
+ */
+GeneticTree NeighborJoinBootstrap::support_tree(const vector<Sequence>& sequences, const vector<Profile>& profiles, int columnCount, vector<double>& distances, int search, int thread_count) {
+	int n = sequences.size();
+	mt19937_64 random(seed);
+	vector<uint64_t> keys(n);
+	for (int i = 0; i < n; ++i) {
+		keys[i] = random();
+	}
+
+	//the tree of all of the columns
+	NeighborJoin nj;
+	GeneticTree tree = nj.construct_tree(distances, sequences, search);
+	if (replicates <= 0) {
+		return tree;
+	}
+
+	vector<uint64_t> splits;
+	hash_splits(tree, keys, splits);
+	vector<uint64_t> referenceSplits;
+	vector<int> referenceNodes;
+	for (int node = 0; node < tree.size(); ++node) {
+		if (splits[node] != 0) {
+			referenceSplits.push_back(splits[node]);
+			referenceNodes.push_back(node);
+		}
+	}
+
+	//the replicate trees only need the leaves to be in the order of the sequences
+	vector<Sequence> leaves(n, Sequence("", ""));
+	vector< vector<char> > found(replicates);
+	NeighborJoinBootstrapTask task = { this, &profiles, columnCount, &leaves, &keys, &referenceSplits, search, &found };
+	Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+	pool.run(replicates, task);
+
+	for (int i = 0; i < referenceNodes.size(); ++i) {
+		int support = 0;
+		for (int replicate = 0; replicate < replicates; ++replicate) {
+			support += found[replicate][i];
+		}
+		tree.set_support(referenceNodes[i], support);
+	}
+	return tree;
+}
+/* Encodes the k-mer profiles of the sequences as columns, numbering the distinct k-mers of all of the sequences in
+ * sorted order, and returns the number of columns.
+ */
+int NeighborJoinBootstrap::encode_profiles(const vector<Sequence>& sequences, vector<Profile>& profiles) {
+	vector<KmerProfile> kmerProfiles(sequences.size());
+	vector<uint64_t> kmers;
+	for (int i = 0; i < sequences.size(); ++i) {
+		kmerProfiles[i] = KmerProfile(sequences[i], k);
+		kmers.insert(kmers.end(), kmerProfiles[i].getKmers().begin(), kmerProfiles[i].getKmers().end());
+	}
+	sort(kmers.begin(), kmers.end());
+	kmers.erase(unique(kmers.begin(), kmers.end()), kmers.end());
+
+	profiles = vector<Profile>(sequences.size());
+	for (int i = 0; i < sequences.size(); ++i) {
+		const vector<uint64_t>& sequenceKmers = kmerProfiles[i].getKmers();
+		profiles[i].counts = kmerProfiles[i].getCounts();
+		profiles[i].columns.resize(sequenceKmers.size());
+		for (int j = 0; j < sequenceKmers.size(); ++j) {
+			profiles[i].columns[j] = lower_bound(kmers.begin(), kmers.end(), sequenceKmers[j]) - kmers.begin();
+		}
+	}
+	return kmers.size();
+}
+/* Draws the columns of a replicate with replacement, setting the weight of every column to the number of times it
+ * is drawn. Every replicate has a random generator of its own, seeded by the seed and the number of the replicate.
+ */
+void NeighborJoinBootstrap::resample(int replicate, int column_count, vector<int>& weights) {
+	weights.assign(column_count, 0);
+	if (column_count == 0) {
+		return;
+	}
+
+	seed_seq seeds = { seed, (unsigned int)replicate };
+	mt19937 random(seeds);
+	uniform_int_distribution<int> column(0, column_count-1);
+	for (int i = 0; i < column_count; ++i) {
+		++weights[column(random)];
+	}
+}
+/* Computes the condensed matrix of the k-mer distances of the weighted columns, without the diagonal. A column of
+ * weight w counts as w columns, so the distances of weights of one are the distances of the KmerDistanceSequencer.
+ * The counts of every row are spread over an array of all of the columns, so the k-mers shared with the other
+ * sequences are looked up instead of merged, and columns that were not drawn are left out of the profiles.
+ */
+void NeighborJoinBootstrap::compute_distances(const vector<Profile>& profiles, const vector<int>& weights, vector<double>& distances) {
+	int n = profiles.size();
+	vector<Profile> drawn(n);
+	vector<long long> totals(n, 0);
+	for (int i = 0; i < n; ++i) {
+		for (int c = 0; c < profiles[i].columns.size(); ++c) {
+			int column = profiles[i].columns[c];
+			if (weights[column] > 0) {
+				drawn[i].columns.push_back(column);
+				drawn[i].counts.push_back(profiles[i].counts[c]);
+				totals[i] += (long long)weights[column] * profiles[i].counts[c];
+			}
+		}
+	}
+
+	const long long scale = KmerDistanceSequencer::DISTANCE_SCALE;
+	distances.assign(n > 1 ? (size_t)n*(n-1)/2 : 0, 0);
+	vector<int> counts(weights.size(), 0);
+	size_t cell = 0;
+	for (int i = 0; i < n; ++i) {
+		for (int c = 0; c < drawn[i].columns.size(); ++c) {
+			counts[drawn[i].columns[c]] = drawn[i].counts[c];
+		}
+
+		for (int j = i+1; j < n; ++j) {
+			long long kmers = min(totals[i], totals[j]);
+			if (kmers == 0) {
+				distances[cell++] = scale;
+				continue;
+			}
+
+			long long shared = 0;
+			const Profile& b = drawn[j];
+			for (int c = 0; c < b.columns.size(); ++c) {
+				shared += (long long)weights[b.columns[c]] * min(counts[b.columns[c]], b.counts[c]);
+			}
+			distances[cell++] = (scale * (kmers - shared) + kmers / 2) / kmers;
+		}
+
+		for (int c = 0; c < drawn[i].columns.size(); ++c) {
+			counts[drawn[i].columns[c]] = 0;
+		}
+	}
+}
+/* Hashes the split of the sequences made by the branch above every node of a tree whose first nodes are the leaves
+ * of the sequences in order. A split is hashed on the side without the first sequence, and the splits of a leaf or
+ * of all but one of the leaves, which every tree makes, are set to 0.
+ */
+void NeighborJoinBootstrap::hash_splits(const GeneticTree& tree, const vector<uint64_t>& keys, vector<uint64_t>& splits) {
+	int n = keys.size();
+	uint64_t all = 0;
+	for (int i = 0; i < n; ++i) {
+		all ^= keys[i];
+	}
+
+	vector<uint64_t> hashes(tree.size(), 0);
+	vector<int> leafCounts(tree.size(), 0);
+	vector<char> holdsFirst(tree.size(), 0);
+	splits.assign(tree.size(), 0);
+	for (int node = 0; node < tree.size(); ++node) {
+		if (tree.num_children(node) == 0) {
+			hashes[node] = keys[node];
+			leafCounts[node] = 1;
+			holdsFirst[node] = node == 0;
+		} else {
+			for (int i = 0; i < tree.num_children(node); ++i) {
+				int child = tree.get_child(node, i);
+				hashes[node] ^= hashes[child];
+				leafCounts[node] += leafCounts[child];
+				holdsFirst[node] |= holdsFirst[child];
+			}
+		}
+
+		if (leafCounts[node] > 1 && leafCounts[node] < n-1) {
+			splits[node] = holdsFirst[node] ? hashes[node] ^ all : hashes[node];
+		}
+	}
+}
+
+/***************************************TESTS**************************************/
+
+void NeighborJoinBootstrap::run_tests() {
+	test_distances();
+	test_support();
+}
+/* Creates a copy of a sequence with a number of random substitutions.
+ */
+static Sequence neighbor_join_bootstrap_test_mutate(const string& sequence, int substitutions, const string& name) {
+	string mutated = sequence;
+	for (int i = 0; i < substitutions; ++i) {
+		mutated[rand() % mutated.size()] = "ACGT"[rand() % 4];
+	}
+	return Sequence(name, mutated);
+}
+void NeighborJoinBootstrap::test_distances() {
+	//columns of weight one give the distances of the KmerDistanceSequencer
+	srand(1);
+	vector<Sequence> sequences;
+	for (int i = 0; i < 12; ++i) {
+		string sequence;
+		for (int j = rand() % 80; j > 0; --j) {
+			sequence += "ACGTacgt"[rand() % 8];
+		}
+		sequences.push_back(Sequence(sequence));
+	}
+
+	NeighborJoinBootstrap bootstrap(3, 0, 1);
+	vector<Profile> profiles;
+	int columnCount = bootstrap.encode_profiles(sequences, profiles);
+	vector<double> distances;
+	bootstrap.compute_distances(profiles, vector<int>(columnCount, 1), distances);
+
+	KmerDistanceSequencer ks(3);
+	vector<MatrixDataType> expected = ks.distances(sequences, 1);
+	size_t cell = 0, expectedCell = 0;
+	(void)cell;
+	for (int i = 0; i < sequences.size(); ++i) {
+		++expectedCell;
+		for (int j = i+1; j < sequences.size(); ++j) {
+			assert(distances[cell++] == expected[expectedCell++]);
+		}
+	}
+
+	//a replicate draws as many columns as there are
+	vector<int> weights;
+	bootstrap.resample(7, columnCount, weights);
+	int drawn = 0;
+	for (int c = 0; c < columnCount; ++c) {
+		drawn += weights[c];
+	}
+	assert(drawn == columnCount);
+}
+void NeighborJoinBootstrap::test_support() {
+	//three groups of close sequences are split apart by nearly every replicate
+	srand(2);
+	vector<Sequence> sequences;
+	for (int group = 0; group < 3; ++group) {
+		string ancestor;
+		for (int j = 0; j < 300; ++j) {
+			ancestor += "ACGT"[rand() % 4];
+		}
+		for (int i = 0; i < 4; ++i) {
+			string name(1, 'A' + group);
+			name += '0' + i;
+			sequences.push_back(neighbor_join_bootstrap_test_mutate(ancestor, 10, name));
+		}
+	}
+
+	NeighborJoinBootstrap bootstrap(4, 50, 7);
+	GeneticTree tree = bootstrap.construct_tree(sequences, NeighborJoin::EXACT_SEARCH, 4);
+
+	//keys of single bits make the hash of a split the set of its sequences
+	vector<uint64_t> keys;
+	for (int i = 0; i < sequences.size(); ++i) {
+		keys.push_back((uint64_t)1 << i);
+	}
+	vector<uint64_t> splits;
+	bootstrap.hash_splits(tree, keys, splits);
+	int groups = 0;
+	for (int node = 0; node < tree.size(); ++node) {
+		if (splits[node] == 0xFF0 || splits[node] == 0x0F0 || splits[node] == 0xF00) {
+			assert(tree.get_support(node) >= 45 && tree.get_support(node) <= 50);
+			++groups;
+		}
+	}
+	assert(groups >= 3);
+
+	//the replicates do not depend on the number of threads or the search
+	string newick = tree.to_newick();
+	assert(newick == bootstrap.construct_tree(sequences, NeighborJoin::EXACT_SEARCH, 1).to_newick());
+	assert(newick == bootstrap.construct_tree(sequences, NeighborJoin::RAPID_SEARCH, 3).to_newick());
+
+	//without replicates the tree is the tree of the k-mer distances
+	NeighborJoinBootstrap none(4, 0, 7);
+	KmerDistanceSequencer ks(4);
+	vector<MatrixDataType> condensed = ks.distances(sequences, 1);
+	vector<double> kmerDistances(condensed.begin(), condensed.end());
+	vector<string> names;
+	for (int i = 0; i < sequences.size(); ++i) {
+		names.push_back(sequences[i].getName());
+	}
+	assert(none.construct_tree(sequences, NeighborJoin::EXACT_SEARCH, 2).to_newick() == NeighborJoin().construct_tree(kmerDistances, names));
+
+	//the k-mer distances of the KmerDistanceSequencer give the same tree and support
+	kmerDistances.assign(condensed.begin(), condensed.end());
+	assert(bootstrap.construct_tree(sequences, kmerDistances, NeighborJoin::EXACT_SEARCH, 2).to_newick() == newick);
+}
\ No newline at end of file
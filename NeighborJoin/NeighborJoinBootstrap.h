@@ -0,0 +1,57 @@
+#pragma once
+#include <string>
+#include <vector>
+#include <stdint.h>
+#include "../NeighborJoin/GeneticTree.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___NEIGHBORJOINBOOTSTRAP___
+#define ___NEIGHBORJOINBOOTSTRAP___
+
+/* Estimates the support of the branches of the neighbor joining tree of the k-mer distances of a list of sequences by
+ * bootstrapping. The k-mer profile of every sequence is computed once and encoded as counts of columns, one column
+ * for every distinct k-mer of the sequences. Every replicate draws as many columns as there are with replacement,
+ * computes the k-mer distances of the drawn columns and joins its own tree, and the replicates are run concurrently
+ * by a ThreadPool. The support of a branch of the tree of all of the columns is the number of replicate trees that
+ * split the sequences the same way.
+ */
+class NeighborJoinBootstrap
+{
+public:
+	NeighborJoinBootstrap(int k, int replicates, unsigned int seed);
+	~NeighborJoinBootstrap(void);
+
+	GeneticTree construct_tree(const std::vector<Sequencing::Sequence>& sequences, int search, int thread_count);
+	GeneticTree construct_tree(const std::vector<Sequencing::Sequence>& sequences, std::vector<double>& distances, int search, int thread_count);
+
+	//tests
+	void run_tests();
+
+private:
+	//the k-mers of a sequence as columns and the number of times they occur
+	struct Profile {
+		std::vector<int> columns;
+		std::vector<int> counts;
+	};
+
+	//members
+	int k;
+	int replicates;
+	unsigned int seed;
+
+	friend struct NeighborJoinBootstrapTask;
+
+	//methods
+	GeneticTree support_tree(const std::vector<Sequencing::Sequence>& sequences, const std::vector<Profile>& profiles, int column_count, std::vector<double>& distances, int search, int thread_count);
+	int encode_profiles(const std::vector<Sequencing::Sequence>& sequences, std::vector<Profile>& profiles);
+	void resample(int replicate, int column_count, std::vector<int>& weights);
+	void compute_distances(const std::vector<Profile>& profiles, const std::vector<int>& weights, std::vector<double>& distances);
+	void hash_splits(const GeneticTree& tree, const std::vector<uint64_t>& keys, std::vector<uint64_t>& splits);
+
+	//tests
+	void test_distances();
+	void test_support();
+};
+
+
+#endif
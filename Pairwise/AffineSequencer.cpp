@@ -1,15 +1,153 @@
 #include <algorithm>
+#include <cassert>
+#include <cstdlib>
 #include <limits>
 #include "AffineSequencer.h"
+#include "PairwiseTests.h"
+#include "WavefrontPass.h"
+#include "../Utilities/ArenaBuffer.h"
 
 namespace Pairwise
 {
 	using Sequencing::Sequence;
 
+	const MatrixDataType AffineSequencer::LINEAR_SPACE_UNREACHABLE = std::numeric_limits<MatrixDataType>::min() / 4;
+
+	/**
+	 * The cell of the sequence matrices of sequence(), which is computed row by row or by
+	 * the tiles of a WavefrontPass. The substitution scores are read from the profile of
+	 * the second sequence. Along with the values of the three matrices it stores
+	 * the traceback pointers of the cell, and in local alignments the best score of its row.
+	 * The tiles of one anti-diagonal never share a row, and the tiles of a row are computed
+	 * from left to right, so the best score of a row is found the same way in both cases.
+	 */
+	struct AffineSequencer::MatrixCell
+	{
+		static const int STATE_COUNT = MATRIX_COUNT;
+
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		const ScoreProfile* profile;
+		const EncodedSequence* encoded;
+		bool global;
+		unsigned char* pointers;
+		int columns;
+		MatrixDataType* row_scores;
+		int* row_cells;
+
+		inline int max_matrix(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z) const
+		{
+			int from_y = (y >= z) ? MATRIX_B : MATRIX_C;
+			return (x >= std::max(y, z)) ? MATRIX_A : from_y;
+		}
+
+		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z) const
+		{
+			MatrixDataType w = std::max(x, y);
+			return std::max(w, z);
+		}
+
+		inline void operator () (const int r, const int c, const MatrixDataType* diagonal, const MatrixDataType* up, const MatrixDataType* left, MatrixDataType* cell) const
+		{
+			int substitution = this->profile->getRow((*this->encoded)[r-1])[c-1];
+			MatrixDataType open_a = up[MATRIX_A] + this->open_gap_penalty;
+			MatrixDataType extend_b = up[MATRIX_B] + this->extend_gap_penalty;
+			MatrixDataType open_c = up[MATRIX_C] + this->open_gap_penalty;
+			MatrixDataType left_a = left[MATRIX_A] + this->open_gap_penalty;
+			MatrixDataType left_b = left[MATRIX_B] + this->open_gap_penalty;
+			MatrixDataType extend_c = left[MATRIX_C] + this->extend_gap_penalty;
+
+			// A local path starts at the cell when no path into its diagonal neighbour scores
+			// above 0.
+			int from_a = this->max_matrix(diagonal[MATRIX_A], diagonal[MATRIX_B], diagonal[MATRIX_C]);
+			MatrixDataType match = this->max(diagonal[MATRIX_A], diagonal[MATRIX_B], diagonal[MATRIX_C]);
+			if ( this->global == false && match <= 0 )
+			{
+				from_a = TRACEBACK_START;
+				match = 0;
+			}
+			int from_b = this->max_matrix(open_a, extend_b, open_c);
+			int from_c = this->max_matrix(left_a, left_b, extend_c);
+
+			cell[MATRIX_A] = match + substitution;
+			cell[MATRIX_B] = this->max(open_a, extend_b, open_c);
+			cell[MATRIX_C] = this->max(left_a, left_b, extend_c);
+			this->pointers[(size_t)r * this->columns + c] = (unsigned char)(from_a | (from_b << 2) | (from_c << 4));
+
+			if ( this->global == false )
+			{
+				for ( int x = 0; x < MATRIX_COUNT; x++ )
+				{
+					if ( cell[x] > this->row_scores[r] )
+					{
+						this->row_scores[r] = cell[x];
+						this->row_cells[r] = c * MATRIX_COUNT + x;
+					}
+				}
+			}
+		}
+	};
+
+	/**
+	 * The cell of the WavefrontPass of the forward and backward linear-space passes, with
+	 * the values of the three matrices. The backward pass runs over the reversed sequences,
+	 * so its diagonal neighbour is the cell after the current cell in both sequences.
+	 */
+	struct AffineSequencer::LinearSpaceCell
+	{
+		static const int STATE_COUNT = MATRIX_COUNT;
+
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		const SubstitutionMatrix* substitution_matrix;
+		const Sequence* sequence1;
+		const Sequence* sequence2;
+		int i0;
+		int i1;
+		int j0;
+		int j1;
+		bool reverse;
+
+		inline MatrixDataType floor(const MatrixDataType x) const
+		{
+			return std::max(x, LINEAR_SPACE_UNREACHABLE);
+		}
+
+		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z) const
+		{
+			MatrixDataType w = std::max(x, y);
+			return std::max(w, z);
+		}
+
+		inline void operator () (const int r, const int c, const MatrixDataType* diagonal, const MatrixDataType* up, const MatrixDataType* left, MatrixDataType* cell) const
+		{
+			if ( this->reverse )
+			{
+				MatrixDataType match = diagonal[MATRIX_A] + this->substitution_matrix->score((*this->sequence1)[this->i1 - r], (*this->sequence2)[this->j1 - c]);
+				MatrixDataType down = (this->j1 - c > 0) ? up[MATRIX_B] : LINEAR_SPACE_UNREACHABLE;
+				MatrixDataType right = (this->i1 - r > 0) ? left[MATRIX_C] : LINEAR_SPACE_UNREACHABLE;
+
+				cell[MATRIX_A] = this->floor(this->max(match, down + this->open_gap_penalty, right + this->open_gap_penalty));
+				cell[MATRIX_B] = this->floor(this->max(match, down + this->extend_gap_penalty, right + this->open_gap_penalty));
+				cell[MATRIX_C] = this->floor(this->max(match, down + this->open_gap_penalty, right + this->extend_gap_penalty));
+			}
+			else
+			{
+				int substitution = this->substitution_matrix->score((*this->sequence1)[this->i0 + r - 1], (*this->sequence2)[this->j0 + c - 1]);
+				cell[MATRIX_A] = this->floor(this->max(diagonal[MATRIX_A], diagonal[MATRIX_B], diagonal[MATRIX_C]) + substitution);
+				cell[MATRIX_B] = this->floor(this->max(up[MATRIX_A] + this->open_gap_penalty, up[MATRIX_B] + this->extend_gap_penalty, up[MATRIX_C] + this->open_gap_penalty));
+				cell[MATRIX_C] = this->floor(this->max(left[MATRIX_A] + this->open_gap_penalty, left[MATRIX_B] + this->open_gap_penalty, left[MATRIX_C] + this->extend_gap_penalty));
+			}
+		}
+	};
+
 	AffineSequencer::AffineSequencer(int open_gap_penalty, int extend_gap_penalty)
 	{
 		this->open_gap_penalty = open_gap_penalty;
 		this->extend_gap_penalty = extend_gap_penalty;
+		this->wavefront = false;
+		this->wavefront_tile_size = 0;
+		this->wavefront_thread_count = 1;
 	}
 
 	AffineSequencer::~AffineSequencer() {}
@@ -25,123 +163,658 @@ namespace Pairwise
 		return std::max(w, z);
 	}
 
-	std::vector<std::vector<std::vector<MatrixDataType> > > AffineSequencer::sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	MatrixDataType AffineSequencer::sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, unsigned char* pointers, int& i_end, int& j_end, int& end_matrix)
 	{
 		int sequence1Length = sequence1.length();
 		int sequence2Length = sequence2.length();
+		int columns = sequence2Length + 1;
 
 		MatrixDataType negative_infinity = -std::numeric_limits<MatrixDataType>::infinity();
 
-		std::vector<std::vector<std::vector<MatrixDataType> > > sequence_matrix = std::vector<std::vector<std::vector<MatrixDataType> > >(MATRIX_COUNT, std::vector<std::vector<MatrixDataType> >(sequence1Length + 1, std::vector<MatrixDataType>(sequence2Length + 1, 0)));
-		
-		sequence_matrix[MATRIX_B][0][0] = negative_infinity;
-		sequence_matrix[MATRIX_C][0][0] = negative_infinity;
+		// The values of the three matrices for a cell are stored next to each other. A local
+		// path may start at any cell, so matrix A is 0 along the boundary and the gap
+		// matrices are unreachable.
+		std::vector<MatrixDataType> first_row = std::vector<MatrixDataType>(columns * MATRIX_COUNT, negative_infinity);
+		std::vector<MatrixDataType> first_column = std::vector<MatrixDataType>((sequence1Length + 1) * MATRIX_COUNT, negative_infinity);
 
-		for ( int i = 1; i < sequence1Length + 1; i++ )
+		for ( int j = 0; j < columns; j++ )
 		{
-			sequence_matrix[MATRIX_A][i][0] = negative_infinity;
-			sequence_matrix[MATRIX_B][i][0] = this->open_gap_penalty + (i - 1) * this->extend_gap_penalty;
-			sequence_matrix[MATRIX_C][i][0] = negative_infinity;
+			MatrixDataType* cell = &first_row[j * MATRIX_COUNT];
+			if ( global == false )
+			{
+				cell[MATRIX_A] = 0;
+				cell[MATRIX_B] = LINEAR_SPACE_UNREACHABLE;
+				cell[MATRIX_C] = LINEAR_SPACE_UNREACHABLE;
+			}
+			else if ( j > 0 )
+				cell[MATRIX_C] = this->open_gap_penalty + (j - 1) * this->extend_gap_penalty;
 		}
 
-		for ( int j = 1; j < sequence2Length + 1; j++ )
+		for ( int i = 0; i < sequence1Length + 1; i++ )
 		{
-			sequence_matrix[MATRIX_A][0][j] = negative_infinity;
-			sequence_matrix[MATRIX_B][0][j] = negative_infinity;
-			sequence_matrix[MATRIX_C][0][j] = this->open_gap_penalty + (j - 1) * this->extend_gap_penalty;
+			MatrixDataType* cell = &first_column[i * MATRIX_COUNT];
+			if ( global == false )
+			{
+				cell[MATRIX_A] = 0;
+				cell[MATRIX_B] = LINEAR_SPACE_UNREACHABLE;
+				cell[MATRIX_C] = LINEAR_SPACE_UNREACHABLE;
+			}
+			else if ( i > 0 )
+				cell[MATRIX_B] = this->open_gap_penalty + (i - 1) * this->extend_gap_penalty;
 		}
 
-		for ( int i = 1; i < sequence1Length + 1; i++ )
+		Utilities::ArenaBuffer<MatrixDataType> row_scores(sequence1Length + 1, 0);
+		Utilities::ArenaBuffer<int> row_cells(sequence1Length + 1, 0);
+		ScoreProfile profile = ScoreProfile(substitution_matrix, sequence2, false);
+		EncodedSequence encoded = EncodedSequence(substitution_matrix, sequence1, true);
+		MatrixCell cell = { this->open_gap_penalty, this->extend_gap_penalty, &profile, &encoded, global, pointers, columns, row_scores.get(), row_cells.get() };
+		std::vector<MatrixDataType> last_row;
+
+		if ( this->wavefront == true )
 		{
-			for ( int j = 1; j < sequence2Length + 1; j++ )
+			Utilities::Wavefront wavefront = Utilities::Wavefront(this->wavefront_tile_size, this->wavefront_thread_count);
+			WavefrontPass<MatrixCell> pass = WavefrontPass<MatrixCell>(cell, sequence1Length, sequence2Length, first_row, first_column);
+			pass.run(wavefront, last_row);
+		}
+		else
+		{
+			Utilities::ArenaBuffer<MatrixDataType> rows(columns * MATRIX_COUNT * 2, 0);
+			MatrixDataType* previous_row = rows.get();
+			MatrixDataType* current_row = previous_row + columns * MATRIX_COUNT;
+			std::copy(first_row.begin(), first_row.end(), previous_row);
+
+			for ( int i = 1; i < sequence1Length + 1; i++ )
 			{
-				sequence_matrix[MATRIX_A][i][j] = this->max(sequence_matrix[MATRIX_A][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])),
-															sequence_matrix[MATRIX_B][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])),
-															sequence_matrix[MATRIX_C][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])));
-				sequence_matrix[MATRIX_B][i][j] = this->max(sequence_matrix[MATRIX_A][i-1][j] + this->open_gap_penalty,
-															sequence_matrix[MATRIX_B][i-1][j] + this->extend_gap_penalty,
-															sequence_matrix[MATRIX_C][i-1][j] + this->open_gap_penalty);
-				sequence_matrix[MATRIX_C][i][j] = this->max(sequence_matrix[MATRIX_A][i][j-1] + this->open_gap_penalty,
-															sequence_matrix[MATRIX_B][i][j-1] + this->open_gap_penalty,
-															sequence_matrix[MATRIX_C][i][j-1] + this->extend_gap_penalty);
+				for ( int x = 0; x < MATRIX_COUNT; x++ )
+					current_row[x] = first_column[i * MATRIX_COUNT + x];
+
+				for ( int j = 1; j < columns; j++ )
+				{
+					MatrixDataType* current = current_row + j * MATRIX_COUNT;
+					const MatrixDataType* up = previous_row + j * MATRIX_COUNT;
+					cell(i, j, up - MATRIX_COUNT, up, current - MATRIX_COUNT, current);
+				}
+
+				std::swap(previous_row, current_row);
 			}
+
+			last_row = std::vector<MatrixDataType>(previous_row, previous_row + columns * MATRIX_COUNT);
+		}
+
+		if ( global == true )
+		{
+			const MatrixDataType* end = &last_row[sequence2Length * MATRIX_COUNT];
+			i_end = sequence1Length;
+			j_end = sequence2Length;
+			end_matrix = cell.max_matrix(end[MATRIX_A], end[MATRIX_B], end[MATRIX_C]);
+			return end[end_matrix];
 		}
 
-		return sequence_matrix;
+		// The first cell with the highest score ends the local alignment, or the empty
+		// alignment at the origin if no cell scores above 0.
+		MatrixDataType highest_score = 0;
+		i_end = 0;
+		j_end = 0;
+		end_matrix = MATRIX_A;
+		for ( int i = 1; i < sequence1Length + 1; i++ )
+		{
+			if ( row_scores[i] > highest_score )
+			{
+				highest_score = row_scores[i];
+				i_end = i;
+				j_end = row_cells[i] / MATRIX_COUNT;
+				end_matrix = row_cells[i] % MATRIX_COUNT;
+			}
+		}
+		return highest_score;
 	}
 
-	PairwiseAlignment AffineSequencer::sequence_matrix_traceback(const bool global, std::vector<std::vector<std::vector<MatrixDataType> > >& sequence_matrix, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	PairwiseAlignment AffineSequencer::sequence_matrix_traceback(const bool global, const unsigned char* pointers, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i, int j, int matrix, const MatrixDataType score)
 	{
 		std::string aligned_sequence1;
 		std::string aligned_sequence2;
-
-		int i = sequence1.length();
-		int j = sequence2.length();
-		MatrixDataType highest_score = this->max(sequence_matrix[MATRIX_A][i][j], sequence_matrix[MATRIX_B][i][j], sequence_matrix[MATRIX_C][i][j]);
+		int columns = sequence2.length() + 1;
 
 		while ( i > 0 && j > 0 )
 		{
-			MatrixDataType score = this->max(sequence_matrix[MATRIX_A][i][j],
-									   sequence_matrix[MATRIX_B][i][j],
-									   sequence_matrix[MATRIX_C][i][j]);
+			int previous = (pointers[(size_t)i * columns + j] >> (2 * matrix)) & 3;
 
-			if ( score == sequence_matrix[MATRIX_A][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])) ||
-				 score == sequence_matrix[MATRIX_B][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])) ||
-				 score == sequence_matrix[MATRIX_C][i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])) )
+			if ( matrix == MATRIX_A )
 			{
 				aligned_sequence1 += sequence1[i-1];
 				aligned_sequence2 += sequence2[j-1];
 				i--;
 				j--;
 			}
-			else if ( score == sequence_matrix[MATRIX_A][i-1][j] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_B][i-1][j] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_C][i-1][j] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_A][i-1][j] + this->extend_gap_penalty ||
-					  score == sequence_matrix[MATRIX_B][i-1][j] + this->extend_gap_penalty ||
-					  score == sequence_matrix[MATRIX_C][i-1][j] + this->extend_gap_penalty )
+			else if ( matrix == MATRIX_B )
 			{
 				aligned_sequence1 += sequence1[i-1];
 				aligned_sequence2 += substitution_matrix.getGapCharacter();
 				i--;
 			}
-			else if ( score == sequence_matrix[MATRIX_A][i][j-1] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_B][i][j-1] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_C][i][j-1] + this->open_gap_penalty ||
-					  score == sequence_matrix[MATRIX_A][i][j-1] + this->extend_gap_penalty ||
-					  score == sequence_matrix[MATRIX_B][i][j-1] + this->extend_gap_penalty ||
-					  score == sequence_matrix[MATRIX_C][i][j-1] + this->extend_gap_penalty )
+			else
 			{
 				aligned_sequence1 += substitution_matrix.getGapCharacter();
 				aligned_sequence2 += sequence2[j-1];
 				j--;
 			}
+
+			if ( previous == TRACEBACK_START )
+				break;
+			matrix = previous;
 		}
 
-		while ( i > 0 )
+		// A global path that reaches the first row or column starts with the remaining
+		// characters aligned against gaps.
+		while ( global == true && i > 0 )
 		{
 			aligned_sequence1 += sequence1[i-1];
 			aligned_sequence2 += substitution_matrix.getGapCharacter();
 			i--;
 		}
 
-		while ( j > 0 )
+		while ( global == true && j > 0 )
 		{
 			aligned_sequence1 += substitution_matrix.getGapCharacter();
-			aligned_sequence2 += sequence1[j-1];
+			aligned_sequence2 += sequence2[j-1];
 			j--;
 		}
 
-		std::string aligned_sequence1Reverse(aligned_sequence1.begin(), aligned_sequence1.end());
-		std::reverse(aligned_sequence1Reverse.begin(), aligned_sequence1Reverse.end());
+		// The characters were appended from the end of the alignment backwards.
+		std::string aligned_sequence1Reverse(aligned_sequence1.rbegin(), aligned_sequence1.rend());
+		std::string aligned_sequence2Reverse(aligned_sequence2.rbegin(), aligned_sequence2.rend());
 
-		std::string aligned_sequence2Reverse(aligned_sequence2.begin(), aligned_sequence2.end());
-		std::reverse(aligned_sequence2Reverse.begin(), aligned_sequence2Reverse.end());
-
-		PairwiseAlignment alignment = PairwiseAlignment(aligned_sequence1Reverse, aligned_sequence2Reverse, highest_score);
+		PairwiseAlignment alignment = PairwiseAlignment(aligned_sequence1Reverse, aligned_sequence2Reverse, score);
+		alignment.setStart(i, j);
 		return alignment;
 	}
 
+	MatrixDataType AffineSequencer::score_rows(const bool global, const ScoreProfile& inner, const EncodedSequence& outer)
+	{
+		int outerLength = outer.length();
+		int innerLength = inner.length();
+
+		MatrixDataType negative_infinity = -std::numeric_limits<MatrixDataType>::infinity();
+		MatrixDataType boundary_gap = global ? negative_infinity : LINEAR_SPACE_UNREACHABLE;
+		MatrixDataType highest_score = 0;
+
+		// Matrix B holds gaps in the second sequence and matrix C holds gaps in the first sequence.
+		// Both follow the same recurrence, so in the rolling rows they are only distinguished by
+		// the direction they extend in: "up" gaps come from the previous outer row and "left" gaps
+		// come from the previous cell of the current row.
+		Utilities::ArenaBuffer<MatrixDataType> rows((innerLength + 1) * MATRIX_COUNT * 2, 0);
+		MatrixDataType* previous_rows[MATRIX_COUNT];
+		MatrixDataType* current_rows[MATRIX_COUNT];
+		for ( int x = 0; x < MATRIX_COUNT; x++ )
+		{
+			previous_rows[x] = rows.get() + x * (innerLength + 1);
+			current_rows[x] = rows.get() + (MATRIX_COUNT + x) * (innerLength + 1);
+		}
+		const int up = inner.isFirst() ? MATRIX_C : MATRIX_B;
+		const int left = inner.isFirst() ? MATRIX_B : MATRIX_C;
+
+		previous_rows[up][0] = boundary_gap;
+		previous_rows[left][0] = boundary_gap;
+
+		for ( int k = 1; k < innerLength + 1; k++ )
+		{
+			previous_rows[MATRIX_A][k] = negative_infinity;
+			previous_rows[up][k] = boundary_gap;
+			previous_rows[left][k] = global ? this->open_gap_penalty + (k - 1) * this->extend_gap_penalty : LINEAR_SPACE_UNREACHABLE;
+		}
+
+		for ( int t = 1; t < outerLength + 1; t++ )
+		{
+			const MatrixDataType* substitution = inner.getRow(outer[t-1]);
+			current_rows[MATRIX_A][0] = negative_infinity;
+			current_rows[up][0] = global ? this->open_gap_penalty + (t - 1) * this->extend_gap_penalty : LINEAR_SPACE_UNREACHABLE;
+			current_rows[left][0] = boundary_gap;
+
+			for ( int k = 1; k < innerLength + 1; k++ )
+			{
+				MatrixDataType match = this->max(previous_rows[MATRIX_A][k-1], previous_rows[MATRIX_B][k-1], previous_rows[MATRIX_C][k-1]);
+				current_rows[MATRIX_A][k] = (global ? match : this->max(match, 0)) + substitution[k-1];
+				current_rows[up][k] = this->max(previous_rows[MATRIX_A][k] + this->open_gap_penalty,
+												previous_rows[up][k] + this->extend_gap_penalty,
+												previous_rows[left][k] + this->open_gap_penalty);
+				current_rows[left][k] = this->max(current_rows[MATRIX_A][k-1] + this->open_gap_penalty,
+												  current_rows[up][k-1] + this->open_gap_penalty,
+												  current_rows[left][k-1] + this->extend_gap_penalty);
+				if ( global == false )
+					highest_score = this->max(highest_score, current_rows[MATRIX_A][k], this->max(current_rows[MATRIX_B][k], current_rows[MATRIX_C][k]));
+			}
+
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+				std::swap(previous_rows[x], current_rows[x]);
+		}
+
+		if ( global == false )
+			return highest_score;
+		return this->max(previous_rows[MATRIX_A][innerLength], previous_rows[MATRIX_B][innerLength], previous_rows[MATRIX_C][innerLength]);
+	}
+
+	MatrixDataType AffineSequencer::score(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	{
+		// Invalid input is scored the same way sequence() scores it.
+		if ( sequence1.length() == 0 || sequence2.length() == 0 )
+			return 0;
+
+		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return 0;
+
+		if ( sequence2.length() <= sequence1.length() )
+			return this->score_rows(global, ScoreProfile(substitution_matrix, sequence2, false), EncodedSequence(substitution_matrix, sequence1, true));
+		return this->score_rows(global, ScoreProfile(substitution_matrix, sequence1, true), EncodedSequence(substitution_matrix, sequence2, false));
+	}
+
+	MatrixDataType AffineSequencer::score(const bool global, const ScoreProfile& query, const EncodedSequence& target)
+	{
+		if ( query.length() == 0 || target.length() == 0 || query.isFirst() == target.isFirst() )
+			return 0;
+
+		return this->score_rows(global, query, target);
+	}
+
+	inline MatrixDataType AffineSequencer::linear_space_floor(const MatrixDataType x)
+	{
+		return std::max(x, LINEAR_SPACE_UNREACHABLE);
+	}
+
+	MatrixDataType AffineSequencer::linear_space_origin(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, LinearSpaceOrigin& origin, int& end_matrix)
+	{
+		int sequence1Length = sequence1.length();
+		int sequence2Length = sequence2.length();
+
+		MatrixDataType negative_infinity = -std::numeric_limits<MatrixDataType>::infinity();
+
+		// Every cell in the first row and column of the sequence matrices holds a fixed value, so
+		// the optimal path may start from any of them. Along with each score the boundary cell
+		// that its path started from is carried, which keeps the search to two rows.
+		std::vector<std::vector<MatrixDataType> > previous_rows = std::vector<std::vector<MatrixDataType> >(MATRIX_COUNT, std::vector<MatrixDataType>(sequence2Length + 1, 0));
+		std::vector<std::vector<MatrixDataType> > current_rows = previous_rows;
+		std::vector<std::vector<LinearSpaceOrigin> > previous_origins = std::vector<std::vector<LinearSpaceOrigin> >(MATRIX_COUNT, std::vector<LinearSpaceOrigin>(sequence2Length + 1));
+		std::vector<std::vector<LinearSpaceOrigin> > current_origins = previous_origins;
+
+		for ( int j = 0; j < sequence2Length + 1; j++ )
+		{
+			previous_rows[MATRIX_A][j] = (j == 0) ? 0 : negative_infinity;
+			previous_rows[MATRIX_B][j] = negative_infinity;
+			previous_rows[MATRIX_C][j] = (j == 0) ? negative_infinity : this->open_gap_penalty + (j - 1) * this->extend_gap_penalty;
+
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+			{
+				previous_origins[x][j].i = 0;
+				previous_origins[x][j].j = j;
+				previous_origins[x][j].matrix = x;
+			}
+		}
+
+		for ( int i = 1; i < sequence1Length + 1; i++ )
+		{
+			current_rows[MATRIX_A][0] = negative_infinity;
+			current_rows[MATRIX_B][0] = this->open_gap_penalty + (i - 1) * this->extend_gap_penalty;
+			current_rows[MATRIX_C][0] = negative_infinity;
+
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+			{
+				current_origins[x][0].i = i;
+				current_origins[x][0].j = 0;
+				current_origins[x][0].matrix = x;
+			}
+
+			for ( int j = 1; j < sequence2Length + 1; j++ )
+			{
+				int substitution = substitution_matrix.score(sequence1[i-1], sequence2[j-1]);
+				MatrixDataType candidates[MATRIX_COUNT];
+
+				int best = MATRIX_A;
+				for ( int x = 1; x < MATRIX_COUNT; x++ )
+					if ( previous_rows[x][j-1] > previous_rows[best][j-1] )
+						best = x;
+				current_rows[MATRIX_A][j] = previous_rows[best][j-1] + substitution;
+				current_origins[MATRIX_A][j] = previous_origins[best][j-1];
+
+				candidates[MATRIX_A] = previous_rows[MATRIX_A][j] + this->open_gap_penalty;
+				candidates[MATRIX_B] = previous_rows[MATRIX_B][j] + this->extend_gap_penalty;
+				candidates[MATRIX_C] = previous_rows[MATRIX_C][j] + this->open_gap_penalty;
+				best = MATRIX_A;
+				for ( int x = 1; x < MATRIX_COUNT; x++ )
+					if ( candidates[x] > candidates[best] )
+						best = x;
+				current_rows[MATRIX_B][j] = candidates[best];
+				current_origins[MATRIX_B][j] = previous_origins[best][j];
+
+				candidates[MATRIX_A] = current_rows[MATRIX_A][j-1] + this->open_gap_penalty;
+				candidates[MATRIX_B] = current_rows[MATRIX_B][j-1] + this->open_gap_penalty;
+				candidates[MATRIX_C] = current_rows[MATRIX_C][j-1] + this->extend_gap_penalty;
+				best = MATRIX_A;
+				for ( int x = 1; x < MATRIX_COUNT; x++ )
+					if ( candidates[x] > candidates[best] )
+						best = x;
+				current_rows[MATRIX_C][j] = candidates[best];
+				current_origins[MATRIX_C][j] = current_origins[best][j-1];
+			}
+
+			previous_rows.swap(current_rows);
+			previous_origins.swap(current_origins);
+		}
+
+		end_matrix = MATRIX_A;
+		for ( int x = 1; x < MATRIX_COUNT; x++ )
+			if ( previous_rows[x][sequence2Length] > previous_rows[end_matrix][sequence2Length] )
+				end_matrix = x;
+
+		origin = previous_origins[end_matrix][sequence2Length];
+
+		// The value the path starts with is the boundary value of its origin.
+		if ( origin.i == 0 && origin.j == 0 )
+			return (origin.matrix == MATRIX_A) ? 0 : negative_infinity;
+		else if ( origin.j == 0 )
+			return (origin.matrix == MATRIX_B) ? this->open_gap_penalty + (origin.i - 1) * this->extend_gap_penalty : negative_infinity;
+		return (origin.matrix == MATRIX_C) ? this->open_gap_penalty + (origin.j - 1) * this->extend_gap_penalty : negative_infinity;
+	}
+
+	void AffineSequencer::linear_space_forward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], std::vector<std::vector<MatrixDataType> >& rows)
+	{
+		int columns = j1 - j0;
+		rows = std::vector<std::vector<MatrixDataType> >(MATRIX_COUNT, std::vector<MatrixDataType>(columns + 1, LINEAR_SPACE_UNREACHABLE));
+		std::vector<std::vector<MatrixDataType> > previous_rows = rows;
+
+		// Cells in the first row or column of the full sequence matrices are boundary cells that
+		// can only be the start of a path, so apart from the start they remain unreachable.
+		for ( int x = 0; x < MATRIX_COUNT; x++ )
+			rows[x][0] = start[x];
+
+		if ( i0 > 0 )
+		{
+			for ( int k = 1; k < columns + 1; k++ )
+				rows[MATRIX_C][k] = this->linear_space_floor(this->max(rows[MATRIX_A][k-1] + this->open_gap_penalty,
+																	   rows[MATRIX_B][k-1] + this->open_gap_penalty,
+																	   rows[MATRIX_C][k-1] + this->extend_gap_penalty));
+		}
+
+		if ( this->wavefront == true )
+		{
+			this->linear_space_wavefront(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, false, rows);
+			return;
+		}
+
+		for ( int i = i0 + 1; i < i1 + 1; i++ )
+		{
+			previous_rows.swap(rows);
+
+			rows[MATRIX_A][0] = LINEAR_SPACE_UNREACHABLE;
+			rows[MATRIX_B][0] = LINEAR_SPACE_UNREACHABLE;
+			rows[MATRIX_C][0] = LINEAR_SPACE_UNREACHABLE;
+			if ( j0 > 0 )
+				rows[MATRIX_B][0] = this->linear_space_floor(this->max(previous_rows[MATRIX_A][0] + this->open_gap_penalty,
+																	   previous_rows[MATRIX_B][0] + this->extend_gap_penalty,
+																	   previous_rows[MATRIX_C][0] + this->open_gap_penalty));
+
+			for ( int k = 1; k < columns + 1; k++ )
+			{
+				int substitution = substitution_matrix.score(sequence1[i-1], sequence2[j0+k-1]);
+				rows[MATRIX_A][k] = this->linear_space_floor(this->max(previous_rows[MATRIX_A][k-1], previous_rows[MATRIX_B][k-1], previous_rows[MATRIX_C][k-1]) + substitution);
+				rows[MATRIX_B][k] = this->linear_space_floor(this->max(previous_rows[MATRIX_A][k] + this->open_gap_penalty,
+																	   previous_rows[MATRIX_B][k] + this->extend_gap_penalty,
+																	   previous_rows[MATRIX_C][k] + this->open_gap_penalty));
+				rows[MATRIX_C][k] = this->linear_space_floor(this->max(rows[MATRIX_A][k-1] + this->open_gap_penalty,
+																	   rows[MATRIX_B][k-1] + this->open_gap_penalty,
+																	   rows[MATRIX_C][k-1] + this->extend_gap_penalty));
+			}
+		}
+	}
+
+	void AffineSequencer::linear_space_backward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const int end_matrix, std::vector<std::vector<MatrixDataType> >& rows)
+	{
+		// The backward rows hold the best score of the rest of the path given the matrix that
+		// the path is in at each cell. Moving into a cell of matrix B or C costs the extend gap
+		// penalty when the path is already in that matrix and the open gap penalty otherwise.
+		int columns = j1 - j0;
+		rows = std::vector<std::vector<MatrixDataType> >(MATRIX_COUNT, std::vector<MatrixDataType>(columns + 1, LINEAR_SPACE_UNREACHABLE));
+		std::vector<std::vector<MatrixDataType> > next_rows = rows;
+
+		rows[end_matrix][columns] = 0;
+
+		if ( i1 > 0 )
+		{
+			for ( int k = columns - 1; k >= 0; k-- )
+			{
+				rows[MATRIX_A][k] = this->linear_space_floor(rows[MATRIX_C][k+1] + this->open_gap_penalty);
+				rows[MATRIX_B][k] = this->linear_space_floor(rows[MATRIX_C][k+1] + this->open_gap_penalty);
+				rows[MATRIX_C][k] = this->linear_space_floor(rows[MATRIX_C][k+1] + this->extend_gap_penalty);
+			}
+		}
+
+		if ( this->wavefront == true )
+		{
+			this->linear_space_wavefront(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, true, rows);
+			return;
+		}
+
+		for ( int i = i1 - 1; i >= i0; i-- )
+		{
+			next_rows.swap(rows);
+
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+				rows[x][columns] = LINEAR_SPACE_UNREACHABLE;
+			if ( j1 > 0 )
+			{
+				rows[MATRIX_A][columns] = this->linear_space_floor(next_rows[MATRIX_B][columns] + this->open_gap_penalty);
+				rows[MATRIX_B][columns] = this->linear_space_floor(next_rows[MATRIX_B][columns] + this->extend_gap_penalty);
+				rows[MATRIX_C][columns] = this->linear_space_floor(next_rows[MATRIX_B][columns] + this->open_gap_penalty);
+			}
+
+			for ( int k = columns - 1; k >= 0; k-- )
+			{
+				MatrixDataType match = next_rows[MATRIX_A][k+1] + substitution_matrix.score(sequence1[i], sequence2[j0+k]);
+				MatrixDataType down = (j0 + k > 0) ? next_rows[MATRIX_B][k] : LINEAR_SPACE_UNREACHABLE;
+				MatrixDataType right = (i > 0) ? rows[MATRIX_C][k+1] : LINEAR_SPACE_UNREACHABLE;
+
+				rows[MATRIX_A][k] = this->linear_space_floor(this->max(match, down + this->open_gap_penalty, right + this->open_gap_penalty));
+				rows[MATRIX_B][k] = this->linear_space_floor(this->max(match, down + this->extend_gap_penalty, right + this->open_gap_penalty));
+				rows[MATRIX_C][k] = this->linear_space_floor(this->max(match, down + this->open_gap_penalty, right + this->extend_gap_penalty));
+			}
+		}
+	}
+
+	void AffineSequencer::linear_space_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool reverse, std::vector<std::vector<MatrixDataType> >& rows)
+	{
+		// The rows hold the first row of the pass, the backward pass starting from the last
+		// column. The values of the first column are computed the same way the passes compute
+		// the first cell of each row.
+		int row_count = i1 - i0;
+		int columns = j1 - j0;
+		std::vector<MatrixDataType> first_row = std::vector<MatrixDataType>((columns + 1) * MATRIX_COUNT, 0);
+		std::vector<MatrixDataType> first_column = std::vector<MatrixDataType>((row_count + 1) * MATRIX_COUNT, LINEAR_SPACE_UNREACHABLE);
+
+		for ( int c = 0; c < columns + 1; c++ )
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+				first_row[c * MATRIX_COUNT + x] = rows[x][reverse ? columns - c : c];
+
+		for ( int x = 0; x < MATRIX_COUNT; x++ )
+			first_column[x] = first_row[x];
+		for ( int r = 1; r < row_count + 1; r++ )
+		{
+			MatrixDataType* previous = &first_column[(r - 1) * MATRIX_COUNT];
+			MatrixDataType* current = &first_column[r * MATRIX_COUNT];
+			if ( reverse && j1 > 0 )
+			{
+				current[MATRIX_A] = this->linear_space_floor(previous[MATRIX_B] + this->open_gap_penalty);
+				current[MATRIX_B] = this->linear_space_floor(previous[MATRIX_B] + this->extend_gap_penalty);
+				current[MATRIX_C] = this->linear_space_floor(previous[MATRIX_B] + this->open_gap_penalty);
+			}
+			else if ( !reverse && j0 > 0 )
+				current[MATRIX_B] = this->linear_space_floor(this->max(previous[MATRIX_A] + this->open_gap_penalty,
+																	   previous[MATRIX_B] + this->extend_gap_penalty,
+																	   previous[MATRIX_C] + this->open_gap_penalty));
+		}
+
+		LinearSpaceCell cell = { this->open_gap_penalty, this->extend_gap_penalty, &substitution_matrix, &sequence1, &sequence2, i0, i1, j0, j1, reverse };
+		Utilities::Wavefront wavefront = Utilities::Wavefront(this->wavefront_tile_size, this->wavefront_thread_count);
+		WavefrontPass<LinearSpaceCell> pass = WavefrontPass<LinearSpaceCell>(cell, row_count, columns, first_row, first_column);
+		std::vector<MatrixDataType> last_row;
+		pass.run(wavefront, last_row);
+
+		for ( int c = 0; c < columns + 1; c++ )
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+				rows[x][reverse ? columns - c : c] = last_row[c * MATRIX_COUNT + x];
+	}
+
+	MatrixDataType AffineSequencer::linear_space_block(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], const int end_matrix, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		int rows = i1 - i0;
+		int columns = j1 - j0;
+		int width = columns + 1;
+		Utilities::ArenaBuffer<MatrixDataType> block((rows + 1) * width * MATRIX_COUNT, LINEAR_SPACE_UNREACHABLE);
+
+		for ( int x = 0; x < MATRIX_COUNT; x++ )
+			block[x] = start[x];
+
+		for ( int i = 0; i < rows + 1; i++ )
+		{
+			for ( int j = 0; j < columns + 1; j++ )
+			{
+				if ( (i == 0 && j == 0) || i0 + i == 0 || j0 + j == 0 )
+					continue;
+
+				MatrixDataType* cell = block.get() + (i * width + j) * MATRIX_COUNT;
+				const MatrixDataType* diagonal = cell - (width + 1) * MATRIX_COUNT;
+				const MatrixDataType* up = cell - width * MATRIX_COUNT;
+				const MatrixDataType* left = cell - MATRIX_COUNT;
+
+				if ( i > 0 && j > 0 )
+				{
+					int substitution = substitution_matrix.score(sequence1[i0+i-1], sequence2[j0+j-1]);
+					cell[MATRIX_A] = this->linear_space_floor(this->max(diagonal[MATRIX_A], diagonal[MATRIX_B], diagonal[MATRIX_C]) + substitution);
+				}
+				if ( i > 0 )
+					cell[MATRIX_B] = this->linear_space_floor(this->max(up[MATRIX_A] + this->open_gap_penalty,
+																		up[MATRIX_B] + this->extend_gap_penalty,
+																		up[MATRIX_C] + this->open_gap_penalty));
+				if ( j > 0 )
+					cell[MATRIX_C] = this->linear_space_floor(this->max(left[MATRIX_A] + this->open_gap_penalty,
+																		left[MATRIX_B] + this->open_gap_penalty,
+																		left[MATRIX_C] + this->extend_gap_penalty));
+			}
+		}
+
+		std::string block_sequence1;
+		std::string block_sequence2;
+		int i = rows;
+		int j = columns;
+		int current = end_matrix;
+
+		while ( i > 0 || j > 0 )
+		{
+			MatrixDataType score = block[(i * width + j) * MATRIX_COUNT + current];
+			int previous = MATRIX_A;
+
+			if ( current == MATRIX_A )
+			{
+				int substitution = substitution_matrix.score(sequence1[i0+i-1], sequence2[j0+j-1]);
+				while ( previous < MATRIX_C && block[((i-1) * width + j-1) * MATRIX_COUNT + previous] + substitution != score )
+					previous++;
+				block_sequence1 += sequence1[i0+i-1];
+				block_sequence2 += sequence2[j0+j-1];
+				i--;
+				j--;
+			}
+			else if ( current == MATRIX_B )
+			{
+				while ( previous < MATRIX_C && block[((i-1) * width + j) * MATRIX_COUNT + previous] + (previous == MATRIX_B ? this->extend_gap_penalty : this->open_gap_penalty) != score )
+					previous++;
+				block_sequence1 += sequence1[i0+i-1];
+				block_sequence2 += substitution_matrix.getGapCharacter();
+				i--;
+			}
+			else
+			{
+				while ( previous < MATRIX_C && block[(i * width + j-1) * MATRIX_COUNT + previous] + (previous == MATRIX_C ? this->extend_gap_penalty : this->open_gap_penalty) != score )
+					previous++;
+				block_sequence1 += substitution_matrix.getGapCharacter();
+				block_sequence2 += sequence2[j0+j-1];
+				j--;
+			}
+
+			current = previous;
+		}
+
+		aligned_sequence1.append(block_sequence1.rbegin(), block_sequence1.rend());
+		aligned_sequence2.append(block_sequence2.rbegin(), block_sequence2.rend());
+		return block[(rows * width + columns) * MATRIX_COUNT + end_matrix] - start[current];
+	}
+
+	MatrixDataType AffineSequencer::linear_space_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], const int end_matrix, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		if ( i1 - i0 <= 1 || j1 - j0 + 1 <= LINEAR_SPACE_BLOCK_SIZE / (i1 - i0 + 1) )
+			return this->linear_space_block(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, start, end_matrix, aligned_sequence1, aligned_sequence2);
+
+		// The optimal path crosses the middle row at the cell and matrix that maximize the
+		// score of the upper half ending there plus the score of the lower half starting there.
+		int middle = (i0 + i1) / 2;
+		int split = j0;
+		int split_matrix = MATRIX_A;
+		{
+			std::vector<std::vector<MatrixDataType> > forward;
+			std::vector<std::vector<MatrixDataType> > backward;
+			this->linear_space_forward(substitution_matrix, sequence1, sequence2, i0, middle, j0, j1, start, forward);
+			this->linear_space_backward(substitution_matrix, sequence1, sequence2, middle, i1, j0, j1, end_matrix, backward);
+
+			MatrixDataType best_score = forward[MATRIX_A][0] + backward[MATRIX_A][0];
+			for ( int k = 0; k < j1 - j0 + 1; k++ )
+			{
+				for ( int x = 0; x < MATRIX_COUNT; x++ )
+				{
+					if ( forward[x][k] + backward[x][k] > best_score )
+					{
+						best_score = forward[x][k] + backward[x][k];
+						split = j0 + k;
+						split_matrix = x;
+					}
+				}
+			}
+		}
+
+		MatrixDataType middle_start[MATRIX_COUNT] = { LINEAR_SPACE_UNREACHABLE, LINEAR_SPACE_UNREACHABLE, LINEAR_SPACE_UNREACHABLE };
+		middle_start[split_matrix] = 0;
+
+		MatrixDataType upper_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, i0, middle, j0, split, start, split_matrix, aligned_sequence1, aligned_sequence2);
+		MatrixDataType lower_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, middle, i1, split, j1, middle_start, end_matrix, aligned_sequence1, aligned_sequence2);
+		return upper_score + lower_score;
+	}
+
+	PairwiseAlignment AffineSequencer::sequenceLinearSpace(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	{
+		if ( global == false || sequence1.length() == 0 || sequence2.length() == 0 || substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return this->sequence(global, substitution_matrix, sequence1, sequence2);
+
+		std::string aligned_sequence1;
+		std::string aligned_sequence2;
+		LinearSpaceOrigin origin;
+		int end_matrix = MATRIX_A;
+
+		MatrixDataType origin_score = this->linear_space_origin(substitution_matrix, sequence1, sequence2, origin, end_matrix);
+		MatrixDataType start[MATRIX_COUNT] = { LINEAR_SPACE_UNREACHABLE, LINEAR_SPACE_UNREACHABLE, LINEAR_SPACE_UNREACHABLE };
+		start[origin.matrix] = 0;
+
+		// The characters before the origin of the path are aligned against gaps, the same way
+		// the traceback of sequence() finishes at the first row or column.
+		for ( int j = 0; j < origin.j; j++ )
+		{
+			aligned_sequence1 += substitution_matrix.getGapCharacter();
+			aligned_sequence2 += sequence2[j];
+		}
+		for ( int i = 0; i < origin.i; i++ )
+		{
+			aligned_sequence1 += sequence1[i];
+			aligned_sequence2 += substitution_matrix.getGapCharacter();
+		}
+
+		MatrixDataType path_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, origin.i, sequence1.length(), origin.j, sequence2.length(), start, end_matrix, aligned_sequence1, aligned_sequence2);
+		return PairwiseAlignment(aligned_sequence1, aligned_sequence2, origin_score + path_score);
+	}
+
 	PairwiseAlignment AffineSequencer::sequence(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
 	{
 		if ( sequence1.length() == 0 && sequence2.length() == 0 )
@@ -163,7 +836,115 @@ namespace Pairwise
 		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
 			return PairwiseAlignment(Sequence("Sequence must be evaluated against a valid matrix"), Sequence("Sequence must be evaluated against a valid matrix"), 0);
 
-		std::vector<std::vector<std::vector<MatrixDataType> > > sequence_matrix = this->sequence_matrix_create(global, substitution_matrix, sequence1, sequence2);
-		return this->sequence_matrix_traceback(global, sequence_matrix, substitution_matrix, sequence1, sequence2);
+		int i_end = 0;
+		int j_end = 0;
+		int end_matrix = MATRIX_A;
+		Utilities::ArenaBuffer<unsigned char> pointers((size_t)(sequence1.length() + 1) * (sequence2.length() + 1), 0);
+		MatrixDataType highest_score = this->sequence_matrix_create(global, substitution_matrix, sequence1, sequence2, pointers.get(), i_end, j_end, end_matrix);
+		return this->sequence_matrix_traceback(global, pointers.get(), substitution_matrix, sequence1, sequence2, i_end, j_end, end_matrix, highest_score);
+	}
+
+	void AffineSequencer::setWavefront(const int tile_size, const int thread_count)
+	{
+		this->wavefront = true;
+		this->wavefront_tile_size = tile_size;
+		this->wavefront_thread_count = thread_count;
+	}
+
+	/***************************************TESTS**************************************/
+
+#ifndef NDEBUG
+	/**
+	 * Scores an alignment with the affine scoring scheme, column by column.
+	 */
+	static MatrixDataType affine_test_score(const SubstitutionMatrix& sm, const std::string& aligned_sequence1, const std::string& aligned_sequence2, const int open_gap_penalty, const int extend_gap_penalty)
+	{
+		MatrixDataType score = 0;
+		char gap = sm.getGapCharacter();
+		int previous = 0;
+		for ( unsigned int k = 0; k < aligned_sequence1.size(); k++ )
+		{
+			int current = (aligned_sequence2[k] == gap) ? 1 : (aligned_sequence1[k] == gap) ? 2 : 0;
+			if ( current == 0 )
+				score += sm.score(aligned_sequence1[k], aligned_sequence2[k]);
+			else
+				score += (current == previous) ? extend_gap_penalty : open_gap_penalty;
+			previous = current;
+		}
+		return score;
+	}
+#endif
+
+	void AffineSequencer::run_tests()
+	{
+		test_traceback();
+		test_wavefront();
+	}
+
+	void AffineSequencer::test_traceback()
+	{
+		srand(13);
+		for ( int test = 0; test < 60; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -6, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 200, "ACGT");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 200, "ACGT");
+			int open_gap_penalty = -(rand() % 12);
+			int extend_gap_penalty = -(rand() % 4);
+			AffineSequencer as = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+
+			// The local alignment follows the pointers of the cells it passes, so it scores
+			// exactly the score of its end and aligns a substring of each sequence.
+			PairwiseAlignment local = as.sequence(false, sm, sequence1, sequence2);
+			std::string aligned_sequence1 = local.getSequence(0).c_str();
+			std::string aligned_sequence2 = local.getSequence(1).c_str();
+			assert(local.getScore() == as.score(false, sm, sequence1, sequence2));
+			assert(local.getScore() == affine_test_score(sm, aligned_sequence1, aligned_sequence2, open_gap_penalty, extend_gap_penalty));
+
+			aligned_sequence1.erase(std::remove(aligned_sequence1.begin(), aligned_sequence1.end(), sm.getGapCharacter()), aligned_sequence1.end());
+			aligned_sequence2.erase(std::remove(aligned_sequence2.begin(), aligned_sequence2.end(), sm.getGapCharacter()), aligned_sequence2.end());
+			assert(std::string(sequence1.c_str()).find(aligned_sequence1) != std::string::npos);
+			assert(std::string(sequence2.c_str()).find(aligned_sequence2) != std::string::npos);
+
+			PairwiseAlignment global = as.sequence(true, sm, sequence1, sequence2);
+			assert(global.getScore() == as.score(true, sm, sequence1, sequence2));
+			assert(global.getScore() == as.sequenceLinearSpace(true, sm, sequence1, sequence2).getScore());
+			assert(global.getSequence(0).length() == global.getSequence(1).length());
+		}
+	}
+
+	void AffineSequencer::test_wavefront()
+	{
+		srand(12);
+		for ( int test = 0; test < 30; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ARNDCQEGHILKMFPSTWYV", -4, 11);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 300, "ARNDCQEGHILKMFPSTWYV");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 300, "ARNDCQEGHILKMFPSTWYV");
+			int open_gap_penalty = -(rand() % 12);
+			int extend_gap_penalty = -(rand() % 4);
+
+			AffineSequencer serial = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+			AffineSequencer tiled = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+			tiled.setWavefront(1 + rand() % 40, 1 + rand() % 4);
+
+			PairwiseAlignment expected = serial.sequence(true, sm, sequence1, sequence2);
+			PairwiseAlignment actual = tiled.sequence(true, sm, sequence1, sequence2);
+			assert(expected.getScore() == actual.getScore());
+			assert(std::string(expected.getSequence(0).c_str()) == actual.getSequence(0).c_str());
+			assert(std::string(expected.getSequence(1).c_str()) == actual.getSequence(1).c_str());
+
+			expected = serial.sequence(false, sm, sequence1, sequence2);
+			actual = tiled.sequence(false, sm, sequence1, sequence2);
+			assert(expected.getScore() == actual.getScore());
+			assert(std::string(expected.getSequence(0).c_str()) == actual.getSequence(0).c_str());
+			assert(std::string(expected.getSequence(1).c_str()) == actual.getSequence(1).c_str());
+
+			expected = serial.sequenceLinearSpace(true, sm, sequence1, sequence2);
+			actual = tiled.sequenceLinearSpace(true, sm, sequence1, sequence2);
+			assert(expected.getScore() == actual.getScore());
+			assert(std::string(expected.getSequence(0).c_str()) == actual.getSequence(0).c_str());
+			assert(std::string(expected.getSequence(1).c_str()) == actual.getSequence(1).c_str());
+		}
 	}
 }
\ No newline at end of file
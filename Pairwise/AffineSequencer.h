@@ -27,12 +27,49 @@ namespace Pairwise
 		MatrixDataType open_gap_penalty;
 		MatrixDataType extend_gap_penalty;
 		bool global;
+		bool wavefront;
+		int wavefront_tile_size;
+		int wavefront_thread_count;
+
+		/**
+		 * The traceback pointer of a cell of matrix A whose path starts at the cell, which
+		 * only occurs in local alignments.
+		 */
+		const static int TRACEBACK_START = 3;
+
+		struct MatrixCell;
+		struct LinearSpaceCell;
 
 		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y);
 		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z);
 
-		std::vector<std::vector<std::vector<MatrixDataType> > > sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
-		PairwiseAlignment sequence_matrix_traceback(const bool global, std::vector<std::vector<std::vector<MatrixDataType> > >& sequence_matrix, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+		MatrixDataType sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, unsigned char* pointers, int& i_end, int& j_end, int& end_matrix);
+		PairwiseAlignment sequence_matrix_traceback(const bool global, const unsigned char* pointers, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i, int j, int matrix, const MatrixDataType score);
+		MatrixDataType score_rows(const bool global, const ScoreProfile& inner, const EncodedSequence& outer);
+
+		/**
+		 * The boundary cell and matrix that an optimal path through the sequence matrix starts from.
+		 */
+		struct LinearSpaceOrigin
+		{
+			int i;
+			int j;
+			int matrix;
+		};
+
+		const static int LINEAR_SPACE_BLOCK_SIZE = 4096;
+		static const MatrixDataType LINEAR_SPACE_UNREACHABLE;
+		inline MatrixDataType linear_space_floor(const MatrixDataType x);
+		MatrixDataType linear_space_origin(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, LinearSpaceOrigin& origin, int& end_matrix);
+		void linear_space_forward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], std::vector<std::vector<MatrixDataType> >& rows);
+		void linear_space_backward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const int end_matrix, std::vector<std::vector<MatrixDataType> >& rows);
+		void linear_space_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool reverse, std::vector<std::vector<MatrixDataType> >& rows);
+		MatrixDataType linear_space_block(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], const int end_matrix, std::string& aligned_sequence1, std::string& aligned_sequence2);
+		MatrixDataType linear_space_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const MatrixDataType start[], const int end_matrix, std::string& aligned_sequence1, std::string& aligned_sequence2);
+
+		//tests
+		void test_traceback();
+		void test_wavefront();
 
 	protected:
 
@@ -57,6 +94,11 @@ namespace Pairwise
 		 * This function sequences two sequences based on the affine scoring 
 		 * scheme using a substitution matrix.
 		 *
+		 * The three sequence matrices are not kept. While the rows are filled, the matrix
+		 * that the best path into each cell of every matrix comes from is stored in two bits,
+		 * one byte per cell, and the traceback follows these pointers from the end of the
+		 * alignment without recomputing any scores.
+		 *
 		 * @param gloabl If true the function with use the affine global 
 		 * alignment algoirhthm to score the sequences. If false the
 		 * function will use the affine local alignment algorithm to score the sequences
@@ -67,6 +109,78 @@ namespace Pairwise
 		 * @param sequence2 The second sequecne that will be scored against the first sequence
 		 */
 		PairwiseAlignment sequence(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function computes only the score of the alignment between two sequences
+		 * based on the affine scoring scheme. The score is identical to the score of the
+		 * alignment returned by sequence(), however no traceback is performed and only two
+		 * rows of each of the three sequence matrices are kept, each the length of the
+		 * shorter sequence.
+		 *
+		 * @param global If true the affine global alignment algorithm is used to score the
+		 * sequences, otherwise the affine local alignment algorithm is used.
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function computes the same score as score(), but reads the substitution
+		 * scores from a query profile and an encoded target instead of translating the
+		 * characters of both sequences for every cell. Building the profile and the
+		 * encoding once per sequence avoids repeating that work when a sequence is scored
+		 * against many others. The query and the target must be prepared for opposite
+		 * roles: a query profiled as the first sequence is scored against a target
+		 * encoded as the second sequence, and the other way around.
+		 *
+		 * @param global If true the affine global alignment algorithm is used to score the
+		 * sequences, otherwise the affine local alignment algorithm is used.
+		 * @param query The score profile of one of the sequences.
+		 * @param target The other sequence, encoded with the same substitution matrix.
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const ScoreProfile& query, const EncodedSequence& target);
+
+		/**
+		 * This function sequences two sequences based on the affine scoring scheme using
+		 * the divide and conquer algorithm of Myers and Miller, which extends Hirschberg's
+		 * algorithm to the three affine sequence matrices. The resulting alignment has the
+		 * same score as the alignment returned by sequence(), however memory use is
+		 * proportional to the length of the sequences instead of their product.
+		 *
+		 * Hirschberg: http://en.wikipedia.org/wiki/Hirschberg%27s_algorithm
+		 *
+		 * @param global If true the sequences are aligned globally. Local alignments are
+		 * not divided and are computed by sequence().
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 */
+		PairwiseAlignment sequenceLinearSpace(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function makes the sequencer compute the sequence matrices of sequence() and
+		 * the rows of the forward and backward passes of sequenceLinearSpace() in square
+		 * tiles, with the tiles on each anti-diagonal computed concurrently by a pool of
+		 * native threads (see Utilities::Wavefront). Every cell has the same values as when
+		 * the rows are computed one after the other, so the alignments are identical. The
+		 * search for the origin of a linear-space alignment is not divided into tiles.
+		 *
+		 * @param tile_size The number of rows and columns of a tile. If the size is 0 or
+		 * less, the default tile size of the wavefront is used.
+		 * @param thread_count The number of threads that compute the tiles. If the count is 0
+		 * or less, one thread per processor is used.
+		 */
+		void setWavefront(const int tile_size, const int thread_count);
+
+		//tests
+		void run_tests();
 	};
 }
 
@@ -0,0 +1,111 @@
+#include <algorithm>
+#include "AllPairsScorer.h"
+#include "EncodedSequence.h"
+#include "ScoreProfile.h"
+#include "LinearSequencer.h"
+#include "AffineSequencer.h"
+#include "StripedSequencer.h"
+#include "BatchSequencer.h"
+#include "BandedSequencer.h"
+#include "../Utilities/ThreadPool.h"
+
+namespace Pairwise
+{
+	/**
+	 * The task of the ThreadPool that scores one row of the triangle.
+	 */
+	struct AllPairsRowTask
+	{
+		AllPairsScorer* scorer;
+		const SubstitutionMatrix* substitution_matrix;
+		const std::vector<Sequence>* sequences;
+		std::vector<MatrixDataType>* scores;
+
+		void operator () (const int row)
+		{
+			int sequence_count = this->sequences->size();
+			std::vector<Sequence> targets = std::vector<Sequence>(this->sequences->begin() + row, this->sequences->end());
+			std::vector<MatrixDataType> row_scores = this->scorer->scoreRow(*this->substitution_matrix, (*this->sequences)[row], targets);
+			std::copy(row_scores.begin(), row_scores.end(), this->scores->begin() + AllPairsScorer::getCondensedIndex(row, row, sequence_count));
+		}
+	};
+
+	AllPairsScorer::AllPairsScorer(const bool global, int gap_penalty, const int engine)
+	{
+		this->global = global;
+		this->affine = false;
+		this->engine = engine;
+		this->open_gap_penalty = gap_penalty;
+		this->extend_gap_penalty = gap_penalty;
+	}
+
+	AllPairsScorer::AllPairsScorer(const bool global, int open_gap_penalty, int extend_gap_penalty, const int engine)
+	{
+		this->global = global;
+		this->affine = true;
+		this->engine = engine;
+		this->open_gap_penalty = open_gap_penalty;
+		this->extend_gap_penalty = extend_gap_penalty;
+	}
+
+	AllPairsScorer::~AllPairsScorer() {}
+
+	std::vector<MatrixDataType> AllPairsScorer::scoreRow(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& targets)
+	{
+		std::vector<MatrixDataType> scores = std::vector<MatrixDataType>(targets.size(), 0);
+		// Only the scalar kernel scores local affine alignments.
+		int engine = ( this->affine && !this->global ) ? AllPairsScorer::SCALAR_ENGINE : this->engine;
+		if ( engine == AllPairsScorer::BANDED_ENGINE && this->global )
+		{
+			BandedSequencer bs = this->affine ? BandedSequencer(this->open_gap_penalty, this->extend_gap_penalty) : BandedSequencer(this->open_gap_penalty);
+			for ( unsigned int t = 0; t < targets.size(); t++ )
+				scores[t] = bs.score(substitution_matrix, query, targets[t], BandedSequencer::AUTO_BANDWIDTH, true);
+			return scores;
+		}
+
+		// The band only applies to global alignments, so local alignments are batched.
+		if ( engine == AllPairsScorer::BATCH_ENGINE || engine == AllPairsScorer::BANDED_ENGINE )
+		{
+			if ( this->affine )
+				return BatchSequencer(this->open_gap_penalty, this->extend_gap_penalty).score(this->global, substitution_matrix, query, targets);
+			return BatchSequencer(this->open_gap_penalty).score(this->global, substitution_matrix, query, targets);
+		}
+
+		if ( engine == AllPairsScorer::STRIPED_ENGINE )
+		{
+			StripedProfile striped_query = StripedProfile(substitution_matrix, query, true);
+			StripedSequencer ss = this->affine ? StripedSequencer(this->open_gap_penalty, this->extend_gap_penalty) : StripedSequencer(this->open_gap_penalty);
+			for ( unsigned int t = 0; t < targets.size(); t++ )
+				scores[t] = ss.score(this->global, striped_query, EncodedSequence(substitution_matrix, targets[t], false));
+		}
+		else
+		{
+			ScoreProfile profiled_query = ScoreProfile(substitution_matrix, query, true);
+			for ( unsigned int t = 0; t < targets.size(); t++ )
+			{
+				if ( this->affine )
+					scores[t] = AffineSequencer(this->open_gap_penalty, this->extend_gap_penalty).score(this->global, profiled_query, EncodedSequence(substitution_matrix, targets[t], false));
+				else
+					scores[t] = LinearSequencer(this->open_gap_penalty).score(this->global, profiled_query, EncodedSequence(substitution_matrix, targets[t], false));
+			}
+		}
+		return scores;
+	}
+
+	std::vector<MatrixDataType> AllPairsScorer::score(const SubstitutionMatrix& substitution_matrix, const std::vector<Sequence>& sequences, const int thread_count)
+	{
+		int sequence_count = sequences.size();
+		std::vector<MatrixDataType> scores = std::vector<MatrixDataType>(AllPairsScorer::getCondensedIndex(sequence_count, sequence_count, sequence_count), 0);
+
+		// The first rows are the longest, and the pool hands out the rows in order.
+		AllPairsRowTask task = { this, &substitution_matrix, &sequences, &scores };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(sequence_count, task);
+		return scores;
+	}
+
+	int AllPairsScorer::getCondensedIndex(const int i, const int j, const int sequence_count)
+	{
+		return i * sequence_count - i * (i - 1) / 2 + (j - i);
+	}
+}
\ No newline at end of file
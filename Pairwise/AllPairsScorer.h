@@ -0,0 +1,107 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___ALLPAIRSSCORER___
+#define ___ALLPAIRSSCORER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The AllPairsScorer class scores every pair of a list of sequences. The scores are
+	 * stored in a condensed upper triangle that includes the diagonal: the scores of
+	 * sequence i against sequences i to n - 1 follow the scores of sequence i - 1. Every
+	 * row of the triangle is scored by one task of a ThreadPool, using the engine selected
+	 * when the scorer is created. All of the engines produce the same scores.
+	 */
+	class AllPairsScorer
+	{
+	private:
+		bool global;
+		bool affine;
+		int engine;
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+
+	public:
+		/**
+		 * The engines that can score the rows of the triangle: the scalar kernels of the
+		 * LinearSequencer and AffineSequencer, the StripedSequencer, the BatchSequencer and
+		 * the BandedSequencer. The banded engine scores global alignments within a verified
+		 * band of an estimated width, and scores local alignments with the batch engine.
+		 */
+		static const int SCALAR_ENGINE = 0;
+		static const int STRIPED_ENGINE = 1;
+		static const int BATCH_ENGINE = 2;
+		static const int BANDED_ENGINE = 3;
+
+		/**
+		 * Creates a new scorer using the linear scoring scheme.
+		 *
+		 * @param global If true the sequences are scored globally, otherwise locally.
+		 * @param gap_penalty The gap penalty used for scoring gaps in the alignments.
+		 * @param engine The engine that scores the rows of the triangle.
+		 */
+		AllPairsScorer(const bool global, int gap_penalty, const int engine);
+
+		/**
+		 * Creates a new scorer using the affine scoring scheme. The striped, batch and
+		 * banded engines only score affine alignments globally, so local affine alignments
+		 * are always scored with the scalar kernel of the AffineSequencer.
+		 *
+		 * @param global If true the sequences are scored globally, otherwise locally.
+		 * @param open_gap_penalty The penalty used for scoring the opening of a gap.
+		 * @param extend_gap_penalty The penalty used for scoring the extension of a gap.
+		 * @param engine The engine that scores the rows of the triangle.
+		 */
+		AllPairsScorer(const bool global, int open_gap_penalty, int extend_gap_penalty, const int engine);
+
+		/**
+		 * Default Destructor.
+		 */
+		~AllPairsScorer();
+
+		/**
+		 * This function scores a query against each of a list of targets with the engine
+		 * of the scorer. A row of the upper triangle is the score of a sequence against
+		 * itself and every sequence that follows it.
+		 *
+		 * @param substitution_matrix The substitution matrix used to score the sequences.
+		 * @param query The sequence that is scored as the first sequence of every alignment.
+		 * @param targets The sequences that are scored as the second sequence.
+		 * @return The score of the query against each target, in the order of the targets.
+		 */
+		std::vector<MatrixDataType> scoreRow(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& targets);
+
+		/**
+		 * This function scores every pair of sequences.
+		 *
+		 * @param substitution_matrix The substitution matrix used to score the sequences.
+		 * @param sequences The list of sequences.
+		 * @param thread_count The number of threads that score the rows. If the count is 0
+		 * or less, one thread per processor is used.
+		 * @return The condensed upper triangle of the scores, n * (n + 1) / 2 values.
+		 */
+		std::vector<MatrixDataType> score(const SubstitutionMatrix& substitution_matrix, const std::vector<Sequence>& sequences, const int thread_count);
+
+		/**
+		 * This function returns the position of the score of sequences i and j in the
+		 * condensed upper triangle.
+		 *
+		 * @param i The index of the first sequence.
+		 * @param j The index of the second sequence, at least i.
+		 * @param sequence_count The number of sequences.
+		 * @return The index of the score in the condensed triangle.
+		 */
+		static int getCondensedIndex(const int i, const int j, const int sequence_count);
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,660 @@
+#include <algorithm>
+#include <cassert>
+#include <cstdlib>
+#include <limits>
+#include "BandedSequencer.h"
+#include "PairwiseTests.h"
+#include "LinearSequencer.h"
+#include "AffineSequencer.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	const MatrixDataType BandedSequencer::UNREACHABLE = std::numeric_limits<MatrixDataType>::min() / 4;
+
+	BandedSequencer::BandedSequencer(int gap_penalty)
+	{
+		this->open_gap_penalty = gap_penalty;
+		this->extend_gap_penalty = gap_penalty;
+		this->affine = false;
+	}
+
+	BandedSequencer::BandedSequencer(int open_gap_penalty, int extend_gap_penalty)
+	{
+		this->open_gap_penalty = open_gap_penalty;
+		this->extend_gap_penalty = extend_gap_penalty;
+		this->affine = true;
+	}
+
+	BandedSequencer::~BandedSequencer() {}
+
+	inline MatrixDataType BandedSequencer::max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z)
+	{
+		MatrixDataType w = std::max(x, y);
+		return std::max(w, z);
+	}
+
+	inline int BandedSequencer::max_matrix(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z)
+	{
+		int from_y = (y >= z) ? MATRIX_B : MATRIX_C;
+		return (x >= std::max(y, z)) ? MATRIX_A : from_y;
+	}
+
+	inline MatrixDataType BandedSequencer::floor(const MatrixDataType x)
+	{
+		return std::max(x, UNREACHABLE);
+	}
+
+	MatrixDataType BandedSequencer::band_fill(const ScoreProfile& profile, const EncodedSequence& encoded, int lower, int upper, std::vector<unsigned char>* pointers, int& end_matrix)
+	{
+		int sequence1Length = encoded.length();
+		int sequence2Length = profile.length();
+		int width = upper - lower + 1;
+
+		// The AffineSequencer lets paths start from any cell of the first row and column, whose
+		// value is negative infinity. The linear scoring scheme only starts paths from the origin.
+		MatrixDataType negative_infinity = -std::numeric_limits<MatrixDataType>::infinity();
+		MatrixDataType boundary = this->affine ? negative_infinity : UNREACHABLE;
+
+		// The rows of the band are indexed by diagonal: cell (i, j) is at d = j - i - lower + 1.
+		// The diagonal cell is at d in the previous row, the cell above at d + 1 and the cell to
+		// the left at d - 1 in the current row. The first and last entries stay unreachable.
+		std::vector<std::vector<MatrixDataType> > previous_rows = std::vector<std::vector<MatrixDataType> >(MATRIX_COUNT, std::vector<MatrixDataType>(width + 2, UNREACHABLE));
+		std::vector<std::vector<MatrixDataType> > current_rows = previous_rows;
+
+		if ( pointers != NULL )
+			pointers->assign((sequence1Length + 1) * width, 0);
+
+		for ( int j = 0; j < upper + 1; j++ )
+		{
+			int d = j - lower + 1;
+			previous_rows[MATRIX_A][d] = (j == 0) ? 0 : boundary;
+			previous_rows[MATRIX_B][d] = boundary;
+			previous_rows[MATRIX_C][d] = (j == 0) ? boundary : this->open_gap_penalty + (j - 1) * this->extend_gap_penalty;
+		}
+
+		for ( int i = 1; i < sequence1Length + 1; i++ )
+		{
+			int first = std::max(0, i + lower);
+			int last = std::min(sequence2Length, i + upper);
+			const MatrixDataType* substitution = profile.getRow(encoded[i-1]);
+
+			MatrixDataType* previous[MATRIX_COUNT];
+			MatrixDataType* current[MATRIX_COUNT];
+			for ( int x = 0; x < MATRIX_COUNT; x++ )
+			{
+				previous[x] = &previous_rows[x][0];
+				current[x] = &current_rows[x][0];
+
+				// Where the band crosses the first or last column its cells are outside the matrix.
+				std::fill(current[x] + 1, current[x] + (first - i - lower + 1), UNREACHABLE);
+				std::fill(current[x] + (last - i - lower + 2), current[x] + width + 1, UNREACHABLE);
+			}
+
+			int j = first;
+			if ( j == 0 )
+			{
+				int d = -i - lower + 1;
+				current[MATRIX_A][d] = boundary;
+				current[MATRIX_B][d] = this->open_gap_penalty + (i - 1) * this->extend_gap_penalty;
+				current[MATRIX_C][d] = boundary;
+				j++;
+			}
+
+			unsigned char* row_pointers = (pointers != NULL) ? &(*pointers)[i * width] : NULL;
+			for ( ; j < last + 1; j++ )
+			{
+				int d = j - i - lower + 1;
+
+				int from_a = this->max_matrix(previous[MATRIX_A][d], previous[MATRIX_B][d], previous[MATRIX_C][d]);
+				current[MATRIX_A][d] = this->floor(previous[from_a][d] + substitution[j-1]);
+
+				MatrixDataType a = previous[MATRIX_A][d+1] + this->open_gap_penalty;
+				MatrixDataType b = previous[MATRIX_B][d+1] + this->extend_gap_penalty;
+				MatrixDataType c = previous[MATRIX_C][d+1] + this->open_gap_penalty;
+				int from_b = this->max_matrix(a, b, c);
+				current[MATRIX_B][d] = this->floor(this->max(a, b, c));
+
+				a = current[MATRIX_A][d-1] + this->open_gap_penalty;
+				b = current[MATRIX_B][d-1] + this->open_gap_penalty;
+				c = current[MATRIX_C][d-1] + this->extend_gap_penalty;
+				int from_c = this->max_matrix(a, b, c);
+				current[MATRIX_C][d] = this->floor(this->max(a, b, c));
+
+				if ( row_pointers != NULL )
+					row_pointers[d-1] = (unsigned char)(from_a | (from_b << 2) | (from_c << 4));
+			}
+
+			previous_rows.swap(current_rows);
+		}
+
+		int end = sequence2Length - sequence1Length - lower + 1;
+		end_matrix = this->max_matrix(previous_rows[MATRIX_A][end], previous_rows[MATRIX_B][end], previous_rows[MATRIX_C][end]);
+		return previous_rows[end_matrix][end];
+	}
+
+	bool BandedSequencer::band_touched(const int sequence1Length, const int sequence2Length, int lower, int upper, const std::vector<unsigned char>& pointers, int matrix)
+	{
+		// Only the cells on the first and last diagonal of a band that cuts off part of the
+		// matrix are edge cells. The path is followed back to the first row or column, whose
+		// remaining cells are further from the edges than the cell where the path reaches them.
+		int width = upper - lower + 1;
+		int i = sequence1Length;
+		int j = sequence2Length;
+
+		while ( true )
+		{
+			int d = j - i - lower;
+			if ( (d == 0 && lower > -sequence1Length) || (d == width - 1 && upper < sequence2Length) )
+				return true;
+			if ( i == 0 || j == 0 )
+				return false;
+
+			int source = (pointers[i * width + d] >> (2 * matrix)) & 3;
+			if ( matrix != MATRIX_C )
+				i--;
+			if ( matrix != MATRIX_B )
+				j--;
+			matrix = source;
+		}
+	}
+
+	MatrixDataType BandedSequencer::band_score(const ScoreProfile& profile, const EncodedSequence& encoded, int bandwidth, const bool verify, std::vector<unsigned char>* pointers, int& lower, int& upper, int& end_matrix)
+	{
+		int sequence1Length = encoded.length();
+		int sequence2Length = profile.length();
+
+		if ( bandwidth <= AUTO_BANDWIDTH )
+			bandwidth = BandedSequencer::getAutoBandwidth(sequence1Length, sequence2Length);
+
+		// A band that covers the whole matrix has no edges to touch, which ends the loop.
+		while ( true )
+		{
+			lower = std::max(-sequence1Length, std::min(0, sequence2Length - sequence1Length) - bandwidth);
+			upper = std::min(sequence2Length, std::max(0, sequence2Length - sequence1Length) + bandwidth);
+
+			MatrixDataType score = this->band_fill(profile, encoded, lower, upper, pointers, end_matrix);
+			if ( verify == false || this->band_touched(sequence1Length, sequence2Length, lower, upper, *pointers, end_matrix) == false )
+				return score;
+			bandwidth *= 2;
+		}
+	}
+
+	MatrixDataType BandedSequencer::x_drop_fill(const ScoreProfile& profile, const EncodedSequence& encoded, const MatrixDataType x_drop, std::vector<unsigned char>& pointers, std::vector<int>& row_starts, std::vector<int>& row_offsets, int& best_i, int& best_j, int& best_matrix, bool& dropped)
+	{
+		int sequence1Length = encoded.length();
+		int sequence2Length = profile.length();
+
+		std::vector<std::vector<MatrixDataType> > previous_rows = std::vector<std::vector<MatrixDataType> >(MATRIX_COUNT, std::vector<MatrixDataType>(sequence2Length + 1, UNREACHABLE));
+		std::vector<std::vector<MatrixDataType> > current_rows = previous_rows;
+
+		MatrixDataType best_score = 0;
+		best_i = 0;
+		best_j = 0;
+		best_matrix = MATRIX_A;
+		dropped = false;
+
+		// The first row is the gap that starts the alignment. The columns that were computed
+		// in the previous row and the columns of its cells that were not dropped are kept.
+		previous_rows[MATRIX_A][0] = 0;
+		int previous_last = 0;
+		for ( int j = 1; j < sequence2Length + 1; j++ )
+		{
+			MatrixDataType gap = this->open_gap_penalty + (j - 1) * this->extend_gap_penalty;
+			if ( gap < best_score - x_drop )
+			{
+				dropped = true;
+				break;
+			}
+			previous_rows[MATRIX_C][j] = gap;
+			previous_last = j;
+		}
+
+		pointers.assign(previous_last + 1, 0);
+		row_starts.assign(sequence1Length + 1, 0);
+		row_offsets.assign(sequence1Length + 1, 0);
+
+		int previous_first = 0;
+		int live_first = 0;
+
+		for ( int i = 1; i < sequence1Length + 1; i++ )
+		{
+			// Cells left of the first live cell of the previous row can not be reached.
+			const MatrixDataType* substitution = profile.getRow(encoded[i-1]);
+			int first = live_first;
+			int last = first - 1;
+			int current_live_first = -1;
+
+			row_starts[i] = first;
+			row_offsets[i] = pointers.size();
+
+			for ( int j = first; j < sequence2Length + 1; j++ )
+			{
+				unsigned char pointer = 0;
+				if ( j == 0 )
+				{
+					current_rows[MATRIX_A][j] = UNREACHABLE;
+					current_rows[MATRIX_B][j] = this->open_gap_penalty + (i - 1) * this->extend_gap_penalty;
+					current_rows[MATRIX_C][j] = UNREACHABLE;
+				}
+				else
+				{
+					MatrixDataType a = UNREACHABLE;
+					MatrixDataType b = UNREACHABLE;
+					MatrixDataType c = UNREACHABLE;
+					int from_a = MATRIX_A;
+					int from_b = MATRIX_A;
+					int from_c = MATRIX_A;
+
+					if ( j - 1 >= previous_first && j - 1 <= previous_last )
+					{
+						from_a = this->max_matrix(previous_rows[MATRIX_A][j-1], previous_rows[MATRIX_B][j-1], previous_rows[MATRIX_C][j-1]);
+						a = previous_rows[from_a][j-1] + substitution[j-1];
+					}
+					if ( j >= previous_first && j <= previous_last )
+					{
+						MatrixDataType up_a = previous_rows[MATRIX_A][j] + this->open_gap_penalty;
+						MatrixDataType up_b = previous_rows[MATRIX_B][j] + this->extend_gap_penalty;
+						MatrixDataType up_c = previous_rows[MATRIX_C][j] + this->open_gap_penalty;
+						from_b = this->max_matrix(up_a, up_b, up_c);
+						b = this->max(up_a, up_b, up_c);
+					}
+					if ( j - 1 >= first )
+					{
+						MatrixDataType left_a = current_rows[MATRIX_A][j-1] + this->open_gap_penalty;
+						MatrixDataType left_b = current_rows[MATRIX_B][j-1] + this->open_gap_penalty;
+						MatrixDataType left_c = current_rows[MATRIX_C][j-1] + this->extend_gap_penalty;
+						from_c = this->max_matrix(left_a, left_b, left_c);
+						c = this->max(left_a, left_b, left_c);
+					}
+
+					current_rows[MATRIX_A][j] = this->floor(a);
+					current_rows[MATRIX_B][j] = this->floor(b);
+					current_rows[MATRIX_C][j] = this->floor(c);
+					pointer = (unsigned char)(from_a | (from_b << 2) | (from_c << 4));
+				}
+
+				int matrix = this->max_matrix(current_rows[MATRIX_A][j], current_rows[MATRIX_B][j], current_rows[MATRIX_C][j]);
+				MatrixDataType score = current_rows[matrix][j];
+				bool live = score >= best_score - x_drop;
+
+				if ( live )
+				{
+					if ( current_live_first < 0 )
+						current_live_first = j;
+					if ( score > best_score )
+					{
+						best_score = score;
+						best_i = i;
+						best_j = j;
+						best_matrix = matrix;
+					}
+				}
+				else
+				{
+					dropped = true;
+					for ( int x = 0; x < MATRIX_COUNT; x++ )
+						current_rows[x][j] = UNREACHABLE;
+				}
+
+				pointers.push_back(pointer);
+				last = j;
+
+				// Past the previous row only a gap from the left can reach the next cell.
+				if ( live == false && j > previous_last )
+					break;
+			}
+
+			if ( current_live_first < 0 )
+				break;
+
+			previous_rows.swap(current_rows);
+			previous_first = first;
+			previous_last = last;
+			live_first = current_live_first;
+		}
+
+		return best_score;
+	}
+
+	PairwiseAlignment BandedSequencer::x_drop_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const MatrixDataType x_drop, bool& dropped)
+	{
+		ScoreProfile profile = ScoreProfile(substitution_matrix, sequence2, false);
+		EncodedSequence encoded = EncodedSequence(substitution_matrix, sequence1, true);
+
+		std::vector<unsigned char> pointers;
+		std::vector<int> row_starts;
+		std::vector<int> row_offsets;
+		int best_i = 0;
+		int best_j = 0;
+		int best_matrix = MATRIX_A;
+
+		MatrixDataType score = this->x_drop_fill(profile, encoded, x_drop, pointers, row_starts, row_offsets, best_i, best_j, best_matrix, dropped);
+		return this->traceback(substitution_matrix, sequence1, sequence2, best_i, best_j, best_matrix, pointers, row_starts, row_offsets, score);
+	}
+
+	PairwiseAlignment BandedSequencer::traceback(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i, int j, int matrix, const std::vector<unsigned char>& pointers, const std::vector<int>& row_starts, const std::vector<int>& row_offsets, const MatrixDataType score)
+	{
+		std::string aligned_sequence1;
+		std::string aligned_sequence2;
+
+		// Each pointer holds the matrix that the best score of matrix A, B and C came from in
+		// two bits each. The cells of row i start at column row_starts[i].
+		while ( i > 0 && j > 0 )
+		{
+			unsigned char pointer = pointers[row_offsets[i] + j - row_starts[i]];
+			int source = (pointer >> (2 * matrix)) & 3;
+
+			if ( matrix == MATRIX_A )
+			{
+				aligned_sequence1 += sequence1[i-1];
+				aligned_sequence2 += sequence2[j-1];
+				i--;
+				j--;
+			}
+			else if ( matrix == MATRIX_B )
+			{
+				aligned_sequence1 += sequence1[i-1];
+				aligned_sequence2 += substitution_matrix.getGapCharacter();
+				i--;
+			}
+			else
+			{
+				aligned_sequence1 += substitution_matrix.getGapCharacter();
+				aligned_sequence2 += sequence2[j-1];
+				j--;
+			}
+			matrix = source;
+		}
+
+		while ( i > 0 )
+		{
+			aligned_sequence1 += sequence1[i-1];
+			aligned_sequence2 += substitution_matrix.getGapCharacter();
+			i--;
+		}
+
+		while ( j > 0 )
+		{
+			aligned_sequence1 += substitution_matrix.getGapCharacter();
+			aligned_sequence2 += sequence2[j-1];
+			j--;
+		}
+
+		std::reverse(aligned_sequence1.begin(), aligned_sequence1.end());
+		std::reverse(aligned_sequence2.begin(), aligned_sequence2.end());
+		return PairwiseAlignment(aligned_sequence1, aligned_sequence2, score);
+	}
+
+	PairwiseAlignment BandedSequencer::sequence_invalid(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	{
+		// Invalid input is reported the same way the full sequencers report it.
+		if ( this->affine )
+			return AffineSequencer(this->open_gap_penalty, this->extend_gap_penalty).sequence(true, substitution_matrix, sequence1, sequence2);
+		return LinearSequencer(this->open_gap_penalty).sequence(true, substitution_matrix, sequence1, sequence2);
+	}
+
+	PairwiseAlignment BandedSequencer::sequence(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const int bandwidth, const bool verify)
+	{
+		if ( sequence1.length() == 0 || sequence2.length() == 0 || substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return this->sequence_invalid(substitution_matrix, sequence1, sequence2);
+
+		ScoreProfile profile = ScoreProfile(substitution_matrix, sequence2, false);
+		EncodedSequence encoded = EncodedSequence(substitution_matrix, sequence1, true);
+
+		std::vector<unsigned char> pointers;
+		int lower = 0;
+		int upper = 0;
+		int end_matrix = MATRIX_A;
+		MatrixDataType score = this->band_score(profile, encoded, bandwidth, verify, &pointers, lower, upper, end_matrix);
+
+		int sequence1Length = sequence1.length();
+		int width = upper - lower + 1;
+		std::vector<int> row_starts = std::vector<int>(sequence1Length + 1, 0);
+		std::vector<int> row_offsets = std::vector<int>(sequence1Length + 1, 0);
+		for ( int i = 0; i < sequence1Length + 1; i++ )
+		{
+			row_starts[i] = i + lower;
+			row_offsets[i] = i * width;
+		}
+
+		return this->traceback(substitution_matrix, sequence1, sequence2, sequence1Length, sequence2.length(), end_matrix, pointers, row_starts, row_offsets, score);
+	}
+
+	MatrixDataType BandedSequencer::score(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const int bandwidth, const bool verify)
+	{
+		// Invalid input is scored the same way sequence() scores it.
+		if ( sequence1.length() == 0 || sequence2.length() == 0 )
+			return 0;
+
+		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return 0;
+
+		// The pointers are only needed to verify the band.
+		std::vector<unsigned char> pointers;
+		int lower = 0;
+		int upper = 0;
+		int end_matrix = MATRIX_A;
+		return this->band_score(ScoreProfile(substitution_matrix, sequence2, false), EncodedSequence(substitution_matrix, sequence1, true), bandwidth, verify, verify ? &pointers : NULL, lower, upper, end_matrix);
+	}
+
+	PairwiseAlignment BandedSequencer::extend(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const MatrixDataType x_drop, const bool verify)
+	{
+		if ( sequence1.length() == 0 || sequence2.length() == 0 || substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return this->sequence_invalid(substitution_matrix, sequence1, sequence2);
+
+		bool dropped = false;
+		MatrixDataType current_x_drop = std::max(x_drop, 0);
+		PairwiseAlignment alignment = this->x_drop_align(substitution_matrix, sequence1, sequence2, current_x_drop, dropped);
+
+		// X is kept well below the range of the scores, so best_score - x_drop can not overflow.
+		while ( verify == true && dropped == true && current_x_drop < -UNREACHABLE )
+		{
+			current_x_drop = std::max(2 * current_x_drop, 1);
+			PairwiseAlignment wider = this->x_drop_align(substitution_matrix, sequence1, sequence2, current_x_drop, dropped);
+			if ( wider.getScore() <= alignment.getScore() )
+				break;
+			alignment = wider;
+		}
+
+		return alignment;
+	}
+
+	int BandedSequencer::getAutoBandwidth(const int length1, const int length2)
+	{
+		int bandwidth = std::max(length1, length2) / BANDWIDTH_DIVISOR;
+		return (bandwidth > MINIMUM_BANDWIDTH) ? bandwidth : MINIMUM_BANDWIDTH;
+	}
+
+	/***************************************TESTS**************************************/
+
+	/**
+	 * Copies a sequence with a few random substitutions, insertions and deletions, which
+	 * keeps the optimal path of the alignment near the diagonal.
+	 */
+	static Sequence banded_test_mutate(const Sequence& sequence, const std::string& alphabet, const int per_mille)
+	{
+		std::string original = std::string(sequence.c_str());
+		std::string mutated;
+		for ( unsigned int i = 0; i < original.size(); i++ )
+		{
+			int event = rand() % 1000;
+			if ( event < per_mille )
+				mutated += alphabet[rand() % alphabet.size()];
+			else if ( event < 2 * per_mille )
+				mutated += std::string(1 + rand() % 3, alphabet[rand() % alphabet.size()]) + original[i];
+			else if ( event >= 3 * per_mille )
+				mutated += original[i];
+		}
+		return Sequence(mutated);
+	}
+
+	/**
+	 * Creates a substitution matrix that scores matching characters with the match score
+	 * and every other pair with the mismatch score.
+	 */
+	static SubstitutionMatrix banded_test_identity_matrix(const std::string& alphabet, const int match, const int mismatch)
+	{
+		std::vector<std::vector<MatrixDataType> > matrix = std::vector<std::vector<MatrixDataType> >(alphabet.size() + 1, std::vector<MatrixDataType>(alphabet.size() + 1, mismatch));
+		matrix[0][0] = '*';
+		for ( unsigned int i = 1; i < alphabet.size() + 1; i++ )
+		{
+			matrix[0][i] = alphabet[i-1];
+			matrix[i][0] = alphabet[i-1];
+			matrix[i][i] = match;
+		}
+		return SubstitutionMatrix(matrix);
+	}
+
+#ifndef NDEBUG
+	/**
+	 * Scores an alignment with the linear scoring scheme.
+	 */
+	static MatrixDataType banded_test_linear_score(const SubstitutionMatrix& sm, PairwiseAlignment& alignment, const int gap_penalty)
+	{
+		std::string aligned_sequence1 = std::string(alignment.getSequence(0).c_str());
+		std::string aligned_sequence2 = std::string(alignment.getSequence(1).c_str());
+		MatrixDataType score = 0;
+		for ( unsigned int k = 0; k < aligned_sequence1.size(); k++ )
+		{
+			if ( aligned_sequence1[k] == sm.getGapCharacter() || aligned_sequence2[k] == sm.getGapCharacter() )
+				score += gap_penalty;
+			else
+				score += sm.score(aligned_sequence1[k], aligned_sequence2[k]);
+		}
+		return score;
+	}
+
+	/**
+	 * Removes the gaps from an aligned sequence.
+	 */
+	static std::string banded_test_ungap(const SubstitutionMatrix& sm, const Sequence& aligned_sequence)
+	{
+		std::string sequence;
+		for ( int k = 0; k < aligned_sequence.length(); k++ )
+			if ( aligned_sequence[k] != sm.getGapCharacter() )
+				sequence += aligned_sequence[k];
+		return sequence;
+	}
+#endif
+
+	void BandedSequencer::run_tests()
+	{
+		test_banded_score();
+		test_banded_sequence();
+		test_x_drop();
+	}
+
+	void BandedSequencer::test_banded_score()
+	{
+		srand(1);
+		for ( int test = 0; test < 200; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 150, "ACGT");
+			Sequence sequence2 = (test % 2 == 0) ? banded_test_mutate(sequence1, "ACGT", 20) : test_random_sequence(1 + rand() % 150, "ACGT");
+			int gap_penalty = -(rand() % 6);
+			int open_gap_penalty = -(rand() % 12);
+			int extend_gap_penalty = -(rand() % 4);
+			int full_bandwidth = sequence1.length() + sequence2.length();
+			(void)full_bandwidth;
+
+			// A band that covers the whole matrix gives the score of the full sequencers.
+			LinearSequencer ds = LinearSequencer(gap_penalty);
+			BandedSequencer linear = BandedSequencer(gap_penalty);
+			assert(linear.score(sm, sequence1, sequence2, full_bandwidth, false) == ds.score(true, sm, sequence1, sequence2));
+			assert(linear.score(sm, sequence1, sequence2, 1 + rand() % 8, false) <= ds.score(true, sm, sequence1, sequence2));
+
+			AffineSequencer as = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+			BandedSequencer affine = BandedSequencer(open_gap_penalty, extend_gap_penalty);
+			assert(affine.score(sm, sequence1, sequence2, full_bandwidth, false) == as.score(true, sm, sequence1, sequence2));
+			assert(affine.score(sm, sequence1, sequence2, 1 + rand() % 8, false) <= as.score(true, sm, sequence1, sequence2));
+		}
+
+		// The optimal path of closely related sequences stays near the diagonal, so the
+		// verified band finds the optimal score.
+		srand(2);
+		for ( int test = 0; test < 20; test++ )
+		{
+			SubstitutionMatrix sm = banded_test_identity_matrix("ACGT", 5, -4);
+			Sequence sequence1 = test_random_sequence(500 + rand() % 1000, "ACGT");
+			Sequence sequence2 = banded_test_mutate(sequence1, "ACGT", 10);
+
+			LinearSequencer ds = LinearSequencer(-4);
+			BandedSequencer linear = BandedSequencer(-4);
+			assert(linear.score(sm, sequence1, sequence2, AUTO_BANDWIDTH, true) == ds.score(true, sm, sequence1, sequence2));
+			assert(linear.score(sm, sequence1, sequence2, 1, true) == ds.score(true, sm, sequence1, sequence2));
+
+			AffineSequencer as = AffineSequencer(-8, -1);
+			BandedSequencer affine = BandedSequencer(-8, -1);
+			assert(affine.score(sm, sequence1, sequence2, AUTO_BANDWIDTH, true) == as.score(true, sm, sequence1, sequence2));
+		}
+	}
+
+	void BandedSequencer::test_banded_sequence()
+	{
+		srand(3);
+		for ( int test = 0; test < 200; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ARNDCQEGHILKMFPSTWYV", -4, 11);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 100, "ARNDCQEGHILKMFPSTWYV");
+			Sequence sequence2 = banded_test_mutate(sequence1, "ARNDCQEGHILKMFPSTWYV", 50);
+			if ( sequence2.length() == 0 )
+				continue;
+			int gap_penalty = -(rand() % 6);
+			int bandwidth = rand() % 10;
+
+			// The alignment holds both sequences and its score is the score of its columns.
+			BandedSequencer linear = BandedSequencer(gap_penalty);
+			PairwiseAlignment alignment = linear.sequence(sm, sequence1, sequence2, bandwidth, test % 2 == 0);
+			assert(alignment.getScore() == linear.score(sm, sequence1, sequence2, bandwidth, test % 2 == 0));
+			assert(alignment.getScore() == banded_test_linear_score(sm, alignment, gap_penalty));
+			assert(banded_test_ungap(sm, alignment.getSequence(0)) == std::string(sequence1.c_str()));
+			assert(banded_test_ungap(sm, alignment.getSequence(1)) == std::string(sequence2.c_str()));
+
+			BandedSequencer affine = BandedSequencer(-(rand() % 12), -(rand() % 4));
+			alignment = affine.sequence(sm, sequence1, sequence2, bandwidth, test % 2 == 0);
+			assert(alignment.getScore() == affine.score(sm, sequence1, sequence2, bandwidth, test % 2 == 0));
+			assert(banded_test_ungap(sm, alignment.getSequence(0)) == std::string(sequence1.c_str()));
+			assert(banded_test_ungap(sm, alignment.getSequence(1)) == std::string(sequence2.c_str()));
+		}
+	}
+
+	void BandedSequencer::test_x_drop()
+	{
+		srand(4);
+		for ( int test = 0; test < 100; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 30, "ACGT");
+			Sequence sequence2 = (test % 2 == 0) ? banded_test_mutate(sequence1, "ACGT", 50) : test_random_sequence(1 + rand() % 30, "ACGT");
+			if ( sequence2.length() == 0 )
+				continue;
+			int gap_penalty = -(rand() % 6);
+
+			// Without dropping any cells the extension finds the best global alignment of
+			// any pair of prefixes.
+			LinearSequencer ds = LinearSequencer(gap_penalty);
+			MatrixDataType best_score = 0;
+			for ( int i = 1; i < sequence1.length() + 1; i++ )
+				for ( int j = 1; j < sequence2.length() + 1; j++ )
+					best_score = std::max(best_score, ds.score(true, sm, Sequence(std::string(sequence1.c_str()).substr(0, i)), Sequence(std::string(sequence2.c_str()).substr(0, j))));
+
+			BandedSequencer linear = BandedSequencer(gap_penalty);
+			PairwiseAlignment alignment = linear.extend(sm, sequence1, sequence2, 100000, false);
+			assert(alignment.getScore() == best_score);
+			assert(alignment.getScore() == 0 || alignment.getScore() == banded_test_linear_score(sm, alignment, gap_penalty));
+
+			// Dropping cells can only lower the score, and verification only raises it.
+			PairwiseAlignment dropped = linear.extend(sm, sequence1, sequence2, rand() % 10, false);
+			PairwiseAlignment verified = linear.extend(sm, sequence1, sequence2, rand() % 10, true);
+			assert(dropped.getScore() <= best_score && verified.getScore() <= best_score);
+			if ( dropped.getScore() == 0 )
+				continue;
+			assert(dropped.getScore() == banded_test_linear_score(sm, dropped, gap_penalty));
+			assert(std::string(sequence1.c_str()).find(banded_test_ungap(sm, dropped.getSequence(0))) == 0);
+			assert(std::string(sequence2.c_str()).find(banded_test_ungap(sm, dropped.getSequence(1))) == 0);
+		}
+	}
+}
\ No newline at end of file
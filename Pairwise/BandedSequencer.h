@@ -0,0 +1,166 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "PairwiseAlignment.h"
+#include "EncodedSequence.h"
+#include "ScoreProfile.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___BANDEDSEQUENCER___
+#define ___BANDEDSEQUENCER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The BandedSequencer class aligns closely related sequences without filling the whole
+	 * sequence matrix. It provides two modes:
+	 *
+	 *     The banded global mode only fills the cells within a band of diagonals around
+	 *     the main diagonal, k diagonals wider than the difference of the lengths. The
+	 *     work and memory is proportional to k times the length of the sequences. When
+	 *     the band covers the whole matrix the score is identical to the score of the
+	 *     LinearSequencer or AffineSequencer.
+	 *
+	 *     The X-drop mode extends an alignment from the start of both sequences, like
+	 *     the gapped extension of BLAST. Cells that score more than X below the best
+	 *     score found so far are dropped, and the extension ends when a whole row is
+	 *     dropped. The alignment of the prefixes with the best score is returned.
+	 *
+	 * Both modes can verify their result. The band is doubled while the best path touches
+	 * the edge of the band, and X is doubled while dropping cells lowered the score.
+	 *
+	 * The linear scoring scheme is computed as the affine scheme with equal open and extend
+	 * gap penalties, which gives the same scores.
+	 */
+	class BandedSequencer
+	{
+	private:
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		bool affine;
+
+		const static int MATRIX_COUNT = 3;
+		const static int MATRIX_A = 0;
+		const static int MATRIX_B = 1;
+		const static int MATRIX_C = 2;
+		static const MatrixDataType UNREACHABLE;
+
+		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z);
+		inline int max_matrix(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z);
+		inline MatrixDataType floor(const MatrixDataType x);
+
+		MatrixDataType band_fill(const ScoreProfile& profile, const EncodedSequence& encoded, int lower, int upper, std::vector<unsigned char>* pointers, int& end_matrix);
+		bool band_touched(const int sequence1Length, const int sequence2Length, int lower, int upper, const std::vector<unsigned char>& pointers, int matrix);
+		MatrixDataType band_score(const ScoreProfile& profile, const EncodedSequence& encoded, int bandwidth, const bool verify, std::vector<unsigned char>* pointers, int& lower, int& upper, int& end_matrix);
+		MatrixDataType x_drop_fill(const ScoreProfile& profile, const EncodedSequence& encoded, const MatrixDataType x_drop, std::vector<unsigned char>& pointers, std::vector<int>& row_starts, std::vector<int>& row_offsets, int& best_i, int& best_j, int& best_matrix, bool& dropped);
+		PairwiseAlignment x_drop_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const MatrixDataType x_drop, bool& dropped);
+		PairwiseAlignment traceback(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i, int j, int matrix, const std::vector<unsigned char>& pointers, const std::vector<int>& row_starts, const std::vector<int>& row_offsets, const MatrixDataType score);
+		PairwiseAlignment sequence_invalid(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		//tests
+		void test_banded_score();
+		void test_banded_sequence();
+		void test_x_drop();
+
+	public:
+		/**
+		 * The bandwidth that requests an estimate from the lengths of the sequences.
+		 */
+		static const int AUTO_BANDWIDTH = 0;
+
+		/**
+		 * The bandwidth estimate is the length of the longer sequence divided by the
+		 * divisor, but at least the minimum bandwidth.
+		 */
+		static const int MINIMUM_BANDWIDTH = 16;
+		static const int BANDWIDTH_DIVISOR = 64;
+
+		/**
+		 * Creates a new banded sequencer using the linear scoring scheme.
+		 *
+		 * @param gap_penalty The gap penalty used for scoring gaps in the alignment.
+		 */
+		BandedSequencer(int gap_penalty);
+
+		/**
+		 * Creates a new banded sequencer using the affine scoring scheme.
+		 *
+		 * @param open_gap_penalty The penalty used for scoring the opening of a gap.
+		 * @param extend_gap_penalty The penalty used for scoring the extension of a gap.
+		 */
+		BandedSequencer(int open_gap_penalty, int extend_gap_penalty);
+
+		/**
+		 * Default Destructor.
+		 */
+		~BandedSequencer();
+
+		/**
+		 * This function aligns two sequences globally within a band of diagonals.
+		 *
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @param bandwidth The number of diagonals the band reaches past the diagonals between
+		 * the start and the end of the matrix, or AUTO_BANDWIDTH to estimate it.
+		 * @param verify If true the band is doubled until the best path does not touch its edges.
+		 * @return The best alignment found within the band.
+		 */
+		PairwiseAlignment sequence(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const int bandwidth, const bool verify);
+
+		/**
+		 * This function computes only the score of the banded global alignment of two
+		 * sequences. The score is identical to the score of the alignment returned by
+		 * sequence(), however only two rows of the band are kept, and the traceback pointers
+		 * of the band only when it is verified.
+		 *
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @param bandwidth The number of diagonals the band reaches past the diagonals between
+		 * the start and the end of the matrix, or AUTO_BANDWIDTH to estimate it.
+		 * @param verify If true the band is doubled until the best path does not touch its edges.
+		 * @return The score of the best alignment found within the band.
+		 */
+		MatrixDataType score(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const int bandwidth, const bool verify);
+
+		/**
+		 * This function extends an alignment from the start of both sequences until the
+		 * score drops too far below the best score found.
+		 *
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @param x_drop How far below the best score a cell may score before it is dropped.
+		 * @param verify If true X is doubled until dropping cells no longer lowers the score.
+		 * @return The alignment of the prefixes of the sequences with the best score.
+		 */
+		PairwiseAlignment extend(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, const MatrixDataType x_drop, const bool verify);
+
+		/**
+		 * This function estimates the bandwidth for the alignment of two sequences.
+		 *
+		 * @param length1 The length of the first sequence.
+		 * @param length2 The length of the second sequence.
+		 * @return The estimated bandwidth.
+		 */
+		static int getAutoBandwidth(const int length1, const int length2);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
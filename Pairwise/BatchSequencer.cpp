@@ -0,0 +1,450 @@
+#include <algorithm>
+#include <cassert>
+#include <cstdlib>
+#include <limits>
+#include "BatchSequencer.h"
+#include "PairwiseTests.h"
+#include "ScoreProfile.h"
+#include "LinearSequencer.h"
+#include "AffineSequencer.h"
+#include "SimdVector.h"
+
+namespace Pairwise
+{
+	static const short BATCH_NEGATIVE_INFINITY = std::numeric_limits<short>::min();
+	static const int BATCH_MAX16 = std::numeric_limits<short>::max();
+
+	/**
+	 * Orders target indices by the length of the targets.
+	 */
+	struct BatchLengthOrder
+	{
+		const std::vector<EncodedSequence>* targets;
+		bool operator () (const int a, const int b) const { return (*this->targets)[a].length() < (*this->targets)[b].length(); }
+	};
+
+	/**
+	 * The query of a batch. The symbols of the query are renumbered so that the column
+	 * profile built for every position of the targets only holds the symbols that occur
+	 * in the query.
+	 */
+	struct BatchQuery
+	{
+		std::vector<int> symbols;
+		std::vector<int> profile_index;
+		MatrixDataType min_score;
+		MatrixDataType max_score;
+
+		BatchQuery(const SubstitutionMatrix& substitution_matrix, const EncodedSequence& query)
+		{
+			std::vector<int> seen = std::vector<int>(substitution_matrix.getColumnSymbolCount(), -1);
+			for ( int i = 0; i < query.length(); i++ )
+			{
+				if ( seen[query[i]] < 0 )
+				{
+					seen[query[i]] = this->symbols.size();
+					this->symbols.push_back(query[i]);
+				}
+				this->profile_index.push_back(seen[query[i]]);
+			}
+
+			this->min_score = 0;
+			this->max_score = 0;
+			for ( unsigned int k = 0; k < this->symbols.size(); k++ )
+				for ( int symbol = 0; symbol < substitution_matrix.getRowSymbolCount(); symbol++ )
+				{
+					this->min_score = std::min(this->min_score, (MatrixDataType)substitution_matrix.scoreSymbols(this->symbols[k], symbol));
+					this->max_score = std::max(this->max_score, (MatrixDataType)substitution_matrix.scoreSymbols(this->symbols[k], symbol));
+				}
+		}
+	};
+
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+	/**
+	 * Scores a batch of linear local alignments with unsigned 8 bit lanes, one target per
+	 * lane. The substitution scores are stored with a bias added, so the 0 floor of the
+	 * local alignment is the floor of the unsigned saturating arithmetic. Targets whose
+	 * score saturated the lanes are added to the overflow list.
+	 */
+	template <class V>
+	static void batch_local8(const SubstitutionMatrix& substitution_matrix, const BatchQuery& query, const std::vector<EncodedSequence>& targets, const int* batch, const int batch_size, const int gap_penalty, std::vector<MatrixDataType>& scores, std::vector<int>& overflow)
+	{
+		typedef typename V::Vector Vector;
+		int query_length = query.profile_index.size();
+		int symbol_count = query.symbols.size();
+		int bias = -query.min_score;
+		int batch_length = targets[batch[batch_size-1]].length();
+
+		std::vector<unsigned char> h = std::vector<unsigned char>((query_length + 1) * V::LANES, 0);
+		std::vector<unsigned char> profile = std::vector<unsigned char>(symbol_count * V::LANES, 0);
+		unsigned char lanes[V::LANES];
+
+		Vector gap = V::set1(-gap_penalty);
+		Vector bias_vector = V::set1(bias);
+		Vector zero = V::set1(0);
+		Vector highest = zero;
+
+		for ( int j = 0; j < batch_length; j++ )
+		{
+			for ( int lane = 0; lane < batch_size; lane++ )
+			{
+				const EncodedSequence& target = targets[batch[lane]];
+				if ( j < target.length() )
+					for ( int k = 0; k < symbol_count; k++ )
+						profile[k * V::LANES + lane] = (unsigned char)(substitution_matrix.scoreSymbols(query.symbols[k], target[j]) + bias);
+			}
+
+			Vector diagonal = zero;
+			Vector up = zero;
+			for ( int i = 1; i <= query_length; i++ )
+			{
+				Vector left = V::load(&h[i * V::LANES]);
+				Vector cell = V::subs(V::adds(diagonal, V::load(&profile[query.profile_index[i-1] * V::LANES])), bias_vector);
+				cell = V::max(cell, V::subs(left, gap));
+				cell = V::max(cell, V::subs(up, gap));
+				highest = V::max(highest, cell);
+				V::store(&h[i * V::LANES], cell);
+				diagonal = left;
+				up = cell;
+			}
+
+			// The score of a target is read when its last column is complete, before the
+			// padding of the longer targets raises it.
+			V::store(lanes, highest);
+			for ( int lane = 0; lane < batch_size; lane++ )
+			{
+				if ( targets[batch[lane]].length() != j + 1 )
+					continue;
+				if ( lanes[lane] + bias >= 255 )
+					overflow.push_back(batch[lane]);
+				else
+					scores[batch[lane]] = lanes[lane];
+			}
+		}
+	}
+
+	/**
+	 * Scores a batch of alignments with signed 16 bit lanes, one target per lane. The
+	 * boundaries of the sequence matrices follow the LinearSequencer for linear alignments
+	 * and the AffineSequencer for affine alignments. Targets whose local score saturated
+	 * the lanes are added to the overflow list.
+	 */
+	template <class V>
+	static void batch_score16(const SubstitutionMatrix& substitution_matrix, const BatchQuery& query, const std::vector<EncodedSequence>& targets, const int* batch, const int batch_size, const bool global, const bool affine, const int open_gap_penalty, const int extend_gap_penalty, std::vector<MatrixDataType>& scores, std::vector<int>& overflow)
+	{
+		typedef typename V::Vector Vector;
+		int query_length = query.profile_index.size();
+		int symbol_count = query.symbols.size();
+		int batch_length = targets[batch[batch_size-1]].length();
+
+		// The first row and column of the sequence matrix. Affine alignments start the gap
+		// matrices at 0 in the first row and column, the same as the AffineSequencer.
+		std::vector<short> boundary = std::vector<short>(std::max(query_length, batch_length) + 1, 0);
+		for ( int k = 1; k < (int)boundary.size(); k++ )
+		{
+			long value = 0;
+			if ( global && affine )
+				value = std::max(0L, (long)open_gap_penalty + (long)(k - 1) * extend_gap_penalty);
+			else if ( global )
+				value = (long)open_gap_penalty * k;
+			boundary[k] = (short)std::max(value, (long)BATCH_NEGATIVE_INFINITY);
+		}
+		short gap_boundary = affine ? 0 : BATCH_NEGATIVE_INFINITY;
+
+		std::vector<short> h = std::vector<short>((query_length + 1) * V::LANES, 0);
+		std::vector<short> e = std::vector<short>((query_length + 1) * V::LANES, gap_boundary);
+		std::vector<short> profile = std::vector<short>(symbol_count * V::LANES, 0);
+		short lanes[V::LANES];
+
+		for ( int i = 0; i <= query_length; i++ )
+			for ( int lane = 0; lane < V::LANES; lane++ )
+				h[i * V::LANES + lane] = boundary[i];
+
+		Vector open_gap = V::set1(open_gap_penalty);
+		Vector extend_gap = V::set1(extend_gap_penalty);
+		Vector zero = V::set1(0);
+		Vector highest = zero;
+
+		for ( int j = 0; j < batch_length; j++ )
+		{
+			for ( int lane = 0; lane < batch_size; lane++ )
+			{
+				const EncodedSequence& target = targets[batch[lane]];
+				if ( j < target.length() )
+					for ( int k = 0; k < symbol_count; k++ )
+						profile[k * V::LANES + lane] = (short)substitution_matrix.scoreSymbols(query.symbols[k], target[j]);
+			}
+
+			Vector diagonal = V::load(&h[0]);
+			Vector up = V::set1(boundary[j+1]);
+			Vector f = V::set1(gap_boundary);
+			V::store(&h[0], up);
+
+			for ( int i = 1; i <= query_length; i++ )
+			{
+				Vector left = V::load(&h[i * V::LANES]);
+				Vector e_current = V::max(V::adds(V::load(&e[i * V::LANES]), extend_gap), V::adds(left, open_gap));
+				f = V::max(V::adds(f, extend_gap), V::adds(up, open_gap));
+
+				Vector cell = V::adds(diagonal, V::load(&profile[query.profile_index[i-1] * V::LANES]));
+				cell = V::max(cell, e_current);
+				cell = V::max(cell, f);
+				if ( !global )
+				{
+					cell = V::max(cell, zero);
+					highest = V::max(highest, cell);
+				}
+
+				V::store(&e[i * V::LANES], e_current);
+				V::store(&h[i * V::LANES], cell);
+				diagonal = left;
+				up = cell;
+			}
+
+			if ( global )
+				V::store(lanes, V::load(&h[query_length * V::LANES]));
+			else
+				V::store(lanes, highest);
+
+			for ( int lane = 0; lane < batch_size; lane++ )
+			{
+				if ( targets[batch[lane]].length() != j + 1 )
+					continue;
+				if ( !global && lanes[lane] >= BATCH_MAX16 )
+					overflow.push_back(batch[lane]);
+				else
+					scores[batch[lane]] = lanes[lane];
+			}
+		}
+	}
+
+	/**
+	 * Sorts the pending targets by length and scores them in batches of one target per
+	 * lane. The targets that the kernel could not score are returned.
+	 */
+	template <class V, class Kernel>
+	static std::vector<int> batch_run(const std::vector<EncodedSequence>& targets, std::vector<int> pending, Kernel kernel)
+	{
+		BatchLengthOrder order;
+		order.targets = &targets;
+		std::stable_sort(pending.begin(), pending.end(), order);
+
+		std::vector<int> overflow;
+		const int lanes = V::LANES;
+		for ( unsigned int first = 0; first < pending.size(); first += lanes )
+			kernel(&pending[first], std::min<int>(lanes, pending.size() - first), overflow);
+		return overflow;
+	}
+
+	/**
+	 * Binds the arguments of batch_local8 for batch_run.
+	 */
+	struct BatchLocal8Kernel
+	{
+		const SubstitutionMatrix* substitution_matrix;
+		const BatchQuery* query;
+		const std::vector<EncodedSequence>* targets;
+		int gap_penalty;
+		std::vector<MatrixDataType>* scores;
+
+		void operator () (const int* batch, const int batch_size, std::vector<int>& overflow) const
+		{
+			batch_local8<SimdVector8>(*this->substitution_matrix, *this->query, *this->targets, batch, batch_size, this->gap_penalty, *this->scores, overflow);
+		}
+	};
+
+	/**
+	 * Binds the arguments of batch_score16 for batch_run.
+	 */
+	struct BatchScore16Kernel
+	{
+		const SubstitutionMatrix* substitution_matrix;
+		const BatchQuery* query;
+		const std::vector<EncodedSequence>* targets;
+		bool global;
+		bool affine;
+		int open_gap_penalty;
+		int extend_gap_penalty;
+		std::vector<MatrixDataType>* scores;
+
+		void operator () (const int* batch, const int batch_size, std::vector<int>& overflow) const
+		{
+			batch_score16<SimdVector16>(*this->substitution_matrix, *this->query, *this->targets, batch, batch_size, this->global, this->affine, this->open_gap_penalty, this->extend_gap_penalty, *this->scores, overflow);
+		}
+	};
+#endif
+
+	BatchSequencer::BatchSequencer(int gap_penalty)
+	{
+		this->open_gap_penalty = gap_penalty;
+		this->extend_gap_penalty = gap_penalty;
+		this->affine = false;
+	}
+
+	BatchSequencer::BatchSequencer(int open_gap_penalty, int extend_gap_penalty)
+	{
+		this->open_gap_penalty = open_gap_penalty;
+		this->extend_gap_penalty = extend_gap_penalty;
+		this->affine = true;
+	}
+
+	BatchSequencer::~BatchSequencer() {}
+
+	std::vector<MatrixDataType> BatchSequencer::score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& targets)
+	{
+		std::vector<MatrixDataType> scores = std::vector<MatrixDataType>(targets.size(), 0);
+
+		// Invalid input is scored the same way the LinearSequencer and AffineSequencer score it.
+		if ( query.length() == 0 || substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return scores;
+
+		EncodedSequence encoded_query = EncodedSequence(substitution_matrix, query, true);
+		std::vector<EncodedSequence> encoded_targets = std::vector<EncodedSequence>();
+		std::vector<int> pending = std::vector<int>();
+		for ( unsigned int t = 0; t < targets.size(); t++ )
+		{
+			encoded_targets.push_back(EncodedSequence(substitution_matrix, targets[t], false));
+			if ( targets[t].length() > 0 )
+				pending.push_back(t);
+		}
+
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+		// The affine recurrence of the kernels only matches the AffineSequencer when opening
+		// a gap costs at least as much as extending one.
+		if ( this->open_gap_penalty <= this->extend_gap_penalty && this->extend_gap_penalty <= 0 )
+		{
+			BatchQuery batch_query = BatchQuery(substitution_matrix, encoded_query);
+			bool use_global = global || this->affine;
+
+			if ( !use_global && batch_query.max_score - batch_query.min_score < 255 && this->open_gap_penalty > -255 )
+			{
+				BatchLocal8Kernel kernel = { &substitution_matrix, &batch_query, &encoded_targets, this->open_gap_penalty, &scores };
+				pending = batch_run<SimdVector8>(encoded_targets, pending, kernel);
+			}
+
+			// Every cell of the sequence matrix is the sum of at most one substitution or gap
+			// per character of both sequences, so global scores that stay within this bound
+			// cannot saturate the 16 bit lanes. Local scores are checked for saturation.
+			long step = std::max(std::max((long)batch_query.max_score, -(long)batch_query.min_score), std::max(std::labs(this->open_gap_penalty), std::labs(this->extend_gap_penalty)));
+			std::vector<int> narrow = std::vector<int>();
+			std::vector<int> wide = std::vector<int>();
+			for ( unsigned int k = 0; k < pending.size(); k++ )
+			{
+				long bound = (long)(query.length() + targets[pending[k]].length() + 2) * step;
+				if ( use_global ? bound < BATCH_MAX16 : step < BATCH_MAX16 / 2 )
+					narrow.push_back(pending[k]);
+				else
+					wide.push_back(pending[k]);
+			}
+
+			BatchScore16Kernel kernel = { &substitution_matrix, &batch_query, &encoded_targets, use_global, this->affine, this->open_gap_penalty, this->extend_gap_penalty, &scores };
+			pending = batch_run<SimdVector16>(encoded_targets, narrow, kernel);
+			pending.insert(pending.end(), wide.begin(), wide.end());
+		}
+#endif
+
+		if ( pending.size() > 0 )
+		{
+			ScoreProfile profile = ScoreProfile(substitution_matrix, query, true);
+			for ( unsigned int k = 0; k < pending.size(); k++ )
+			{
+				if ( this->affine )
+					scores[pending[k]] = AffineSequencer(this->open_gap_penalty, this->extend_gap_penalty).score(global, profile, encoded_targets[pending[k]]);
+				else
+					scores[pending[k]] = LinearSequencer(this->open_gap_penalty).score(global, profile, encoded_targets[pending[k]]);
+			}
+		}
+		return scores;
+	}
+
+	int BatchSequencer::getBatchSize(const bool narrow)
+	{
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+		return narrow ? SimdVector8::LANES : SimdVector16::LANES;
+#else
+		return 1;
+#endif
+	}
+
+	/***************************************TESTS**************************************/
+
+	void BatchSequencer::run_tests()
+	{
+		test_linear_score();
+		test_affine_score();
+		test_score_overflow();
+	}
+
+	void BatchSequencer::test_linear_score()
+	{
+		srand(1);
+		for ( int test = 0; test < 40; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence query = test_random_sequence(1 + rand() % 150, "ACGTacgtN");
+			std::vector<Sequence> targets = std::vector<Sequence>();
+			for ( int t = rand() % 70; t > 0; t-- )
+				targets.push_back(test_random_sequence(rand() % 150, "ACGTacgtN"));
+			int gap_penalty = -(rand() % 6);
+
+			LinearSequencer ds = LinearSequencer(gap_penalty);
+			BatchSequencer bs = BatchSequencer(gap_penalty);
+			std::vector<MatrixDataType> global_scores = bs.score(true, sm, query, targets);
+			std::vector<MatrixDataType> local_scores = bs.score(false, sm, query, targets);
+			for ( unsigned int t = 0; t < targets.size(); t++ )
+			{
+				assert(global_scores[t] == ds.score(true, sm, query, targets[t]));
+				assert(local_scores[t] == ds.score(false, sm, query, targets[t]));
+			}
+		}
+	}
+
+	void BatchSequencer::test_affine_score()
+	{
+		srand(2);
+		for ( int test = 0; test < 40; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ARNDCQEGHILKMFPSTWYV", -4, 11);
+			Sequence query = test_random_sequence(1 + rand() % 150, "ARNDCQEGHILKMFPSTWYVx");
+			std::vector<Sequence> targets = std::vector<Sequence>();
+			for ( int t = rand() % 70; t > 0; t-- )
+				targets.push_back(test_random_sequence(rand() % 150, "ARNDCQEGHILKMFPSTWYVx"));
+			int open_gap_penalty = -(rand() % 12);
+			int extend_gap_penalty = -(rand() % 4);
+
+			AffineSequencer as = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+			BatchSequencer bs = BatchSequencer(open_gap_penalty, extend_gap_penalty);
+			std::vector<MatrixDataType> scores = bs.score(true, sm, query, targets);
+			for ( unsigned int t = 0; t < targets.size(); t++ )
+				assert(scores[t] == as.score(true, sm, query, targets[t]));
+		}
+	}
+
+	void BatchSequencer::test_score_overflow()
+	{
+		// Long, nearly identical sequences exceed the 8 bit lanes and the bound of the 16
+		// bit lanes, so these scores are produced by the wider kernels.
+		srand(3);
+		SubstitutionMatrix sm = test_random_matrix("ACGT", 5, 20);
+		Sequence query = test_random_sequence(3000, "ACGT");
+		std::vector<Sequence> targets = std::vector<Sequence>();
+		for ( int t = 0; t < 20; t++ )
+			targets.push_back(Sequence(std::string(query.c_str()).substr(t * 100, 50 + t * 140)));
+
+		LinearSequencer ds = LinearSequencer(-2);
+		BatchSequencer bs = BatchSequencer(-2);
+		std::vector<MatrixDataType> global_scores = bs.score(true, sm, query, targets);
+		std::vector<MatrixDataType> local_scores = bs.score(false, sm, query, targets);
+		for ( unsigned int t = 0; t < targets.size(); t++ )
+		{
+			assert(global_scores[t] == ds.score(true, sm, query, targets[t]));
+			assert(local_scores[t] == ds.score(false, sm, query, targets[t]));
+		}
+
+		AffineSequencer as = AffineSequencer(-10, -1);
+		BatchSequencer ba = BatchSequencer(-10, -1);
+		std::vector<MatrixDataType> scores = ba.score(true, sm, query, targets);
+		for ( unsigned int t = 0; t < targets.size(); t++ )
+			assert(scores[t] == as.score(true, sm, query, targets[t]));
+	}
+}
\ No newline at end of file
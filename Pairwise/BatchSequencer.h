@@ -0,0 +1,101 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "EncodedSequence.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___BATCHSEQUENCER___
+#define ___BATCHSEQUENCER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The BatchSequencer class scores one query sequence against many target sequences at
+	 * once. Unlike the StripedSequencer, which spreads one query over the lanes of a vector,
+	 * every lane holds a different target, so a single vector instruction computes the same
+	 * cell of the sequence matrices of 8 to 32 alignments. This works well for data sets of
+	 * many short sequences, where a striped query only fills a few vectors.
+	 *
+	 * The targets are sorted by length and grouped into batches of one target per lane, so
+	 * that little work is spent on the padding of the shorter targets of a batch:
+	 *
+	 *     Linear local alignments are first scored with saturating 8 bit lanes.
+	 *     Linear global alignments and affine alignments are scored with 16 bit lanes.
+	 *     Targets whose scores could exceed the range of the lanes are scored again with
+	 *     the wider lanes, and finally with the 32 bit scalar kernel.
+	 *
+	 * The scores are identical to the scores of the score() function of the LinearSequencer
+	 * and AffineSequencer. Without SSE2 every alignment is scored with the scalar kernel.
+	 *
+	 * Rognes: http://dx.doi.org/10.1186/1471-2105-12-221
+	 */
+	class BatchSequencer
+	{
+	private:
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		bool affine;
+
+		//tests
+		void test_linear_score();
+		void test_affine_score();
+		void test_score_overflow();
+
+	public:
+		/**
+		 * Creates a new batch sequencer using the linear scoring scheme.
+		 *
+		 * @param gap_penalty The gap penalty used for scoring gaps in the alignment.
+		 */
+		BatchSequencer(int gap_penalty);
+
+		/**
+		 * Creates a new batch sequencer using the affine scoring scheme.
+		 *
+		 * @param open_gap_penalty The penalty used for scoring the opening of a gap.
+		 * @param extend_gap_penalty The penalty used for scoring the extension of a gap.
+		 */
+		BatchSequencer(int open_gap_penalty, int extend_gap_penalty);
+
+		/**
+		 * Default Destructor.
+		 */
+		~BatchSequencer();
+
+		/**
+		 * This function computes the scores of the alignments between a query and each of
+		 * a list of targets.
+		 *
+		 * @param global If true the sequences are scored globally, otherwise locally.
+		 * Affine alignments are currently always scored globally.
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param query The sequence that is scored as the first sequence of every alignment.
+		 * @param targets The sequences that are scored as the second sequence.
+		 * @return The score of the query against each target, in the order of the targets.
+		 */
+		std::vector<MatrixDataType> score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& targets);
+
+		/**
+		 * This function returns the number of targets scored at once by the 8 bit and
+		 * 16 bit kernels.
+		 *
+		 * @param narrow If true the number of 8 bit lanes is returned, otherwise the
+		 * number of 16 bit lanes.
+		 * @return The number of targets in a batch.
+		 */
+		static int getBatchSize(const bool narrow);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
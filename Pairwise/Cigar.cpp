@@ -0,0 +1,243 @@
+#include <cassert>
+#include <cstdlib>
+#include <sstream>
+#include "Cigar.h"
+#include "PairwiseTests.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	Cigar::Cigar()
+	{
+		this->operations = "";
+		this->starts[0] = 0;
+		this->starts[1] = 0;
+		this->ends[0] = 0;
+		this->ends[1] = 0;
+		this->score = 0;
+	}
+
+	Cigar::Cigar(PairwiseAlignment& alignment, const Sequence& sequence1, const Sequence& sequence2, const char gap_character)
+	{
+		this->operations = "";
+		this->starts[0] = 0;
+		this->starts[1] = 0;
+		this->ends[0] = 0;
+		this->ends[1] = 0;
+		this->score = alignment.getScore();
+
+		std::string aligned_sequence1 = std::string(alignment.getSequence(0).c_str());
+		std::string aligned_sequence2 = std::string(alignment.getSequence(1).c_str());
+		if ( aligned_sequence1.size() != aligned_sequence2.size() )
+			return;
+
+		int i = alignment.getStart(0);
+		int j = alignment.getStart(1);
+		if ( i < 0 || j < 0 )
+			return;
+
+		char run_operation = 0;
+		int run_length = 0;
+		for ( unsigned int k = 0; k < aligned_sequence1.size(); k++ )
+		{
+			bool gap1 = (aligned_sequence1[k] == gap_character);
+			bool gap2 = (aligned_sequence2[k] == gap_character);
+			if ( gap1 && gap2 )
+			{
+				this->operations = "";
+				return;
+			}
+
+			// Every character that is not a gap must be the next character of its sequence.
+			if ( !gap1 && (i >= sequence1.length() || sequence1[i] != aligned_sequence1[k]) )
+			{
+				this->operations = "";
+				return;
+			}
+			if ( !gap2 && (j >= sequence2.length() || sequence2[j] != aligned_sequence2[k]) )
+			{
+				this->operations = "";
+				return;
+			}
+
+			char operation = gap2 ? DELETION : (gap1 ? INSERTION : MATCH);
+			if ( operation != run_operation && run_length > 0 )
+			{
+				this->append_run(run_operation, run_length);
+				run_length = 0;
+			}
+			run_operation = operation;
+			run_length++;
+
+			if ( !gap1 )
+				i++;
+			if ( !gap2 )
+				j++;
+		}
+
+		if ( run_length > 0 )
+			this->append_run(run_operation, run_length);
+
+		this->starts[0] = alignment.getStart(0);
+		this->starts[1] = alignment.getStart(1);
+		this->ends[0] = i;
+		this->ends[1] = j;
+	}
+
+	Cigar::~Cigar() {}
+
+	void Cigar::append_run(const char operation, const int count)
+	{
+		std::ostringstream run;
+		run << count << operation;
+		this->operations += run.str();
+	}
+
+	const std::string& Cigar::getOperations() const
+	{
+		return this->operations;
+	}
+
+	int Cigar::getStart(const int index) const
+	{
+		return this->starts[index];
+	}
+
+	int Cigar::getEnd(const int index) const
+	{
+		return this->ends[index];
+	}
+
+	MatrixDataType Cigar::getScore() const
+	{
+		return this->score;
+	}
+
+	bool Cigar::expand(const std::string& operations, const int start1, const int start2, const Sequence& sequence1, const Sequence& sequence2, const char gap_character, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		aligned_sequence1 = "";
+		aligned_sequence2 = "";
+		if ( start1 < 0 || start2 < 0 || start1 > sequence1.length() || start2 > sequence2.length() )
+			return false;
+
+		int i = start1;
+		int j = start2;
+		unsigned int k = 0;
+		while ( k < operations.size() )
+		{
+			// A run is a count of at least one digit followed by its operation.
+			int count = 0;
+			unsigned int digits = 0;
+			while ( k < operations.size() && operations[k] >= '0' && operations[k] <= '9' )
+			{
+				count = count * 10 + (operations[k] - '0');
+				if ( count > sequence1.length() + sequence2.length() )
+					return false;
+				digits++;
+				k++;
+			}
+			if ( digits == 0 || count == 0 || k == operations.size() )
+				return false;
+
+			char operation = operations[k];
+			k++;
+			bool consumes1 = (operation == MATCH || operation == DELETION);
+			bool consumes2 = (operation == MATCH || operation == INSERTION);
+			if ( !consumes1 && !consumes2 )
+				return false;
+			if ( (consumes1 && i + count > sequence1.length()) || (consumes2 && j + count > sequence2.length()) )
+				return false;
+
+			for ( int c = 0; c < count; c++ )
+			{
+				aligned_sequence1 += consumes1 ? sequence1[i++] : gap_character;
+				aligned_sequence2 += consumes2 ? sequence2[j++] : gap_character;
+			}
+		}
+		return true;
+	}
+
+	/***************************************TESTS**************************************/
+
+	void Cigar::run_tests()
+	{
+		test_round_trip();
+	}
+
+	void Cigar::test_round_trip()
+	{
+		srand(1);
+		const char gap = '-';
+		for ( int test = 0; test < 200; test++ )
+		{
+			Sequence sequence1 = test_random_sequence(rand() % 40, "ACGT");
+			Sequence sequence2 = test_random_sequence(rand() % 40, "ACGT");
+
+			// A random path from a random start cell, ending anywhere before the end of both sequences.
+			int start1 = sequence1.length() > 0 ? rand() % sequence1.length() : 0;
+			int start2 = sequence2.length() > 0 ? rand() % sequence2.length() : 0;
+			int i = start1;
+			int j = start2;
+			std::string aligned_sequence1;
+			std::string aligned_sequence2;
+			while ( rand() % 30 != 0 )
+			{
+				int step = rand() % 3;
+				if ( step == 0 && i < sequence1.length() && j < sequence2.length() )
+				{
+					aligned_sequence1 += sequence1[i++];
+					aligned_sequence2 += sequence2[j++];
+				}
+				else if ( step == 1 && i < sequence1.length() )
+				{
+					aligned_sequence1 += sequence1[i++];
+					aligned_sequence2 += gap;
+				}
+				else if ( step == 2 && j < sequence2.length() )
+				{
+					aligned_sequence1 += gap;
+					aligned_sequence2 += sequence2[j++];
+				}
+			}
+			if ( aligned_sequence1.empty() )
+				continue;
+
+			PairwiseAlignment alignment = PairwiseAlignment(Sequence(aligned_sequence1), Sequence(aligned_sequence2), test);
+			alignment.setStart(start1, start2);
+			Cigar cigar = Cigar(alignment, sequence1, sequence2, gap);
+			assert(!cigar.getOperations().empty());
+			assert(cigar.getStart(0) == start1 && cigar.getStart(1) == start2);
+			assert(cigar.getEnd(0) == i && cigar.getEnd(1) == j);
+			assert(cigar.getScore() == test);
+
+			std::string expanded1;
+			std::string expanded2;
+			assert(Cigar::expand(cigar.getOperations(), start1, start2, sequence1, sequence2, gap, expanded1, expanded2));
+			assert(expanded1 == aligned_sequence1);
+			assert(expanded2 == aligned_sequence2);
+		}
+
+		// Malformed runs and runs past the end of a sequence are rejected.
+		Sequence sequence1 = Sequence("ACGT");
+		Sequence sequence2 = Sequence("AGT");
+		std::string expanded1;
+		std::string expanded2;
+		assert(Cigar::expand("1M1D2M", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(expanded1 == "ACGT" && expanded2 == "A-GT");
+		assert(Cigar::expand("", 4, 3, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(expanded1.empty() && expanded2.empty());
+		assert(!Cigar::expand("4M", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(!Cigar::expand("M", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(!Cigar::expand("2", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(!Cigar::expand("0M", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(!Cigar::expand("2X", 0, 0, sequence1, sequence2, gap, expanded1, expanded2));
+		assert(!Cigar::expand("1M", 5, 0, sequence1, sequence2, gap, expanded1, expanded2));
+
+		// Aligned characters that are not the characters of the sequences give no runs.
+		PairwiseAlignment message = PairwiseAlignment(Sequence("Invalid input"), Sequence("Invalid input"), 0);
+		Cigar invalid = Cigar(message, sequence1, sequence2, gap);
+		assert(invalid.getOperations().empty());
+		assert(invalid.getEnd(0) == 0 && invalid.getEnd(1) == 0);
+	}
+}
\ No newline at end of file
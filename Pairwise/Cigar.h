@@ -0,0 +1,122 @@
+#include <string>
+#include "PairwiseAlignment.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___CIGAR___
+#define ___CIGAR___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The Cigar class describes a pairwise alignment as runs of edit operations, in the style
+	 * of the CIGAR strings of the SAM format, instead of two gapped copies of the aligned
+	 * sequences. Every run is a count followed by one of the operations:
+	 *
+	 *     M - Characters of the first sequence aligned with characters of the second sequence.
+	 *     D - Characters of the first sequence aligned with gaps.
+	 *     I - Characters of the second sequence aligned with gaps.
+	 *
+	 * Along with the runs the position of the first aligned character and of the character
+	 * after the last aligned character of both sequences is kept, so the gapped sequences of
+	 * a local alignment can be expanded again from the original sequences.
+	 */
+	class Cigar
+	{
+	private:
+		std::string operations;
+		int starts[2];
+		int ends[2];
+		MatrixDataType score;
+
+		void append_run(const char operation, const int count);
+
+		//tests
+		void test_round_trip();
+
+	public:
+		static const char MATCH = 'M';
+		static const char DELETION = 'D';
+		static const char INSERTION = 'I';
+
+		/**
+		 * Default Constructor.
+		 */
+		Cigar();
+
+		/**
+		 * Creates the runs of an alignment. If the aligned characters are not the characters
+		 * of the sequences from the start of the alignment on, as for the messages returned
+		 * in place of an alignment for invalid input, there are no runs and the alignment
+		 * covers no characters.
+		 *
+		 * @param alignment The alignment of the two sequences.
+		 * @param sequence1 The first sequence that was aligned.
+		 * @param sequence2 The second sequence that was aligned.
+		 * @param gap_character The character of the gaps in the aligned sequences.
+		 */
+		Cigar(PairwiseAlignment& alignment, const Sequence& sequence1, const Sequence& sequence2, const char gap_character);
+
+		/**
+		 * Default Destructor.
+		 */
+		~Cigar();
+
+		/**
+		 * This function returns the runs of the alignment, such as "12M2D30M".
+		 *
+		 * @return The runs of edit operations.
+		 */
+		const std::string& getOperations() const;
+
+		/**
+		 * This function returns the position of the first aligned character of a sequence.
+		 *
+		 * @param index 0 for the first sequence, 1 for the second sequence.
+		 * @return The position of the first aligned character.
+		 */
+		int getStart(const int index) const;
+
+		/**
+		 * This function returns the position after the last aligned character of a sequence.
+		 *
+		 * @param index 0 for the first sequence, 1 for the second sequence.
+		 * @return The position after the last aligned character.
+		 */
+		int getEnd(const int index) const;
+
+		/**
+		 * This function returns the score of the alignment.
+		 *
+		 * @return The score of the alignment.
+		 */
+		MatrixDataType getScore() const;
+
+		/**
+		 * This function expands runs of edit operations into the gapped sequences of the
+		 * alignment.
+		 *
+		 * @param operations The runs of edit operations.
+		 * @param start1 The position of the first aligned character of the first sequence.
+		 * @param start2 The position of the first aligned character of the second sequence.
+		 * @param sequence1 The first sequence that was aligned.
+		 * @param sequence2 The second sequence that was aligned.
+		 * @param gap_character The character of the gaps in the aligned sequences.
+		 * @param aligned_sequence1 Set to the gapped first sequence.
+		 * @param aligned_sequence2 Set to the gapped second sequence.
+		 * @return False if the runs are malformed or reach past the end of a sequence.
+		 */
+		static bool expand(const std::string& operations, const int start1, const int start2, const Sequence& sequence1, const Sequence& sequence2, const char gap_character, std::string& aligned_sequence1, std::string& aligned_sequence2);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
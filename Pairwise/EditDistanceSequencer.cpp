@@ -0,0 +1,253 @@
+#include <algorithm>
+#include <cassert>
+#include <cctype>
+#include <cstdlib>
+#include <string>
+#include "EditDistanceSequencer.h"
+#include "PairwiseTests.h"
+#include "AllPairsScorer.h"
+#include "../Utilities/ArenaBuffer.h"
+#include "../Utilities/ThreadPool.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	static const int EDIT_DISTANCE_SYMBOLS = 256;
+
+	/**
+	 * The task of the ThreadPool that computes one row of the triangle.
+	 */
+	struct EditDistanceRowTask
+	{
+		EditDistanceSequencer* sequencer;
+		const std::vector<Sequence>* sequences;
+		std::vector<MatrixDataType>* distances;
+
+		void operator () (const int row)
+		{
+			int sequence_count = this->sequences->size();
+			std::vector<Sequence> targets = std::vector<Sequence>(this->sequences->begin() + row, this->sequences->end());
+			std::vector<MatrixDataType> row_distances = this->sequencer->distanceRow((*this->sequences)[row], targets);
+			std::copy(row_distances.begin(), row_distances.end(), this->distances->begin() + AllPairsScorer::getCondensedIndex(row, row, sequence_count));
+		}
+	};
+
+	EditDistanceProfile::EditDistanceProfile()
+	{
+		this->block_count = 1;
+		this->query_length = 0;
+		this->match_vectors = std::vector<uint64_t>(EDIT_DISTANCE_SYMBOLS, 0);
+	}
+
+	EditDistanceProfile::EditDistanceProfile(const Sequence& query)
+	{
+		this->query_length = query.length();
+		this->block_count = std::max(1, (this->query_length + BLOCK_SIZE - 1) / BLOCK_SIZE);
+		this->match_vectors = std::vector<uint64_t>(EDIT_DISTANCE_SYMBOLS * this->block_count, 0);
+
+		for ( int i = 0; i < this->query_length; i++ )
+		{
+			uint64_t bit = (uint64_t)1 << (i % BLOCK_SIZE);
+			unsigned char upper = (unsigned char)toupper((unsigned char)query[i]);
+			unsigned char lower = (unsigned char)tolower((unsigned char)query[i]);
+			this->match_vectors[upper * this->block_count + i / BLOCK_SIZE] |= bit;
+			this->match_vectors[lower * this->block_count + i / BLOCK_SIZE] |= bit;
+		}
+	}
+
+	EditDistanceProfile::~EditDistanceProfile() {}
+
+	EditDistanceSequencer::EditDistanceSequencer() {}
+
+	EditDistanceSequencer::~EditDistanceSequencer() {}
+
+	MatrixDataType EditDistanceSequencer::distance_word(const EditDistanceProfile& query, const Sequence& target)
+	{
+		// Bit i of the vertical vectors is set if cell (i + 1, j) is one more (positive) or
+		// one less (negative) than cell (i, j). Column 0 counts up from 0 to the query length.
+		uint64_t positive = ~(uint64_t)0;
+		uint64_t negative = 0;
+		uint64_t last_row = (uint64_t)1 << (query.length() - 1);
+		MatrixDataType distance = query.length();
+
+		const char* text = target.c_str();
+		int length = target.length();
+		for ( int j = 0; j < length; j++ )
+		{
+			uint64_t match = query.getVector(text[j])[0];
+			uint64_t vertical = match | negative;
+			uint64_t horizontal = (((match & positive) + positive) ^ positive) | match;
+			uint64_t horizontal_positive = negative | ~(horizontal | positive);
+			uint64_t horizontal_negative = positive & horizontal;
+
+			if ( horizontal_positive & last_row )
+				distance++;
+			else if ( horizontal_negative & last_row )
+				distance--;
+
+			// Row 0 counts up from 0 to the target length, so the difference above row 1 is +1.
+			horizontal_positive = (horizontal_positive << 1) | 1;
+			horizontal_negative = horizontal_negative << 1;
+			positive = horizontal_negative | ~(vertical | horizontal_positive);
+			negative = horizontal_positive & vertical;
+		}
+		return distance;
+	}
+
+	MatrixDataType EditDistanceSequencer::distance_blocks(const EditDistanceProfile& query, const Sequence& target)
+	{
+		int block_count = query.getBlockCount();
+		Utilities::ArenaBuffer<uint64_t> positive(block_count, ~(uint64_t)0);
+		Utilities::ArenaBuffer<uint64_t> negative(block_count, 0);
+		uint64_t last_row = (uint64_t)1 << ((query.length() - 1) % EditDistanceProfile::BLOCK_SIZE);
+		uint64_t high_bit = (uint64_t)1 << (EditDistanceProfile::BLOCK_SIZE - 1);
+		MatrixDataType distance = query.length();
+
+		const char* text = target.c_str();
+		int length = target.length();
+		for ( int j = 0; j < length; j++ )
+		{
+			const uint64_t* match_vector = query.getVector(text[j]);
+
+			// The horizontal difference above the first row of each block, which is the
+			// difference below the last row of the block above it.
+			int difference = 1;
+			for ( int b = 0; b < block_count; b++ )
+			{
+				uint64_t match = match_vector[b];
+				uint64_t vertical = match | negative[b];
+				if ( difference < 0 )
+					match |= 1;
+				uint64_t horizontal = (((match & positive[b]) + positive[b]) ^ positive[b]) | match;
+				uint64_t horizontal_positive = negative[b] | ~(horizontal | positive[b]);
+				uint64_t horizontal_negative = positive[b] & horizontal;
+
+				uint64_t bottom = (b == block_count - 1) ? last_row : high_bit;
+				int difference_in = difference;
+				difference = 0;
+				if ( horizontal_positive & bottom )
+					difference = 1;
+				else if ( horizontal_negative & bottom )
+					difference = -1;
+
+				horizontal_positive = horizontal_positive << 1;
+				horizontal_negative = horizontal_negative << 1;
+				if ( difference_in < 0 )
+					horizontal_negative |= 1;
+				else if ( difference_in > 0 )
+					horizontal_positive |= 1;
+				positive[b] = horizontal_negative | ~(vertical | horizontal_positive);
+				negative[b] = horizontal_positive & vertical;
+			}
+			distance += difference;
+		}
+		return distance;
+	}
+
+	MatrixDataType EditDistanceSequencer::distance(const EditDistanceProfile& query, const Sequence& target)
+	{
+		if ( query.length() == 0 )
+			return target.length();
+		if ( query.getBlockCount() == 1 )
+			return this->distance_word(query, target);
+		return this->distance_blocks(query, target);
+	}
+
+	MatrixDataType EditDistanceSequencer::distance(const Sequence& sequence1, const Sequence& sequence2)
+	{
+		// The distance is symmetric, and the shorter sequence needs the fewest blocks.
+		if ( sequence2.length() < sequence1.length() )
+			return this->distance(EditDistanceProfile(sequence2), sequence1);
+		return this->distance(EditDistanceProfile(sequence1), sequence2);
+	}
+
+	std::vector<MatrixDataType> EditDistanceSequencer::distanceRow(const Sequence& query, const std::vector<Sequence>& targets)
+	{
+		EditDistanceProfile profiled_query = EditDistanceProfile(query);
+		std::vector<MatrixDataType> distances = std::vector<MatrixDataType>(targets.size(), 0);
+		for ( unsigned int t = 0; t < targets.size(); t++ )
+			distances[t] = this->distance(profiled_query, targets[t]);
+		return distances;
+	}
+
+	std::vector<MatrixDataType> EditDistanceSequencer::distances(const std::vector<Sequence>& sequences, const int thread_count)
+	{
+		int sequence_count = sequences.size();
+		std::vector<MatrixDataType> distances = std::vector<MatrixDataType>(AllPairsScorer::getCondensedIndex(sequence_count, sequence_count, sequence_count), 0);
+
+		EditDistanceRowTask task = { this, &sequences, &distances };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(sequence_count, task);
+		return distances;
+	}
+
+	/***************************************TESTS**************************************/
+
+	/**
+	 * Computes the edit distance with the full sequence matrix.
+	 */
+	static MatrixDataType edit_distance_test_distance(const Sequence& sequence1, const Sequence& sequence2)
+	{
+		std::vector<std::vector<MatrixDataType> > matrix = std::vector<std::vector<MatrixDataType> >(sequence1.length() + 1, std::vector<MatrixDataType>(sequence2.length() + 1, 0));
+		for ( int i = 0; i < sequence1.length() + 1; i++ )
+			matrix[i][0] = i;
+		for ( int j = 0; j < sequence2.length() + 1; j++ )
+			matrix[0][j] = j;
+		for ( int i = 1; i < sequence1.length() + 1; i++ )
+		{
+			for ( int j = 1; j < sequence2.length() + 1; j++ )
+			{
+				int substitution = (toupper(sequence1[i-1]) == toupper(sequence2[j-1])) ? 0 : 1;
+				matrix[i][j] = std::min(matrix[i-1][j-1] + substitution, std::min(matrix[i-1][j], matrix[i][j-1]) + 1);
+			}
+		}
+		return matrix[sequence1.length()][sequence2.length()];
+	}
+
+	void EditDistanceSequencer::run_tests()
+	{
+		test_distance();
+		test_distances();
+	}
+
+	void EditDistanceSequencer::test_distance()
+	{
+		srand(1);
+		EditDistanceSequencer es = EditDistanceSequencer();
+		for ( int test = 0; test < 300; test++ )
+		{
+			// Lengths around the block size and several blocks long.
+			int limit = (test % 3 == 0) ? 70 : 300;
+			Sequence sequence1 = test_random_sequence(rand() % limit, "ACGTacgtN");
+			Sequence sequence2 = test_random_sequence(rand() % limit, "ACGTacgtN");
+			MatrixDataType expected = edit_distance_test_distance(sequence1, sequence2);
+			(void)expected;
+			assert(es.distance(sequence1, sequence2) == expected);
+			assert(es.distance(EditDistanceProfile(sequence1), sequence2) == expected);
+			assert(es.distance(EditDistanceProfile(sequence2), sequence1) == expected);
+		}
+
+		Sequence sequence = test_random_sequence(200, "ACGT");
+		assert(es.distance(sequence, sequence) == 0);
+		assert(es.distance(Sequence(""), sequence) == 200);
+		assert(es.distance(sequence, Sequence("")) == 200);
+		assert(es.distance(Sequence("ACGT"), Sequence("acgt")) == 0);
+	}
+
+	void EditDistanceSequencer::test_distances()
+	{
+		srand(2);
+		std::vector<Sequence> sequences;
+		for ( int i = 0; i < 12; i++ )
+			sequences.push_back(test_random_sequence(rand() % 150, "ACGT"));
+
+		EditDistanceSequencer es = EditDistanceSequencer();
+		std::vector<MatrixDataType> distances = es.distances(sequences, 3);
+		for ( int i = 0; i < (int)sequences.size(); i++ )
+		{
+			for ( int j = i; j < (int)sequences.size(); j++ )
+				assert(distances[AllPairsScorer::getCondensedIndex(i, j, sequences.size())] == edit_distance_test_distance(sequences[i], sequences[j]));
+		}
+	}
+}
\ No newline at end of file
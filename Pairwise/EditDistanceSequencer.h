@@ -0,0 +1,159 @@
+#include <vector>
+#include <stdint.h>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___EDITDISTANCESEQUENCER___
+#define ___EDITDISTANCESEQUENCER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The EditDistanceProfile class holds the match vectors of a query used by the
+	 * EditDistanceSequencer. For every character the profile keeps a bit vector with bit i
+	 * set if character i of the query is that character, ignoring case like the
+	 * SubstitutionMatrix. A query longer than 64 characters is split into blocks of 64
+	 * characters, one word of each vector per block.
+	 */
+	class EditDistanceProfile
+	{
+	private:
+		std::vector<uint64_t> match_vectors;
+		int block_count;
+		int query_length;
+
+	public:
+		/**
+		 * The number of characters of the query in a block.
+		 */
+		static const int BLOCK_SIZE = 64;
+
+		/**
+		 * Default Constructor.
+		 */
+		EditDistanceProfile();
+
+		/**
+		 * Creates the profile of a query sequence.
+		 *
+		 * @param query The sequence to profile.
+		 */
+		EditDistanceProfile(const Sequence& query);
+
+		/**
+		 * Default Destructor.
+		 */
+		~EditDistanceProfile();
+
+		/**
+		 * This function returns the length of the profiled query.
+		 *
+		 * @return The length of the query.
+		 */
+		int length() const { return this->query_length; };
+
+		/**
+		 * This function returns the number of blocks of the query.
+		 *
+		 * @return The number of 64 bit words of every match vector.
+		 */
+		int getBlockCount() const { return this->block_count; };
+
+		/**
+		 * This function returns the match vector of a character.
+		 *
+		 * @param character A character of the other sequence.
+		 * @return The first word of the match vector.
+		 */
+		const uint64_t* getVector(const char character) const { return &this->match_vectors[(unsigned char)character * this->block_count]; };
+	};
+
+	/**
+	 * The EditDistanceSequencer class computes the unit-cost edit distance of two sequences,
+	 * the smallest number of substitutions, insertions and deletions that turn one sequence
+	 * into the other, with the bit-parallel algorithm of Myers in the form given by Hyyro
+	 * for the edit distance. Instead of the cells of the sequence matrix the differences
+	 * between neighbouring cells, which are always -1, 0 or +1, are kept as bit vectors, so
+	 * one column of 64 cells is computed with a few word operations. Queries longer than 64
+	 * characters are computed one block of 64 rows after the other, passing the difference
+	 * at the bottom of every block to the block below it.
+	 *
+	 * The distances need no substitution matrix or gap penalties, and can be used as the
+	 * distance matrix of the NeighborJoin directly.
+	 *
+	 * Myers: http://dx.doi.org/10.1145/316542.316550
+	 */
+	class EditDistanceSequencer
+	{
+	private:
+		MatrixDataType distance_word(const EditDistanceProfile& query, const Sequence& target);
+		MatrixDataType distance_blocks(const EditDistanceProfile& query, const Sequence& target);
+
+		//tests
+		void test_distance();
+		void test_distances();
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		EditDistanceSequencer();
+
+		/**
+		 * Default Destructor.
+		 */
+		~EditDistanceSequencer();
+
+		/**
+		 * This function computes the edit distance between a profiled query and a target.
+		 *
+		 * @param query The profile of one of the sequences.
+		 * @param target The other sequence.
+		 * @return The edit distance of the two sequences.
+		 */
+		MatrixDataType distance(const EditDistanceProfile& query, const Sequence& target);
+
+		/**
+		 * This function computes the edit distance between two sequences.
+		 *
+		 * @param sequence1 The first sequence.
+		 * @param sequence2 The second sequence.
+		 * @return The edit distance of the two sequences.
+		 */
+		MatrixDataType distance(const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function computes the edit distance of a query to each of a list of targets,
+		 * profiling the query only once.
+		 *
+		 * @param query The sequence that is compared to every target.
+		 * @param targets The other sequences.
+		 * @return The distance of the query to each target, in the order of the targets.
+		 */
+		std::vector<MatrixDataType> distanceRow(const Sequence& query, const std::vector<Sequence>& targets);
+
+		/**
+		 * This function computes the edit distance of every pair of sequences. The distances
+		 * are stored in the same condensed upper triangle as the scores of the AllPairsScorer,
+		 * and every row of the triangle is computed by one task of a ThreadPool.
+		 *
+		 * @param sequences The list of sequences.
+		 * @param thread_count The number of threads that compute the rows. If the count is 0
+		 * or less, one thread per processor is used.
+		 * @return The condensed upper triangle of the distances, n * (n + 1) / 2 values.
+		 */
+		std::vector<MatrixDataType> distances(const std::vector<Sequence>& sequences, const int thread_count);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,23 @@
+#include "EncodedSequence.h"
+
+namespace Pairwise
+{
+	EncodedSequence::EncodedSequence()
+	{
+		this->first = true;
+	}
+
+	EncodedSequence::EncodedSequence(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence, const bool first)
+	{
+		int sequenceLength = sequence.length();
+		const char* characters = sequence.c_str();
+
+		this->first = first;
+		this->symbols = std::vector<int>(sequenceLength, 0);
+
+		for ( int i = 0; i < sequenceLength; i++ )
+			this->symbols[i] = first ? substitution_matrix.getColumnSymbol(characters[i]) : substitution_matrix.getRowSymbol(characters[i]);
+	}
+
+	EncodedSequence::~EncodedSequence() {}
+}
\ No newline at end of file
@@ -0,0 +1,76 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___ENCODEDSEQUENCE___
+#define ___ENCODEDSEQUENCE___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The EncodedSequence class holds a sequence whose characters have been translated
+	 * once into the symbols of a substitution matrix. A symbol is the position of the
+	 * character's label in the matrix, so the sequencers can read scores directly instead
+	 * of translating every character again for every cell of the sequence matrix.
+	 * Since substitution matrices are not required to be symmetric, a sequence is encoded
+	 * either as the first sequence (column symbols) or as the second sequence (row symbols).
+	 */
+	class EncodedSequence
+	{
+	private:
+		std::vector<int> symbols;
+		bool first;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		EncodedSequence();
+
+		/**
+		 * Encodes a sequence with the symbols of the provided substitution matrix.
+		 *
+		 * @param substitution_matrix The substitution matrix that the symbols belong to.
+		 * @param sequence The sequence to encode.
+		 * @param first If true the sequence is encoded as the first sequence of an
+		 * alignment, otherwise it is encoded as the second sequence.
+		 */
+		EncodedSequence(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence, const bool first);
+
+		/**
+		 * Default Destructor.
+		 */
+		~EncodedSequence();
+
+		/**
+		 * This function returns the length of the encoded sequence.
+		 *
+		 * @return The length of the sequence.
+		 */
+		int length() const { return this->symbols.size(); };
+
+		/**
+		 * This function returns true if the sequence was encoded as the first sequence.
+		 *
+		 * @return True for column symbols, false for row symbols.
+		 */
+		bool isFirst() const { return this->first; };
+
+		/**
+		 * This operator returns the symbol at the provided index.
+		 *
+		 * @param index The index of the symbol to return.
+		 * @return The substitution matrix symbol of the character at the index.
+		 */
+		int operator [] (unsigned int index) const { return this->symbols[index]; };
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,208 @@
+#include <algorithm>
+#include <cassert>
+#include <cctype>
+#include <cstdlib>
+#include <map>
+#include <string>
+#include "KmerDistanceSequencer.h"
+#include "PairwiseTests.h"
+#include "AllPairsScorer.h"
+#include "../Utilities/ThreadPool.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The task of the ThreadPool that computes one row of the triangle.
+	 */
+	struct KmerDistanceRowTask
+	{
+		KmerDistanceSequencer* sequencer;
+		const std::vector<KmerProfile>* profiles;
+		std::vector<MatrixDataType>* distances;
+
+		void operator () (const int row)
+		{
+			int sequence_count = this->profiles->size();
+			int index = AllPairsScorer::getCondensedIndex(row, row, sequence_count);
+			for ( int column = row; column < sequence_count; column++ )
+				(*this->distances)[index++] = this->sequencer->distance((*this->profiles)[row], (*this->profiles)[column]);
+		}
+	};
+
+	KmerProfile::KmerProfile()
+	{
+		this->kmer_count = 0;
+	}
+
+	KmerProfile::KmerProfile(const Sequence& sequence, const int k)
+	{
+		this->kmer_count = std::max(0, sequence.length() - k + 1);
+
+		// Every k-mer is packed with its first character in the highest byte, and the packed
+		// value of the next k-mer shifts out that character and shifts in one more.
+		uint64_t mask = (k < 8) ? (((uint64_t)1 << (8 * k)) - 1) : ~(uint64_t)0;
+		uint64_t kmer = 0;
+		std::vector<uint64_t> packed;
+		packed.reserve(this->kmer_count);
+		for ( int i = 0; i < sequence.length(); i++ )
+		{
+			kmer = ((kmer << 8) | (unsigned char)toupper((unsigned char)sequence[i])) & mask;
+			if ( i >= k - 1 )
+				packed.push_back(kmer);
+		}
+		std::sort(packed.begin(), packed.end());
+
+		for ( unsigned int i = 0; i < packed.size(); i++ )
+		{
+			if ( this->kmers.empty() || this->kmers.back() != packed[i] )
+			{
+				this->kmers.push_back(packed[i]);
+				this->counts.push_back(0);
+			}
+			this->counts.back()++;
+		}
+	}
+
+	KmerProfile::~KmerProfile() {}
+
+	int KmerProfile::countShared(const KmerProfile& other) const
+	{
+		int shared = 0;
+		unsigned int i = 0;
+		unsigned int j = 0;
+		while ( i < this->kmers.size() && j < other.kmers.size() )
+		{
+			if ( this->kmers[i] < other.kmers[j] )
+				i++;
+			else if ( other.kmers[j] < this->kmers[i] )
+				j++;
+			else
+			{
+				shared += std::min(this->counts[i], other.counts[j]);
+				i++;
+				j++;
+			}
+		}
+		return shared;
+	}
+
+	KmerDistanceSequencer::KmerDistanceSequencer(const int k)
+	{
+		int maximum_k = KmerDistanceSequencer::MAXIMUM_K;
+		this->k = std::max(1, std::min(k, maximum_k));
+	}
+
+	KmerDistanceSequencer::~KmerDistanceSequencer() {}
+
+	MatrixDataType KmerDistanceSequencer::distance(const KmerProfile& profile1, const KmerProfile& profile2)
+	{
+		int kmers = std::min(profile1.getKmerCount(), profile2.getKmerCount());
+		if ( kmers == 0 )
+			return DISTANCE_SCALE;
+
+		// The fraction of unshared k-mers, scaled and rounded to the nearest integer.
+		int unshared = kmers - profile1.countShared(profile2);
+		return (DISTANCE_SCALE * unshared + kmers / 2) / kmers;
+	}
+
+	MatrixDataType KmerDistanceSequencer::distance(const Sequence& sequence1, const Sequence& sequence2)
+	{
+		return this->distance(KmerProfile(sequence1, this->k), KmerProfile(sequence2, this->k));
+	}
+
+	std::vector<MatrixDataType> KmerDistanceSequencer::distances(const std::vector<Sequence>& sequences, const int thread_count)
+	{
+		int sequence_count = sequences.size();
+		std::vector<MatrixDataType> distances = std::vector<MatrixDataType>(AllPairsScorer::getCondensedIndex(sequence_count, sequence_count, sequence_count), 0);
+
+		// Every sequence is profiled once, the profiles are shared by all of the rows.
+		std::vector<KmerProfile> profiles = std::vector<KmerProfile>(sequence_count);
+		for ( int i = 0; i < sequence_count; i++ )
+			profiles[i] = KmerProfile(sequences[i], this->k);
+
+		KmerDistanceRowTask task = { this, &profiles, &distances };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(sequence_count, task);
+		return distances;
+	}
+
+	/***************************************TESTS**************************************/
+
+	/**
+	 * Computes the k-mer distance by counting the k-mers of both sequences in maps.
+	 */
+	static MatrixDataType kmer_test_distance(const Sequence& sequence1, const Sequence& sequence2, const int k)
+	{
+		std::string upper1 = std::string(sequence1.c_str());
+		std::string upper2 = std::string(sequence2.c_str());
+		std::transform(upper1.begin(), upper1.end(), upper1.begin(), ::toupper);
+		std::transform(upper2.begin(), upper2.end(), upper2.begin(), ::toupper);
+
+		std::map<std::string, int> counts1;
+		std::map<std::string, int> counts2;
+		for ( int i = 0; i + k <= (int)upper1.size(); i++ )
+			counts1[upper1.substr(i, k)]++;
+		for ( int i = 0; i + k <= (int)upper2.size(); i++ )
+			counts2[upper2.substr(i, k)]++;
+
+		int kmers = std::min(std::max(0, (int)upper1.size() - k + 1), std::max(0, (int)upper2.size() - k + 1));
+		if ( kmers == 0 )
+			return KmerDistanceSequencer::DISTANCE_SCALE;
+
+		int shared = 0;
+		for ( std::map<std::string, int>::iterator it = counts1.begin(); it != counts1.end(); it++ )
+		{
+			if ( counts2.count(it->first) )
+				shared += std::min(it->second, counts2[it->first]);
+		}
+		return (KmerDistanceSequencer::DISTANCE_SCALE * (kmers - shared) + kmers / 2) / kmers;
+	}
+
+	void KmerDistanceSequencer::run_tests()
+	{
+		test_distance();
+		test_distances();
+	}
+
+	void KmerDistanceSequencer::test_distance()
+	{
+		srand(1);
+		for ( int test = 0; test < 300; test++ )
+		{
+			int k = 1 + rand() % KmerDistanceSequencer::MAXIMUM_K;
+			Sequence sequence1 = test_random_sequence(rand() % 200, "ACGTacgt");
+			Sequence sequence2 = test_random_sequence(rand() % 200, (test % 2) ? "ACGT" : "ARNDCQEGHILKMFPSTWYV");
+
+			KmerDistanceSequencer ks = KmerDistanceSequencer(k);
+			MatrixDataType expected = kmer_test_distance(sequence1, sequence2, k);
+			(void)expected;
+			assert(ks.distance(sequence1, sequence2) == expected);
+			assert(ks.distance(sequence2, sequence1) == expected);
+		}
+
+		KmerDistanceSequencer ks = KmerDistanceSequencer(4);
+		Sequence sequence = test_random_sequence(300, "ACGT");
+		assert(ks.distance(sequence, sequence) == 0);
+		assert(ks.distance(Sequence("ACGTACGT"), Sequence("acgtacgt")) == 0);
+		assert(ks.distance(Sequence("AAAAAAAA"), Sequence("CCCCCCCC")) == KmerDistanceSequencer::DISTANCE_SCALE);
+		assert(ks.distance(Sequence("ACG"), Sequence("ACG")) == KmerDistanceSequencer::DISTANCE_SCALE);
+	}
+
+	void KmerDistanceSequencer::test_distances()
+	{
+		srand(2);
+		std::vector<Sequence> sequences;
+		for ( int i = 0; i < 15; i++ )
+			sequences.push_back(test_random_sequence(rand() % 150, "ACGT"));
+
+		KmerDistanceSequencer ks = KmerDistanceSequencer(3);
+		std::vector<MatrixDataType> distances = ks.distances(sequences, 3);
+		for ( int i = 0; i < (int)sequences.size(); i++ )
+		{
+			for ( int j = i; j < (int)sequences.size(); j++ )
+				assert(distances[AllPairsScorer::getCondensedIndex(i, j, sequences.size())] == kmer_test_distance(sequences[i], sequences[j], 3));
+		}
+	}
+}
\ No newline at end of file
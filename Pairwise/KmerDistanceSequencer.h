@@ -0,0 +1,169 @@
+#include <vector>
+#include <stdint.h>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___KMERDISTANCESEQUENCER___
+#define ___KMERDISTANCESEQUENCER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The KmerProfile class holds the k-mers of a sequence used by the KmerDistanceSequencer:
+	 * every distinct substring of k characters, ignoring case like the SubstitutionMatrix,
+	 * with the number of times it occurs. The k-mers are packed into integers of one byte
+	 * per character and kept sorted, so the k-mers two profiles share are found in a single
+	 * pass over both profiles.
+	 */
+	class KmerProfile
+	{
+	private:
+		std::vector<uint64_t> kmers;
+		std::vector<int> counts;
+		int kmer_count;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		KmerProfile();
+
+		/**
+		 * Creates the k-mer profile of a sequence.
+		 *
+		 * @param sequence The sequence to profile.
+		 * @param k The length of the k-mers, from 1 to KmerDistanceSequencer::MAXIMUM_K.
+		 */
+		KmerProfile(const Sequence& sequence, const int k);
+
+		/**
+		 * Default Destructor.
+		 */
+		~KmerProfile();
+
+		/**
+		 * This function returns the number of k-mers of the sequence, counting repeats.
+		 *
+		 * @return The length of the sequence minus k plus one, or 0 for shorter sequences.
+		 */
+		int getKmerCount() const { return this->kmer_count; };
+
+		/**
+		 * This function returns the distinct k-mers of the sequence.
+		 *
+		 * @return The packed k-mers, sorted.
+		 */
+		const std::vector<uint64_t>& getKmers() const { return this->kmers; };
+
+		/**
+		 * This function returns the number of times every distinct k-mer occurs.
+		 *
+		 * @return The counts, in the order of the k-mers.
+		 */
+		const std::vector<int>& getCounts() const { return this->counts; };
+
+		/**
+		 * This function returns the number of k-mers the sequence shares with another
+		 * sequence. A k-mer that occurs a times in one sequence and b times in the other is
+		 * shared min(a, b) times.
+		 *
+		 * @param other The profile of the other sequence, with k-mers of the same length.
+		 * @return The number of shared k-mers.
+		 */
+		int countShared(const KmerProfile& other) const;
+	};
+
+	/**
+	 * The KmerDistanceSequencer class computes alignment-free distances between sequences from
+	 * the k-mers they share, like the k-tuple distances that Clustal and MAFFT use to build
+	 * their guide trees. The distance is the fractional common k-mer count of MUSCLE:
+	 *
+	 *     distance = 1 - shared / min(kmers1, kmers2)
+	 *
+	 * scaled by DISTANCE_SCALE and rounded to an integer, 0 for sequences with the same
+	 * k-mers and DISTANCE_SCALE for sequences that share none. Sequences shorter than k have
+	 * no k-mers, so they share none with any sequence. Every sequence is profiled once, after
+	 * which each pair takes time proportional to the lengths of the sequences instead of
+	 * their product.
+	 */
+	class KmerDistanceSequencer
+	{
+	private:
+		int k;
+
+		//tests
+		void test_distance();
+		void test_distances();
+
+	public:
+		/**
+		 * The longest k-mers that fit the packed integers of the profiles.
+		 */
+		static const int MAXIMUM_K = 8;
+
+		/**
+		 * The length of the k-mers used when none is requested, the k-tuple length of
+		 * Clustal for nucleotide sequences.
+		 */
+		static const int DEFAULT_K = 4;
+
+		/**
+		 * The distance of sequences that share no k-mers.
+		 */
+		static const int DISTANCE_SCALE = 1000;
+
+		/**
+		 * Creates a new k-mer distance sequencer.
+		 *
+		 * @param k The length of the k-mers, from 1 to MAXIMUM_K.
+		 */
+		KmerDistanceSequencer(const int k);
+
+		/**
+		 * Default Destructor.
+		 */
+		~KmerDistanceSequencer();
+
+		/**
+		 * This function computes the k-mer distance between two profiled sequences.
+		 *
+		 * @param profile1 The k-mer profile of the first sequence.
+		 * @param profile2 The k-mer profile of the second sequence.
+		 * @return The k-mer distance of the two sequences.
+		 */
+		MatrixDataType distance(const KmerProfile& profile1, const KmerProfile& profile2);
+
+		/**
+		 * This function computes the k-mer distance between two sequences.
+		 *
+		 * @param sequence1 The first sequence.
+		 * @param sequence2 The second sequence.
+		 * @return The k-mer distance of the two sequences.
+		 */
+		MatrixDataType distance(const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function computes the k-mer distance of every pair of sequences. The distances
+		 * are stored in the same condensed upper triangle as the scores of the AllPairsScorer,
+		 * and every row of the triangle is computed by one task of a ThreadPool.
+		 *
+		 * @param sequences The list of sequences.
+		 * @param thread_count The number of threads that compute the rows. If the count is 0
+		 * or less, one thread per processor is used.
+		 * @return The condensed upper triangle of the distances, n * (n + 1) / 2 values.
+		 */
+		std::vector<MatrixDataType> distances(const std::vector<Sequence>& sequences, const int thread_count);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
@@ -1,13 +1,115 @@
 #include <algorithm>
+#include <cassert>
+#include <cstdlib>
 #include "LinearSequencer.h"
+#include "PairwiseTests.h"
+#include "WavefrontPass.h"
+#include "../Utilities/ArenaBuffer.h"
 
 namespace Pairwise
 {
 	using Sequencing::Sequence;
 
+	/**
+	 * The cell of the serial and the WavefrontPass fill of the sequence matrix, which
+	 * records the traceback pointer of every cell. Every row of pointers starts on a byte
+	 * of its own, and the tiles of one anti-diagonal never share a row, so tiles computed
+	 * concurrently never write the same byte.
+	 */
+	struct LinearSequencer::MatrixCell
+	{
+		static const int STATE_COUNT = 1;
+
+		MatrixDataType gap_penalty;
+		const SubstitutionMatrix* substitution_matrix;
+		const char* sequence1;
+		const char* sequence2;
+		unsigned char* pointers;
+		int row_size;
+
+		inline void operator () (const int r, const int c, const MatrixDataType* diagonal, const MatrixDataType* up, const MatrixDataType* left, MatrixDataType* cell) const
+		{
+			MatrixDataType match = diagonal[0] + this->substitution_matrix->score(this->sequence1[r-1], this->sequence2[c-1]);
+			MatrixDataType remove = up[0] + this->gap_penalty;
+			MatrixDataType insert = left[0] + this->gap_penalty;
+
+			// Ties go to the diagonal, then to the cell above. The pointer is computed without
+			// branches, since which neighbour wins changes too often to be predicted.
+			int from_up = TRACEBACK_UP + (insert > remove);
+			int from = (match < std::max(remove, insert)) * from_up;
+
+			cell[0] = std::max(match, std::max(remove, insert));
+			this->pointers[(size_t)r * this->row_size + c / POINTERS_PER_BYTE] |= (unsigned char)(from << (2 * (c % POINTERS_PER_BYTE)));
+		}
+	};
+
+	/**
+	 * The cell of the WavefrontPass of the forward and backward linear-space passes. The
+	 * backward pass is the forward pass of the reversed sequences.
+	 */
+	struct LinearSequencer::LinearSpaceCell
+	{
+		static const int STATE_COUNT = 1;
+
+		MatrixDataType gap_penalty;
+		const SubstitutionMatrix* substitution_matrix;
+		const Sequence* sequence1;
+		const Sequence* sequence2;
+		int i0;
+		int i1;
+		int j0;
+		int j1;
+		bool reverse;
+
+		inline void operator () (const int r, const int c, const MatrixDataType* diagonal, const MatrixDataType* up, const MatrixDataType* left, MatrixDataType* cell) const
+		{
+			int substitution = 0;
+			if ( this->reverse )
+				substitution = this->substitution_matrix->score((*this->sequence1)[this->i1 - r], (*this->sequence2)[this->j1 - c]);
+			else
+				substitution = this->substitution_matrix->score((*this->sequence1)[this->i0 + r - 1], (*this->sequence2)[this->j0 + c - 1]);
+
+			MatrixDataType best = std::max(diagonal[0] + substitution, up[0] + this->gap_penalty);
+			cell[0] = std::max(best, left[0] + this->gap_penalty);
+		}
+	};
+
+	/**
+	 * The cell of the WavefrontPass of the searches for the end and the start of a local
+	 * alignment. The search for the end runs forward over the local sequence matrix, and the
+	 * search for the start runs backward from the end like the backward linear-space pass.
+	 * The first cell with the highest score of every row is kept. The tiles of one
+	 * anti-diagonal never share a row and the tiles of a row are computed from left to
+	 * right, so the cells are found in the same order as by the passes that are not tiled.
+	 */
+	struct LinearSequencer::LocalSearchCell
+	{
+		static const int STATE_COUNT = 1;
+
+		LinearSpaceCell pass;
+		MatrixDataType* row_scores;
+		int* row_columns;
+
+		inline void operator () (const int r, const int c, const MatrixDataType* diagonal, const MatrixDataType* up, const MatrixDataType* left, MatrixDataType* cell) const
+		{
+			this->pass(r, c, diagonal, up, left, cell);
+			if ( this->pass.reverse == false )
+				cell[0] = std::max(cell[0], 0);
+
+			if ( cell[0] > this->row_scores[r] )
+			{
+				this->row_scores[r] = cell[0];
+				this->row_columns[r] = c;
+			}
+		}
+	};
+
 	LinearSequencer::LinearSequencer(int new_gap_penalty)
 	{
 		this->gap_penalty = new_gap_penalty;
+		this->wavefront = false;
+		this->wavefront_tile_size = 0;
+		this->wavefront_thread_count = 1;
 	}
 
 	LinearSequencer::~LinearSequencer() {}
@@ -25,133 +127,477 @@ namespace Pairwise
 		return std::max(a, b);
 	}
 
-	std::vector<std::vector<MatrixDataType> > LinearSequencer::sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	inline int LinearSequencer::pointer_row_size(const int columns)
 	{
-		int sequence1Length = sequence1.length();
-		int sequence2Length = sequence2.length();
+		return columns / POINTERS_PER_BYTE + 1;
+	}
 
-		std::vector<std::vector<MatrixDataType> > sequence_matrix = std::vector<std::vector<MatrixDataType> >(sequence1Length + 1, std::vector<MatrixDataType>(sequence2Length + 1, 0));
+	MatrixDataType LinearSequencer::sequence_matrix_create(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool tiled, unsigned char* pointers)
+	{
+		int rows = i1 - i0;
+		int columns = j1 - j0;
+		MatrixCell cell = { this->gap_penalty, &substitution_matrix, sequence1.c_str() + i0, sequence2.c_str() + j0, pointers, this->pointer_row_size(columns) };
 
-		for ( int i = 1; i < sequence1Length + 1; i++ )
-			global ? sequence_matrix[i][0] = this->gap_penalty * i : sequence_matrix[i][0] = 0;
-		for ( int j = 1; j < sequence2Length + 1; j++ )
-			global ? sequence_matrix[0][j] = this->gap_penalty * j : sequence_matrix[0][j] = 0;
+		if ( tiled == true )
+		{
+			std::vector<MatrixDataType> first_row = std::vector<MatrixDataType>(columns + 1, 0);
+			std::vector<MatrixDataType> first_column = std::vector<MatrixDataType>(rows + 1, 0);
+			for ( int c = 1; c < columns + 1; c++ )
+				first_row[c] = this->gap_penalty * c;
+			for ( int r = 1; r < rows + 1; r++ )
+				first_column[r] = this->gap_penalty * r;
 
-		for ( int i = 1; i < sequence1Length + 1; i++ )
+			Utilities::Wavefront wavefront = Utilities::Wavefront(this->wavefront_tile_size, this->wavefront_thread_count);
+			WavefrontPass<MatrixCell> pass = WavefrontPass<MatrixCell>(cell, rows, columns, first_row, first_column);
+			std::vector<MatrixDataType> last_row;
+			pass.run(wavefront, last_row);
+			return last_row[columns];
+		}
+
+		Utilities::ArenaBuffer<MatrixDataType> scores((columns + 1) * 2, 0);
+		MatrixDataType* previous_row = scores.get();
+		MatrixDataType* current_row = previous_row + columns + 1;
+
+		for ( int c = 1; c < columns + 1; c++ )
+			previous_row[c] = this->gap_penalty * c;
+
+		for ( int r = 1; r < rows + 1; r++ )
 		{
-			for ( int j = 1; j < sequence2Length + 1; j++ )
+			current_row[0] = this->gap_penalty * r;
+			for ( int c = 1; c < columns + 1; c++ )
+				cell(r, c, previous_row + c - 1, previous_row + c, current_row + c - 1, current_row + c);
+
+			std::swap(previous_row, current_row);
+		}
+
+		return previous_row[columns];
+	}
+
+	void LinearSequencer::sequence_matrix_traceback(const unsigned char* pointers, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		std::string block_sequence1;
+		std::string block_sequence2;
+		int row_size = this->pointer_row_size(j1 - j0);
+		int i = i1 - i0;
+		int j = j1 - j0;
+
+		while ( i > 0 && j > 0 )
+		{
+			int from = (pointers[(size_t)i * row_size + j / POINTERS_PER_BYTE] >> (2 * (j % POINTERS_PER_BYTE))) & 3;
+
+			if ( from == TRACEBACK_DIAGONAL )
 			{
-				int match = sequence_matrix[i-1][j-1] + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1]));
-				int remove = sequence_matrix[i-1][j] + this->gap_penalty;
-				int insert = sequence_matrix[i][j-1] + this->gap_penalty;
-				if ( global == true )
-					sequence_matrix[i][j] = this->max(match, remove, insert);
-				else
-					sequence_matrix[i][j] = this->max(match, remove, insert, 0);
+				block_sequence1 += sequence1[i0+i-1];
+				block_sequence2 += sequence2[j0+j-1];
+				i--;
+				j--;
+			}
+			else if ( from == TRACEBACK_UP )
+			{
+				block_sequence1 += sequence1[i0+i-1];
+				block_sequence2 += substitution_matrix.getGapCharacter();
+				i--;
+			}
+			else
+			{
+				block_sequence1 += substitution_matrix.getGapCharacter();
+				block_sequence2 += sequence2[j0+j-1];
+				j--;
 			}
 		}
-		
-		return sequence_matrix;
+
+		while ( i > 0 )
+		{
+			block_sequence1 += sequence1[i0+i-1];
+			block_sequence2 += substitution_matrix.getGapCharacter();
+			i--;
+		}
+
+		while ( j > 0 )
+		{
+			block_sequence1 += substitution_matrix.getGapCharacter();
+			block_sequence2 += sequence2[j0+j-1];
+			j--;
+		}
+
+		// The characters were appended from the end of the alignment backwards.
+		aligned_sequence1.append(block_sequence1.rbegin(), block_sequence1.rend());
+		aligned_sequence2.append(block_sequence2.rbegin(), block_sequence2.rend());
 	}
 
-	PairwiseAlignment LinearSequencer::sequence_matrix_traceback(const bool global, std::vector<std::vector<MatrixDataType> >& sequence_matrix, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	PairwiseAlignment LinearSequencer::sequence_local(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
 	{
 		std::string aligned_sequence1;
 		std::string aligned_sequence2;
+		int alignment_start1 = 0;
+		int alignment_start2 = 0;
+		int i_end = 0;
+		int j_end = 0;
+		MatrixDataType highest_score = this->linear_space_local_end(substitution_matrix, sequence1, sequence2, i_end, j_end);
+
+		// Between its start and its end the local alignment is the global alignment of the
+		// aligned parts of the sequences, so only that block of the matrix is filled.
+		if ( highest_score > 0 )
+		{
+			int i_start = 0;
+			int j_start = 0;
+			this->linear_space_local_start(substitution_matrix, sequence1, sequence2, i_end, j_end, i_start, j_start);
+			this->linear_space_block(substitution_matrix, sequence1, sequence2, i_start, i_end, j_start, j_end, aligned_sequence1, aligned_sequence2);
+			alignment_start1 = i_start;
+			alignment_start2 = j_start;
+		}
+
+		PairwiseAlignment alignment = PairwiseAlignment(aligned_sequence1, aligned_sequence2, highest_score);
+		alignment.setStart(alignment_start1, alignment_start2);
+		return alignment;
+	}
+
+	MatrixDataType LinearSequencer::score_rows(const bool global, const ScoreProfile& inner, const EncodedSequence& outer)
+	{
+		int outerLength = outer.length();
+		int innerLength = inner.length();
 
-		int i = 0;
-		int j = 0;
+		Utilities::ArenaBuffer<MatrixDataType> rows((innerLength + 1) * 2, 0);
+		MatrixDataType* previous_row = rows.get();
+		MatrixDataType* current_row = previous_row + innerLength + 1;
 		MatrixDataType highest_score = 0;
 
 		if ( global == true )
+			for ( int k = 1; k < innerLength + 1; k++ )
+				previous_row[k] = this->gap_penalty * k;
+
+		for ( int t = 1; t < outerLength + 1; t++ )
 		{
-			i = sequence1.length();
-			j = sequence2.length();
+			// The profile row holds the scores of the current outer character against every
+			// inner character, in the order of the original sequences.
+			const MatrixDataType* substitution = inner.getRow(outer[t-1]);
+			global ? current_row[0] = this->gap_penalty * t : current_row[0] = 0;
+
+			for ( int k = 1; k < innerLength + 1; k++ )
+			{
+				int match = previous_row[k-1] + substitution[k-1];
+				int remove = previous_row[k] + this->gap_penalty;
+				int insert = current_row[k-1] + this->gap_penalty;
+				if ( global == true )
+					current_row[k] = this->max(match, remove, insert);
+				else
+				{
+					current_row[k] = this->max(match, remove, insert, 0);
+					if ( current_row[k] > highest_score )
+						highest_score = current_row[k];
+				}
+			}
+
+			std::swap(previous_row, current_row);
 		}
-		else
-			this->getHighestScore(sequence_matrix, i, j);
 
-		highest_score = sequence_matrix[i][j];
+		if ( global == true )
+			return previous_row[innerLength];
+		return highest_score;
+	}
+
+	MatrixDataType LinearSequencer::score(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	{
+		// Invalid input is scored the same way sequence() scores it.
+		if ( sequence1.length() == 0 || sequence2.length() == 0 )
+			return 0;
 
-		while ( i > 0 && j > 0 )
+		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return 0;
+
+		if ( sequence2.length() <= sequence1.length() )
+			return this->score_rows(global, ScoreProfile(substitution_matrix, sequence2, false), EncodedSequence(substitution_matrix, sequence1, true));
+		return this->score_rows(global, ScoreProfile(substitution_matrix, sequence1, true), EncodedSequence(substitution_matrix, sequence2, false));
+	}
+
+	MatrixDataType LinearSequencer::score(const bool global, const ScoreProfile& query, const EncodedSequence& target)
+	{
+		if ( query.length() == 0 || target.length() == 0 || query.isFirst() == target.isFirst() )
+			return 0;
+
+		return this->score_rows(global, query, target);
+	}
+
+	void LinearSequencer::linear_space_forward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::vector<MatrixDataType>& row)
+	{
+		if ( this->wavefront == true )
 		{
-			MatrixDataType score = sequence_matrix[i][j];
-			if ( global == false && score == 0 ) break;
+			this->linear_space_wavefront(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, false, row);
+			return;
+		}
 
-			MatrixDataType diag = sequence_matrix[i-1][j-1];
-			MatrixDataType up = sequence_matrix[i][j-1];
-			MatrixDataType left = sequence_matrix[i-1][j];
+		int columns = j1 - j0;
+		row = std::vector<MatrixDataType>(columns + 1, 0);
 
-			if ( score == diag + substitution_matrix.score(toupper(sequence1[i-1]), toupper(sequence2[j-1])) )
+		for ( int k = 1; k < columns + 1; k++ )
+			row[k] = this->gap_penalty * k;
+
+		for ( int i = i0 + 1; i < i1 + 1; i++ )
+		{
+			MatrixDataType diagonal = row[0];
+			row[0] = this->gap_penalty * (i - i0);
+
+			for ( int k = 1; k < columns + 1; k++ )
 			{
-				aligned_sequence1 += sequence1[i-1];
-				aligned_sequence2 += sequence2[j-1];
-				i--;
-				j--;
+				MatrixDataType up = row[k];
+				int match = diagonal + substitution_matrix.score(sequence1[i-1], sequence2[j0+k-1]);
+				row[k] = this->max(match, up + this->gap_penalty, row[k-1] + this->gap_penalty);
+				diagonal = up;
 			}
-			else if ( score == left + this->gap_penalty )
+		}
+	}
+
+	void LinearSequencer::linear_space_backward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::vector<MatrixDataType>& row)
+	{
+		if ( this->wavefront == true )
+		{
+			this->linear_space_wavefront(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, true, row);
+			return;
+		}
+
+		int columns = j1 - j0;
+		row = std::vector<MatrixDataType>(columns + 1, 0);
+
+		for ( int k = columns - 1; k >= 0; k-- )
+			row[k] = this->gap_penalty * (columns - k);
+
+		for ( int i = i1 - 1; i >= i0; i-- )
+		{
+			MatrixDataType diagonal = row[columns];
+			row[columns] = this->gap_penalty * (i1 - i);
+
+			for ( int k = columns - 1; k >= 0; k-- )
 			{
-				aligned_sequence1 += sequence1[i-1];
-				aligned_sequence2 += substitution_matrix.getGapCharacter();
-				i--;
+				MatrixDataType down = row[k];
+				int match = diagonal + substitution_matrix.score(sequence1[i], sequence2[j0+k]);
+				row[k] = this->max(match, down + this->gap_penalty, row[k+1] + this->gap_penalty);
+				diagonal = down;
 			}
-			else
+		}
+	}
+
+	void LinearSequencer::linear_space_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool reverse, std::vector<MatrixDataType>& row)
+	{
+		int rows = i1 - i0;
+		int columns = j1 - j0;
+		std::vector<MatrixDataType> first_row = std::vector<MatrixDataType>(columns + 1, 0);
+		std::vector<MatrixDataType> first_column = std::vector<MatrixDataType>(rows + 1, 0);
+
+		for ( int k = 1; k < columns + 1; k++ )
+			first_row[k] = this->gap_penalty * k;
+		for ( int r = 1; r < rows + 1; r++ )
+			first_column[r] = this->gap_penalty * r;
+
+		LinearSpaceCell cell = { this->gap_penalty, &substitution_matrix, &sequence1, &sequence2, i0, i1, j0, j1, reverse };
+		Utilities::Wavefront wavefront = Utilities::Wavefront(this->wavefront_tile_size, this->wavefront_thread_count);
+		WavefrontPass<LinearSpaceCell> pass = WavefrontPass<LinearSpaceCell>(cell, rows, columns, first_row, first_column);
+		pass.run(wavefront, row);
+
+		if ( reverse == true )
+			std::reverse(row.begin(), row.end());
+	}
+
+	MatrixDataType LinearSequencer::linear_space_block(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		Utilities::ArenaBuffer<unsigned char> pointers((size_t)(i1 - i0 + 1) * this->pointer_row_size(j1 - j0), 0);
+		MatrixDataType score = this->sequence_matrix_create(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, false, pointers.get());
+		this->sequence_matrix_traceback(pointers.get(), substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, aligned_sequence1, aligned_sequence2);
+		return score;
+	}
+
+	MatrixDataType LinearSequencer::linear_space_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2)
+	{
+		if ( i1 - i0 <= 1 || j1 - j0 + 1 <= LINEAR_SPACE_BLOCK_SIZE / (i1 - i0 + 1) )
+			return this->linear_space_block(substitution_matrix, sequence1, sequence2, i0, i1, j0, j1, aligned_sequence1, aligned_sequence2);
+
+		// The optimal path crosses the middle row at the column that maximizes the score of
+		// the upper half ending there plus the score of the lower half starting there.
+		int middle = (i0 + i1) / 2;
+		int split = j0;
+		{
+			std::vector<MatrixDataType> forward;
+			std::vector<MatrixDataType> backward;
+			this->linear_space_forward(substitution_matrix, sequence1, sequence2, i0, middle, j0, j1, forward);
+			this->linear_space_backward(substitution_matrix, sequence1, sequence2, middle, i1, j0, j1, backward);
+
+			MatrixDataType best_score = forward[0] + backward[0];
+			for ( int k = 1; k < j1 - j0 + 1; k++ )
 			{
-				aligned_sequence1 += substitution_matrix.getGapCharacter();
-				aligned_sequence2 += sequence2[j-1];
-				j--;
+				if ( forward[k] + backward[k] > best_score )
+				{
+					best_score = forward[k] + backward[k];
+					split = j0 + k;
+				}
 			}
 		}
 
-		if ( global == true )
+		MatrixDataType upper_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, i0, middle, j0, split, aligned_sequence1, aligned_sequence2);
+		MatrixDataType lower_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, middle, i1, split, j1, aligned_sequence1, aligned_sequence2);
+		return upper_score + lower_score;
+	}
+
+	MatrixDataType LinearSequencer::linear_space_local_end(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int& i_end, int& j_end)
+	{
+		if ( this->wavefront == true )
+			return this->linear_space_local_wavefront(substitution_matrix, sequence1, sequence2, sequence1.length(), sequence2.length(), false, i_end, j_end);
+
+		int sequence1Length = sequence1.length();
+		int sequence2Length = sequence2.length();
+		std::vector<MatrixDataType> row = std::vector<MatrixDataType>(sequence2Length + 1, 0);
+		ScoreProfile profile = ScoreProfile(substitution_matrix, sequence2, false);
+		EncodedSequence encoded = EncodedSequence(substitution_matrix, sequence1, true);
+		MatrixDataType highest_score = 0;
+
+		i_end = 0;
+		j_end = 0;
+
+		for ( int i = 1; i < sequence1Length + 1; i++ )
 		{
-			while ( i > 0 )
+			MatrixDataType diagonal = row[0];
+			const MatrixDataType* substitution = profile.getRow(encoded[i-1]);
+
+			for ( int j = 1; j < sequence2Length + 1; j++ )
 			{
-				aligned_sequence1 += sequence1[i-1];
-				aligned_sequence2 += substitution_matrix.getGapCharacter();
-				i--;
+				MatrixDataType up = row[j];
+				int match = diagonal + substitution[j-1];
+				row[j] = this->max(match, up + this->gap_penalty, row[j-1] + this->gap_penalty, 0);
+				diagonal = up;
+
+				// The first cell with the highest score, row by row, ends the alignment.
+				if ( row[j] > highest_score )
+				{
+					highest_score = row[j];
+					i_end = i;
+					j_end = j;
+				}
 			}
+		}
+
+		return highest_score;
+	}
+
+	void LinearSequencer::linear_space_local_start(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i_end, int j_end, int& i_start, int& j_start)
+	{
+		if ( this->wavefront == true )
+		{
+			this->linear_space_local_wavefront(substitution_matrix, sequence1, sequence2, i_end, j_end, true, i_start, j_start);
+			return;
+		}
+
+		// The local alignment ending at the end cell starts where the global score of the
+		// remaining suffixes is the highest. The cell closest to the end cell is used, which
+		// gives the shortest of the equally scored alignments.
+		std::vector<MatrixDataType> row;
+		row = std::vector<MatrixDataType>(j_end + 1, 0);
+		for ( int k = j_end - 1; k >= 0; k-- )
+			row[k] = this->gap_penalty * (j_end - k);
+
+		ScoreProfile profile = ScoreProfile(substitution_matrix, sequence2, false);
+		EncodedSequence encoded = EncodedSequence(substitution_matrix, sequence1, true);
 
-			while ( j > 0 )
+		MatrixDataType highest_score = row[j_end];
+		i_start = i_end;
+		j_start = j_end;
+
+		for ( int i = i_end - 1; i >= 0; i-- )
+		{
+			MatrixDataType diagonal = row[j_end];
+			const MatrixDataType* substitution = profile.getRow(encoded[i]);
+			row[j_end] = this->gap_penalty * (i_end - i);
+
+			for ( int k = j_end - 1; k >= 0; k-- )
 			{
-				aligned_sequence1 += substitution_matrix.getGapCharacter();
-				aligned_sequence2 += sequence1[j-1];
-				j--;
+				MatrixDataType down = row[k];
+				int match = diagonal + substitution[k];
+				row[k] = this->max(match, down + this->gap_penalty, row[k+1] + this->gap_penalty);
+				diagonal = down;
+
+				if ( row[k] > highest_score )
+				{
+					highest_score = row[k];
+					i_start = i;
+					j_start = k;
+				}
 			}
 		}
-		
+	}
 
-		std::string aligned_sequence1Reverse(aligned_sequence1.begin(), aligned_sequence1.end());
-		std::reverse(aligned_sequence1Reverse.begin(), aligned_sequence1Reverse.end());
+	MatrixDataType LinearSequencer::linear_space_local_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i1, int j1, const bool reverse, int& i_best, int& j_best)
+	{
+		// The search for the start scores the suffixes that end at the end cell globally,
+		// the same way as the backward linear-space pass.
+		std::vector<MatrixDataType> first_row = std::vector<MatrixDataType>(j1 + 1, 0);
+		std::vector<MatrixDataType> first_column = std::vector<MatrixDataType>(i1 + 1, 0);
+		if ( reverse == true )
+		{
+			for ( int c = 1; c < j1 + 1; c++ )
+				first_row[c] = this->gap_penalty * c;
+			for ( int r = 1; r < i1 + 1; r++ )
+				first_column[r] = this->gap_penalty * r;
+		}
 
-		std::string aligned_sequence2Reverse(aligned_sequence2.begin(), aligned_sequence2.end());
-		std::reverse(aligned_sequence2Reverse.begin(), aligned_sequence2Reverse.end());
+		Utilities::ArenaBuffer<MatrixDataType> row_scores(i1 + 1, 0);
+		Utilities::ArenaBuffer<int> row_columns(i1 + 1, 0);
+		LinearSpaceCell pass = { this->gap_penalty, &substitution_matrix, &sequence1, &sequence2, 0, i1, 0, j1, reverse };
+		LocalSearchCell cell = { pass, row_scores.get(), row_columns.get() };
+		Utilities::Wavefront wavefront = Utilities::Wavefront(this->wavefront_tile_size, this->wavefront_thread_count);
+		WavefrontPass<LocalSearchCell> search = WavefrontPass<LocalSearchCell>(cell, i1, j1, first_row, first_column);
+		std::vector<MatrixDataType> last_row;
+		search.run(wavefront, last_row);
 
-		PairwiseAlignment alignment = PairwiseAlignment(aligned_sequence1Reverse, aligned_sequence2Reverse, highest_score);
-		return alignment;
+		MatrixDataType highest_score = 0;
+		int r_best = 0;
+		int c_best = 0;
+		for ( int r = 1; r < i1 + 1; r++ )
+		{
+			if ( row_scores[r] > highest_score )
+			{
+				highest_score = row_scores[r];
+				r_best = r;
+				c_best = row_columns[r];
+			}
+		}
+
+		i_best = reverse ? i1 - r_best : r_best;
+		j_best = reverse ? j1 - c_best : c_best;
+		return highest_score;
 	}
 
-	void LinearSequencer::getHighestScore(std::vector<std::vector<MatrixDataType> >& sequence_matrix, int& i_index, int& j_index)
+	PairwiseAlignment LinearSequencer::sequenceLinearSpace(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
 	{
-		MatrixDataType highest_i_score = 0;
-		MatrixDataType highest_j_score = 0;
+		if ( sequence1.length() == 0 || sequence2.length() == 0 || substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return this->sequence(global, substitution_matrix, sequence1, sequence2);
+
+		std::string aligned_sequence1;
+		std::string aligned_sequence2;
 		MatrixDataType highest_score = 0;
+		int alignment_start1 = 0;
+		int alignment_start2 = 0;
 
-		for ( unsigned int i = 0; i < sequence_matrix.size(); i++ )
+		if ( global == true )
+		{
+			highest_score = this->linear_space_align(substitution_matrix, sequence1, sequence2, 0, sequence1.length(), 0, sequence2.length(), aligned_sequence1, aligned_sequence2);
+		}
+		else
 		{
-			for ( unsigned int j = 0; j < sequence_matrix[i].size(); j++ )
+			int i_end = 0;
+			int j_end = 0;
+			highest_score = this->linear_space_local_end(substitution_matrix, sequence1, sequence2, i_end, j_end);
+
+			if ( highest_score > 0 )
 			{
-				if ( sequence_matrix[i][j] > highest_score )
-				{
-					highest_score = sequence_matrix[i][j];
-					highest_i_score = i;
-					highest_j_score = j;
-				}
+				int i_start = 0;
+				int j_start = 0;
+				this->linear_space_local_start(substitution_matrix, sequence1, sequence2, i_end, j_end, i_start, j_start);
+				this->linear_space_align(substitution_matrix, sequence1, sequence2, i_start, i_end, j_start, j_end, aligned_sequence1, aligned_sequence2);
+				alignment_start1 = i_start;
+				alignment_start2 = j_start;
 			}
 		}
 
-		i_index = highest_i_score;
-		j_index = highest_j_score;
+		PairwiseAlignment alignment = PairwiseAlignment(aligned_sequence1, aligned_sequence2, highest_score);
+		alignment.setStart(alignment_start1, alignment_start2);
+		return alignment;
 	}
 
 	PairwiseAlignment LinearSequencer::sequence(const bool global, const Pairwise::SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
@@ -175,7 +621,100 @@ namespace Pairwise
 		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
 			return PairwiseAlignment(Sequence("Sequence must be evaluated against a valid matrix"), Sequence("Sequence must be evaluated against a valid matrix"), 0);
 
-		std::vector<std::vector<MatrixDataType> > sequence_matrix = this->sequence_matrix_create(global, substitution_matrix, sequence1, sequence2);
-		return this->sequence_matrix_traceback(global, sequence_matrix, substitution_matrix, sequence1, sequence2);
+		if ( global == false )
+			return this->sequence_local(substitution_matrix, sequence1, sequence2);
+
+		std::string aligned_sequence1;
+		std::string aligned_sequence2;
+		int sequence1Length = sequence1.length();
+		int sequence2Length = sequence2.length();
+		Utilities::ArenaBuffer<unsigned char> pointers((size_t)(sequence1Length + 1) * this->pointer_row_size(sequence2Length), 0);
+		MatrixDataType highest_score = this->sequence_matrix_create(substitution_matrix, sequence1, sequence2, 0, sequence1Length, 0, sequence2Length, this->wavefront, pointers.get());
+		this->sequence_matrix_traceback(pointers.get(), substitution_matrix, sequence1, sequence2, 0, sequence1Length, 0, sequence2Length, aligned_sequence1, aligned_sequence2);
+		return PairwiseAlignment(aligned_sequence1, aligned_sequence2, highest_score);
+	}
+
+	void LinearSequencer::setWavefront(const int tile_size, const int thread_count)
+	{
+		this->wavefront = true;
+		this->wavefront_tile_size = tile_size;
+		this->wavefront_thread_count = thread_count;
+	}
+
+	/***************************************TESTS**************************************/
+
+	void LinearSequencer::run_tests()
+	{
+		test_local();
+		test_wavefront();
+	}
+
+	void LinearSequencer::test_local()
+	{
+		srand(14);
+		for ( int test = 0; test < 60; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 300, "ACGT");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 300, "ACGT");
+			int gap_penalty = -(rand() % 6);
+			LinearSequencer ls = LinearSequencer(gap_penalty);
+
+			// The local alignment aligns a substring of each sequence and scores exactly the
+			// best score of the local sequence matrix.
+			PairwiseAlignment local = ls.sequence(false, sm, sequence1, sequence2);
+			std::string aligned_sequence1 = local.getSequence(0).c_str();
+			std::string aligned_sequence2 = local.getSequence(1).c_str();
+			assert(local.getScore() == ls.score(false, sm, sequence1, sequence2));
+			assert(local.getScore() == ls.sequenceLinearSpace(false, sm, sequence1, sequence2).getScore());
+			if ( local.getScore() == 0 )
+				continue;
+
+			MatrixDataType score = 0;
+			for ( unsigned int k = 0; k < aligned_sequence1.size(); k++ )
+			{
+				if ( aligned_sequence1[k] == sm.getGapCharacter() || aligned_sequence2[k] == sm.getGapCharacter() )
+					score += gap_penalty;
+				else
+					score += sm.score(aligned_sequence1[k], aligned_sequence2[k]);
+			}
+			assert(score == local.getScore());
+
+			aligned_sequence1.erase(std::remove(aligned_sequence1.begin(), aligned_sequence1.end(), sm.getGapCharacter()), aligned_sequence1.end());
+			aligned_sequence2.erase(std::remove(aligned_sequence2.begin(), aligned_sequence2.end(), sm.getGapCharacter()), aligned_sequence2.end());
+			assert(std::string(sequence1.c_str()).find(aligned_sequence1) != std::string::npos);
+			assert(std::string(sequence2.c_str()).find(aligned_sequence2) != std::string::npos);
+		}
+	}
+
+	void LinearSequencer::test_wavefront()
+	{
+		srand(11);
+		for ( int test = 0; test < 30; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 300, "ACGT");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 300, "ACGT");
+			int gap_penalty = -(rand() % 6);
+
+			LinearSequencer serial = LinearSequencer(gap_penalty);
+			LinearSequencer tiled = LinearSequencer(gap_penalty);
+			tiled.setWavefront(1 + rand() % 40, 1 + rand() % 4);
+
+			for ( int global = 0; global < 2; global++ )
+			{
+				PairwiseAlignment expected = serial.sequence(global, sm, sequence1, sequence2);
+				PairwiseAlignment actual = tiled.sequence(global, sm, sequence1, sequence2);
+				assert(expected.getScore() == actual.getScore());
+				assert(std::string(expected.getSequence(0).c_str()) == actual.getSequence(0).c_str());
+				assert(std::string(expected.getSequence(1).c_str()) == actual.getSequence(1).c_str());
+
+				expected = serial.sequenceLinearSpace(global, sm, sequence1, sequence2);
+				actual = tiled.sequenceLinearSpace(global, sm, sequence1, sequence2);
+				assert(expected.getScore() == actual.getScore());
+				assert(std::string(expected.getSequence(0).c_str()) == actual.getSequence(0).c_str());
+				assert(std::string(expected.getSequence(1).c_str()) == actual.getSequence(1).c_str());
+			}
+		}
 	}
 }
\ No newline at end of file
@@ -22,13 +22,47 @@ namespace Pairwise
 	private:
 		MatrixDataType gap_penalty;
 		bool global;
+		bool wavefront;
+		int wavefront_tile_size;
+		int wavefront_thread_count;
+
+		/**
+		 * The traceback pointers of the sequence matrix, which name the neighbour that the
+		 * best path into a cell comes from. A pointer takes two bits, so one byte holds the
+		 * pointers of POINTERS_PER_BYTE cells of a row. The fill relies on TRACEBACK_DIAGONAL
+		 * being 0 and TRACEBACK_LEFT following TRACEBACK_UP.
+		 */
+		const static int TRACEBACK_DIAGONAL = 0;
+		const static int TRACEBACK_UP = 1;
+		const static int TRACEBACK_LEFT = 2;
+		const static int POINTERS_PER_BYTE = 4;
+
+		struct MatrixCell;
+		struct LinearSpaceCell;
+		struct LocalSearchCell;
 
 		inline MatrixDataType max(const MatrixDataType x, const MatrixDataType y, const MatrixDataType z);
 		inline MatrixDataType max(const MatrixDataType w, const MatrixDataType x, const MatrixDataType y, const MatrixDataType z);
 		
-		std::vector<std::vector<MatrixDataType> > sequence_matrix_create(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
-		void getHighestScore(std::vector<std::vector<MatrixDataType> >& sequence_matrix, int& i_index, int& j_index);
-		PairwiseAlignment sequence_matrix_traceback(const bool global, std::vector<std::vector<MatrixDataType> >& sequence_matrix, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+		inline int pointer_row_size(const int columns);
+		MatrixDataType sequence_matrix_create(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool tiled, unsigned char* pointers);
+		void sequence_matrix_traceback(const unsigned char* pointers, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2);
+		PairwiseAlignment sequence_local(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+		MatrixDataType score_rows(const bool global, const ScoreProfile& inner, const EncodedSequence& outer);
+
+		const static int LINEAR_SPACE_BLOCK_SIZE = 4096;
+		void linear_space_forward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::vector<MatrixDataType>& row);
+		void linear_space_backward(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::vector<MatrixDataType>& row);
+		void linear_space_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, const bool reverse, std::vector<MatrixDataType>& row);
+		MatrixDataType linear_space_block(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2);
+		MatrixDataType linear_space_align(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i0, int i1, int j0, int j1, std::string& aligned_sequence1, std::string& aligned_sequence2);
+		MatrixDataType linear_space_local_end(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int& i_end, int& j_end);
+		void linear_space_local_start(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i_end, int j_end, int& i_start, int& j_start);
+		MatrixDataType linear_space_local_wavefront(const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2, int i1, int j1, const bool reverse, int& i_best, int& j_best);
+
+		//tests
+		void test_local();
+		void test_wavefront();
 	
 	protected:
 
@@ -51,6 +85,17 @@ namespace Pairwise
 		 * This function sequences two sequences based on the linear scoring 
 		 * scheme using a substitution matrix.
 		 *
+		 * The sequence matrix is filled keeping only two rows of scores and a two bit
+		 * traceback pointer for every cell, and the alignment is traced back by following
+		 * the pointers from the last cell.
+		 *
+		 * A local alignment is found in two stages without filling the whole sequence
+		 * matrix. A score-only pass that keeps a single row finds the best score and the
+		 * cell where the alignment ends, and a pass backwards from that cell finds where it
+		 * starts. Only the cells between the start and the end are then filled and traced
+		 * back, so a short hit in a long sequence needs little more memory than its own
+		 * alignment.
+		 *
 		 * @param gloabl If true the function with use the linear global 
 		 * alignment algoirhthm to score the sequences. If this parameter is false
 		 * the function will use the linear local alignment algorithm to score the sequences.
@@ -62,6 +107,78 @@ namespace Pairwise
 		 */
 		PairwiseAlignment sequence(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
 
+		/**
+		 * This function computes only the score of the alignment between two sequences
+		 * based on the linear scoring scheme. The score is identical to the score of the
+		 * alignment returned by sequence(), however no traceback is performed and only two
+		 * rows of the sequence matrix are kept, each the length of the shorter sequence.
+		 *
+		 * @param global If true the linear global alignment algorithm is used to score the
+		 * sequences, otherwise the linear local alignment algorithm is used.
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function computes the same score as score(), but reads the substitution
+		 * scores from a query profile and an encoded target instead of translating the
+		 * characters of both sequences for every cell. Building the profile and the
+		 * encoding once per sequence avoids repeating that work when a sequence is scored
+		 * against many others. The query and the target must be prepared for opposite
+		 * roles: a query profiled as the first sequence is scored against a target
+		 * encoded as the second sequence, and the other way around.
+		 *
+		 * @param global If true the linear global alignment algorithm is used to score the
+		 * sequences, otherwise the linear local alignment algorithm is used.
+		 * @param query The score profile of one of the sequences.
+		 * @param target The other sequence, encoded with the same substitution matrix.
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const ScoreProfile& query, const EncodedSequence& target);
+
+		/**
+		 * This function sequences two sequences based on the linear scoring scheme
+		 * using Hirschberg's divide and conquer algorithm. The resulting alignment has
+		 * the same score as the alignment returned by sequence(), however memory use is
+		 * proportional to the length of the sequences instead of their product. When
+		 * several alignments share the best score, the gaps may be placed differently.
+		 *
+		 * Hirschberg: http://en.wikipedia.org/wiki/Hirschberg%27s_algorithm
+		 *
+		 * @param global If true the function with use the linear global
+		 * alignment algoirhthm to score the sequences. If this parameter is false
+		 * the function will use the linear local alignment algorithm to score the sequences.
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 */
+		PairwiseAlignment sequenceLinearSpace(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function makes the sequencer compute the sequence matrix of sequence() and
+		 * the rows of the forward and backward passes of sequenceLinearSpace() in square
+		 * tiles, with the tiles on each anti-diagonal computed concurrently by a pool of
+		 * native threads (see Utilities::Wavefront). Every cell has the same value as when
+		 * the rows are computed one after the other, so the alignments are identical. The
+		 * passes that find the end and the start of a local alignment are divided into tiles
+		 * as well, but the cells between its start and end are filled row by row.
+		 *
+		 * @param tile_size The number of rows and columns of a tile. If the size is 0 or
+		 * less, the default tile size of the wavefront is used.
+		 * @param thread_count The number of threads that compute the tiles. If the count is 0
+		 * or less, one thread per processor is used.
+		 */
+		void setWavefront(const int tile_size, const int thread_count);
+
+		//tests
+		void run_tests();
 	};
 }
 
@@ -0,0 +1,398 @@
+#include <algorithm>
+#include <cassert>
+#include <cctype>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <set>
+#include "MinHashSketcher.h"
+#include "PairwiseTests.h"
+#include "AllPairsScorer.h"
+#include "../Utilities/ThreadPool.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	static const char MINHASH_FILE_MAGIC[] = "DNASKT01";
+	static const int MINHASH_FILE_MAGIC_LENGTH = 8;
+
+	/**
+	 * The task of the ThreadPool that sketches one sequence.
+	 */
+	struct MinHashSketchTask
+	{
+		MinHashSketcher* sketcher;
+		const std::vector<Sequence>* sequences;
+		const std::vector<int>* missing;
+		std::vector<MinHashSketch>* sketches;
+
+		void operator () (const int index)
+		{
+			int sequence = (*this->missing)[index];
+			(*this->sketches)[sequence] = this->sketcher->sketch((*this->sequences)[sequence]);
+		}
+	};
+
+	/**
+	 * The task of the ThreadPool that computes one row of the triangle.
+	 */
+	struct MinHashDistanceRowTask
+	{
+		MinHashSketcher* sketcher;
+		const std::vector<MinHashSketch>* sketches;
+		std::vector<MatrixDataType>* distances;
+
+		void operator () (const int row)
+		{
+			int sketch_count = this->sketches->size();
+			int index = AllPairsScorer::getCondensedIndex(row, row, sketch_count);
+			for ( int column = row; column < sketch_count; column++ )
+				(*this->distances)[index++] = this->sketcher->distance((*this->sketches)[row], (*this->sketches)[column]);
+		}
+	};
+
+	MinHashSketch::MinHashSketch() {}
+
+	MinHashSketch::MinHashSketch(const Sequence& sequence, const int k, const int sketch_size)
+	{
+		const char* characters = sequence.c_str();
+		for ( int i = 0; i + k <= sequence.length(); i++ )
+			this->hashes.push_back(MinHashSketch::hash(characters + i, k));
+
+		std::sort(this->hashes.begin(), this->hashes.end());
+		this->hashes.erase(std::unique(this->hashes.begin(), this->hashes.end()), this->hashes.end());
+		if ( (int)this->hashes.size() > sketch_size )
+			this->hashes.resize(sketch_size);
+	}
+
+	MinHashSketch::MinHashSketch(const std::vector<uint64_t>& hashes)
+	{
+		this->hashes = hashes;
+	}
+
+	MinHashSketch::~MinHashSketch() {}
+
+	double MinHashSketch::jaccard(const MinHashSketch& other, const int sketch_size) const
+	{
+		// The smallest hash values of the union are visited in ascending order, counting the
+		// values found in both sketches, until sketch_size values have been visited. The
+		// comparisons advance the positions without branches, which the order of random hash
+		// values would mispredict half of the time.
+		const uint64_t* hashes1 = this->hashes.empty() ? NULL : &this->hashes[0];
+		const uint64_t* hashes2 = other.hashes.empty() ? NULL : &other.hashes[0];
+		int length1 = this->hashes.size();
+		int length2 = other.hashes.size();
+		int i = 0;
+		int j = 0;
+		int visited = 0;
+		int shared = 0;
+		while ( visited < sketch_size && i < length1 && j < length2 )
+		{
+			uint64_t hash1 = hashes1[i];
+			uint64_t hash2 = hashes2[j];
+			shared += (hash1 == hash2);
+			i += (hash1 <= hash2);
+			j += (hash2 <= hash1);
+			visited++;
+		}
+		int remaining = (length1 - i) + (length2 - j);
+		visited += std::min(sketch_size - visited, remaining);
+
+		if ( visited == 0 )
+			return 0.0;
+		return (double)shared / visited;
+	}
+
+	uint64_t MinHashSketch::hash(const char* characters, const int length)
+	{
+		// FNV-1a, followed by the finalizer of MurmurHash3 to spread the bits of short strings.
+		uint64_t hash = 14695981039346656037ULL;
+		for ( int i = 0; i < length; i++ )
+		{
+			hash ^= (unsigned char)toupper((unsigned char)characters[i]);
+			hash *= 1099511628211ULL;
+		}
+		hash ^= hash >> 33;
+		hash *= 0xff51afd7ed558ccdULL;
+		hash ^= hash >> 33;
+		hash *= 0xc4ceb9fe1a85ec53ULL;
+		hash ^= hash >> 33;
+		return hash;
+	}
+
+	MinHashSketchFile::MinHashSketchFile(const int k, const int sketch_size)
+	{
+		this->k = k;
+		this->sketch_size = sketch_size;
+	}
+
+	MinHashSketchFile::~MinHashSketchFile() {}
+
+	bool MinHashSketchFile::read(const std::string& filename)
+	{
+		std::ifstream file(filename.c_str(), std::ios::in | std::ios::binary);
+		if ( !file.is_open() )
+			return false;
+
+		char magic[MINHASH_FILE_MAGIC_LENGTH];
+		int32_t k = 0;
+		int32_t sketch_size = 0;
+		uint64_t sketch_count = 0;
+		file.read(magic, MINHASH_FILE_MAGIC_LENGTH);
+		file.read((char*)&k, sizeof(k));
+		file.read((char*)&sketch_size, sizeof(sketch_size));
+		file.read((char*)&sketch_count, sizeof(sketch_count));
+		if ( !file || memcmp(magic, MINHASH_FILE_MAGIC, MINHASH_FILE_MAGIC_LENGTH) != 0 )
+			return false;
+		if ( k != this->k || sketch_size != this->sketch_size )
+			return false;
+
+		std::map<uint64_t, MinHashSketch> sketches;
+		for ( uint64_t s = 0; s < sketch_count; s++ )
+		{
+			uint64_t checksum = 0;
+			uint32_t hash_count = 0;
+			file.read((char*)&checksum, sizeof(checksum));
+			file.read((char*)&hash_count, sizeof(hash_count));
+			if ( !file || hash_count > (uint32_t)this->sketch_size )
+				return false;
+
+			std::vector<uint64_t> hashes = std::vector<uint64_t>(hash_count, 0);
+			if ( hash_count > 0 )
+				file.read((char*)&hashes[0], hash_count * sizeof(uint64_t));
+			if ( !file )
+				return false;
+			sketches[checksum] = MinHashSketch(hashes);
+		}
+
+		this->sketches.insert(sketches.begin(), sketches.end());
+		return true;
+	}
+
+	bool MinHashSketchFile::write(const std::string& filename) const
+	{
+		std::ofstream file(filename.c_str(), std::ios::out | std::ios::binary | std::ios::trunc);
+		if ( !file.is_open() )
+			return false;
+
+		int32_t k = this->k;
+		int32_t sketch_size = this->sketch_size;
+		uint64_t sketch_count = this->sketches.size();
+		file.write(MINHASH_FILE_MAGIC, MINHASH_FILE_MAGIC_LENGTH);
+		file.write((const char*)&k, sizeof(k));
+		file.write((const char*)&sketch_size, sizeof(sketch_size));
+		file.write((const char*)&sketch_count, sizeof(sketch_count));
+
+		for ( std::map<uint64_t, MinHashSketch>::const_iterator it = this->sketches.begin(); it != this->sketches.end(); it++ )
+		{
+			const std::vector<uint64_t>& hashes = it->second.getHashes();
+			uint64_t checksum = it->first;
+			uint32_t hash_count = hashes.size();
+			file.write((const char*)&checksum, sizeof(checksum));
+			file.write((const char*)&hash_count, sizeof(hash_count));
+			if ( hash_count > 0 )
+				file.write((const char*)&hashes[0], hash_count * sizeof(uint64_t));
+		}
+		return (bool)file;
+	}
+
+	const MinHashSketch* MinHashSketchFile::find(const uint64_t checksum) const
+	{
+		std::map<uint64_t, MinHashSketch>::const_iterator it = this->sketches.find(checksum);
+		if ( it == this->sketches.end() )
+			return NULL;
+		return &it->second;
+	}
+
+	void MinHashSketchFile::add(const uint64_t checksum, const MinHashSketch& sketch)
+	{
+		this->sketches[checksum] = sketch;
+	}
+
+	MinHashSketcher::MinHashSketcher(const int k, const int sketch_size)
+	{
+		this->k = std::max(1, k);
+		this->sketch_size = std::max(1, sketch_size);
+	}
+
+	MinHashSketcher::~MinHashSketcher() {}
+
+	MinHashSketch MinHashSketcher::sketch(const Sequence& sequence)
+	{
+		return MinHashSketch(sequence, this->k, this->sketch_size);
+	}
+
+	std::vector<MinHashSketch> MinHashSketcher::sketch(const std::vector<Sequence>& sequences, MinHashSketchFile* sketch_file, const int thread_count)
+	{
+		std::vector<MinHashSketch> sketches = std::vector<MinHashSketch>(sequences.size());
+		std::vector<uint64_t> checksums = std::vector<uint64_t>(sequences.size(), 0);
+		std::vector<int> missing;
+		for ( unsigned int i = 0; i < sequences.size(); i++ )
+		{
+			const MinHashSketch* stored = NULL;
+			if ( sketch_file != NULL )
+			{
+				checksums[i] = MinHashSketch::hash(sequences[i].c_str(), sequences[i].length());
+				stored = sketch_file->find(checksums[i]);
+			}
+
+			if ( stored != NULL )
+				sketches[i] = *stored;
+			else
+				missing.push_back(i);
+		}
+
+		MinHashSketchTask task = { this, &sequences, &missing, &sketches };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(missing.size(), task);
+
+		if ( sketch_file != NULL )
+		{
+			for ( unsigned int m = 0; m < missing.size(); m++ )
+				sketch_file->add(checksums[missing[m]], sketches[missing[m]]);
+		}
+		return sketches;
+	}
+
+	MatrixDataType MinHashSketcher::distance(const MinHashSketch& sketch1, const MinHashSketch& sketch2)
+	{
+		double jaccard = sketch1.jaccard(sketch2, this->sketch_size);
+		if ( jaccard <= 0.0 )
+			return DISTANCE_SCALE;
+
+		double distance = -1.0 / this->k * log(2.0 * jaccard / (1.0 + jaccard));
+		return (MatrixDataType)floor(std::min(1.0, distance) * DISTANCE_SCALE + 0.5);
+	}
+
+	std::vector<MatrixDataType> MinHashSketcher::distances(const std::vector<MinHashSketch>& sketches, const int thread_count)
+	{
+		int sketch_count = sketches.size();
+		std::vector<MatrixDataType> distances = std::vector<MatrixDataType>(AllPairsScorer::getCondensedIndex(sketch_count, sketch_count, sketch_count), 0);
+
+		MinHashDistanceRowTask task = { this, &sketches, &distances };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(sketch_count, task);
+		return distances;
+	}
+
+	/***************************************TESTS**************************************/
+
+	/**
+	 * Copies a sequence with random substitutions.
+	 */
+	static Sequence minhash_test_mutate(const Sequence& sequence, const std::string& alphabet, const int per_mille)
+	{
+		std::string mutated = std::string(sequence.c_str());
+		for ( unsigned int i = 0; i < mutated.size(); i++ )
+		{
+			if ( rand() % 1000 < per_mille )
+				mutated[i] = alphabet[rand() % alphabet.size()];
+		}
+		return Sequence(mutated);
+	}
+
+	void MinHashSketcher::run_tests()
+	{
+		test_sketch();
+		test_distance();
+		test_sketch_file();
+	}
+
+	void MinHashSketcher::test_sketch()
+	{
+		// A sketch is the smallest distinct hash values of the k-mers, whatever their case.
+		srand(1);
+		for ( int test = 0; test < 50; test++ )
+		{
+			int k = 1 + rand() % 25;
+			int sketch_size = 1 + rand() % 200;
+			Sequence sequence = test_random_sequence(rand() % 500, "ACGTacgt");
+
+			std::set<uint64_t> hashes;
+			std::string characters = std::string(sequence.c_str());
+			std::transform(characters.begin(), characters.end(), characters.begin(), ::toupper);
+			for ( int i = 0; i + k <= (int)characters.size(); i++ )
+				hashes.insert(MinHashSketch::hash(characters.c_str() + i, k));
+
+			MinHashSketch sketch = MinHashSketch(sequence, k, sketch_size);
+			std::vector<uint64_t> expected = std::vector<uint64_t>(hashes.begin(), hashes.end());
+			if ( (int)expected.size() > sketch_size )
+				expected.resize(sketch_size);
+			assert(sketch.getHashes() == expected);
+		}
+	}
+
+	void MinHashSketcher::test_distance()
+	{
+		srand(2);
+		MinHashSketcher ms = MinHashSketcher(MinHashSketcher::DEFAULT_K, MinHashSketcher::DEFAULT_SKETCH_SIZE);
+		Sequence sequence = test_random_sequence(20000, "ACGT");
+		assert(ms.distance(ms.sketch(sequence), ms.sketch(sequence)) == 0);
+		assert(ms.distance(ms.sketch(sequence), ms.sketch(test_random_sequence(20000, "ACGT"))) == MinHashSketcher::DISTANCE_SCALE);
+		assert(ms.distance(ms.sketch(Sequence("ACGT")), ms.sketch(Sequence("ACGT"))) == MinHashSketcher::DISTANCE_SCALE);
+
+		// The Mash distance estimates the rate of substitutions.
+		MatrixDataType previous = 0;
+		for ( int per_mille = 10; per_mille <= 40; per_mille += 10 )
+		{
+			MatrixDataType distance = ms.distance(ms.sketch(sequence), ms.sketch(minhash_test_mutate(sequence, "ACGT", per_mille)));
+			double rate = per_mille * 0.75;
+			(void)rate;
+			assert(distance > previous);
+			assert(distance > rate * 0.7 && distance < rate * 1.3);
+			previous = distance;
+		}
+		(void)previous;
+
+		std::vector<Sequence> sequences;
+		for ( int i = 0; i < 10; i++ )
+			sequences.push_back(minhash_test_mutate(sequence, "ACGT", 5 * i));
+		std::vector<MinHashSketch> sketches = ms.sketch(sequences, NULL, 3);
+		std::vector<MatrixDataType> distances = ms.distances(sketches, 3);
+		for ( int i = 0; i < (int)sequences.size(); i++ )
+		{
+			for ( int j = i; j < (int)sequences.size(); j++ )
+				assert(distances[AllPairsScorer::getCondensedIndex(i, j, sequences.size())] == ms.distance(ms.sketch(sequences[i]), ms.sketch(sequences[j])));
+		}
+	}
+
+	void MinHashSketcher::test_sketch_file()
+	{
+		srand(3);
+		std::vector<Sequence> sequences;
+		for ( int i = 0; i < 8; i++ )
+			sequences.push_back(test_random_sequence(rand() % 300, "ACGT"));
+
+		std::string filename = "minhash_test.sketch";
+
+		MinHashSketcher ms = MinHashSketcher(11, 50);
+		MinHashSketchFile written = MinHashSketchFile(11, 50);
+		std::vector<MinHashSketch> sketches = ms.sketch(sequences, &written, 2);
+		assert(written.size() == 8);
+		assert(written.write(filename));
+
+		// The sketches read back are the sketches that were written.
+		MinHashSketchFile read = MinHashSketchFile(11, 50);
+		assert(read.read(filename));
+		assert(read.size() == 8);
+		for ( unsigned int i = 0; i < sequences.size(); i++ )
+		{
+			const MinHashSketch* stored = read.find(MinHashSketch::hash(sequences[i].c_str(), sequences[i].length()));
+			(void)stored;
+			assert(stored != NULL && stored->getHashes() == sketches[i].getHashes());
+		}
+
+		// Only the new sequence is sketched, and sketches of other parameters are not read.
+		sequences.push_back(test_random_sequence(100, "ACGT"));
+		ms.sketch(sequences, &read, 2);
+		assert(read.size() == 9);
+		MinHashSketchFile other = MinHashSketchFile(12, 50);
+		assert(!other.read(filename));
+		assert(other.size() == 0);
+		remove(filename.c_str());
+		assert(!other.read(filename));
+	}
+}
\ No newline at end of file
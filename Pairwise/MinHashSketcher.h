@@ -0,0 +1,261 @@
+#include <map>
+#include <string>
+#include <vector>
+#include <stdint.h>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___MINHASHSKETCHER___
+#define ___MINHASHSKETCHER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The MinHashSketch class holds the bottom-k MinHash sketch of a sequence: the smallest
+	 * distinct hash values of its k-mers, sorted in ascending order. Two sketches estimate
+	 * the Jaccard index of the k-mer sets of their sequences without the sequences.
+	 */
+	class MinHashSketch
+	{
+	private:
+		std::vector<uint64_t> hashes;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		MinHashSketch();
+
+		/**
+		 * Creates the sketch of a sequence. The k-mers are hashed ignoring case like the
+		 * SubstitutionMatrix, in the direction the sequence is written.
+		 *
+		 * @param sequence The sequence to sketch.
+		 * @param k The length of the k-mers.
+		 * @param sketch_size The largest number of hash values kept.
+		 */
+		MinHashSketch(const Sequence& sequence, const int k, const int sketch_size);
+
+		/**
+		 * Creates a sketch from hash values that were sketched before.
+		 *
+		 * @param hashes The hash values of the sketch, sorted in ascending order.
+		 */
+		MinHashSketch(const std::vector<uint64_t>& hashes);
+
+		/**
+		 * Default Destructor.
+		 */
+		~MinHashSketch();
+
+		/**
+		 * This function returns the hash values of the sketch.
+		 *
+		 * @return The hash values, sorted in ascending order.
+		 */
+		const std::vector<uint64_t>& getHashes() const { return this->hashes; };
+
+		/**
+		 * This function estimates the Jaccard index of the k-mers of two sequences from the
+		 * smallest hash values of the union of their sketches.
+		 *
+		 * @param other The sketch of the other sequence.
+		 * @param sketch_size The number of hash values the sketches were created with.
+		 * @return The fraction of the smallest hash values of the union found in both sketches.
+		 */
+		double jaccard(const MinHashSketch& other, const int sketch_size) const;
+
+		/**
+		 * This function hashes a string of characters, ignoring case.
+		 *
+		 * @param characters The first character to hash.
+		 * @param length The number of characters to hash.
+		 * @return The 64 bit hash value of the characters.
+		 */
+		static uint64_t hash(const char* characters, const int length);
+	};
+
+	/**
+	 * The MinHashSketchFile class stores sketches on disk, so a collection of sequences is
+	 * only sketched once. The sketches are found by the hash value of the whole sequence
+	 * they were created from, so renamed or reordered records reuse their sketches and
+	 * changed records are sketched again. The file is binary:
+	 *
+	 *     The eight characters "DNASKT01".
+	 *     The k-mer length and the sketch size, 32 bit integers.
+	 *     The number of sketches, a 64 bit integer.
+	 *     For every sketch the hash value of its sequence, a 64 bit integer, the number of
+	 *     hash values, a 32 bit integer, and the hash values, 64 bit integers.
+	 *
+	 * The integers are stored in the byte order of the machine. A file created with a
+	 * different k-mer length or sketch size holds no usable sketches.
+	 */
+	class MinHashSketchFile
+	{
+	private:
+		int k;
+		int sketch_size;
+		std::map<uint64_t, MinHashSketch> sketches;
+
+	public:
+		/**
+		 * Creates an empty sketch file for sketches of the provided parameters.
+		 *
+		 * @param k The length of the k-mers of the sketches.
+		 * @param sketch_size The number of hash values of the sketches.
+		 */
+		MinHashSketchFile(const int k, const int sketch_size);
+
+		/**
+		 * Default Destructor.
+		 */
+		~MinHashSketchFile();
+
+		/**
+		 * This function reads the sketches of a file. Sketches of other parameters are
+		 * ignored.
+		 *
+		 * @param filename The path of the sketch file.
+		 * @return True if the file was read, false if it is missing, damaged or holds
+		 * sketches of other parameters.
+		 */
+		bool read(const std::string& filename);
+
+		/**
+		 * This function writes every sketch to a file, replacing the file.
+		 *
+		 * @param filename The path of the sketch file.
+		 * @return True if the file was written.
+		 */
+		bool write(const std::string& filename) const;
+
+		/**
+		 * This function finds the sketch of a sequence.
+		 *
+		 * @param checksum The hash value of the whole sequence, see MinHashSketch::hash.
+		 * @return The sketch, or NULL if the sequence was not sketched.
+		 */
+		const MinHashSketch* find(const uint64_t checksum) const;
+
+		/**
+		 * This function adds the sketch of a sequence.
+		 *
+		 * @param checksum The hash value of the whole sequence.
+		 * @param sketch The sketch of the sequence.
+		 */
+		void add(const uint64_t checksum, const MinHashSketch& sketch);
+
+		/**
+		 * This function returns the number of sketches.
+		 *
+		 * @return The number of sketches.
+		 */
+		int size() const { return this->sketches.size(); };
+	};
+
+	/**
+	 * The MinHashSketcher class estimates distances between sequences from their bottom-k
+	 * MinHash sketches, for collections too large for the k-mer distances of every pair.
+	 * Each sequence is reduced to a sketch of at most sketch_size hash values, so every pair
+	 * takes the same short time however long the sequences are. The distance is the Mash
+	 * distance of Ondov et al., which estimates the mutation rate between the sequences from
+	 * the Jaccard index j of their k-mers:
+	 *
+	 *     distance = -1 / k * ln(2 * j / (1 + j))
+	 *
+	 * capped at 1, scaled by DISTANCE_SCALE and rounded to an integer like the distances of
+	 * the KmerDistanceSequencer.
+	 *
+	 * Mash: http://dx.doi.org/10.1186/s13059-016-0997-x
+	 */
+	class MinHashSketcher
+	{
+	private:
+		int k;
+		int sketch_size;
+
+		//tests
+		void test_sketch();
+		void test_distance();
+		void test_sketch_file();
+
+	public:
+		/**
+		 * The default k-mer length and sketch size, the defaults of Mash for nucleotides.
+		 */
+		static const int DEFAULT_K = 21;
+		static const int DEFAULT_SKETCH_SIZE = 1000;
+
+		/**
+		 * The distance of sequences that share no sketched k-mers.
+		 */
+		static const int DISTANCE_SCALE = 1000;
+
+		/**
+		 * Creates a new sketcher.
+		 *
+		 * @param k The length of the k-mers, at least 1.
+		 * @param sketch_size The number of hash values of every sketch, at least 1.
+		 */
+		MinHashSketcher(const int k, const int sketch_size);
+
+		/**
+		 * Default Destructor.
+		 */
+		~MinHashSketcher();
+
+		/**
+		 * This function creates the sketch of a sequence.
+		 *
+		 * @param sequence The sequence to sketch.
+		 * @return The sketch of the sequence.
+		 */
+		MinHashSketch sketch(const Sequence& sequence);
+
+		/**
+		 * This function creates the sketches of a list of sequences with a ThreadPool. The
+		 * sketches of sequences that are found in a sketch file are taken from the file, and
+		 * the new sketches are added to it.
+		 *
+		 * @param sequences The list of sequences.
+		 * @param sketch_file The sketches of earlier runs, or NULL to sketch every sequence.
+		 * @param thread_count The number of threads that sketch the sequences. If the count
+		 * is 0 or less, one thread per processor is used.
+		 * @return The sketch of each sequence, in the order of the sequences.
+		 */
+		std::vector<MinHashSketch> sketch(const std::vector<Sequence>& sequences, MinHashSketchFile* sketch_file, const int thread_count);
+
+		/**
+		 * This function estimates the Mash distance of two sketches.
+		 *
+		 * @param sketch1 The sketch of the first sequence.
+		 * @param sketch2 The sketch of the second sequence.
+		 * @return The scaled Mash distance of the two sequences.
+		 */
+		MatrixDataType distance(const MinHashSketch& sketch1, const MinHashSketch& sketch2);
+
+		/**
+		 * This function estimates the Mash distance of every pair of sketches. The distances
+		 * are stored in the same condensed upper triangle as the scores of the AllPairsScorer,
+		 * and every row of the triangle is computed by one task of a ThreadPool.
+		 *
+		 * @param sketches The list of sketches.
+		 * @param thread_count The number of threads that compute the rows. If the count is 0
+		 * or less, one thread per processor is used.
+		 * @return The condensed upper triangle of the distances, n * (n + 1) / 2 values.
+		 */
+		std::vector<MatrixDataType> distances(const std::vector<MinHashSketch>& sketches, const int thread_count);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
@@ -6,6 +6,8 @@ namespace Pairwise
 	{
 		this->sequences = std::vector<Sequencing::Sequence>();
 		this->score = 0;
+		this->starts[0] = 0;
+		this->starts[1] = 0;
 	}
 
 	PairwiseAlignment::~PairwiseAlignment() {}
@@ -13,6 +15,8 @@ namespace Pairwise
 	PairwiseAlignment::PairwiseAlignment(Sequence sequence1, Sequence sequence2, MatrixDataType new_score)
 	{
 		this->score = new_score;
+		this->starts[0] = 0;
+		this->starts[1] = 0;
 
 		if ( sequence1.length() == 0 )
 			this->sequences.push_back(Sequence("No-Sequence"));
@@ -29,6 +33,8 @@ namespace Pairwise
 	{
 		this->sequences = pairwise_alignment.sequences;
 		this->score = pairwise_alignment.score;
+		this->starts[0] = pairwise_alignment.starts[0];
+		this->starts[1] = pairwise_alignment.starts[1];
 	}
 
 	void PairwiseAlignment::setScore(MatrixDataType score)
@@ -40,4 +46,15 @@ namespace Pairwise
 	{
 		return this->score;
 	}
+
+	void PairwiseAlignment::setStart(const int start1, const int start2)
+	{
+		this->starts[0] = start1;
+		this->starts[1] = start2;
+	}
+
+	int PairwiseAlignment::getStart(const int index) const
+	{
+		return this->starts[index];
+	}
 }
\ No newline at end of file
@@ -13,6 +13,7 @@ namespace Pairwise
 	{
 	private:
 		MatrixDataType score;
+		int starts[2];
 
 	protected:
 
@@ -24,6 +25,23 @@ namespace Pairwise
 
 		void setScore(MatrixDataType score);
 		MatrixDataType getScore() const;
+
+		/**
+		 * Sets the positions of the first aligned characters of both sequences. Global
+		 * alignments start at 0, local alignments and extensions may start later.
+		 *
+		 * @param start1 The position of the first aligned character of the first sequence.
+		 * @param start2 The position of the first aligned character of the second sequence.
+		 */
+		void setStart(const int start1, const int start2);
+
+		/**
+		 * Returns the position of the first aligned character of one of the sequences.
+		 *
+		 * @param index 0 for the first sequence, 1 for the second sequence.
+		 * @return The position of the first aligned character in the original sequence.
+		 */
+		int getStart(const int index) const;
 	};
 }
 
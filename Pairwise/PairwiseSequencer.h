@@ -1,6 +1,8 @@
 #include <vector>
 #include "SubstitutionMatrix.h"
 #include "PairwiseAlignment.h"
+#include "EncodedSequence.h"
+#include "ScoreProfile.h"
 #include "../Sequencing/Sequence.h"
 
 #ifndef ___PAIRWISESEQUENCER___
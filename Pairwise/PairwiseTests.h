@@ -0,0 +1,50 @@
+#include <cstdlib>
+#include <string>
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___PAIRWISETESTS___
+#define ___PAIRWISETESTS___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * Creates a random sequence of the provided length from the characters of an alphabet.
+	 * The tests of the pairwise classes seed rand() themselves, so the sequences they
+	 * create are the same on every run.
+	 */
+	inline Sequence test_random_sequence(const int length, const std::string& alphabet)
+	{
+		std::string sequence;
+		for ( int i = 0; i < length; i++ )
+			sequence += alphabet[rand() % alphabet.size()];
+		return Sequence(sequence);
+	}
+
+	/**
+	 * Creates a substitution matrix with random, asymmetric scores between low and high.
+	 */
+	inline SubstitutionMatrix test_random_matrix(const std::string& alphabet, const int low, const int high)
+	{
+		std::vector<std::vector<MatrixDataType> > matrix = std::vector<std::vector<MatrixDataType> >(alphabet.size() + 1, std::vector<MatrixDataType>(alphabet.size() + 1, 0));
+		matrix[0][0] = '*';
+		for ( unsigned int i = 1; i < alphabet.size() + 1; i++ )
+		{
+			matrix[0][i] = alphabet[i-1];
+			matrix[i][0] = alphabet[i-1];
+			for ( unsigned int j = 1; j < alphabet.size() + 1; j++ )
+				matrix[i][j] = low + rand() % (high - low + 1);
+		}
+		return SubstitutionMatrix(matrix);
+	}
+}
+
+#endif
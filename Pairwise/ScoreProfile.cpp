@@ -0,0 +1,30 @@
+#include "ScoreProfile.h"
+
+namespace Pairwise
+{
+	ScoreProfile::ScoreProfile()
+	{
+		this->query_length = 0;
+		this->symbol_count = 0;
+		this->first = true;
+	}
+
+	ScoreProfile::ScoreProfile(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const bool first)
+	{
+		EncodedSequence encoded_query = EncodedSequence(substitution_matrix, query, first);
+
+		this->query_length = query.length();
+		this->symbol_count = first ? substitution_matrix.getRowSymbolCount() : substitution_matrix.getColumnSymbolCount();
+		this->first = first;
+		this->profile = std::vector<MatrixDataType>(this->symbol_count * this->query_length + 1, 0);
+
+		for ( int symbol = 0; symbol < this->symbol_count; symbol++ )
+		{
+			MatrixDataType* row = &this->profile[symbol * this->query_length];
+			for ( int i = 0; i < this->query_length; i++ )
+				row[i] = first ? substitution_matrix.scoreSymbols(encoded_query[i], symbol) : substitution_matrix.scoreSymbols(symbol, encoded_query[i]);
+		}
+	}
+
+	ScoreProfile::~ScoreProfile() {}
+}
\ No newline at end of file
@@ -0,0 +1,88 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "EncodedSequence.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___SCOREPROFILE___
+#define ___SCOREPROFILE___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The ScoreProfile class holds the substitution scores of one sequence (the query)
+	 * against every symbol of a substitution matrix. The profile has one row per symbol
+	 * and each row holds the score of that symbol against every position of the query.
+	 * When the query is aligned against an EncodedSequence the scores of a whole row of
+	 * the sequence matrix are read from a single contiguous profile row. A query that is
+	 * aligned against many other sequences only needs to be profiled once.
+	 */
+	class ScoreProfile
+	{
+	private:
+		std::vector<MatrixDataType> profile;
+		int query_length;
+		int symbol_count;
+		bool first;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		ScoreProfile();
+
+		/**
+		 * Creates the score profile of a query sequence.
+		 *
+		 * @param substitution_matrix The substitution matrix used to score the query.
+		 * @param query The sequence to profile.
+		 * @param first If true the query is scored as the first sequence of an alignment,
+		 * and the profile is indexed by the symbols of sequences encoded as the second
+		 * sequence. Otherwise the roles are reversed.
+		 */
+		ScoreProfile(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const bool first);
+
+		/**
+		 * Default Destructor.
+		 */
+		~ScoreProfile();
+
+		/**
+		 * This function returns the length of the profiled query.
+		 *
+		 * @return The length of the query.
+		 */
+		int length() const { return this->query_length; };
+
+		/**
+		 * This function returns the number of rows in the profile.
+		 *
+		 * @return The number of symbols that the profile can be indexed by.
+		 */
+		int getSymbolCount() const { return this->symbol_count; };
+
+		/**
+		 * This function returns true if the query was profiled as the first sequence.
+		 *
+		 * @return True if the query is the first sequence of its alignments.
+		 */
+		bool isFirst() const { return this->first; };
+
+		/**
+		 * This function returns the profile row of a symbol. Element i of the row holds
+		 * the score of the symbol against position i of the query.
+		 *
+		 * @param symbol A symbol of a sequence encoded for the other role than the query.
+		 * @return A pointer to the first score of the row.
+		 */
+		const MatrixDataType* getRow(const int symbol) const { return &this->profile[symbol * this->query_length]; };
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,755 @@
+#include <algorithm>
+#include <cassert>
+#include <cctype>
+#include <climits>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <string>
+#include "SeedSearcher.h"
+#include "PairwiseTests.h"
+#include "AffineSequencer.h"
+#include "BandedSequencer.h"
+#include "LinearSequencer.h"
+#include "MinHashSketcher.h"
+#include "PairwiseAlignment.h"
+#include "../Utilities/ThreadPool.h"
+
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	static const int SEED_BITS_PER_CHARACTER = 5;
+	static const char SEED_FILE_MAGIC[] = "DNASIX01";
+	static const int SEED_FILE_MAGIC_LENGTH = 8;
+	static const int SEED_FILE_HEADER_LENGTH = SEED_FILE_MAGIC_LENGTH + 2 * sizeof(int32_t) + sizeof(uint64_t);
+
+	/**
+	 * A seed is a k-mer of the query that occurs in a subject, at the position of the query
+	 * plus the diagonal.
+	 */
+	struct SearchSeed
+	{
+		int subject;
+		int diagonal;
+		int query_position;
+	};
+
+	/**
+	 * An ungapped segment of a diagonal and its score.
+	 */
+	struct SearchSegment
+	{
+		int diagonal;
+		int query_start;
+		int query_end;
+		MatrixDataType score;
+	};
+
+	/**
+	 * The task of the ThreadPool that searches one subject.
+	 */
+	struct SeedSearchTask
+	{
+		SeedSearcher* searcher;
+		const SubstitutionMatrix* substitution_matrix;
+		const Sequence* query;
+		const std::vector<Sequence>* subjects;
+		int k;
+		const std::vector<SearchSeed>* seeds;
+		const std::vector<int>* groups;
+		MatrixDataType x_drop;
+		MatrixDataType ungapped_x_drop;
+		MatrixDataType minimum_score;
+		std::vector<Cigar>* hits;
+		std::vector<char>* found;
+
+		void operator () (const int group)
+		{
+			const SearchSeed* first = &(*this->seeds)[0] + (*this->groups)[group];
+			const SearchSeed* last = &(*this->seeds)[0] + (*this->groups)[group+1];
+			const Sequence& subject = (*this->subjects)[first->subject];
+			(*this->found)[group] = this->searcher->search_subject(*this->substitution_matrix, *this->query, subject, this->k, first, last, this->x_drop, this->ungapped_x_drop, this->minimum_score, (*this->hits)[group]);
+		}
+	};
+
+	static bool seed_posting_less(const SeedPosting& posting1, const SeedPosting& posting2)
+	{
+		if ( posting1.kmer != posting2.kmer )
+			return posting1.kmer < posting2.kmer;
+		if ( posting1.subject != posting2.subject )
+			return posting1.subject < posting2.subject;
+		return posting1.position < posting2.position;
+	}
+
+	static bool search_seed_less(const SearchSeed& seed1, const SearchSeed& seed2)
+	{
+		if ( seed1.subject != seed2.subject )
+			return seed1.subject < seed2.subject;
+		if ( seed1.diagonal != seed2.diagonal )
+			return seed1.diagonal < seed2.diagonal;
+		return seed1.query_position < seed2.query_position;
+	}
+
+	static bool search_segment_greater(const SearchSegment& segment1, const SearchSegment& segment2)
+	{
+		if ( segment1.score != segment2.score )
+			return segment1.score > segment2.score;
+		if ( segment1.diagonal != segment2.diagonal )
+			return segment1.diagonal < segment2.diagonal;
+		return segment1.query_start < segment2.query_start;
+	}
+
+	static bool search_hit_ranks_before(const SearchHit& hit1, const SearchHit& hit2)
+	{
+		if ( hit1.getAlignment().getScore() != hit2.getAlignment().getScore() )
+			return hit1.getAlignment().getScore() > hit2.getAlignment().getScore();
+		return hit1.getSubject() < hit2.getSubject();
+	}
+
+	/**
+	 * Counts the characters of an aligned sequence that are not gaps.
+	 */
+	static int search_aligned_length(const std::string& aligned_sequence, const char gap_character)
+	{
+		return aligned_sequence.size() - std::count(aligned_sequence.begin(), aligned_sequence.end(), gap_character);
+	}
+
+	SeedIndex::SeedIndex()
+	{
+		this->k = 0;
+		this->subject_count = 0;
+		this->mapped_postings = NULL;
+		this->mapped_posting_count = 0;
+	}
+
+	SeedIndex::SeedIndex(const std::vector<Sequence>& subjects, const int k)
+	{
+		this->k = k;
+		this->subject_count = 0;
+		this->mapped_postings = NULL;
+		this->mapped_posting_count = 0;
+		this->append(subjects);
+	}
+
+	SeedIndex::~SeedIndex() {}
+
+	void SeedIndex::index_subjects(const std::vector<Sequence>& subjects, const int first, std::vector<SeedPosting>& postings)
+	{
+		for ( int subject = first; subject < (int)subjects.size(); subject++ )
+		{
+			const char* characters = subjects[subject].c_str();
+			int length = subjects[subject].length();
+			for ( int position = 0; position + this->k <= length; position++ )
+			{
+				SeedPosting posting;
+				if ( !SeedIndex::pack(characters + position, this->k, posting.kmer) )
+					continue;
+				posting.subject = subject;
+				posting.position = position;
+				postings.push_back(posting);
+			}
+		}
+
+		std::sort(postings.begin(), postings.end(), seed_posting_less);
+	}
+
+	const SeedPosting* SeedIndex::begin_postings() const
+	{
+		if ( this->mapped_file )
+			return this->mapped_postings;
+		return this->postings.empty() ? NULL : &this->postings[0];
+	}
+
+	const SeedPosting* SeedIndex::end_postings() const
+	{
+		if ( this->mapped_file )
+			return this->mapped_postings + this->mapped_posting_count;
+		return this->postings.empty() ? NULL : &this->postings[0] + this->postings.size();
+	}
+
+	bool SeedIndex::load(const std::string& filename)
+	{
+		*this = SeedIndex();
+
+		std::shared_ptr<Utilities::MappedFile> file = std::shared_ptr<Utilities::MappedFile>(new Utilities::MappedFile());
+		if ( !file->open(filename) || file->getSize() < (size_t)SEED_FILE_HEADER_LENGTH )
+			return false;
+
+		const char* data = file->getData();
+		int32_t k;
+		int32_t subject_count;
+		uint64_t posting_count;
+		memcpy(&k, data + SEED_FILE_MAGIC_LENGTH, sizeof(k));
+		memcpy(&subject_count, data + SEED_FILE_MAGIC_LENGTH + sizeof(k), sizeof(subject_count));
+		memcpy(&posting_count, data + SEED_FILE_MAGIC_LENGTH + sizeof(k) + sizeof(subject_count), sizeof(posting_count));
+		if ( memcmp(data, SEED_FILE_MAGIC, SEED_FILE_MAGIC_LENGTH) != 0 || k < 1 || k > MAXIMUM_K || subject_count < 0 )
+			return false;
+
+		// The sizes are checked against the size of the file before they are multiplied, so
+		// a damaged header can not overflow them.
+		size_t remaining = file->getSize() - SEED_FILE_HEADER_LENGTH;
+		if ( (uint64_t)subject_count > remaining / sizeof(uint64_t) )
+			return false;
+		remaining -= subject_count * sizeof(uint64_t);
+		if ( posting_count != remaining / sizeof(SeedPosting) || remaining % sizeof(SeedPosting) != 0 || posting_count > (uint64_t)INT_MAX )
+			return false;
+
+		this->k = k;
+		this->subject_count = subject_count;
+		this->checksums = std::vector<uint64_t>(subject_count);
+		if ( subject_count > 0 )
+			memcpy(&this->checksums[0], data + SEED_FILE_HEADER_LENGTH, subject_count * sizeof(uint64_t));
+
+		// The postings start a multiple of eight bytes into the file, and the file is mapped
+		// at the start of a page, so they are aligned for reading in place.
+		this->mapped_file = file;
+		this->mapped_postings = (const SeedPosting*)(data + SEED_FILE_HEADER_LENGTH + subject_count * sizeof(uint64_t));
+		this->mapped_posting_count = posting_count;
+		return true;
+	}
+
+	bool SeedIndex::save(const std::string& filename) const
+	{
+		std::string temporary = filename + ".tmp";
+		std::ofstream file(temporary.c_str(), std::ios::out | std::ios::binary | std::ios::trunc);
+		if ( !file )
+			return false;
+
+		int32_t k = this->k;
+		int32_t subject_count = this->subject_count;
+		uint64_t posting_count = this->getPostingCount();
+		file.write(SEED_FILE_MAGIC, SEED_FILE_MAGIC_LENGTH);
+		file.write((const char*)&k, sizeof(k));
+		file.write((const char*)&subject_count, sizeof(subject_count));
+		file.write((const char*)&posting_count, sizeof(posting_count));
+		if ( subject_count > 0 )
+			file.write((const char*)&this->checksums[0], subject_count * sizeof(uint64_t));
+		if ( posting_count > 0 )
+			file.write((const char*)this->begin_postings(), posting_count * sizeof(SeedPosting));
+		file.close();
+
+		if ( !file )
+		{
+			remove(temporary.c_str());
+			return false;
+		}
+
+		// Renaming onto an existing file fails on some systems, so the old file is removed first.
+		remove(filename.c_str());
+		if ( rename(temporary.c_str(), filename.c_str()) != 0 )
+		{
+			remove(temporary.c_str());
+			return false;
+		}
+		return true;
+	}
+
+	bool SeedIndex::indexes(const std::vector<Sequence>& subjects) const
+	{
+		if ( this->subject_count > (int)subjects.size() )
+			return false;
+
+		for ( int subject = 0; subject < this->subject_count; subject++ )
+		{
+			if ( this->checksums[subject] != SeedIndex::checksum(subjects[subject]) )
+				return false;
+		}
+		return true;
+	}
+
+	void SeedIndex::append(const std::vector<Sequence>& subjects)
+	{
+		if ( this->mapped_file )
+		{
+			this->postings = std::vector<SeedPosting>(this->begin_postings(), this->end_postings());
+			this->mapped_file.reset();
+			this->mapped_postings = NULL;
+			this->mapped_posting_count = 0;
+		}
+
+		// The new subjects come after the indexed subjects, so the postings of both lists
+		// are merged in the order of a single sort.
+		std::vector<SeedPosting> appended;
+		this->index_subjects(subjects, this->subject_count, appended);
+		std::vector<SeedPosting> merged = std::vector<SeedPosting>(this->postings.size() + appended.size());
+		std::merge(this->postings.begin(), this->postings.end(), appended.begin(), appended.end(), merged.begin(), seed_posting_less);
+		this->postings.swap(merged);
+
+		for ( int subject = this->subject_count; subject < (int)subjects.size(); subject++ )
+			this->checksums.push_back(SeedIndex::checksum(subjects[subject]));
+		this->subject_count = subjects.size();
+	}
+
+	uint64_t SeedIndex::checksum(const Sequence& subject)
+	{
+		return MinHashSketch::hash(subject.c_str(), subject.length());
+	}
+
+	bool SeedIndex::pack(const char* characters, const int k, uint64_t& kmer)
+	{
+		// The low five bits of a letter are the same for both cases and differ between letters.
+		kmer = 0;
+		for ( int i = 0; i < k; i++ )
+		{
+			if ( !isalpha((unsigned char)characters[i]) )
+				return false;
+			kmer = (kmer << SEED_BITS_PER_CHARACTER) | (characters[i] & 31);
+		}
+		return true;
+	}
+
+	void SeedIndex::find(const uint64_t kmer, const SeedPosting*& first, const SeedPosting*& last) const
+	{
+		SeedPosting lowest = { kmer, -1, -1 };
+		const SeedPosting* end = this->end_postings();
+		first = std::lower_bound(this->begin_postings(), end, lowest, seed_posting_less);
+		last = first;
+		while ( last != end && last->kmer == kmer )
+			last++;
+	}
+
+	SearchHit::SearchHit()
+	{
+		this->subject = -1;
+	}
+
+	SearchHit::SearchHit(const int subject, const Cigar& alignment)
+	{
+		this->subject = subject;
+		this->alignment = alignment;
+	}
+
+	SearchHit::~SearchHit() {}
+
+	SeedSearcher::SeedSearcher(int gap_penalty)
+	{
+		this->open_gap_penalty = gap_penalty;
+		this->extend_gap_penalty = gap_penalty;
+		this->affine = false;
+	}
+
+	SeedSearcher::SeedSearcher(int open_gap_penalty, int extend_gap_penalty)
+	{
+		this->open_gap_penalty = open_gap_penalty;
+		this->extend_gap_penalty = extend_gap_penalty;
+		this->affine = true;
+	}
+
+	SeedSearcher::~SeedSearcher() {}
+
+	MatrixDataType SeedSearcher::extend_ungapped(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int query_position, const int subject_position, const int k, const MatrixDataType ungapped_x_drop, int& query_start, int& query_end)
+	{
+		const char* characters1 = query.c_str();
+		const char* characters2 = subject.c_str();
+		int length1 = query.length();
+		int length2 = subject.length();
+
+		MatrixDataType score = 0;
+		for ( int i = 0; i < k; i++ )
+			score += substitution_matrix.score(characters1[query_position + i], characters2[subject_position + i]);
+
+		MatrixDataType best = score;
+		query_start = query_position;
+		query_end = query_position + k;
+		for ( int i = query_position + k, j = subject_position + k; i < length1 && j < length2; i++, j++ )
+		{
+			score += substitution_matrix.score(characters1[i], characters2[j]);
+			if ( score > best )
+			{
+				best = score;
+				query_end = i + 1;
+			}
+			else if ( score < best - ungapped_x_drop )
+				break;
+		}
+
+		score = best;
+		for ( int i = query_position - 1, j = subject_position - 1; i >= 0 && j >= 0; i--, j-- )
+		{
+			score += substitution_matrix.score(characters1[i], characters2[j]);
+			if ( score > best )
+			{
+				best = score;
+				query_start = i;
+			}
+			else if ( score < best - ungapped_x_drop )
+				break;
+		}
+
+		return best;
+	}
+
+	Cigar SeedSearcher::extend_gapped(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int query_position, const int subject_position, const MatrixDataType x_drop)
+	{
+		BandedSequencer sequencer = this->affine ? BandedSequencer(this->open_gap_penalty, this->extend_gap_penalty) : BandedSequencer(this->open_gap_penalty);
+		const char gap_character = substitution_matrix.getGapCharacter();
+		std::string characters1 = std::string(query.c_str());
+		std::string characters2 = std::string(subject.c_str());
+		std::string aligned_sequence1;
+		std::string aligned_sequence2;
+		MatrixDataType score = 0;
+
+		// The prefixes are reversed, so extending them from their start extends the alignment
+		// backwards from the anchor.
+		if ( query_position > 0 && subject_position > 0 )
+		{
+			std::string prefix1 = std::string(characters1.rend() - query_position, characters1.rend());
+			std::string prefix2 = std::string(characters2.rend() - subject_position, characters2.rend());
+			PairwiseAlignment backward = sequencer.extend(substitution_matrix, Sequence(prefix1), Sequence(prefix2), x_drop, false);
+			aligned_sequence1 = std::string(backward.getSequence(0).c_str());
+			aligned_sequence2 = std::string(backward.getSequence(1).c_str());
+			std::reverse(aligned_sequence1.begin(), aligned_sequence1.end());
+			std::reverse(aligned_sequence2.begin(), aligned_sequence2.end());
+			score += backward.getScore();
+		}
+
+		int start1 = query_position - search_aligned_length(aligned_sequence1, gap_character);
+		int start2 = subject_position - search_aligned_length(aligned_sequence2, gap_character);
+
+		if ( query_position < query.length() && subject_position < subject.length() )
+		{
+			PairwiseAlignment forward = sequencer.extend(substitution_matrix, Sequence(characters1.substr(query_position)), Sequence(characters2.substr(subject_position)), x_drop, false);
+			aligned_sequence1 += forward.getSequence(0).c_str();
+			aligned_sequence2 += forward.getSequence(1).c_str();
+			score += forward.getScore();
+		}
+
+		PairwiseAlignment alignment = PairwiseAlignment(Sequence(aligned_sequence1), Sequence(aligned_sequence2), score);
+		alignment.setStart(start1, start2);
+		return Cigar(alignment, query, subject, gap_character);
+	}
+
+	bool SeedSearcher::search_subject(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int k, const SearchSeed* first, const SearchSeed* last, const MatrixDataType x_drop, const MatrixDataType ungapped_x_drop, const MatrixDataType minimum_score, Cigar& hit)
+	{
+		// The seeds of a diagonal are ordered by their position, so a seed is covered by an
+		// earlier extension when it ends before the end of the last segment of its diagonal.
+		std::vector<SearchSegment> segments;
+		int covered_diagonal = 0;
+		int covered_end = -1;
+		for ( const SearchSeed* seed = first; seed != last; seed++ )
+		{
+			if ( seed->diagonal == covered_diagonal && seed->query_position + k <= covered_end )
+				continue;
+
+			SearchSegment segment;
+			segment.diagonal = seed->diagonal;
+			segment.score = this->extend_ungapped(substitution_matrix, query, subject, seed->query_position, seed->query_position + seed->diagonal, k, ungapped_x_drop, segment.query_start, segment.query_end);
+			covered_diagonal = seed->diagonal;
+			covered_end = segment.query_end;
+			if ( segment.score >= minimum_score )
+				segments.push_back(segment);
+		}
+
+		// The best segments are extended first, and a segment whose anchor lies within the
+		// best gapped alignment found so far would extend into the same alignment.
+		std::sort(segments.begin(), segments.end(), search_segment_greater);
+		bool found = false;
+		for ( unsigned int s = 0; s < segments.size(); s++ )
+		{
+			int query_position = (segments[s].query_start + segments[s].query_end) / 2;
+			int subject_position = query_position + segments[s].diagonal;
+			if ( found && query_position >= hit.getStart(0) && query_position < hit.getEnd(0) && subject_position >= hit.getStart(1) && subject_position < hit.getEnd(1) )
+				continue;
+
+			Cigar alignment = this->extend_gapped(substitution_matrix, query, subject, query_position, subject_position, x_drop);
+			if ( alignment.getScore() >= minimum_score && (!found || alignment.getScore() > hit.getScore()) )
+			{
+				hit = alignment;
+				found = true;
+			}
+		}
+
+		return found;
+	}
+
+	std::vector<SearchHit> SeedSearcher::search(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& subjects, const SeedIndex& index, const MatrixDataType x_drop, const MatrixDataType ungapped_x_drop, const MatrixDataType minimum_score, const int thread_count)
+	{
+		int k = index.getK();
+		const char* characters = query.c_str();
+		std::vector<SearchSeed> seeds;
+		for ( int position = 0; position + k <= query.length(); position++ )
+		{
+			uint64_t kmer;
+			if ( !SeedIndex::pack(characters + position, k, kmer) )
+				continue;
+
+			const SeedPosting* posting;
+			const SeedPosting* last;
+			index.find(kmer, posting, last);
+			for ( ; posting != last; posting++ )
+			{
+				SearchSeed seed = { posting->subject, posting->position - position, position };
+				seeds.push_back(seed);
+			}
+		}
+
+		std::sort(seeds.begin(), seeds.end(), search_seed_less);
+
+		// Every group holds the seeds of one subject.
+		std::vector<int> groups;
+		for ( unsigned int s = 0; s < seeds.size(); s++ )
+		{
+			if ( s == 0 || seeds[s].subject != seeds[s-1].subject )
+				groups.push_back(s);
+		}
+		int group_count = groups.size();
+		groups.push_back(seeds.size());
+
+		std::vector<Cigar> alignments = std::vector<Cigar>(group_count);
+		std::vector<char> found = std::vector<char>(group_count, 0);
+		SeedSearchTask task = { this, &substitution_matrix, &query, &subjects, k, &seeds, &groups, x_drop, ungapped_x_drop, minimum_score, &alignments, &found };
+		Utilities::ThreadPool pool = Utilities::ThreadPool(thread_count);
+		pool.run(group_count, task);
+
+		std::vector<SearchHit> hits;
+		for ( int group = 0; group < group_count; group++ )
+		{
+			if ( found[group] )
+				hits.push_back(SearchHit(seeds[groups[group]].subject, alignments[group]));
+		}
+
+		std::sort(hits.begin(), hits.end(), search_hit_ranks_before);
+		return hits;
+	}
+
+	/***************************************TESTS**************************************/
+
+	/**
+	 * Copies a sequence with random substitutions.
+	 */
+	static std::string search_test_mutate(const std::string& sequence, const std::string& alphabet, const int per_mille)
+	{
+		std::string mutated = sequence;
+		for ( unsigned int i = 0; i < mutated.size(); i++ )
+		{
+			if ( rand() % 1000 < per_mille )
+				mutated[i] = alphabet[rand() % alphabet.size()];
+		}
+		return mutated;
+	}
+
+	/**
+	 * Creates a substitution matrix that scores matching characters with the match score
+	 * and every other pair with the mismatch score.
+	 */
+	static SubstitutionMatrix search_test_identity_matrix(const std::string& alphabet, const int match, const int mismatch)
+	{
+		std::vector<std::vector<MatrixDataType> > matrix = std::vector<std::vector<MatrixDataType> >(alphabet.size() + 1, std::vector<MatrixDataType>(alphabet.size() + 1, mismatch));
+		matrix[0][0] = '*';
+		for ( unsigned int i = 1; i < alphabet.size() + 1; i++ )
+		{
+			matrix[0][i] = alphabet[i-1];
+			matrix[i][0] = alphabet[i-1];
+			matrix[i][i] = match;
+		}
+		return SubstitutionMatrix(matrix);
+	}
+
+	void SeedSearcher::run_tests()
+	{
+		test_index();
+		test_index_file();
+		test_search();
+	}
+
+	void SeedSearcher::test_index()
+	{
+		// Every k-mer is found at each of its positions, whatever its case.
+		srand(1);
+		std::vector<Sequence> subjects;
+		for ( int i = 0; i < 10; i++ )
+			subjects.push_back(test_random_sequence(rand() % 200, "ACGTacgt"));
+		subjects.push_back(Sequence("ACGT-ACGTNNACGT"));
+
+		for ( int k = 1; k < 6; k++ )
+		{
+			SeedIndex index = SeedIndex(subjects, k);
+			assert(index.getK() == k && index.getSubjectCount() == (int)subjects.size());
+
+			int letters = 0;
+			for ( unsigned int subject = 0; subject < subjects.size(); subject++ )
+			{
+				std::string characters = std::string(subjects[subject].c_str());
+				for ( int position = 0; position + k <= (int)characters.size(); position++ )
+				{
+					uint64_t kmer;
+					if ( characters.find('-', position) < (unsigned int)(position + k) )
+					{
+						assert(!SeedIndex::pack(characters.c_str() + position, k, kmer));
+						continue;
+					}
+					letters++;
+
+					std::string upper = characters.substr(position, k);
+					std::transform(upper.begin(), upper.end(), upper.begin(), ::toupper);
+					uint64_t upper_kmer;
+					bool packed = SeedIndex::pack(characters.c_str() + position, k, kmer) && SeedIndex::pack(upper.c_str(), k, upper_kmer) && kmer == upper_kmer;
+					assert(packed);
+					(void)packed;
+
+					const SeedPosting* first;
+					const SeedPosting* last;
+					index.find(kmer, first, last);
+					bool found = false;
+					for ( ; first != last; first++ )
+					{
+						assert(first->kmer == kmer);
+						found = found || (first->subject == (int)subject && first->position == position);
+					}
+					assert(found);
+				}
+			}
+			assert(index.getPostingCount() == letters);
+		}
+
+		SeedIndex empty = SeedIndex(std::vector<Sequence>(), 4);
+		const SeedPosting* first;
+		const SeedPosting* last;
+		empty.find(0, first, last);
+		assert(first == last);
+	}
+
+	/**
+	 * Checks that two indexes hold the same postings for every k-mer of a list of sequences.
+	 */
+	static void search_test_same_postings(const SeedIndex& index1, const SeedIndex& index2, const std::vector<Sequence>& sequences)
+	{
+		assert(index1.getK() == index2.getK() && index1.getPostingCount() == index2.getPostingCount());
+		for ( unsigned int s = 0; s < sequences.size(); s++ )
+		{
+			for ( int position = 0; position + index1.getK() <= sequences[s].length(); position++ )
+			{
+				uint64_t kmer;
+				if ( !SeedIndex::pack(sequences[s].c_str() + position, index1.getK(), kmer) )
+					continue;
+
+				const SeedPosting* first1;
+				const SeedPosting* last1;
+				const SeedPosting* first2;
+				const SeedPosting* last2;
+				index1.find(kmer, first1, last1);
+				index2.find(kmer, first2, last2);
+				assert(last1 - first1 == last2 - first2);
+				for ( ; first1 != last1; first1++, first2++ )
+					assert(first1->kmer == first2->kmer && first1->subject == first2->subject && first1->position == first2->position);
+			}
+		}
+	}
+
+	void SeedSearcher::test_index_file()
+	{
+		srand(3);
+		std::vector<Sequence> subjects;
+		for ( int i = 0; i < 20; i++ )
+			subjects.push_back(test_random_sequence(rand() % 400, "ACGTacgt"));
+
+		std::string filename = "seed_test.index";
+
+		// The mapped index finds the same postings as the index it was saved from.
+		SeedIndex built = SeedIndex(subjects, 6);
+		assert(built.indexes(subjects));
+		assert(built.save(filename));
+		SeedIndex mapped;
+		assert(mapped.load(filename));
+		assert(mapped.getSubjectCount() == 20 && mapped.indexes(subjects));
+		search_test_same_postings(built, mapped, subjects);
+
+		// Appending subjects indexes only the new subjects, and gives the postings of an
+		// index of the whole list.
+		std::vector<Sequence> appended = subjects;
+		for ( int i = 0; i < 5; i++ )
+			appended.push_back(test_random_sequence(rand() % 400, "ACGT"));
+		assert(mapped.indexes(appended));
+		mapped.append(appended);
+		assert(mapped.getSubjectCount() == 25);
+		search_test_same_postings(SeedIndex(appended, 6), mapped, appended);
+
+		// The file can be replaced while a copy of an index is mapped from it.
+		SeedIndex copy;
+		assert(copy.load(filename));
+		assert(mapped.save(filename));
+		search_test_same_postings(built, copy, subjects);
+		assert(copy.load(filename));
+		search_test_same_postings(SeedIndex(appended, 6), copy, appended);
+
+		// An index does not belong to a list whose subjects were changed or removed.
+		std::vector<Sequence> changed = appended;
+		changed[3] = test_random_sequence(50, "ACGT");
+		assert(!copy.indexes(changed));
+		assert(!copy.indexes(subjects));
+
+		// Files that are not index files are not loaded.
+		std::ofstream damaged(filename.c_str(), std::ios::out | std::ios::binary | std::ios::trunc);
+		damaged << "DNASIX01 and not much else";
+		damaged.close();
+		assert(!copy.load(filename));
+		assert(copy.getPostingCount() == 0 && copy.getSubjectCount() == 0);
+		remove(filename.c_str());
+		assert(!copy.load(filename));
+	}
+
+	void SeedSearcher::test_search()
+	{
+		srand(2);
+		SubstitutionMatrix sm = search_test_identity_matrix("ACGT", 5, -4);
+		Sequence query = test_random_sequence(300, "ACGT");
+		std::string characters = std::string(query.c_str());
+
+		// Every third subject holds a mutated copy of a part of the query within random
+		// sequence, and no other subject shares a k-mer with the query.
+		std::vector<Sequence> subjects;
+		for ( int i = 0; i < 30; i++ )
+		{
+			std::string subject = std::string(test_random_sequence(rand() % 300, "ACGT").c_str());
+			if ( i % 3 == 0 )
+			{
+				int start = rand() % 100;
+				std::string planted = search_test_mutate(characters.substr(start, 100 + rand() % 150), "ACGT", 20);
+				subject.insert(rand() % (subject.size() + 1), planted);
+			}
+			subjects.push_back(Sequence(subject));
+		}
+
+		SeedIndex index = SeedIndex(subjects, SeedSearcher::DEFAULT_K);
+		for ( int scheme = 0; scheme < 2; scheme++ )
+		{
+			SeedSearcher searcher = (scheme == 0) ? SeedSearcher(-4) : SeedSearcher(-8, -1);
+			std::vector<SearchHit> hits = searcher.search(sm, query, subjects, index, 1000, SeedSearcher::DEFAULT_UNGAPPED_X_DROP, 100, 3);
+			assert(hits.size() == 10);
+
+			for ( unsigned int h = 0; h < hits.size(); h++ )
+			{
+				const Cigar& alignment = hits[h].getAlignment();
+				const Sequence& subject = subjects[hits[h].getSubject()];
+				(void)alignment;
+				(void)subject;
+				assert(hits[h].getSubject() % 3 == 0);
+				assert(h == 0 || search_hit_ranks_before(hits[h-1], hits[h]));
+
+				// The runs expand into an alignment of the reported coordinates and score.
+				std::string aligned_sequence1;
+				std::string aligned_sequence2;
+				assert(Cigar::expand(alignment.getOperations(), alignment.getStart(0), alignment.getStart(1), query, subject, sm.getGapCharacter(), aligned_sequence1, aligned_sequence2));
+				assert(alignment.getStart(0) + search_aligned_length(aligned_sequence1, sm.getGapCharacter()) == alignment.getEnd(0));
+				assert(alignment.getStart(1) + search_aligned_length(aligned_sequence2, sm.getGapCharacter()) == alignment.getEnd(1));
+
+				// With a large X the hit is the best local alignment of the subject.
+				if ( scheme == 0 )
+					assert(alignment.getScore() == LinearSequencer(-4).sequence(false, sm, query, subject).getScore());
+				else
+					assert(alignment.getScore() == AffineSequencer(-8, -1).sequence(false, sm, query, subject).getScore());
+			}
+
+			std::vector<SearchHit> single = searcher.search(sm, query, subjects, index, 1000, SeedSearcher::DEFAULT_UNGAPPED_X_DROP, 100, 1);
+			assert(single.size() == hits.size());
+			for ( unsigned int h = 0; h < hits.size(); h++ )
+				assert(single[h].getSubject() == hits[h].getSubject() && single[h].getAlignment().getOperations() == hits[h].getAlignment().getOperations());
+		}
+
+		// A query without k-mers finds nothing.
+		SeedSearcher searcher = SeedSearcher(-8, -1);
+		assert(searcher.search(sm, Sequence("ACGT"), subjects, index, 50, SeedSearcher::DEFAULT_UNGAPPED_X_DROP, 0, 2).empty());
+	}
+}
\ No newline at end of file
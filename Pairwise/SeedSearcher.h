@@ -0,0 +1,321 @@
+#include <memory>
+#include <string>
+#include <vector>
+#include <stdint.h>
+#include "SubstitutionMatrix.h"
+#include "Cigar.h"
+#include "../Sequencing/Sequence.h"
+#include "../Utilities/MappedFile.h"
+
+#ifndef ___SEEDSEARCHER___
+#define ___SEEDSEARCHER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * A SeedPosting records one occurrence of a k-mer in the subjects of a SeedIndex.
+	 */
+	struct SeedPosting
+	{
+		uint64_t kmer;
+		int subject;
+		int position;
+	};
+
+	/**
+	 * The SeedIndex class holds the positions of every k-mer of a list of subject sequences,
+	 * the words of the seeds that the SeedSearcher extends. The k-mers are packed into
+	 * integers of five bits per letter, ignoring case like the SubstitutionMatrix, and the
+	 * postings are kept sorted by k-mer, so the occurrences of a k-mer are found with a
+	 * binary search. K-mers that hold a character other than a letter are not indexed.
+	 *
+	 * An index can be saved to an index file and memory-mapped from it again, so the postings
+	 * of a large database are not computed on every search, and only the pages of the file
+	 * that a search touches are read. The file holds a checksum of every subject, which tells
+	 * whether the index still belongs to a list of subjects. When subjects are appended to
+	 * the list, only the new subjects are indexed and merged into the postings. The file is
+	 * written in the byte order of the machine:
+	 *
+	 *     "DNASIX01", int32 k, int32 subject count, uint64 posting count,
+	 *     a uint64 checksum for every subject,
+	 *     every posting as a uint64 k-mer, an int32 subject and an int32 position.
+	 */
+	class SeedIndex
+	{
+	private:
+		int k;
+		int subject_count;
+		std::vector<uint64_t> checksums;
+		std::vector<SeedPosting> postings;
+		std::shared_ptr<Utilities::MappedFile> mapped_file;
+		const SeedPosting* mapped_postings;
+		int mapped_posting_count;
+
+		void index_subjects(const std::vector<Sequence>& subjects, const int first, std::vector<SeedPosting>& postings);
+		const SeedPosting* begin_postings() const;
+		const SeedPosting* end_postings() const;
+
+	public:
+		/**
+		 * The longest k-mer that fits into a packed integer.
+		 */
+		static const int MAXIMUM_K = 12;
+
+		/**
+		 * Default Constructor.
+		 */
+		SeedIndex();
+
+		/**
+		 * Creates the index of a list of subjects.
+		 *
+		 * @param subjects The sequences to index.
+		 * @param k The length of the k-mers, from 1 to MAXIMUM_K.
+		 */
+		SeedIndex(const std::vector<Sequence>& subjects, const int k);
+
+		/**
+		 * Default Destructor.
+		 */
+		~SeedIndex();
+
+		/**
+		 * This function maps an index file, replacing the postings of this index. The
+		 * postings are used in place, so the file must not be written while the index or a
+		 * copy of it is in use.
+		 *
+		 * @param filename The path of the index file.
+		 * @return False if the file could not be mapped or is not an index file, in which
+		 * case the index is left empty.
+		 */
+		bool load(const std::string& filename);
+
+		/**
+		 * This function writes the index to an index file. The file is written under a
+		 * temporary name first and then replaces the file, so an index that is mapped from
+		 * the file stays intact.
+		 *
+		 * @param filename The path of the index file.
+		 * @return False if the file could not be written.
+		 */
+		bool save(const std::string& filename) const;
+
+		/**
+		 * This function tells whether the subjects of the index are the first subjects of a
+		 * list, so the index can be used for the list once the rest of it is appended.
+		 *
+		 * @param subjects The list of subjects.
+		 * @return True if the checksum of every indexed subject matches the subject at the
+		 * same position of the list.
+		 */
+		bool indexes(const std::vector<Sequence>& subjects) const;
+
+		/**
+		 * This function indexes the subjects of a list that follow the subjects of the index
+		 * and merges their postings into the postings of the index. A mapped index is copied
+		 * into memory and its file is released.
+		 *
+		 * @param subjects The list of subjects, of which the index holds the first subjects.
+		 */
+		void append(const std::vector<Sequence>& subjects);
+
+		/**
+		 * This function computes the checksum of a subject, the same hash of the whole
+		 * sequence that the MinHashSketchFile keeps.
+		 *
+		 * @param subject The subject.
+		 * @return The checksum of the subject.
+		 */
+		static uint64_t checksum(const Sequence& subject);
+
+		/**
+		 * This function packs the k-mer that starts at a character.
+		 *
+		 * @param characters The first character of the k-mer.
+		 * @param k The length of the k-mer, from 1 to MAXIMUM_K.
+		 * @param kmer Set to the packed k-mer.
+		 * @return False if the k-mer holds a character other than a letter.
+		 */
+		static bool pack(const char* characters, const int k, uint64_t& kmer);
+
+		/**
+		 * This function finds the postings of a k-mer.
+		 *
+		 * @param kmer The packed k-mer.
+		 * @param first Set to the first posting of the k-mer.
+		 * @param last Set to the posting after the last posting of the k-mer.
+		 */
+		void find(const uint64_t kmer, const SeedPosting*& first, const SeedPosting*& last) const;
+
+		/**
+		 * This function returns the length of the k-mers.
+		 *
+		 * @return The length of the k-mers.
+		 */
+		int getK() const { return this->k; };
+
+		/**
+		 * This function returns the number of subjects that were indexed.
+		 *
+		 * @return The number of subjects.
+		 */
+		int getSubjectCount() const { return this->subject_count; };
+
+		/**
+		 * This function returns the number of indexed k-mers, counting repeats.
+		 *
+		 * @return The number of postings.
+		 */
+		int getPostingCount() const { return this->end_postings() - this->begin_postings(); };
+	};
+
+	/**
+	 * A SearchHit is the best local alignment of the query with one subject.
+	 */
+	class SearchHit
+	{
+	private:
+		int subject;
+		Cigar alignment;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		SearchHit();
+
+		/**
+		 * Creates a hit.
+		 *
+		 * @param subject The index of the subject in the list of subjects.
+		 * @param alignment The runs of the alignment of the query with the subject, the query
+		 * being the first sequence.
+		 */
+		SearchHit(const int subject, const Cigar& alignment);
+
+		/**
+		 * Default Destructor.
+		 */
+		~SearchHit();
+
+		/**
+		 * This function returns the index of the subject in the list of subjects.
+		 *
+		 * @return The index of the subject.
+		 */
+		int getSubject() const { return this->subject; };
+
+		/**
+		 * This function returns the alignment of the query with the subject.
+		 *
+		 * @return The runs of the alignment, its coordinates and its score.
+		 */
+		const Cigar& getAlignment() const { return this->alignment; };
+	};
+
+	struct SearchSeed;
+
+	/**
+	 * The SeedSearcher class searches a list of subject sequences for local alignments with a
+	 * query, in the seed-and-extend style of BLAST, instead of scoring the query against every
+	 * subject with a full sequence matrix:
+	 *
+	 *     Seeds are the k-mers that the query shares with a subject, found in a SeedIndex of
+	 *     the subjects. Seeds are grouped by subject and by diagonal, and a seed that lies
+	 *     within the ungapped extension of an earlier seed of its diagonal is skipped.
+	 *
+	 *     Every other seed is extended without gaps in both directions until the score drops
+	 *     more than the ungapped X below the best score found.
+	 *
+	 *     Ungapped segments that score at least the minimum score are extended with gaps by
+	 *     the X-drop mode of the BandedSequencer, forwards from the middle of the segment and
+	 *     backwards over the reversed prefixes of both sequences.
+	 *
+	 * The best gapped alignment of every subject that scores at least the minimum score is a
+	 * hit, and the hits are ranked by score. Subjects are searched concurrently by a
+	 * ThreadPool, and the hits do not depend on the number of threads.
+	 */
+	class SeedSearcher
+	{
+	private:
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		bool affine;
+
+		friend struct SeedSearchTask;
+
+		bool search_subject(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int k, const SearchSeed* first, const SearchSeed* last, const MatrixDataType x_drop, const MatrixDataType ungapped_x_drop, const MatrixDataType minimum_score, Cigar& hit);
+		MatrixDataType extend_ungapped(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int query_position, const int subject_position, const int k, const MatrixDataType ungapped_x_drop, int& query_start, int& query_end);
+		Cigar extend_gapped(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const Sequence& subject, const int query_position, const int subject_position, const MatrixDataType x_drop);
+
+		//tests
+		void test_index();
+		void test_index_file();
+		void test_search();
+
+	public:
+		/**
+		 * The default k-mer length, the word size of BLAST for nucleotides.
+		 */
+		static const int DEFAULT_K = 11;
+
+		/**
+		 * The default X of the ungapped extension.
+		 */
+		static const int DEFAULT_UNGAPPED_X_DROP = 20;
+
+		/**
+		 * Creates a new searcher using the linear scoring scheme.
+		 *
+		 * @param gap_penalty The gap penalty used for scoring gaps in the alignment.
+		 */
+		SeedSearcher(int gap_penalty);
+
+		/**
+		 * Creates a new searcher using the affine scoring scheme.
+		 *
+		 * @param open_gap_penalty The penalty used for scoring the opening of a gap.
+		 * @param extend_gap_penalty The penalty used for scoring the extension of a gap.
+		 */
+		SeedSearcher(int open_gap_penalty, int extend_gap_penalty);
+
+		/**
+		 * Default Destructor.
+		 */
+		~SeedSearcher();
+
+		/**
+		 * This function searches the subjects for local alignments with the query.
+		 *
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param query The sequence to search for.
+		 * @param subjects The sequences to search, the sequences that the index was built from.
+		 * @param index The index of the subjects.
+		 * @param x_drop How far below the best score a cell of the gapped extension may score
+		 * before it is dropped.
+		 * @param ungapped_x_drop How far below the best score the ungapped extension may drop
+		 * before it ends.
+		 * @param minimum_score The lowest score of an ungapped segment that is extended with
+		 * gaps, and of a hit.
+		 * @param thread_count The number of threads that search the subjects. If the count is
+		 * 0 or less, one thread per processor is used.
+		 * @return The best hit of every subject that has one, the highest score first and
+		 * subjects of the same score in the order of the subjects.
+		 */
+		std::vector<SearchHit> search(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const std::vector<Sequence>& subjects, const SeedIndex& index, const MatrixDataType x_drop, const MatrixDataType ungapped_x_drop, const MatrixDataType minimum_score, const int thread_count);
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,89 @@
+// SIMD_AVX2 or SIMD_SSE2 is defined when the module is compiled for that instruction set.
+#if defined(__AVX2__)
+#include <immintrin.h>
+#define SIMD_AVX2
+#elif defined(__SSE2__) || defined(_M_X64) || (defined(_M_IX86_FP) && _M_IX86_FP >= 2)
+#include <emmintrin.h>
+#define SIMD_SSE2
+#endif
+
+#ifndef ___SIMDVECTOR___
+#define ___SIMDVECTOR___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+#if defined(SIMD_AVX2)
+	/**
+	 * AVX2 vectors of 32 unsigned 8 bit lanes.
+	 */
+	struct SimdVector8
+	{
+		typedef __m256i Vector;
+		static const int LANES = 32;
+		static inline Vector load(const unsigned char* p) { return _mm256_loadu_si256((const __m256i*)p); }
+		static inline Vector set1(const int x) { return _mm256_set1_epi8((char)x); }
+		static inline Vector adds(const Vector a, const Vector b) { return _mm256_adds_epu8(a, b); }
+		static inline Vector subs(const Vector a, const Vector b) { return _mm256_subs_epu8(a, b); }
+		static inline Vector max(const Vector a, const Vector b) { return _mm256_max_epu8(a, b); }
+		static inline bool any_greater(const Vector a, const Vector b) { return _mm256_movemask_epi8(_mm256_cmpeq_epi8(_mm256_subs_epu8(a, b), _mm256_setzero_si256())) != -1; }
+		static inline Vector shift(const Vector a) { return _mm256_alignr_epi8(a, _mm256_permute2x128_si256(a, a, 0x08), 15); }
+		static inline void store(unsigned char* p, const Vector a) { _mm256_storeu_si256((__m256i*)p, a); }
+	};
+
+	/**
+	 * AVX2 vectors of 16 signed 16 bit lanes.
+	 */
+	struct SimdVector16
+	{
+		typedef __m256i Vector;
+		static const int LANES = 16;
+		static inline Vector load(const short* p) { return _mm256_loadu_si256((const __m256i*)p); }
+		static inline Vector set1(const int x) { return _mm256_set1_epi16((short)x); }
+		static inline Vector adds(const Vector a, const Vector b) { return _mm256_adds_epi16(a, b); }
+		static inline Vector max(const Vector a, const Vector b) { return _mm256_max_epi16(a, b); }
+		static inline bool any_greater(const Vector a, const Vector b) { return _mm256_movemask_epi8(_mm256_cmpgt_epi16(a, b)) != 0; }
+		static inline Vector shift(const Vector a, const int x) { return _mm256_insert_epi16(_mm256_alignr_epi8(a, _mm256_permute2x128_si256(a, a, 0x08), 14), (short)x, 0); }
+		static inline void store(short* p, const Vector a) { _mm256_storeu_si256((__m256i*)p, a); }
+	};
+#elif defined(SIMD_SSE2)
+	/**
+	 * SSE2 vectors of 16 unsigned 8 bit lanes.
+	 */
+	struct SimdVector8
+	{
+		typedef __m128i Vector;
+		static const int LANES = 16;
+		static inline Vector load(const unsigned char* p) { return _mm_loadu_si128((const __m128i*)p); }
+		static inline Vector set1(const int x) { return _mm_set1_epi8((char)x); }
+		static inline Vector adds(const Vector a, const Vector b) { return _mm_adds_epu8(a, b); }
+		static inline Vector subs(const Vector a, const Vector b) { return _mm_subs_epu8(a, b); }
+		static inline Vector max(const Vector a, const Vector b) { return _mm_max_epu8(a, b); }
+		static inline bool any_greater(const Vector a, const Vector b) { return _mm_movemask_epi8(_mm_cmpeq_epi8(_mm_subs_epu8(a, b), _mm_setzero_si128())) != 0xFFFF; }
+		static inline Vector shift(const Vector a) { return _mm_slli_si128(a, 1); }
+		static inline void store(unsigned char* p, const Vector a) { _mm_storeu_si128((__m128i*)p, a); }
+	};
+
+	/**
+	 * SSE2 vectors of 8 signed 16 bit lanes.
+	 */
+	struct SimdVector16
+	{
+		typedef __m128i Vector;
+		static const int LANES = 8;
+		static inline Vector load(const short* p) { return _mm_loadu_si128((const __m128i*)p); }
+		static inline Vector set1(const int x) { return _mm_set1_epi16((short)x); }
+		static inline Vector adds(const Vector a, const Vector b) { return _mm_adds_epi16(a, b); }
+		static inline Vector max(const Vector a, const Vector b) { return _mm_max_epi16(a, b); }
+		static inline bool any_greater(const Vector a, const Vector b) { return _mm_movemask_epi8(_mm_cmpgt_epi16(a, b)) != 0; }
+		static inline Vector shift(const Vector a, const int x) { return _mm_insert_epi16(_mm_slli_si128(a, 2), (short)x, 0); }
+		static inline void store(short* p, const Vector a) { _mm_storeu_si128((__m128i*)p, a); }
+	};
+#endif
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,446 @@
+#include <algorithm>
+#include <cassert>
+#include <cstdlib>
+#include <limits>
+#include "StripedSequencer.h"
+#include "PairwiseTests.h"
+#include "LinearSequencer.h"
+#include "AffineSequencer.h"
+#include "SimdVector.h"
+
+namespace Pairwise
+{
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+	const int StripedProfile::LANES8 = SimdVector8::LANES;
+	const int StripedProfile::LANES16 = SimdVector16::LANES;
+#else
+	const int StripedProfile::LANES8 = 1;
+	const int StripedProfile::LANES16 = 1;
+#endif
+
+	static const short STRIPED_NEGATIVE_INFINITY = std::numeric_limits<short>::min();
+	static const int STRIPED_MAX16 = std::numeric_limits<short>::max();
+
+	/**
+	 * Clamps a value to the range of the 16 bit lanes.
+	 */
+	static inline short striped_clamp16(const long value)
+	{
+		return (short)std::min<long>(std::max<long>(value, STRIPED_NEGATIVE_INFINITY), STRIPED_MAX16);
+	}
+
+	StripedProfile::StripedProfile()
+	{
+		this->segment_length8 = 0;
+		this->segment_length16 = 0;
+		this->bias = 0;
+		this->min_score = 0;
+		this->max_score = 0;
+	}
+
+	StripedProfile::StripedProfile(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const bool first)
+	{
+		this->profile = ScoreProfile(substitution_matrix, query, first);
+
+		int query_length = this->profile.length();
+		int symbol_count = this->profile.getSymbolCount();
+
+		this->min_score = 0;
+		this->max_score = 0;
+		for ( int symbol = 0; symbol < symbol_count; symbol++ )
+		{
+			const MatrixDataType* row = this->profile.getRow(symbol);
+			for ( int i = 0; i < query_length; i++ )
+			{
+				this->min_score = std::min(this->min_score, row[i]);
+				this->max_score = std::max(this->max_score, row[i]);
+			}
+		}
+
+		// Positions past the end of the query pad the last segments. Their score is low
+		// enough that they never raise the score of the alignment.
+		this->bias = -this->min_score;
+		this->segment_length8 = (query_length + LANES8 - 1) / LANES8;
+		this->segment_length16 = (query_length + LANES16 - 1) / LANES16;
+
+		if ( this->max_score + this->bias < 255 )
+		{
+			this->profile8 = std::vector<unsigned char>(symbol_count * this->segment_length8 * LANES8 + 1, 0);
+			for ( int symbol = 0; symbol < symbol_count; symbol++ )
+			{
+				const MatrixDataType* row = this->profile.getRow(symbol);
+				unsigned char* striped_row = &this->profile8[symbol * this->segment_length8 * LANES8];
+				for ( int s = 0; s < this->segment_length8; s++ )
+					for ( int lane = 0; lane < LANES8; lane++ )
+					{
+						int i = lane * this->segment_length8 + s;
+						striped_row[s * LANES8 + lane] = (i < query_length) ? (unsigned char)(row[i] + this->bias) : 0;
+					}
+			}
+		}
+
+		this->profile16 = std::vector<short>(symbol_count * this->segment_length16 * LANES16 + 1, 0);
+		for ( int symbol = 0; symbol < symbol_count; symbol++ )
+		{
+			const MatrixDataType* row = this->profile.getRow(symbol);
+			short* striped_row = &this->profile16[symbol * this->segment_length16 * LANES16];
+			for ( int s = 0; s < this->segment_length16; s++ )
+				for ( int lane = 0; lane < LANES16; lane++ )
+				{
+					int i = lane * this->segment_length16 + s;
+					striped_row[s * LANES16 + lane] = (i < query_length) ? striped_clamp16(row[i]) : STRIPED_NEGATIVE_INFINITY / 2;
+				}
+		}
+	}
+
+	StripedProfile::~StripedProfile() {}
+
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+	/**
+	 * Scores a linear local alignment with unsigned 8 bit lanes. Every score is stored with
+	 * the bias of the profile added, so the 0 floor of the local alignment is the floor of
+	 * the unsigned saturating arithmetic. Returns false if the score saturated the lanes.
+	 */
+	template <class V>
+	static bool striped_local8(const StripedProfile& query, const EncodedSequence& target, const int gap_penalty, MatrixDataType& score)
+	{
+		typedef typename V::Vector Vector;
+		int segment_length = query.getSegmentLength8();
+		int target_length = target.length();
+
+		std::vector<unsigned char> store_buffer = std::vector<unsigned char>(segment_length * V::LANES, 0);
+		std::vector<unsigned char> load_buffer = std::vector<unsigned char>(segment_length * V::LANES, 0);
+		std::vector<unsigned char> e_buffer = std::vector<unsigned char>(segment_length * V::LANES, 0);
+		unsigned char* h_store = &store_buffer[0];
+		unsigned char* h_load = &load_buffer[0];
+		unsigned char* e = &e_buffer[0];
+
+		Vector gap = V::set1(-gap_penalty);
+		Vector bias = V::set1(query.getBias());
+		Vector highest = V::set1(0);
+
+		for ( int t = 0; t < target_length; t++ )
+		{
+			const unsigned char* profile = query.getRow8(target[t]);
+			Vector f = V::set1(0);
+			Vector h = V::shift(V::load(h_store + (segment_length - 1) * V::LANES));
+			std::swap(h_store, h_load);
+
+			for ( int s = 0; s < segment_length; s++ )
+			{
+				h = V::subs(V::adds(h, V::load(profile + s * V::LANES)), bias);
+				Vector e_current = V::load(e + s * V::LANES);
+				h = V::max(h, e_current);
+				h = V::max(h, f);
+				highest = V::max(highest, h);
+				V::store(h_store + s * V::LANES, h);
+
+				h = V::subs(h, gap);
+				V::store(e + s * V::LANES, V::max(V::subs(e_current, gap), h));
+				f = V::max(V::subs(f, gap), h);
+				h = V::load(h_load + s * V::LANES);
+			}
+
+			// The lazy F loop carries gaps across the segment boundaries until they can no
+			// longer raise any cell or open a better gap than the cell already has.
+			for ( int k = 0; k < V::LANES; k++ )
+			{
+				f = V::shift(f);
+				for ( int s = 0; s < segment_length; s++ )
+				{
+					h = V::load(h_store + s * V::LANES);
+					if ( !V::any_greater(f, V::subs(h, gap)) )
+						goto lazy_f_done;
+
+					h = V::max(h, f);
+					V::store(h_store + s * V::LANES, h);
+					highest = V::max(highest, h);
+
+					h = V::subs(h, gap);
+					V::store(e + s * V::LANES, V::max(V::load(e + s * V::LANES), h));
+					f = V::subs(f, gap);
+				}
+			}
+lazy_f_done:
+			;
+		}
+
+		unsigned char lanes[V::LANES];
+		V::store(lanes, highest);
+		int highest_score = 0;
+		for ( int lane = 0; lane < V::LANES; lane++ )
+			highest_score = std::max(highest_score, (int)lanes[lane]);
+
+		score = highest_score;
+		return highest_score + query.getBias() < 255;
+	}
+
+	/**
+	 * Scores an alignment with signed 16 bit lanes. The boundaries of the sequence matrix
+	 * follow the LinearSequencer for linear alignments and the AffineSequencer for affine
+	 * alignments. Returns false if the score saturated the lanes.
+	 */
+	template <class V>
+	static bool striped_score16(const StripedProfile& query, const EncodedSequence& target, const bool global, const bool affine, const int open_gap_penalty, const int extend_gap_penalty, MatrixDataType& score)
+	{
+		typedef typename V::Vector Vector;
+		int segment_length = query.getSegmentLength16();
+		int query_length = query.length();
+		int target_length = target.length();
+
+		std::vector<short> store_buffer = std::vector<short>(segment_length * V::LANES, 0);
+		std::vector<short> load_buffer = std::vector<short>(segment_length * V::LANES, 0);
+		std::vector<short> e_buffer = std::vector<short>(segment_length * V::LANES, 0);
+		short* h_store = &store_buffer[0];
+		short* h_load = &load_buffer[0];
+		short* e = &e_buffer[0];
+
+		// The first row and column of the sequence matrix. Affine alignments start the gap
+		// matrices at 0 in the first row and column, the same as the AffineSequencer.
+		std::vector<long> boundary = std::vector<long>(std::max(query_length, target_length) + 1, 0);
+		for ( int k = 1; k < (int)boundary.size(); k++ )
+		{
+			if ( !global )
+				boundary[k] = 0;
+			else if ( affine )
+				boundary[k] = std::max(0L, (long)open_gap_penalty + (long)(k - 1) * extend_gap_penalty);
+			else
+				boundary[k] = (long)open_gap_penalty * k;
+		}
+		long gap_boundary = affine ? 0 : STRIPED_NEGATIVE_INFINITY;
+
+		for ( int s = 0; s < segment_length; s++ )
+		{
+			for ( int lane = 0; lane < V::LANES; lane++ )
+			{
+				int k = std::min(lane * segment_length + s + 1, query_length);
+				h_store[s * V::LANES + lane] = striped_clamp16(boundary[k]);
+				e[s * V::LANES + lane] = striped_clamp16(std::max(boundary[k] + open_gap_penalty, gap_boundary + extend_gap_penalty));
+			}
+		}
+
+		Vector open_gap = V::set1(open_gap_penalty);
+		Vector extend_gap = V::set1(extend_gap_penalty);
+		Vector zero = V::set1(0);
+		Vector highest = V::set1(0);
+
+		for ( int t = 0; t < target_length; t++ )
+		{
+			const short* profile = query.getRow16(target[t]);
+			Vector f = V::shift(V::set1(STRIPED_NEGATIVE_INFINITY), striped_clamp16(std::max(boundary[t+1] + open_gap_penalty, gap_boundary + extend_gap_penalty)));
+			Vector h = V::shift(V::load(h_store + (segment_length - 1) * V::LANES), striped_clamp16(boundary[t]));
+			std::swap(h_store, h_load);
+
+			for ( int s = 0; s < segment_length; s++ )
+			{
+				h = V::adds(h, V::load(profile + s * V::LANES));
+				Vector e_current = V::load(e + s * V::LANES);
+				h = V::max(h, e_current);
+				h = V::max(h, f);
+				if ( !global )
+				{
+					h = V::max(h, zero);
+					highest = V::max(highest, h);
+				}
+				V::store(h_store + s * V::LANES, h);
+
+				h = V::adds(h, open_gap);
+				V::store(e + s * V::LANES, V::max(V::adds(e_current, extend_gap), h));
+				f = V::max(V::adds(f, extend_gap), h);
+				h = V::load(h_load + s * V::LANES);
+			}
+
+			// The lazy F loop carries gaps across the segment boundaries until they can no
+			// longer raise any cell or open a better gap than the cell already has.
+			for ( int k = 0; k < V::LANES; k++ )
+			{
+				f = V::shift(f, STRIPED_NEGATIVE_INFINITY);
+				for ( int s = 0; s < segment_length; s++ )
+				{
+					h = V::load(h_store + s * V::LANES);
+					if ( !V::any_greater(f, V::adds(h, open_gap)) )
+						goto lazy_f_done;
+
+					h = V::max(h, f);
+					V::store(h_store + s * V::LANES, h);
+					if ( !global )
+						highest = V::max(highest, h);
+
+					h = V::adds(h, open_gap);
+					V::store(e + s * V::LANES, V::max(V::load(e + s * V::LANES), h));
+					f = V::adds(f, extend_gap);
+				}
+			}
+lazy_f_done:
+			;
+		}
+
+		if ( global )
+		{
+			int s = (query_length - 1) % segment_length;
+			int lane = (query_length - 1) / segment_length;
+			score = h_store[s * V::LANES + lane];
+			return true;
+		}
+
+		short lanes[V::LANES];
+		V::store(lanes, highest);
+		int highest_score = 0;
+		for ( int lane = 0; lane < V::LANES; lane++ )
+			highest_score = std::max(highest_score, (int)lanes[lane]);
+
+		score = highest_score;
+		return highest_score < STRIPED_MAX16;
+	}
+#endif
+
+	StripedSequencer::StripedSequencer(int gap_penalty)
+	{
+		this->open_gap_penalty = gap_penalty;
+		this->extend_gap_penalty = gap_penalty;
+		this->affine = false;
+	}
+
+	StripedSequencer::StripedSequencer(int open_gap_penalty, int extend_gap_penalty)
+	{
+		this->open_gap_penalty = open_gap_penalty;
+		this->extend_gap_penalty = extend_gap_penalty;
+		this->affine = true;
+	}
+
+	StripedSequencer::~StripedSequencer() {}
+
+	MatrixDataType StripedSequencer::score_scalar(const bool global, const StripedProfile& query, const EncodedSequence& target)
+	{
+		if ( this->affine )
+		{
+			AffineSequencer as = AffineSequencer(this->open_gap_penalty, this->extend_gap_penalty);
+			return as.score(global, query.getProfile(), target);
+		}
+
+		LinearSequencer ds = LinearSequencer(this->open_gap_penalty);
+		return ds.score(global, query.getProfile(), target);
+	}
+
+	MatrixDataType StripedSequencer::score(const bool global, const StripedProfile& query, const EncodedSequence& target)
+	{
+		if ( query.length() == 0 || target.length() == 0 || query.isFirst() == target.isFirst() )
+			return 0;
+
+#if defined(SIMD_AVX2) || defined(SIMD_SSE2)
+		MatrixDataType score = 0;
+
+		// The AffineSequencer lets a gap in one sequence open from a gap in the other
+		// sequence. The striped recurrence only matches it when opening a gap costs at least
+		// as much as extending one, and the lazy F loop requires that gaps are penalized.
+		if ( this->open_gap_penalty > this->extend_gap_penalty || this->extend_gap_penalty > 0 )
+			return this->score_scalar(global, query, target);
+
+		if ( !this->affine && !global && query.getMaxScore() + query.getBias() < 255 && this->open_gap_penalty > -255 )
+		{
+			if ( striped_local8<SimdVector8>(query, target, this->open_gap_penalty, score) )
+				return score;
+		}
+
+		// Every cell of the sequence matrix is the sum of at most one substitution or gap
+		// per character of both sequences, so global scores that stay within this bound
+		// cannot saturate the 16 bit lanes.
+		long step = std::max(std::max((long)query.getMaxScore(), -(long)query.getMinScore()), std::max(std::labs(this->open_gap_penalty), std::labs(this->extend_gap_penalty)));
+		long bound = (long)(query.length() + target.length() + 2) * step;
+		bool global16 = (global || this->affine) && bound < STRIPED_MAX16;
+
+		if ( global16 || (!global && !this->affine && step < STRIPED_MAX16 / 2) )
+		{
+			if ( striped_score16<SimdVector16>(query, target, global || this->affine, this->affine, this->open_gap_penalty, this->extend_gap_penalty, score) )
+				return score;
+		}
+#endif
+
+		return this->score_scalar(global, query, target);
+	}
+
+	MatrixDataType StripedSequencer::score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2)
+	{
+		// Invalid input is scored the same way the LinearSequencer and AffineSequencer score it.
+		if ( sequence1.length() == 0 || sequence2.length() == 0 )
+			return 0;
+
+		if ( substitution_matrix.getColumnCount() == 0 || substitution_matrix.getRowCount() == 0 )
+			return 0;
+
+		return this->score(global, StripedProfile(substitution_matrix, sequence1, true), EncodedSequence(substitution_matrix, sequence2, false));
+	}
+
+	const char* StripedSequencer::getInstructionSet()
+	{
+#if defined(SIMD_AVX2)
+		return "AVX2";
+#elif defined(SIMD_SSE2)
+		return "SSE2";
+#else
+		return "none";
+#endif
+	}
+
+	/***************************************TESTS**************************************/
+
+	void StripedSequencer::run_tests()
+	{
+		test_linear_score();
+		test_affine_score();
+		test_score_overflow();
+	}
+
+	void StripedSequencer::test_linear_score()
+	{
+		srand(1);
+		for ( int test = 0; test < 200; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ACGT", -5, 5);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 150, "ACGTacgtN");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 150, "ACGTacgtN");
+			int gap_penalty = -(rand() % 6);
+
+			LinearSequencer ds = LinearSequencer(gap_penalty);
+			StripedSequencer ss = StripedSequencer(gap_penalty);
+			assert(ss.score(true, sm, sequence1, sequence2) == ds.score(true, sm, sequence1, sequence2));
+			assert(ss.score(false, sm, sequence1, sequence2) == ds.score(false, sm, sequence1, sequence2));
+		}
+	}
+
+	void StripedSequencer::test_affine_score()
+	{
+		srand(2);
+		for ( int test = 0; test < 200; test++ )
+		{
+			SubstitutionMatrix sm = test_random_matrix("ARNDCQEGHILKMFPSTWYV", -4, 11);
+			Sequence sequence1 = test_random_sequence(1 + rand() % 150, "ARNDCQEGHILKMFPSTWYVx");
+			Sequence sequence2 = test_random_sequence(1 + rand() % 150, "ARNDCQEGHILKMFPSTWYVx");
+			int open_gap_penalty = -(rand() % 12);
+			int extend_gap_penalty = -(rand() % 4);
+
+			AffineSequencer as = AffineSequencer(open_gap_penalty, extend_gap_penalty);
+			StripedSequencer ss = StripedSequencer(open_gap_penalty, extend_gap_penalty);
+			assert(ss.score(true, sm, sequence1, sequence2) == as.score(true, sm, sequence1, sequence2));
+		}
+	}
+
+	void StripedSequencer::test_score_overflow()
+	{
+		// Long, nearly identical sequences exceed the 8 bit lanes and the bound of the 16
+		// bit lanes, so these scores are produced by the fallback kernels.
+		srand(3);
+		SubstitutionMatrix sm = test_random_matrix("ACGT", 5, 20);
+		Sequence sequence1 = test_random_sequence(3000, "ACGT");
+		Sequence sequence2 = Sequence(std::string(sequence1.c_str()).substr(100));
+
+		LinearSequencer ds = LinearSequencer(-2);
+		StripedSequencer ss = StripedSequencer(-2);
+		assert(ss.score(true, sm, sequence1, sequence2) == ds.score(true, sm, sequence1, sequence2));
+		assert(ss.score(false, sm, sequence1, sequence2) == ds.score(false, sm, sequence1, sequence2));
+
+		AffineSequencer as = AffineSequencer(-10, -1);
+		StripedSequencer sa = StripedSequencer(-10, -1);
+		assert(sa.score(true, sm, sequence1, sequence2) == as.score(true, sm, sequence1, sequence2));
+	}
+}
\ No newline at end of file
@@ -0,0 +1,202 @@
+#include <vector>
+#include "SubstitutionMatrix.h"
+#include "EncodedSequence.h"
+#include "ScoreProfile.h"
+#include "../Sequencing/Sequence.h"
+
+#ifndef ___STRIPEDSEQUENCER___
+#define ___STRIPEDSEQUENCER___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	using Sequencing::Sequence;
+
+	/**
+	 * The StripedProfile class holds the query profile used by the StripedSequencer. The
+	 * scores of each symbol are stored in Farrar's striped order: the query is split into
+	 * as many segments as there are lanes in a vector, and vector s holds position s of
+	 * every segment. The profile is kept for 8 bit lanes (biased to be unsigned), 16 bit
+	 * lanes and the regular 32 bit ScoreProfile, which is used whenever the scores of an
+	 * alignment do not fit the narrower lanes.
+	 *
+	 * Farrar: http://dx.doi.org/10.1093/bioinformatics/btl582
+	 */
+	class StripedProfile
+	{
+	private:
+		ScoreProfile profile;
+		std::vector<unsigned char> profile8;
+		std::vector<short> profile16;
+		int segment_length8;
+		int segment_length16;
+		int bias;
+		MatrixDataType min_score;
+		MatrixDataType max_score;
+
+	public:
+		/**
+		 * Default Constructor.
+		 */
+		StripedProfile();
+
+		/**
+		 * Creates the striped profile of a query sequence.
+		 *
+		 * @param substitution_matrix The substitution matrix used to score the query.
+		 * @param query The sequence to profile.
+		 * @param first If true the query is scored as the first sequence of an alignment,
+		 * otherwise as the second sequence. See ScoreProfile.
+		 */
+		StripedProfile(const SubstitutionMatrix& substitution_matrix, const Sequence& query, const bool first);
+
+		/**
+		 * Default Destructor.
+		 */
+		~StripedProfile();
+
+		/**
+		 * This function returns the unstriped 32 bit profile of the query.
+		 *
+		 * @return The score profile of the query.
+		 */
+		const ScoreProfile& getProfile() const { return this->profile; };
+
+		/**
+		 * This function returns the length of the profiled query.
+		 *
+		 * @return The length of the query.
+		 */
+		int length() const { return this->profile.length(); };
+
+		/**
+		 * This function returns true if the query was profiled as the first sequence.
+		 *
+		 * @return True if the query is the first sequence of its alignments.
+		 */
+		bool isFirst() const { return this->profile.isFirst(); };
+
+		/**
+		 * These functions return the number of vectors in each striped row of the 8 bit
+		 * and 16 bit profiles.
+		 */
+		int getSegmentLength8() const { return this->segment_length8; };
+		int getSegmentLength16() const { return this->segment_length16; };
+
+		/**
+		 * These functions return the value added to every score of the 8 bit profile and
+		 * the lowest and highest scores found in the profile.
+		 */
+		int getBias() const { return this->bias; };
+		MatrixDataType getMinScore() const { return this->min_score; };
+		MatrixDataType getMaxScore() const { return this->max_score; };
+
+		/**
+		 * These functions return the striped scores of the query against an encoded symbol
+		 * of the other sequence.
+		 *
+		 * @param symbol The symbol index of a target character. See EncodedSequence.
+		 * @return The first vector of the striped row.
+		 */
+		const unsigned char* getRow8(const int symbol) const { return &this->profile8[symbol * this->segment_length8 * StripedProfile::LANES8]; };
+		const short* getRow16(const int symbol) const { return &this->profile16[symbol * this->segment_length16 * StripedProfile::LANES16]; };
+
+		/**
+		 * The number of 8 bit and 16 bit lanes in the vectors of the compiled instruction set.
+		 */
+		static const int LANES8;
+		static const int LANES16;
+	};
+
+	/**
+	 * The StripedSequencer class scores alignments with Farrar's striped algorithm using
+	 * SSE2 or, when the module is compiled with AVX2 enabled, AVX2 vectors. Every vector
+	 * holds one cell of each query segment, so a whole column of cells is computed with
+	 * each vector instruction. The scores are identical to the scores of the score() function
+	 * of the LinearSequencer and AffineSequencer:
+	 *
+	 *     Linear local alignments are first scored with saturating 8 bit lanes.
+	 *     Linear global alignments and affine alignments are scored with 16 bit lanes.
+	 *     When the scores could exceed the range of the lanes the alignment is scored
+	 *     again with the 32 bit scalar kernel.
+	 *
+	 * Without SSE2 every alignment is scored with the 32 bit scalar kernel.
+	 */
+	class StripedSequencer
+	{
+	private:
+		MatrixDataType open_gap_penalty;
+		MatrixDataType extend_gap_penalty;
+		bool affine;
+
+		MatrixDataType score_scalar(const bool global, const StripedProfile& query, const EncodedSequence& target);
+
+		//tests
+		void test_linear_score();
+		void test_affine_score();
+		void test_score_overflow();
+
+	public:
+		/**
+		 * Creates a new striped sequencer using the linear scoring scheme.
+		 *
+		 * @param gap_penalty The gap penalty used for scoring gaps in the alignment.
+		 */
+		StripedSequencer(int gap_penalty);
+
+		/**
+		 * Creates a new striped sequencer using the affine scoring scheme.
+		 *
+		 * @param open_gap_penalty The penalty used for scoring the opening of a gap.
+		 * @param extend_gap_penalty The penalty used for scoring the extension of a gap.
+		 */
+		StripedSequencer(int open_gap_penalty, int extend_gap_penalty);
+
+		/**
+		 * Default Destructor.
+		 */
+		~StripedSequencer();
+
+		/**
+		 * This function computes the score of the alignment between a profiled query and an
+		 * encoded target. The query and the target must be prepared for opposite roles.
+		 *
+		 * @param global If true the sequences are scored globally, otherwise locally.
+		 * Affine alignments are currently always scored globally.
+		 * @param query The striped profile of one of the sequences.
+		 * @param target The other sequence, encoded with the same substitution matrix.
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const StripedProfile& query, const EncodedSequence& target);
+
+		/**
+		 * This function computes the score of the alignment between two sequences.
+		 *
+		 * @param global If true the sequences are scored globally, otherwise locally.
+		 * @param substitution_matrix The substitution matrix that will be used
+		 * to find the scores between the included nucleotide or protein characters
+		 * in the sequences.
+		 * @param sequence1 The first sequence that will be scored against the second sequence
+		 * @param sequence2 The second sequecne that will be scored against the first sequence
+		 * @return The score of the best alignment between the two sequences.
+		 */
+		MatrixDataType score(const bool global, const SubstitutionMatrix& substitution_matrix, const Sequence& sequence1, const Sequence& sequence2);
+
+		/**
+		 * This function returns the name of the instruction set that the striped kernels
+		 * were compiled for: "AVX2", "SSE2" or "none".
+		 *
+		 * @return The name of the instruction set.
+		 */
+		static const char* getInstructionSet();
+
+		//tests
+		void run_tests();
+	};
+}
+
+#endif
\ No newline at end of file
@@ -1,3 +1,4 @@
+#include <algorithm>
 #include <fstream>
 #include <iostream>
 #include "SubstitutionMatrix.h"
@@ -7,12 +8,14 @@ namespace Pairwise
 	SubstitutionMatrix::SubstitutionMatrix()
 	{
 		this->matrix_has_corner = false;
+		this->score_table_create();
 	}
 
 	SubstitutionMatrix::SubstitutionMatrix(std::vector<std::vector<MatrixDataType> >& input_matrix)
 	{
 		this->matrix = input_matrix;
 		this->matrix_has_corner = false;
+		this->score_table_create();
 	}
 
 	SubstitutionMatrix::~SubstitutionMatrix() {}
@@ -31,9 +34,44 @@ namespace Pairwise
 
 		this->scanComments(fileScanner);
 		this->scanMatrix(fileScanner);
+		this->score_table_create();
 		return true;
 	}
 
+	void SubstitutionMatrix::score_table_create()
+	{
+		int row_count = this->matrix.size();
+		int column_count = (row_count > 0) ? this->matrix[0].size() : 0;
+
+		for ( int c = 0; c < SYMBOL_COUNT; c++ )
+		{
+			this->column_symbols[c] = 0;
+			this->row_symbols[c] = 0;
+		}
+
+		this->score_table_columns = std::max(column_count, 1);
+		this->score_table = std::vector<MatrixDataType>(std::max(row_count, 1) * this->score_table_columns, 0);
+
+		// When a label occurs more than once the last occurrence is used.
+		for ( int i = 1; i < column_count; i++ )
+			for ( int c = 0; c < SYMBOL_COUNT; c++ )
+				if ( (char)(this->matrix[0][i]) == (char)toupper(c) )
+					this->column_symbols[c] = i;
+
+		for ( int i = 1; i < row_count; i++ )
+		{
+			if ( this->matrix[i].size() == 0 )
+				continue;
+
+			for ( int c = 0; c < SYMBOL_COUNT; c++ )
+				if ( (char)(this->matrix[i][0]) == (char)toupper(c) )
+					this->row_symbols[c] = i;
+
+			for ( int j = 1; j < column_count && j < (int)this->matrix[i].size(); j++ )
+				this->score_table[i * this->score_table_columns + j] = this->matrix[i][j];
+		}
+	}
+
 	void SubstitutionMatrix::scanComments(Utilities::FileScanner& fileScanner)
 	{
 		std::string currentLine;
@@ -109,30 +147,6 @@ namespace Pairwise
 		return this->matrix[i][j];
 	}
 
-	int SubstitutionMatrix::score(const char nucleotide1, const char nucleotide2) const
-	{
-		int nucleotideIndex1 = 0;
-		int nucleotideIndex2 = 0;
-
-		for ( unsigned int i = 0; i < this->matrix.size(); i++ )
-			if ( (char)(this->matrix[0][i]) == toupper(nucleotide1) )
-				nucleotideIndex1 = i;
-
-		if ( nucleotideIndex1 == 0 )
-			return 0;
-
-		for ( unsigned int i = 0; i < this->matrix.size(); i++ )
-			if ( (char)(this->matrix[i][0]) == toupper(nucleotide2) )
-				nucleotideIndex2 = i;
-
-		if ( nucleotideIndex2 == 0 )
-			return 0;
-
-		int score = this->matrix[nucleotideIndex2][nucleotideIndex1];
-
-		return score;
-	}
-
 	char SubstitutionMatrix::getGapCharacter() const
 	{
 		return this->GAP_CHARACTER;
@@ -28,10 +28,23 @@ namespace Pairwise
 		static const char COMMENT_SYMBOL = '#';
 		static const char UNKNOWN_SYMBOL = '*';
 		static const char GAP_CHARACTER = '-';
+		static const int SYMBOL_COUNT = 256;
 		std::vector<std::vector<MatrixDataType> > matrix;
 		std::vector<std::string> comments;
 		bool matrix_has_corner;
 
+		/**
+		 * The score table holds the matrix scores in a single contiguous block that is
+		 * indexed by the positions of the row and column labels. Every one of the 256
+		 * character values is mapped to the position of its upper case label, or to 0 if
+		 * the character is not in the matrix, where the table row and column are all 0.
+		 */
+		int column_symbols[SYMBOL_COUNT];
+		int row_symbols[SYMBOL_COUNT];
+		int score_table_columns;
+		std::vector<MatrixDataType> score_table;
+
+		void score_table_create();
 		void scanComments(Utilities::FileScanner& fileScanner);
 		void scanMatrix(Utilities::FileScanner& fileScanner);
 		std::vector<MatrixDataType> scanMatrixLine(std::string line);
@@ -108,8 +121,62 @@ namespace Pairwise
 		 * @param nucleotide2 The second representative character. This character must be in
 		 * the substitution matrix for a valid result.
 		 * @return The match or mismatch score associated with the provided characters.
+		 * Characters are matched regardless of case and characters that are not in the
+		 * substitution matrix score 0.
+		 */
+		inline int score(const char nucleotide1, const char nucleotide2) const
+		{
+			return this->score_table[this->row_symbols[(unsigned char)nucleotide2] * this->score_table_columns + this->column_symbols[(unsigned char)nucleotide1]];
+		}
+
+		/**
+		 * This function returns the symbol of a character when it is scored as part of the
+		 * first sequence. The symbol is the position of the character's column in the
+		 * substitution matrix, or 0 if the character is not in the matrix.
+		 *
+		 * @param nucleotide The representative character.
+		 * @return The column symbol of the character.
+		 */
+		inline int getColumnSymbol(const char nucleotide) const { return this->column_symbols[(unsigned char)nucleotide]; }
+
+		/**
+		 * This function returns the symbol of a character when it is scored as part of the
+		 * second sequence. The symbol is the position of the character's row in the
+		 * substitution matrix, or 0 if the character is not in the matrix.
+		 *
+		 * @param nucleotide The representative character.
+		 * @return The row symbol of the character.
+		 */
+		inline int getRowSymbol(const char nucleotide) const { return this->row_symbols[(unsigned char)nucleotide]; }
+
+		/**
+		 * This function returns the number of distinct column symbols, including symbol 0
+		 * for characters that are not in the matrix.
+		 *
+		 * @return The number of column symbols.
+		 */
+		inline int getColumnSymbolCount() const { return this->score_table_columns; }
+
+		/**
+		 * This function returns the number of distinct row symbols, including symbol 0
+		 * for characters that are not in the matrix.
+		 *
+		 * @return The number of row symbols.
+		 */
+		inline int getRowSymbolCount() const { return this->score_table.size() / this->score_table_columns; }
+
+		/**
+		 * This function returns the score between two characters that have already been
+		 * translated to their symbols.
+		 *
+		 * @param column_symbol The column symbol of the character from the first sequence.
+		 * @param row_symbol The row symbol of the character from the second sequence.
+		 * @return The match or mismatch score associated with the provided symbols.
 		 */
-		int score(const char nucleotide1, const char nucleotide2) const;
+		inline int scoreSymbols(const int column_symbol, const int row_symbol) const
+		{
+			return this->score_table[row_symbol * this->score_table_columns + column_symbol];
+		}
 
 		/**
 		 * Returns the gap character associated with this substitution matrix.
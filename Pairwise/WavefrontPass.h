@@ -0,0 +1,157 @@
+#include <vector>
+#include <algorithm>
+#include "SubstitutionMatrix.h"
+#include "../Utilities/Wavefront.h"
+
+#ifndef ___WAVEFRONTPASS___
+#define ___WAVEFRONTPASS___
+
+/**
+ * The pairwise namespace contains all of the data structures and
+ * algorithms related to pairwise sequencing (The alignment of only
+ * two nucleotide or protein sequences at a time)
+ */
+namespace Pairwise
+{
+	/**
+	 * The WavefrontPass class computes the last row of a sequence matrix without keeping the
+	 * matrix, like the forward and backward passes of the linear-space alignments, with the
+	 * tiles of a Wavefront. Instead of the rows of the whole matrix only one row and one
+	 * column of values are kept: a tile reads the last row of the tile above it and the
+	 * last column of the tile to its left, and replaces them with its own last row and
+	 * column. The value at the upper left corner of every tile is kept separately, since
+	 * the tile to its left has replaced it by the time the tile is computed.
+	 *
+	 * The Cell type is a function object that holds the scoring of the pass. Its
+	 * STATE_COUNT is the number of values of every cell, one for each sequence matrix, and
+	 * it is called as cell(r, c, diagonal, up, left, result) with the values of the
+	 * neighbours of cell (r, c) to compute the values of the cell. The rows and columns of
+	 * the pass are counted from 1, row 0 and column 0 being the boundary.
+	 */
+	template <class Cell>
+	class WavefrontPass
+	{
+	private:
+		static const int STATE_COUNT = Cell::STATE_COUNT;
+
+		const Cell* cell;
+		int rows;
+		int columns;
+		int tile_size;
+		int tile_columns;
+		std::vector<MatrixDataType> row;
+		std::vector<MatrixDataType> column;
+		std::vector<MatrixDataType> corners;
+
+	public:
+		/**
+		 * Creates a new pass. The values of the boundary are stored one cell after the
+		 * other, with the values of all of the states of a cell next to each other.
+		 *
+		 * @param cell The function object that computes the values of a cell.
+		 * @param rows The number of rows of the pass.
+		 * @param columns The number of columns of the pass.
+		 * @param first_row The values of row 0, columns + 1 cells.
+		 * @param first_column The values of column 0, rows + 1 cells.
+		 */
+		WavefrontPass(const Cell& cell, const int rows, const int columns, const std::vector<MatrixDataType>& first_row, const std::vector<MatrixDataType>& first_column)
+		{
+			this->cell = &cell;
+			this->rows = rows;
+			this->columns = columns;
+			this->tile_size = 0;
+			this->tile_columns = 0;
+			this->row = first_row;
+			this->column = first_column;
+		}
+
+		/**
+		 * Default Destructor.
+		 */
+		~WavefrontPass() {}
+
+		/**
+		 * This function computes every cell of the pass.
+		 *
+		 * @param wavefront The wavefront that runs the tiles of the pass.
+		 * @param last_row The values of the last row, columns + 1 cells.
+		 */
+		void run(Utilities::Wavefront& wavefront, std::vector<MatrixDataType>& last_row)
+		{
+			this->tile_size = wavefront.getTileSize();
+			this->tile_columns = wavefront.getTileCount(this->columns);
+			int tile_rows = wavefront.getTileCount(this->rows);
+
+			this->corners = std::vector<MatrixDataType>((tile_rows + 1) * (this->tile_columns + 1) * STATE_COUNT, 0);
+			for ( int x = 0; x < STATE_COUNT; x++ )
+			{
+				for ( int t = 0; t < this->tile_columns; t++ )
+					this->corners[t * STATE_COUNT + x] = this->row[t * this->tile_size * STATE_COUNT + x];
+				for ( int t = 0; t < tile_rows; t++ )
+					this->corners[t * (this->tile_columns + 1) * STATE_COUNT + x] = this->column[t * this->tile_size * STATE_COUNT + x];
+			}
+
+			// The first cell of the last row is a boundary cell, which the tiles never replace.
+			for ( int x = 0; x < STATE_COUNT; x++ )
+				this->row[x] = this->column[this->rows * STATE_COUNT + x];
+
+			wavefront.run(this->rows, this->columns, *this);
+			last_row.swap(this->row);
+		}
+
+		/**
+		 * This function computes one tile of the pass. It is called by the wavefront.
+		 *
+		 * @param tile_row The row of the tile in the grid of tiles.
+		 * @param tile_column The column of the tile in the grid of tiles.
+		 */
+		void operator () (const int tile_row, const int tile_column)
+		{
+			int r0 = tile_row * this->tile_size;
+			int r1 = std::min(this->rows, r0 + this->tile_size);
+			int c0 = tile_column * this->tile_size;
+			int c1 = std::min(this->columns, c0 + this->tile_size);
+			int width = c1 - c0;
+
+			// The cells of the tile are computed in a copy of the row above the tile, which is
+			// replaced row by row the same way the passes replace a single row. The value of the
+			// row at the corner is not read, since the tile to the lower left may be replacing it.
+			std::vector<MatrixDataType> cells = std::vector<MatrixDataType>((width + 1) * STATE_COUNT, 0);
+			int corner = (tile_row * (this->tile_columns + 1) + tile_column) * STATE_COUNT;
+			for ( int x = 0; x < STATE_COUNT; x++ )
+				cells[x] = this->corners[corner + x];
+			std::copy(this->row.begin() + (c0 + 1) * STATE_COUNT, this->row.begin() + (c1 + 1) * STATE_COUNT, cells.begin() + STATE_COUNT);
+
+			MatrixDataType diagonal[STATE_COUNT];
+			MatrixDataType up[STATE_COUNT];
+			for ( int r = r0 + 1; r < r1 + 1; r++ )
+			{
+				for ( int x = 0; x < STATE_COUNT; x++ )
+				{
+					diagonal[x] = cells[x];
+					cells[x] = this->column[r * STATE_COUNT + x];
+				}
+
+				for ( int k = 1; k < width + 1; k++ )
+				{
+					MatrixDataType* current = &cells[k * STATE_COUNT];
+					for ( int x = 0; x < STATE_COUNT; x++ )
+						up[x] = current[x];
+					(*this->cell)(r, c0 + k, diagonal, up, current - STATE_COUNT, current);
+					for ( int x = 0; x < STATE_COUNT; x++ )
+						diagonal[x] = up[x];
+				}
+
+				for ( int x = 0; x < STATE_COUNT; x++ )
+					this->column[r * STATE_COUNT + x] = cells[width * STATE_COUNT + x];
+			}
+
+			std::copy(cells.begin() + STATE_COUNT, cells.end(), this->row.begin() + (c0 + 1) * STATE_COUNT);
+			corner = ((tile_row + 1) * (this->tile_columns + 1) + tile_column + 1) * STATE_COUNT;
+			for ( int x = 0; x < STATE_COUNT; x++ )
+				this->corners[corner + x] = cells[width * STATE_COUNT + x];
+		}
+	};
+}
+
+#endif
\ No newline at end of file
@@ -10,6 +10,7 @@ class Messages :
     STORE_VIEW_STATE = 'storeViewState'
     RUN_PAIRWISE_MATRIX = 'runPairwiseMatrix'
     RUN_PAIRWISE_ONLY = 'runPairwiseOnly'
+    RUN_DATABASE_SEARCH = 'runDatabaseSearch'
     GET_CUSTOM_SUB_MATRIX = 'getCustomSubMatrix'
     GET_STORED_SUB_MATRIX = 'getStoredSubMatrix'
     EXTRACT_SEQUENCES = 'extractSequences'
@@ -25,6 +25,8 @@ class PairwiseSelectorVO( object ) :
     openGapValue = None
     extendedGapValue = None
     gapPenaltyValue = None
+    kmerLengthValue = None
+    bootstrapValue = None
     matrixFileValue = None
     matrixBoxValue = None
     analysisBoxValue = None
@@ -41,6 +43,24 @@ class FileReturnVO( object ) :
     entry = None
     msg = None
 
+##
+# Stores the result of a pairwise alignment as the compact runs of edit operations returned by the Sequencing module,
+# such as "12M2D30M", along with the aligned part of both sequences and the score.  The aligned sequences with gaps
+# inserted are only expanded from the runs when the results are shown, and are then kept in alignedOne and alignedTwo.
+##
+class PairwiseResultVO( object ) :
+    VONAME = 'PairwiseResultVo'
+    operations = None
+    sequenceOne = None
+    sequenceTwo = None
+    startOne = None
+    endOne = None
+    startTwo = None
+    endTwo = None
+    score = None
+    alignedOne = None
+    alignedTwo = None
+
 ##
 # Stores the substitution matrix to be used in the sequence comparison algorithms.
 ##
@@ -56,11 +76,16 @@ class SequenceListVO( object ) :
     sequences = None
 
 ##
-# Stores the score matrix to be used by the multiple sequence comparison algorithms.
+# Stores the score matrix to be used by the multiple sequence comparison algorithms.  The result is the condensed upper
+# triangle of the matrix, including the diagonal, as returned by Sequencing.scoreAllPairs.  The k-mer length and the
+# number of bootstrap replicates are set when the scores are k-mer distances, so the newick tree can be bootstrapped
+# from the same k-mers.
 ##
 class ScoreMatrixResultVO( object ) :
     VONAME = 'ScoreMatrixResultVo'
     result = None
     names = None
+    kmerLength = None
+    replicates = None
     outerLoop = None
     innterLoop = None
\ No newline at end of file
@@ -1,5 +1,4 @@
 import patterns.command
-import multiprocessing
 
 from comm.messages import Messages
 from comm.valueObjects import *
@@ -9,9 +8,9 @@ from libs import Sequencing
 
 ##
 # Takes a list if \ref SequenceVO objects, and constructs a matrix of their scored pairwise comparisons.  This relies on
-# the pyd as well.  It gets its settings from the \ref Model.  The pairwise comparisons occur in multiple processes, but
-# is still blocking system wide until they are complete.  It queries the system for the number of CPU's, and uses this
-# to determine the number of processes to run.
+# the pyd as well.  It gets its settings from the \ref Model.  The pairwise comparisons are scored by a pool of native
+# threads inside the pyd, one per CPU, which releases the GIL while it works, but the command still blocks until they
+# are complete.
 #
 # @see patterns.command.SimpleCommand
 # @see comm.valueObjects.SequenceVO
@@ -37,29 +36,73 @@ class CreateScoreMatrixCommand( patterns.command.SimpleCommand ) :
                 extendGap = int( settings.extendedGapValue )
             except ValueError :
                 extendGap = StaticStateProxy.DEFAULT_EXT_PENALTY
-            items = self.buildAffineMSATasks( openGap, extendGap, matrix, sequences)
+            mode = 'affine'
+            params = ( openGap, extendGap )
+        elif settings.analysisBoxValue == 'Edit Distance':
+            # The edit distances are already distances, so they feed the newick tree without a substitution matrix.
+            mode = 'edit'
+            params = ( )
+        elif settings.analysisBoxValue == 'K-mer Distance':
+            # The k-mer distances skip the alignments altogether, for quick guide trees of many sequences.
+            try :
+                kmerLength = int( settings.kmerLengthValue )
+            except ( TypeError, ValueError ) :
+                kmerLength = StaticStateProxy.DEFAULT_KMER_LENGTH
+            if not 1 <= kmerLength <= StaticStateProxy.MAXIMUM_KMER_LENGTH :
+                kmerLength = StaticStateProxy.DEFAULT_KMER_LENGTH
+            # The newick tree is only bootstrapped when replicates are asked for.
+            try :
+                replicates = int( settings.bootstrapValue )
+            except ( TypeError, ValueError ) :
+                replicates = StaticStateProxy.DEFAULT_BOOTSTRAP_REPLICATES
+            if replicates < 0 :
+                replicates = StaticStateProxy.DEFAULT_BOOTSTRAP_REPLICATES
+            mode = 'kmer'
+            params = ( kmerLength, )
+        elif settings.analysisBoxValue == 'MinHash Distance':
+            # The sketches of the records are kept next to the fasta file, so later runs only sketch new records.
+            mode = 'sketch'
+            params = ( )
         else :
             try :
                 gapPenalty = int( settings.gapPenaltyValue )
             except ValueError :
                 gapPenalty = StaticStateProxy.DEFAULT_GAP_PENALTY
 
-            if settings.analysisBoxValue == 'Global':
-                useGlobal = 1
+            if settings.analysisBoxValue in ( 'Global', 'Banded' ):
+                mode = 'global'
             else :
-                useGlobal = 0
-            items = self.buildLinearMSATasks( useGlobal, gapPenalty, matrix, sequences )
+                mode = 'local'
+            params = ( gapPenalty, )
 
-        results = self.runProcesses( items )
+        # The banded analysis scores the global alignments within a band, the x-drop analysis scores local alignments.
+        if settings.analysisBoxValue == 'Banded':
+            engine = 'banded'
+        else :
+            engine = StaticStateProxy.SCORE_ENGINE
+
+        if mode == 'sketch':
+            results = Sequencing.sketchAllPairs( [ sequence.seq for sequence in sequences ],
+                                                 filename=self.getSketchFile( proxy ),
+                                                 k=StaticStateProxy.SKETCH_KMER_LENGTH,
+                                                 size=StaticStateProxy.SKETCH_SIZE )
+        else :
+            results = Sequencing.scoreAllPairs( matrix, [ sequence.seq for sequence in sequences ], mode, params,
+                                                engine=engine )
+        # The condensed upper triangle is passed to constructNewickTree as it is, without a Python object per score.
         smrvo = ScoreMatrixResultVO()
-        smrvo.result = self.convertToMatrix( results, len( sequences ) )
+        smrvo.result = results
         smrvo.names = []
         for seq in sequences :
             smrvo.names.append( seq.name )
+        if mode == 'kmer' :
+            smrvo.kmerLength = kmerLength
+            smrvo.replicates = replicates
 
         proxy.setData( smrvo )
         self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Score matrix successfully constructed.' )
-        self.sendNotification( Messages.SHOW_RESULTS, smrvo.result )
+        if len( sequences ) <= StaticStateProxy.SHOWN_SCORE_MATRIX_SIZE :
+            self.sendNotification( Messages.SHOW_RESULTS, self.convertToMatrix( results, len( sequences ) ) )
         self.sendNotification( Messages.BUILD_NEWICK_TREE )
 
     ##
@@ -85,84 +128,69 @@ class CreateScoreMatrixCommand( patterns.command.SimpleCommand ) :
         return result
 
     ##
-    # A helper method for processing a pool of worker functions while keeping them in order.
+    # Finds the sketch file of the fasta file the sequences were loaded from, which is the fasta file with the sketch
+    # extension appended.  Sequences that were not loaded from a file are not sketched to disk.
     #
-    # @param items a list of items to be run in multiple processes.
+    # @param proxy the \ref RunningStateProxy that holds the \ref DataSelectorVO.
     ##
-    def runProcesses( self, items ) :
-        result = []
-        try :
-            NUM_PROCESSORS = multiprocessing.cpu_count()
-        except NotImplementedError :
-            # Need to dispatch a notification to show an info screen.
-            message = 'Unable to multi-thread because due to cpu count erring out.'
-            title = 'Asynchronous Processing Error'
-            self.sendNotification( Messages.SHOW_INFO, ( title, message ) )
-            NUM_PROCESSORS = 1
-
-        print( 'Number of processors: ',NUM_PROCESSORS )
-        
-        pool = multiprocessing.Pool( NUM_PROCESSORS )
-        processMap = pool.imap( doStarScore, items )
+    def getSketchFile( self, proxy ) :
+        data = proxy.getData().get( DataSelectorVO.VONAME )
+        if data is None or not data.filePath :
+            return ''
+        return data.filePath + StaticStateProxy.SKETCH_FILE_EXTENSION
 
-        for i in processMap:
-            result.append( i )
-        
-        return result
+##
+# Searches the records of a fasta file for local alignments with its first record, the way BLAST searches a database
+# with a query, instead of scoring every pair of records.  The pyd indexes the k-mers of the other records, extends the
+# seeds they share with the query and returns the best hit of every record, ranked by score.  The index is kept in a
+# file next to the fasta file, so later searches map it instead of indexing the records again, and records appended to
+# the fasta file are added to it.  The hits are shown as a table with the coordinates of the alignments and their runs
+# of edit operations.
+#
+# @see patterns.command.SimpleCommand
+# @see comm.valueObjects.SequenceVO
+# @see core.Model
+##
+class SearchDatabaseCommand( patterns.command.SimpleCommand ) :
+    def execute( self, notification ) :
+        proxy = self.facade.retrieveProxy( RunningStateProxy.NAME )
+        settings = proxy.getData()[ PairwiseSelectorVO.VONAME ]
+        matrix = proxy.getData()[ MatrixFileVO.VONAME ].matrix
+        sequences = proxy.getData()[ SequenceListVO.VONAME ].sequences
 
+        if sequences is None :
+            return
 
-    ##
-    # Constructs the data lists to be passes aa parameters to the worker methods in the process pool.  This one deals
-    # specifically with the needs of the linear sequencing function.
-    ##
-    def buildLinearMSATasks( self, useGlobal, gapPenalty, matrix, sequences ) :
-        items = []
-        for i in range( 0, len( sequences ) ) :
-            for j in range( i, len( sequences ) ) :
-                items.append( ( doLinearPairwise, ( useGlobal, gapPenalty, matrix, sequences[i].seq, sequences[j].seq ) ) )
-        return items
+        try :
+            openGap = int( settings.openGapValue )
+        except ValueError :
+            openGap = StaticStateProxy.DEFAULT_OPEN_PENALTY
 
-    ##
-    # Constructs the data lists to be passes aa parameters to the worker methods in the process pool.  This one deals
-    # specifically with the needs of the affine sequencing function.
-    ##
-    def buildAffineMSATasks( self, openGap, extendGap, matrix, sequences ) :
-        items = []
-        for i in range( 0, len( sequences ) ) :
-            for j in range( i, len( sequences ) ) :
-                items.append( ( doAffinePairwise, ( openGap, extendGap, matrix, sequences[i].seq, sequences[j].seq ) ) )
-        return items
+        try :
+            extendGap = int( settings.extendedGapValue )
+        except ValueError :
+            extendGap = StaticStateProxy.DEFAULT_EXT_PENALTY
 
-##
-# calls the actual worker method defined by the state specific task pool creation methods.  This has to be a the main
-# level because of limitations with Python.  On windows systems, processes can not be created in class methods.  Breaks
-# the task list into the function and parameters to pass to doScore.
-##
-def doStarScore( args ) :
-    return doScore( *args )
+        data = proxy.getData()[ DataSelectorVO.VONAME ]
+        indexFile = data.filePath + StaticStateProxy.SEED_INDEX_EXTENSION
 
-##
-# Another helper function that calls the method passed to it, and unzips the parameter list to forward along.
-#
-# @param method the actual worker method to get the score from the sequence strings.
-# @args the parameters to pass to the worker method.
-##
-def doScore( method, args ) :
-    result = method( *args )
-    return result
+        query = sequences[ 0 ]
+        subjects = sequences[ 1: ]
+        try :
+            hits = Sequencing.searchDatabase( matrix, query.seq, [ subject.seq for subject in subjects ], 'affine',
+                                              ( openGap, extendGap ), filename=indexFile,
+                                              k=StaticStateProxy.SEARCH_SEED_LENGTH,
+                                              x_drop=StaticStateProxy.DEFAULT_X_DROP )
+        except IOError :
+            message = "Unable to write the seed index: %s please check the folder of the fasta file." % indexFile
+            title = 'IO Error'
+            self.sendNotification( Messages.SHOW_INFO, ( title, message ) )
+            return
 
-##
-# A wrapper function for the linearSequence api provided through the c++ lib file.  This one is for linear sequencing.
-##
-def doLinearPairwise( useGlobal, gapPenalty, matrix, sequenceOne, sequenceTwo ) :
-    # elements 0 and 1 of the return value of the linear sequence are the strings ith gaps inserted.
-    score = Sequencing.linearSequence( useGlobal, gapPenalty, matrix, sequenceOne, sequenceTwo )[ 2 ]
-    return score
+        lines = [ 'Hits of %s against %d records:' % ( query.name, len( subjects ) ) ]
+        for subject, operations, queryStart, queryEnd, subjectStart, subjectEnd, score in hits :
+            lines.append( '%s %d query %d-%d subject %d-%d %s' % ( subjects[ subject ].name, score, queryStart, queryEnd,
+                                                                   subjectStart, subjectEnd, operations ) )
 
-##
-# A wrapper function for the linearSequence api provided through the c++ lib file.  This one is for affine sequencing.
-##
-def doAffinePairwise( openGap, extendGap, matrix, sequenceOne, sequenceTwo ) :
-    # elements 0 and 1 of the return value of the affine sequence are the strings ith gaps inserted.
-    score = Sequencing.affineSequence( 1, openGap, extendGap, matrix, sequenceOne, sequenceTwo )[ 2 ]
-    return score
\ No newline at end of file
+        self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Database search complete, %d hits found.' % len( hits ) )
+        self.sendNotification( Messages.SHOW_RESULTS, '\n'.join( lines ) )
\ No newline at end of file
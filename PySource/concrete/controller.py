@@ -61,8 +61,13 @@ class StartAlignmentCommand( patterns.command.SimpleCommand ) :
         if data is not None :
             if data.filePath is not None and data.filePath is not '':
                 self.sendNotification( Messages.EXTRACT_SEQUENCES )
-                self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Starting score matrix calculations.' )
-                self.sendNotification( Messages.RUN_PAIRWISE_MATRIX )
+                # The search only compares the first record with the others, so there is no score matrix to build.
+                if singleSettings is not None and singleSettings.analysisBoxValue == 'Database Search' :
+                    self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Starting database search.' )
+                    self.sendNotification( Messages.RUN_DATABASE_SEARCH )
+                else :
+                    self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Starting score matrix calculations.' )
+                    self.sendNotification( Messages.RUN_PAIRWISE_MATRIX )
             elif data.sequenceOne is not None and data.sequenceTwo is not None and len(data.sequenceOne.rstrip()) > 0 and len(data.sequenceTwo.rstrip()) > 0 :
                 self.sendNotification( Messages.RUN_PAIRWISE_ONLY )
             else :
@@ -146,7 +151,8 @@ class ParseMatrixCommand( patterns.command.SimpleCommand ) :
             
         if matrixFile is not None :
             try :
-                matrix.matrix = Sequencing.loadSubstitutionMatrix( matrixFile )
+                # The matrix is compiled once here, and the compiled matrix is passed to every alignment.
+                matrix.matrix = Sequencing.SubstitutionMatrix( Sequencing.loadSubstitutionMatrix( matrixFile ) )
                 # TODO determine what other kinds of errors could be thrown by the matrix file creation.
             except IOError:
                 if matrixFile != None :
@@ -161,7 +167,8 @@ class ParseMatrixCommand( patterns.command.SimpleCommand ) :
         proxy.setData( matrix )
 
 ##
-# Compares two strings getting the settings from the \ref Model and returns the strings with gaps, as well as the score.
+# Compares two strings getting the settings from the \ref Model and returns the alignment as a \ref PairwiseResultVO, which
+# holds the runs of edit operations the strings with gaps are expanded from, as well as the score.
 #
 # @see patterns.command.SimpleCommand
 # @see core.Model
@@ -173,7 +180,39 @@ class PairwiseCompareCommand( patterns.command.SimpleCommand ) :
         data = proxy.getData()[ DataSelectorVO.VONAME ]
         matrix = proxy.getData()[ MatrixFileVO.VONAME ].matrix
 
-        if settings.analysisBoxValue == 'Affine':
+        if len( data.sequenceOne ) * len( data.sequenceTwo ) > StaticStateProxy.LINEAR_SPACE_CELLS :
+            mode = 'linear-space'
+        else :
+            mode = 'full'
+
+        if settings.analysisBoxValue == 'Edit Distance':
+            distance = Sequencing.editDistance( data.sequenceOne, data.sequenceTwo )
+            self.sendNotification( Messages.SHOW_RESULTS, 'Edit distance: %d' % distance )
+            self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Edit distance successfully computed.' )
+            return
+
+        if settings.analysisBoxValue == 'K-mer Distance':
+            try :
+                kmerLength = int( settings.kmerLengthValue )
+            except ( TypeError, ValueError ) :
+                kmerLength = StaticStateProxy.DEFAULT_KMER_LENGTH
+            if not 1 <= kmerLength <= StaticStateProxy.MAXIMUM_KMER_LENGTH :
+                kmerLength = StaticStateProxy.DEFAULT_KMER_LENGTH
+
+            distance = Sequencing.kmerDistance( data.sequenceOne, data.sequenceTwo, k=kmerLength )
+            self.sendNotification( Messages.SHOW_RESULTS, '%d-mer distance: %d' % ( kmerLength, distance ) )
+            self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'K-mer distance successfully computed.' )
+            return
+
+        if settings.analysisBoxValue == 'MinHash Distance':
+            distances = Sequencing.sketchAllPairs( [ data.sequenceOne, data.sequenceTwo ],
+                                                   k=StaticStateProxy.SKETCH_KMER_LENGTH,
+                                                   size=StaticStateProxy.SKETCH_SIZE )
+            self.sendNotification( Messages.SHOW_RESULTS, 'MinHash distance: %d' % distances[ 1 ] )
+            self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'MinHash distance successfully computed.' )
+            return
+
+        if settings.analysisBoxValue in ( 'Affine', 'Database Search' ):
             try :
                 openGap = int( settings.openGapValue )
             except ValueError :
@@ -183,8 +222,21 @@ class PairwiseCompareCommand( patterns.command.SimpleCommand ) :
                 extendGap = int( settings.extendedGapValue )
             except ValueError :
                 extendGap = StaticStateProxy.DEFAULT_EXT_PENALTY
-                
-            result = Sequencing.affineSequence( 1, openGap, extendGap, matrix, data.sequenceOne, data.sequenceTwo )
+
+        if settings.analysisBoxValue == 'Database Search':
+            # The second sequence is searched as a database of one subject, so the hit is shown like an alignment.
+            hits = Sequencing.searchDatabase( matrix, data.sequenceOne, [ data.sequenceTwo ], 'affine', ( openGap, extendGap ),
+                                              k=StaticStateProxy.SEARCH_SEED_LENGTH,
+                                              x_drop=StaticStateProxy.DEFAULT_X_DROP )
+            if not hits :
+                self.sendNotification( Messages.SHOW_RESULTS, 'No hits found.' )
+                self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Database search complete.' )
+                return
+            result = hits[ 0 ][ 1: ]
+        elif settings.analysisBoxValue == 'Affine':
+            result = Sequencing.affineSequence( 1, openGap, extendGap, matrix, data.sequenceOne, data.sequenceTwo, mode=mode,
+                                                threads=StaticStateProxy.PAIRWISE_THREADS,
+                                                tile_size=StaticStateProxy.PAIRWISE_TILE_SIZE, cigar=1 )
         else :
             try :
                 gapPenalty = int( settings.gapPenaltyValue )
@@ -196,9 +248,23 @@ class PairwiseCompareCommand( patterns.command.SimpleCommand ) :
             else :
                 useGlobal = 0
 
-            result = Sequencing.linearSequence( useGlobal, gapPenalty, matrix, data.sequenceOne, data.sequenceTwo )
-            
-        self.sendNotification( Messages.SHOW_RESULTS, result )
+            # The banded and x-drop modes only fill the cells near the best path, so they never need linear-space.
+            if settings.analysisBoxValue == 'Banded':
+                mode = 'banded'
+            elif settings.analysisBoxValue == 'X-Drop':
+                mode = 'x-drop'
+
+            result = Sequencing.linearSequence( useGlobal, gapPenalty, matrix, data.sequenceOne, data.sequenceTwo, mode=mode,
+                                                x_drop=StaticStateProxy.DEFAULT_X_DROP,
+                                                threads=StaticStateProxy.PAIRWISE_THREADS,
+                                                tile_size=StaticStateProxy.PAIRWISE_TILE_SIZE, cigar=1 )
+
+        # Only the runs of edit operations are kept, the results tab expands them into the gapped sequences.
+        alignment = PairwiseResultVO( )
+        alignment.operations, alignment.startOne, alignment.endOne, alignment.startTwo, alignment.endTwo, alignment.score = result
+        alignment.sequenceOne = data.sequenceOne
+        alignment.sequenceTwo = data.sequenceTwo
+        self.sendNotification( Messages.SHOW_RESULTS, alignment )
         self.sendNotification( Messages.UPDATE_STATUS_TEXT, 'Sequences successfully aligned.' )
 
 ##
@@ -217,7 +283,17 @@ class BuildNewickTreeCommand( patterns.command.SimpleCommand ) :
         scores = scoreMatrix.result
         names = scoreMatrix.names
         
-        result = Sequencing.constructNewickTree( scores, names )
+        if scoreMatrix.kmerLength is not None and scoreMatrix.replicates :
+            # Every replicate redraws the k-mers of the sequences, so the tree of the k-mer distances comes with the
+            # support of its branches.  The tree itself is joined from the distances that were already scored.
+            sequences = proxy.getData()[ SequenceListVO.VONAME ].sequences
+            result = Sequencing.bootstrapNewickTree( [ sequence.seq for sequence in sequences ], names,
+                                                     replicates=scoreMatrix.replicates,
+                                                     k=scoreMatrix.kmerLength,
+                                                     search=StaticStateProxy.TREE_SEARCH,
+                                                     distances=scores )
+        else :
+            result = Sequencing.constructNewickTree( scores, names, search=StaticStateProxy.TREE_SEARCH )
 
         self.sendNotification( Messages.SHOW_RESULTS, result )
         if settings.useForester :
@@ -4,6 +4,7 @@ from tkinter import filedialog
 
 from comm import valueObjects
 from comm.messages import Messages
+from libs import Sequencing
 import patterns.mediator
 
 ##
@@ -69,7 +70,8 @@ class PairwiseSequenceMediator( patterns.mediator.Mediator ) :
 
         self.viewComponent.matrixComboBox.state( [ 'readonly' ] )
         self.viewComponent.matrixComboBox.set( 'BLOSUM62' )
-        self.viewComponent.analysisComboBox[ 'values' ] = ( 'Local', 'Global', 'Affine' )
+        self.viewComponent.analysisComboBox[ 'values' ] = ( 'Local', 'Global', 'Affine', 'Banded', 'X-Drop', 'Edit Distance', 'K-mer Distance',
+                                                         'MinHash Distance', 'Database Search' )
         self.viewComponent.analysisComboBox.state( [ 'readonly' ] )
         self.viewComponent.analysisComboBox.set( 'Local' )
         self.viewComponent.analysisComboBox.bind( '<<ComboboxSelected>>', self.transformPage )
@@ -81,6 +83,8 @@ class PairwiseSequenceMediator( patterns.mediator.Mediator ) :
         psvo.openGapValue = self.viewComponent.openGapEntry.get( )
         psvo.extendedGapValue = self.viewComponent.extendGapEntry.get( )
         psvo.gapPenaltyValue = self.viewComponent.gapPenaltyEntry.get( )
+        psvo.kmerLengthValue = self.viewComponent.kmerLengthEntry.get( )
+        psvo.bootstrapValue = self.viewComponent.bootstrapEntry.get( )
         psvo.matrixFileValue = self.viewComponent.matrixFileEntry.get( )
         psvo.matrixBoxValue = self.viewComponent.matrixComboBox.get( )
         psvo.analysisBoxValue = self.viewComponent.analysisComboBox.get( )
@@ -97,13 +101,32 @@ class PairwiseSequenceMediator( patterns.mediator.Mediator ) :
     #noinspection PyUnusedLocal
     def transformPage( self, event=None ) :
         val = self.viewComponent.analysisComboBox.get( )
-        if val == 'Affine' :
+        if val == 'K-mer Distance' :
+            self.viewComponent.kmerLengthLabel.grid( column=1, row=6, sticky=W )
+            self.viewComponent.kmerLengthEntry.grid( column=1, row=7, columnspan=2, sticky=( E, W ) )
+            self.viewComponent.bootstrapLabel.grid( column=1, row=8, sticky=W )
+            self.viewComponent.bootstrapEntry.grid( column=1, row=9, columnspan=2, sticky=( E, W ) )
+        else :
+            self.viewComponent.kmerLengthEntry.grid_remove( )
+            self.viewComponent.kmerLengthLabel.grid_remove( )
+            self.viewComponent.bootstrapEntry.grid_remove( )
+            self.viewComponent.bootstrapLabel.grid_remove( )
+
+        if val in ( 'Affine', 'Database Search' ) :
             self.viewComponent.openGapLabel.grid( column=1, row=6, sticky=W )
             self.viewComponent.openGapEntry.grid( column=1, row=7, columnspan=2, sticky=( E, W ) )
             self.viewComponent.extendGapLabel.grid( column=1, row=8, sticky=W )
             self.viewComponent.extendGapEntry.grid( column=1, row=9, columnspan=2, sticky=( E, W ) )
             self.viewComponent.gapPenaltyLabel.grid_remove( )
             self.viewComponent.gapPenaltyEntry.grid_remove( )
+        elif val in ( 'Edit Distance', 'K-mer Distance', 'MinHash Distance' ) :
+            # The distances do not align the sequences, so there are no gap penalties to enter.
+            self.viewComponent.openGapEntry.grid_remove( )
+            self.viewComponent.openGapLabel.grid_remove( )
+            self.viewComponent.extendGapEntry.grid_remove( )
+            self.viewComponent.extendGapLabel.grid_remove( )
+            self.viewComponent.gapPenaltyLabel.grid_remove( )
+            self.viewComponent.gapPenaltyEntry.grid_remove( )
         else :
             self.viewComponent.openGapEntry.grid_remove( )
             self.viewComponent.openGapLabel.grid_remove( )
@@ -180,9 +203,26 @@ class ResultMediator( patterns.mediator.Mediator ) :
                 self.viewComponent.resultsArea.delete( '1.0', END )
                 self.firstRun = False
             results = notification.getBody( )
+            if isinstance( results, valueObjects.PairwiseResultVO ) :
+                results = self.expandAlignment( results )
             self.viewComponent.resultsArea.insert( END, results )
             self.viewComponent.resultsArea.insert( END, '\n\n' )
 
+    ##
+    # Expands the runs of edit operations of a pairwise alignment into the strings with gaps the first time the
+    # alignment is shown, and formats them the way the aligned strings and the score were shown before.
+    ##
+    def expandAlignment( self, alignment ) :
+        if alignment.alignedOne is None :
+            alignment.alignedOne, alignment.alignedTwo = Sequencing.expandCigar( alignment.operations,
+                                                                                alignment.sequenceOne,
+                                                                                alignment.sequenceTwo,
+                                                                                alignment.startOne,
+                                                                                alignment.startTwo )
+        alignedOne = alignment.alignedOne or 'No-Sequence'
+        alignedTwo = alignment.alignedTwo or 'No-Sequence'
+        return '%s %s %d' % ( alignedOne, alignedTwo, alignment.score )
+
     def onRegister( self ) :
         pass
 
@@ -58,6 +58,62 @@ class StaticStateProxy( patterns.proxy.Proxy ) :
     DEFAULT_GAP_PENALTY = -1
     DEFAULT_OPEN_PENALTY = -4
     DEFAULT_EXT_PENALTY = -1
+    ##
+    # The length of the k-mers shared by the sequences of the 'K-mer Distance' analysis, and the longest k-mers the
+    # pyd supports.
+    ##
+    DEFAULT_KMER_LENGTH = 4
+    MAXIMUM_KMER_LENGTH = 8
+    ##
+    # The k-mer length and the number of hashes of the sketches of the 'MinHash Distance' analysis, and the extension of
+    # the sketch file written next to the fasta file.  Changing either value sketches the records again.
+    ##
+    SKETCH_KMER_LENGTH = 21
+    SKETCH_SIZE = 1000
+    SKETCH_FILE_EXTENSION = '.sketch'
+    ##
+    # The length of the seeds of the 'Database Search' analysis, the word size of BLAST for nucleotides, and the
+    # extension of the seed index file written next to the fasta file.
+    ##
+    SEARCH_SEED_LENGTH = 11
+    SEED_INDEX_EXTENSION = '.seeds'
+    ##
+    # Pairwise alignments with more cells than this use the linear-space alignment mode instead of the full matrix.
+    ##
+    LINEAR_SPACE_CELLS = 25000000
+    ##
+    # The engine used to score the pairwise comparisons of the score matrix.  'batch' scores one sequence against many
+    # sequences at once, 'striped' vectorizes each comparison, and 'scalar' uses the original kernels.  All of them
+    # produce the same scores.
+    ##
+    SCORE_ENGINE = 'batch'
+    ##
+    # The search used to find the pair of nodes to join while constructing the newick tree.  'rapid' skips most of the
+    # pairs of large score matrices and 'exact' compares every pair.  Both construct the same tree.
+    ##
+    TREE_SEARCH = 'rapid'
+    ##
+    # The largest number of sequences whose score matrix is shown in the results, larger matrices are only used to
+    # construct the newick tree.
+    ##
+    SHOWN_SCORE_MATRIX_SIZE = 100
+    ##
+    # The number of bootstrap replicates used to find the support of the branches of the newick tree of the 'K-mer
+    # Distance' analysis when none is entered.  The support is written after every inner node of the tree.  0 turns
+    # the bootstrap off, so the guide tree is joined as soon as the distances are scored.
+    ##
+    DEFAULT_BOOTSTRAP_REPLICATES = 0
+    ##
+    # How far below the best score the 'X-Drop' analysis lets an extension drop before it stops.
+    ##
+    DEFAULT_X_DROP = 50
+    ##
+    # The threads and the tile size of the 'Local', 'Global' and 'Affine' pairwise alignments.  The sequence matrix is
+    # computed in square tiles, and the tiles on each anti-diagonal run on their own thread.  0 threads uses one thread
+    # per CPU.  The alignment does not depend on either value.
+    ##
+    PAIRWISE_THREADS = 0
+    PAIRWISE_TILE_SIZE = 256
 
     def setData( self, data ) :
         ##
@@ -110,6 +110,10 @@ class PairwiseInterface( ttk.Frame ) :
     extendGapLabel = None
     gapPenaltyEntry = None
     gapPenaltyLabel = None
+    kmerLengthEntry = None
+    kmerLengthLabel = None
+    bootstrapEntry = None
+    bootstrapLabel = None
     matrixFileEntry = None
     matrixBrowseButton = None
     matrixComboBox = None
@@ -148,6 +152,12 @@ class PairwiseInterface( ttk.Frame ) :
         self.extendGapLabel = ttk.Label( self, text='Extend Gap Penalty')
         self.extendGapEntry = ttk.Entry( self )
 
+        self.kmerLengthLabel = ttk.Label( self, text='K-mer Length')
+        self.kmerLengthEntry = ttk.Entry( self )
+
+        self.bootstrapLabel = ttk.Label( self, text='Bootstrap Replicates')
+        self.bootstrapEntry = ttk.Entry( self )
+
 ##
 # \ref ResultsInterface subclasses ttk.Frame and lays out the results interface. This view is mediated
 # by \ref ResultMediator.  All layout is handled in the constructor.
@@ -49,6 +49,7 @@ class EntryPoint( patterns.facade.Facade ) :
         self.registerCommand( Messages.GET_STORED_SUB_MATRIX, controller.ParseMatrixCommand )
         self.registerCommand( Messages.RUN_PAIRWISE_ONLY, controller.PairwiseCompareCommand )
         self.registerCommand( Messages.RUN_PAIRWISE_MATRIX, async.CreateScoreMatrixCommand )
+        self.registerCommand( Messages.RUN_DATABASE_SEARCH, async.SearchDatabaseCommand )
         self.registerCommand( Messages.EXTRACT_SEQUENCES, controller.ParseFastaCommand )
         self.registerCommand( Messages.BUILD_NEWICK_TREE, controller.BuildNewickTreeCommand )
         self.registerCommand( Messages.SHOW_TREE_GRAPHICALLY, controller.OpenTreeInForester )
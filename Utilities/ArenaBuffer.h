@@ -0,0 +1,109 @@
+#include <algorithm>
+#include <cstddef>
+#include <deque>
+#include <vector>
+
+#ifndef ___ARENABUFFER___
+#define ___ARENABUFFER___
+
+/**
+ * The utilities namespace holds the basic utilities for scanning strings
+ * and files into tokens and retrieving data.
+ */
+namespace Utilities
+{
+	/**
+	 * The ArenaBuffer class lends a contiguous block of memory from an arena that belongs to
+	 * the calling thread. The arena keeps one block for every buffer that is in use at the
+	 * same time. A block grows to the largest size requested from it and is kept when its
+	 * buffer is released, so a thread that computes many alignments allocates its matrices
+	 * once instead of once per alignment. Buffers must be released in the reverse order of
+	 * their creation, which holds for buffers that are local variables.
+	 *
+	 * Blocks of more than RETAINED_SIZE elements are freed when their buffer is released,
+	 * so a single large alignment does not hold on to its memory.
+	 */
+	template <class T>
+	class ArenaBuffer
+	{
+	private:
+		T* data;
+		size_t size;
+
+		static std::deque<std::vector<T> >& blocks()
+		{
+			static thread_local std::deque<std::vector<T> > arena;
+			return arena;
+		}
+
+		static size_t& depth()
+		{
+			static thread_local size_t depth = 0;
+			return depth;
+		}
+
+		ArenaBuffer(const ArenaBuffer& other);
+		ArenaBuffer& operator = (const ArenaBuffer& other);
+
+	public:
+		/**
+		 * The largest number of elements that a block keeps after its buffer is released.
+		 */
+		static const size_t RETAINED_SIZE = 1 << 22;
+
+		/**
+		 * Borrows a buffer from the arena of the calling thread.
+		 *
+		 * @param size The number of elements of the buffer.
+		 * @param value The value every element of the buffer is set to.
+		 */
+		ArenaBuffer(const size_t size, const T& value)
+		{
+			std::deque<std::vector<T> >& arena = ArenaBuffer::blocks();
+			size_t& depth = ArenaBuffer::depth();
+			if ( depth == arena.size() )
+				arena.push_back(std::vector<T>());
+
+			std::vector<T>& block = arena[depth];
+			depth++;
+			if ( block.size() < size )
+				block.resize(size);
+			std::fill(block.begin(), block.begin() + size, value);
+
+			this->data = block.empty() ? NULL : &block[0];
+			this->size = size;
+		}
+
+		/**
+		 * Returns the buffer to the arena of the calling thread.
+		 */
+		~ArenaBuffer()
+		{
+			size_t& depth = ArenaBuffer::depth();
+			depth--;
+
+			std::vector<T>& block = ArenaBuffer::blocks()[depth];
+			if ( block.size() > RETAINED_SIZE )
+				std::vector<T>().swap(block);
+		}
+
+		/**
+		 * This function returns the first element of the buffer.
+		 *
+		 * @return A pointer to the elements of the buffer.
+		 */
+		T* get() { return this->data; }
+
+		/**
+		 * This function returns the number of elements of the buffer.
+		 *
+		 * @return The size of the buffer.
+		 */
+		size_t getSize() const { return this->size; }
+
+		T& operator [] (const size_t index) { return this->data[index]; }
+		const T& operator [] (const size_t index) const { return this->data[index]; }
+	};
+}
+
+#endif
\ No newline at end of file
@@ -0,0 +1,122 @@
+#include "MappedFile.h"
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace Utilities
+{
+	MappedFile::MappedFile()
+	{
+		this->data = NULL;
+		this->size = 0;
+#ifdef _WIN32
+		this->file = INVALID_HANDLE_VALUE;
+		this->mapping = NULL;
+#else
+		this->file = -1;
+#endif
+	}
+
+	MappedFile::~MappedFile()
+	{
+		this->close();
+	}
+
+#ifdef _WIN32
+	bool MappedFile::open(const std::string& filename)
+	{
+		this->close();
+
+		this->file = CreateFileA(filename.c_str(), GENERIC_READ, FILE_SHARE_READ, NULL, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, NULL);
+		if ( this->file == INVALID_HANDLE_VALUE )
+			return false;
+
+		LARGE_INTEGER file_size;
+		if ( !GetFileSizeEx(this->file, &file_size) )
+		{
+			this->close();
+			return false;
+		}
+
+		// An empty file can not be mapped, but it is still a file with no contents.
+		this->size = (size_t)file_size.QuadPart;
+		if ( this->size == 0 )
+			return true;
+
+		this->mapping = CreateFileMappingA(this->file, NULL, PAGE_READONLY, 0, 0, NULL);
+		if ( this->mapping != NULL )
+			this->data = (const char*)MapViewOfFile(this->mapping, FILE_MAP_READ, 0, 0, 0);
+
+		if ( this->data == NULL )
+		{
+			this->close();
+			return false;
+		}
+		return true;
+	}
+
+	void MappedFile::close()
+	{
+		if ( this->data != NULL )
+			UnmapViewOfFile(this->data);
+		if ( this->mapping != NULL )
+			CloseHandle(this->mapping);
+		if ( this->file != INVALID_HANDLE_VALUE )
+			CloseHandle(this->file);
+
+		this->data = NULL;
+		this->size = 0;
+		this->file = INVALID_HANDLE_VALUE;
+		this->mapping = NULL;
+	}
+#else
+	bool MappedFile::open(const std::string& filename)
+	{
+		this->close();
+
+		this->file = ::open(filename.c_str(), O_RDONLY);
+		if ( this->file < 0 )
+			return false;
+
+		struct stat status;
+		if ( fstat(this->file, &status) != 0 )
+		{
+			this->close();
+			return false;
+		}
+
+		// An empty file can not be mapped, but it is still a file with no contents.
+		this->size = (size_t)status.st_size;
+		if ( this->size == 0 )
+			return true;
+
+		void* mapped = mmap(NULL, this->size, PROT_READ, MAP_SHARED, this->file, 0);
+		if ( mapped == MAP_FAILED )
+		{
+			this->close();
+			return false;
+		}
+
+		this->data = (const char*)mapped;
+		return true;
+	}
+
+	void MappedFile::close()
+	{
+		if ( this->data != NULL )
+			munmap((void*)this->data, this->size);
+		if ( this->file >= 0 )
+			::close(this->file);
+
+		this->data = NULL;
+		this->size = 0;
+		this->file = -1;
+	}
+#endif
+}
\ No newline at end of file
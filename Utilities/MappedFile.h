@@ -0,0 +1,77 @@
+#include <cstddef>
+#include <string>
+
+#ifndef ___MAPPEDFILE___
+#define ___MAPPEDFILE___
+
+/**
+ * The utilities namespace holds the basic utilities for scanning strings
+ * and files into tokens and retrieving data.
+ */
+namespace Utilities
+{
+	/**
+	 * The MappedFile class maps a file into memory for reading, so the contents of a large
+	 * file can be used in place without reading it. The pages of the file are only read
+	 * when they are first touched, and they are shared with every other process that maps
+	 * the same file. The file must not be written while it is mapped.
+	 */
+	class MappedFile
+	{
+	private:
+		const char* data;
+		size_t size;
+#ifdef _WIN32
+		void* file;
+		void* mapping;
+#else
+		int file;
+#endif
+
+		MappedFile(const MappedFile& other);
+		MappedFile& operator = (const MappedFile& other);
+
+	public:
+		/**
+		 * Creates a MappedFile that has no file mapped.
+		 */
+		MappedFile();
+
+		/**
+		 * Default destructor. If a file is mapped when the destructor is called, the
+		 * file will automatically be closed.
+		 */
+		~MappedFile();
+
+		/**
+		 * Maps the file at the specified path, closing the file mapped before.
+		 *
+		 * @param filename The path of the file to map.
+		 * @return This function returns true if the file was sucessfully mapped.
+		 */
+		bool open(const std::string& filename);
+
+		/**
+		 * This function unmaps and closes the mapped file. If no file is mapped, then
+		 * this function does nothing.
+		 */
+		void close();
+
+		/**
+		 * This function returns the contents of the mapped file.
+		 *
+		 * @return A pointer to the first byte of the file, or NULL if no file is mapped or
+		 * the file is empty.
+		 */
+		const char* getData() const { return this->data; };
+
+		/**
+		 * This function returns the size of the mapped file.
+		 *
+		 * @return The number of bytes of the file.
+		 */
+		size_t getSize() const { return this->size; };
+	};
+}
+
+#endif
\ No newline at end of file
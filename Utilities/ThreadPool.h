@@ -0,0 +1,92 @@
+#include <atomic>
+#include <thread>
+#include <vector>
+
+#ifndef ___THREADPOOL___
+#define ___THREADPOOL___
+
+/**
+ * The utilities namespace holds the basic utilities for scanning strings
+ * and files into tokens and retrieving data.
+ */
+namespace Utilities
+{
+	/**
+	 * The ThreadPool class runs a number of independent tasks on a fixed number of native
+	 * threads. The tasks are handed out one at a time in the order of their index, so long
+	 * tasks that come first do not leave the other threads idle at the end. The calling
+	 * thread works on the tasks as well, and run() returns when every task is complete.
+	 *
+	 * The tasks must not call into Python, which allows the callers to release the GIL
+	 * while the pool is running.
+	 */
+	class ThreadPool
+	{
+	private:
+		int thread_count;
+
+		template <class Task>
+		static void worker(Task* task, std::atomic<int>* next_task, const int task_count)
+		{
+			for ( int index = (*next_task)++; index < task_count; index = (*next_task)++ )
+				(*task)(index);
+		}
+
+	public:
+		/**
+		 * Creates a new thread pool.
+		 *
+		 * @param thread_count The number of threads that run the tasks. If the count is 0
+		 * or less, one thread per processor is used.
+		 */
+		ThreadPool(const int thread_count)
+		{
+			this->thread_count = (thread_count > 0) ? thread_count : ThreadPool::getProcessorCount();
+		}
+
+		/**
+		 * Default Destructor.
+		 */
+		~ThreadPool() {}
+
+		/**
+		 * This function returns the number of threads that run the tasks.
+		 *
+		 * @return The number of threads.
+		 */
+		int getThreadCount() const { return this->thread_count; }
+
+		/**
+		 * This function runs the tasks and waits until they are complete.
+		 *
+		 * @param task_count The number of tasks.
+		 * @param task A function object that is called once with the index of each task.
+		 */
+		template <class Task>
+		void run(const int task_count, Task& task)
+		{
+			std::atomic<int> next_task(0);
+			std::vector<std::thread> threads;
+			for ( int t = 1; t < this->thread_count && t < task_count; t++ )
+				threads.push_back(std::thread(&ThreadPool::worker<Task>, &task, &next_task, task_count));
+
+			ThreadPool::worker<Task>(&task, &next_task, task_count);
+
+			for ( unsigned int t = 0; t < threads.size(); t++ )
+				threads[t].join();
+		}
+
+		/**
+		 * This function returns the number of processors, or 1 if it can not be found.
+		 *
+		 * @return The number of processors.
+		 */
+		static int getProcessorCount()
+		{
+			int count = std::thread::hardware_concurrency();
+			return (count > 0) ? count : 1;
+		}
+	};
+}
+
+#endif
\ No newline at end of file
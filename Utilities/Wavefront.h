@@ -0,0 +1,112 @@
+#include "ThreadPool.h"
+
+#ifndef ___WAVEFRONT___
+#define ___WAVEFRONT___
+
+/**
+ * The utilities namespace holds the basic utilities for scanning strings
+ * and files into tokens and retrieving data.
+ */
+namespace Utilities
+{
+	/**
+	 * The Wavefront class runs the tiles of a dynamic programming matrix in which every cell
+	 * depends on the cells above it, to its left and on its upper left diagonal. The matrix
+	 * is cut into square tiles, and a tile can be computed once the tiles above it and to
+	 * its left are complete. The tiles on one anti-diagonal of the grid of tiles do not
+	 * depend on each other, so they are computed concurrently by a ThreadPool, one
+	 * anti-diagonal after the other.
+	 *
+	 * Every cell is computed from the same inputs as in a row by row fill, so the result
+	 * does not depend on the tile size or the number of threads.
+	 */
+	class Wavefront
+	{
+	private:
+		int tile_size;
+		ThreadPool pool;
+
+		/**
+		 * The task of the ThreadPool that computes one tile of an anti-diagonal.
+		 */
+		template <class Tile>
+		struct WavefrontTask
+		{
+			Tile* tile;
+			int diagonal;
+			int first_row;
+
+			void operator () (const int index)
+			{
+				(*this->tile)(this->first_row + index, this->diagonal - this->first_row - index);
+			}
+		};
+
+	public:
+		/**
+		 * The tile size used when no tile size is requested.
+		 */
+		static const int DEFAULT_TILE_SIZE = 256;
+
+		/**
+		 * Creates a new wavefront.
+		 *
+		 * @param tile_size The number of rows and columns of a tile. If the size is 0 or
+		 * less, the default tile size is used.
+		 * @param thread_count The number of threads that compute the tiles. If the count is 0
+		 * or less, one thread per processor is used.
+		 */
+		Wavefront(const int tile_size, const int thread_count) : pool(thread_count)
+		{
+			this->tile_size = (tile_size > 0) ? tile_size : Wavefront::DEFAULT_TILE_SIZE;
+		}
+
+		/**
+		 * Default Destructor.
+		 */
+		~Wavefront() {}
+
+		/**
+		 * This function returns the number of rows and columns of a tile.
+		 *
+		 * @return The tile size.
+		 */
+		int getTileSize() const { return this->tile_size; }
+
+		/**
+		 * This function returns the number of tiles needed to cover a number of rows or columns.
+		 *
+		 * @param length The number of rows or columns.
+		 * @return The number of tiles.
+		 */
+		int getTileCount(const int length) const { return (length + this->tile_size - 1) / this->tile_size; }
+
+		/**
+		 * This function computes every tile of a matrix and waits until they are complete.
+		 *
+		 * @param rows The number of rows of the matrix, not counting the boundary row.
+		 * @param columns The number of columns of the matrix, not counting the boundary column.
+		 * @param tile A function object that is called once with the row and the column of
+		 * each tile in the grid of tiles.
+		 */
+		template <class Tile>
+		void run(const int rows, const int columns, Tile& tile)
+		{
+			int tile_rows = this->getTileCount(rows);
+			int tile_columns = this->getTileCount(columns);
+			if ( tile_rows == 0 || tile_columns == 0 )
+				return;
+
+			for ( int diagonal = 0; diagonal < tile_rows + tile_columns - 1; diagonal++ )
+			{
+				int first_row = (diagonal < tile_columns) ? 0 : diagonal - tile_columns + 1;
+				int last_row = (diagonal < tile_rows) ? diagonal : tile_rows - 1;
+
+				WavefrontTask<Tile> task = { &tile, diagonal, first_row };
+				this->pool.run(last_row - first_row + 1, task);
+			}
+		}
+	};
+}
+
+#endif
\ No newline at end of file
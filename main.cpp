@@ -4,7 +4,7 @@
 #include "Pairwise/LinearSequencer.h"
 #include "Pairwise/AffineSequencer.h"
 #include "NeighborJoin/NeighborJoin.h"
-#include "NeighborJoin/GeneticTreeNode.h"
+#include "NeighborJoin/GeneticTree.h"
 #include "MultipleAlignment/Msa.h"
 
 int main()
@@ -6,13 +6,26 @@ SequencingModule = Extension('Sequencing',
                                       'Sequencing/Alignment.cpp',
                                       'Pairwise/SubstitutionMatrix.cpp',
                                       'Pairwise/PairwiseAlignment.cpp',
+                                      'Pairwise/EncodedSequence.cpp',
+                                      'Pairwise/ScoreProfile.cpp',
+                                      'Pairwise/StripedSequencer.cpp',
+                                      'Pairwise/BatchSequencer.cpp',
+                                      'Pairwise/BandedSequencer.cpp',
+                                      'Pairwise/AllPairsScorer.cpp',
+                                      'Pairwise/Cigar.cpp',
+                                      'Pairwise/EditDistanceSequencer.cpp',
+                                      'Pairwise/KmerDistanceSequencer.cpp',
+                                      'Pairwise/MinHashSketcher.cpp',
+                                      'Pairwise/SeedSearcher.cpp',
                                       'Pairwise/AffineSequencer.cpp',
                                       'Pairwise/LinearSequencer.cpp',
                                       'Utilities/Scanner.cpp',
                                       'Utilities/FileScanner.cpp',
+                                      'Utilities/MappedFile.cpp',
                                       'Utilities/StringScanner.cpp',
                                       'NeighborJoin/NeighborJoin.cpp',
-                                      'NeighborJoin/GeneticTreeNode.cpp',
+                                      'NeighborJoin/GeneticTree.cpp',
+                                      'NeighborJoin/NeighborJoinBootstrap.cpp',
                                       'MultipleAlignment/Msa.cpp']
 )
 